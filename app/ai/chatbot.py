@@ -1,16 +1,16 @@
+import os
 import json
 import asyncio
+import logging
 import uuid
+from cachetools import LRUCache
 from typing_extensions import TypedDict, Annotated
 
-from langgraph.store.memory import InMemoryStore
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from langchain_core.messages import ToolMessage, HumanMessage, AIMessage
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import MemorySaver
 from langchain_core.runnables import RunnableConfig
-from langgraph.store.base import BaseStore
 
 # Import our custom modules and tools
 from app.ai.tools.news_sentiment import news_sentiment_tool
@@ -19,6 +19,10 @@ from app.ai.sentiment_analyzer import (
     analyze_sentiment,
 )  # analyze_sentiment now accepts LLM
 from langchain_core.language_models import BaseChatModel  # Import for type hinting
+from app.ai.models.gemini import create_gemini_flash_model
+from app.ai.checkpoints import create_checkpointer
+from app.ai.memory import ChatMemoryBackend, create_chat_memory
+from app.ai.tool_cache import ToolResultCache, create_tool_cache
 
 # Import and instantiate DuckDuckGoSearchRun
 from langchain_community.tools import DuckDuckGoSearchRun
@@ -40,13 +44,71 @@ class State(TypedDict):
 # List of tool instances; note that DuckDuckGoSearchRun is now instantiated.
 tools = [duckduckgo_search_tool, news_sentiment_tool, fetch_yfinance_news]
 
+# Results of identical tool calls are reused for a few minutes across chats
+tool_cache = create_tool_cache()
+
 
 class BasicToolNode:
-    """A node that runs the tools requested in the last AIMessage."""
+    """
+    A node that runs the tools requested in the last AIMessage.
+
+    All tool calls of the message run concurrently: async tools on the event
+    loop, sync-only tools in worker threads. Each call is bounded by its
+    tool's timeout (TOOL_TIMEOUT_SECONDS by default); a call that times out or
+    fails answers with an error payload so the other results still reach the LLM.
+    Results are reused from ``cache`` while fresh (see app/ai/tool_cache.py).
+    """
 
-    def __init__(self, tools: list) -> None:
+    def __init__(
+        self,
+        tools: list,
+        timeouts: dict[str, float] | None = None,
+        cache: ToolResultCache | None = None,
+    ) -> None:
         # Create a mapping from tool name to tool instance
         self.tools_by_name = {tool.name: tool for tool in tools}
+        self.default_timeout = float(os.getenv("TOOL_TIMEOUT_SECONDS", "30"))
+        self.timeouts = timeouts or {}
+        self.cache = cache
+
+    def _invoke(self, tool, tool_call: dict):
+        # Use the asynchronous method if available
+        if hasattr(tool, "arun") and asyncio.iscoroutinefunction(tool.arun):
+            return tool.arun(tool_call["args"])
+        # Fallback to the synchronous method, off the event loop
+        if hasattr(tool, "run"):
+            return asyncio.to_thread(tool.run, tool_call["args"])
+        raise ValueError(f"Tool {tool_call['name']} does not have 'run' or 'arun' method.")
+
+    async def _run(self, tool_call: dict) -> ToolMessage:
+        name = tool_call["name"]
+        # Ensure tool_call_id is present and properly set
+        tool_call_id = tool_call.get("id") or str(uuid.uuid4())
+        timeout = self.timeouts.get(name, self.default_timeout)
+
+        async def call():
+            return await asyncio.wait_for(self._invoke(tool, tool_call), timeout=timeout)
+
+        try:
+            tool = self.tools_by_name.get(name)
+            if tool is None:
+                raise ValueError(f"Unknown tool {name}")
+            if self.cache is not None:
+                tool_result = await self.cache.get_or_call(name, tool_call["args"], call)
+            else:
+                tool_result = await call()
+        except TimeoutError:
+            logging.warning("Tool %s timed out after %ss", name, timeout)
+            tool_result = {"error": f"{name} timed out after {timeout} seconds"}
+        except Exception as e:
+            logging.warning("Tool %s failed: %s", name, e)
+            tool_result = {"error": f"{name} failed: {e}"}
+
+        return ToolMessage(
+            content=json.dumps(tool_result),
+            name=name,
+            tool_call_id=tool_call_id,
+        )
 
     async def __call__(self, inputs: dict):
         messages = inputs.get("messages", [])
@@ -54,62 +116,8 @@ class BasicToolNode:
             raise ValueError("No message found in input")
         message = messages[-1]
 
-        outputs = []
-        tasks = []
-
-        # Iterate through each tool call in the message
-        for tool_call in message.tool_calls:
-            tool = self.tools_by_name[tool_call["name"]]
-            tool_args = tool_call["args"]
-
-            # Ensure tool_call_id is present and properly set
-            tool_call_id = tool_call.get("id")
-            if not tool_call_id:
-                # Generate a UUID if id not present
-                tool_call_id = str(uuid.uuid4())
-
-            # Use the asynchronous method if available
-            if hasattr(tool, "arun") and asyncio.iscoroutinefunction(tool.arun):
-                task = tool.arun(tool_args)  # call the async method
-                tasks.append((task, tool_call, tool_call_id))
-            # Fallback to the synchronous method if available
-            elif hasattr(tool, "run"):
-                tool_result = tool.run(tool_args)
-                outputs.append(
-                    ToolMessage(
-                        content=json.dumps(tool_result),
-                        name=tool_call["name"],
-                        tool_call_id=tool_call_id,
-                    )
-                )
-            else:
-                raise ValueError(
-                    f"Tool {tool_call['name']} does not have 'run' or 'arun' method."
-                )
-
-        print(f"tool_call in sync: {tool_call}")
-        print(f"tool_call.keys() in sync: {tool_call.keys()}")
-        print(f"tool_call.get('id') in sync: {tool_call.get('id')}")
-        print(f"tool_call.get('name') in sync: {tool_call.get('name')}")
-        print(f"tool_call.get('args') in sync: {tool_call.get('args')}")
-
-        # Await all asynchronous tasks and process results
-        for task, tool_call, tool_call_id in tasks:
-            print(f"tool_call in async: {tool_call}")
-            print(f"tool_call.keys() in async: {tool_call.keys()}")
-            print(f"tool_call.get('id') in async: {tool_call.get('id')}")
-            print(f"tool_call.get('name') in async: {tool_call.get('name')}")
-            print(f"tool_call.get('args') in async: {tool_call.get('args')}")
-            tool_result = await task
-            outputs.append(
-                ToolMessage(
-                    content=json.dumps(tool_result),
-                    name=tool_call["name"],
-                    tool_call_id=tool_call_id,
-                )
-            )
-
-        return {"messages": outputs}
+        outputs = await asyncio.gather(*(self._run(tool_call) for tool_call in message.tool_calls))
+        return {"messages": list(outputs)}
 
 
 # ---------------------------
@@ -308,17 +316,22 @@ def route_tools(state: State):
 # ChatBot Agent
 # ---------------------------
 async def okane_chat_agent(
-    state: State, config: RunnableConfig, *, store: BaseStore, llm: BaseChatModel
+    state: State,
+    config: RunnableConfig,
+    *,
+    memory: ChatMemoryBackend,
+    llm: BaseChatModel,
+    llm_with_tools=None,
 ):
     """
     Chatbot agent that uses the LLM to generate responses, potentially calling tools.
-    Accepts the LLM instance as an argument.
+    Accepts the LLM instance as an argument, and optionally the LLM with the
+    tools already bound (as create_chatbot_graph does once per graph).
     """
     thread_id = config["configurable"]["thread_id"]
-    namespace = ("memories", thread_id)
     # Use attribute access for the message content
-    memories = store.search(namespace, query=state["messages"][-1].content)
-    info = "\\n".join([d.value["data"] for d in memories])
+    memories = await memory.search(thread_id, state["messages"][-1].content)
+    info = "\\n".join(memories)
 
     # Extract grounded search results from the state
     grounding_message = ""
@@ -351,7 +364,7 @@ async def okane_chat_agent(
     )
 
     last_message = state["messages"][-1]
-    store.put(namespace, str(uuid.uuid4()), {"data": last_message.content})
+    await memory.put(thread_id, last_message.content)
     if "remember" in last_message.content.lower():
         pass  # previously stored the message here, now storing all messages
 
@@ -400,12 +413,12 @@ async def okane_chat_agent(
                 {"role": "user", "content": "Tell me about financial advice."}
             )
 
-        # Bind tools to the passed LLM instance
-        llm_with_tools = llm.bind_tools(tools)
+        # Bind tools to the passed LLM instance unless the graph already did
+        if llm_with_tools is None:
+            llm_with_tools = llm.bind_tools(tools)
         result = await llm_with_tools.ainvoke(formatted_messages)
-        store.put(
-            namespace, str(uuid.uuid4()), {"data": result.content}
-        )  # Store the response
+        if isinstance(result.content, str):
+            await memory.put(thread_id, result.content, role="assistant")  # Store the response
         return {"messages": [result]}
     except Exception as e:
         print(f"Error details in okane_chat_agent: {type(e)}, {str(e)}")
@@ -416,20 +429,24 @@ async def okane_chat_agent(
 # ---------------------------
 # Memory Setup
 # ---------------------------
-memory = MemorySaver()
+EMBEDDING_MODEL = "models/embedding-001"
+
+# Conversation threads; in the database with CHAT_MEMORY_BACKEND=sql (see app/ai/checkpoints.py)
+memory = create_checkpointer()
 
-in_memory_store = InMemoryStore(
-    index={"embed": GoogleGenerativeAIEmbeddings(model="models/embedding-001")}
+# Long-term memories recalled by okane_chat_agent (see app/ai/memory.py)
+chat_memory = create_chat_memory(
+    GoogleGenerativeAIEmbeddings(model=EMBEDDING_MODEL), EMBEDDING_MODEL
 )
 
 # ---------------------------
 # Graph Construction
 # ---------------------------
 # Create the tool node using our list of tool instances.
-tool_node = BasicToolNode(tools=tools)
+tool_node = BasicToolNode(tools=tools, cache=tool_cache)
 
 # Remove global graph instance
-# graph = graph_builder.compile(checkpointer=memory, store=in_memory_store)
+# graph = graph_builder.compile(checkpointer=memory)
 
 
 def create_chatbot_graph(llm: BaseChatModel):
@@ -437,16 +454,18 @@ def create_chatbot_graph(llm: BaseChatModel):
     Creates and compiles the LangGraph chatbot graph with the specified LLM instance.
     """
     # Create the tool node using our list of tool instances.
-    tool_node = BasicToolNode(tools=tools)
+    tool_node = BasicToolNode(tools=tools, cache=tool_cache)
+    # Bind the tools once per graph rather than on every chat turn
+    llm_with_tools = llm.bind_tools(tools)
 
     graph_builder = StateGraph(State)
     graph_builder.add_edge(START, "okane_chat_agent")
 
     # Define wrapper functions to pass the LLM and await the agents
-    async def okane_chat_node(
-        state: State, config: RunnableConfig, *, store: BaseStore
-    ):
-        return await okane_chat_agent(state, config, store=store, llm=llm)
+    async def okane_chat_node(state: State, config: RunnableConfig):
+        return await okane_chat_agent(
+            state, config, memory=chat_memory, llm=llm, llm_with_tools=llm_with_tools
+        )
 
     async def sentiment_analysis_node(state: State):
         return await sentiment_analysis_agent(state, llm=llm)
@@ -494,23 +513,43 @@ def create_chatbot_graph(llm: BaseChatModel):
     # Direct edge from format_final_response to END
     graph_builder.add_edge("format_final_response", END)
 
-    # Compile the graph with checkpointing and persistent store.
-    # Use the global memory and in_memory_store instances
-    compiled_graph = graph_builder.compile(checkpointer=memory, store=in_memory_store)
+    # Compile the graph with checkpointing.
+    # Use the global memory instance; long-term memories live in chat_memory
+    compiled_graph = graph_builder.compile(checkpointer=memory)
 
     return compiled_graph
 
 
-# The graph is now created and compiled in create_chatbot_graph, not globally.
-# The get_langgraph_graph function might need adjustment if it was used elsewhere
-# to get the compiled graph instance. For now, keep it as is, but note it
-# won't return a globally compiled graph anymore.
+# ---------------------------
+# Compiled Graph Cache
+# ---------------------------
+DEFAULT_MODEL_NAME = "gemini-2.0-flash-001"
+DEFAULT_TEMPERATURE = 0.6
+
+# Compiled graphs by (model name, temperature). All of them share the global
+# checkpointer and chat memory, so reusing a graph across sessions keeps threads apart.
+_graph_cache: LRUCache = LRUCache(maxsize=int(os.getenv("CHATBOT_GRAPH_CACHE_SIZE", "8")))
+
+
+def get_chatbot_graph(
+    model_name: str = DEFAULT_MODEL_NAME, temperature: float = DEFAULT_TEMPERATURE
+):
+    """
+    Returns the compiled chatbot graph for a model configuration, creating the
+    LLM, binding its tools and compiling the graph only on first use.
+    """
+    key = (model_name, round(float(temperature), 2))
+    graph = _graph_cache.get(key)
+    if graph is None:
+        llm = create_gemini_flash_model(model_name=key[0], temperature=key[1])
+        graph = create_chatbot_graph(llm)
+        _graph_cache[key] = graph
+    return graph
+
+
 def get_langgraph_graph():
     try:
-        # This function might need to be updated to accept the compiled graph
-        # or the LLM to create it. Leaving as is for now, assuming it might
-        # not be critical or will be updated elsewhere.
-        return create_chatbot_graph().get_graph().draw_mermaid_png()
+        return get_chatbot_graph().get_graph().draw_mermaid_png()
     except Exception:
         # Optional: rendering the diagram requires extra dependencies.
         return None
@@ -0,0 +1,237 @@
+"""
+Bounded LangGraph checkpointers for the chatbot graph.
+
+A checkpointer holds the state of every conversation thread (its messages).
+It follows CHAT_MEMORY_BACKEND like the long-term memories in app/ai/memory.py:
+
+    memory   (default) in process; at most CHAT_MEMORY_MAX_THREADS threads,
+             least recently used and idle ones evicted first
+    sql      the chat_checkpoints / chat_checkpoint_writes tables through
+             app.db, so threads survive restarts and are shared by workers
+
+The sql checkpointer keeps the newest CHAT_MEMORY_MAX_CHECKPOINTS checkpoints
+of a thread (resuming only needs the latest) and purges threads idle for
+CHAT_MEMORY_TTL_HOURS, so storage stays flat however long it runs.
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+import time
+from collections.abc import AsyncIterator, Callable, Sequence
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from app.ai.memory import PURGE_INTERVAL_SECONDS, ThreadLru
+from app.db.repository import ChatCheckpointRepository
+
+
+class BoundedMemorySaver(MemorySaver):
+    """
+    MemorySaver that keeps at most ``max_threads`` conversation threads,
+    deleting the least recently written ones and those idle for ``ttl_seconds``.
+    """
+
+    def __init__(self, max_threads: int = 1000, ttl_seconds: float = 72 * 3600) -> None:
+        super().__init__()
+        self.threads = ThreadLru(max_threads, ttl_seconds)
+
+    def put(self, config, *args, **kwargs):
+        # aput delegates here
+        for thread_id in self.threads.touch(config["configurable"]["thread_id"]):
+            self.delete_thread(thread_id)
+        return super().put(config, *args, **kwargs)
+
+
+def _config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": checkpoint_ns,
+            "checkpoint_id": checkpoint_id,
+        }
+    }
+
+
+class SqlCheckpointSaver(BaseCheckpointSaver):
+    """
+    Checkpoints in the chat_checkpoints table, pending writes in
+    chat_checkpoint_writes. Async only, as the chatbot graph is only run with
+    ainvoke / astream.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable,
+        max_checkpoints: int = 20,
+        ttl_seconds: float = 72 * 3600,
+    ) -> None:
+        super().__init__()
+        self._session_factory = session_factory
+        self._max_checkpoints = max_checkpoints
+        self._ttl = datetime.timedelta(seconds=ttl_seconds)
+        self._purged_at = 0.0
+
+    async def _tuple(self, repo: ChatCheckpointRepository, row) -> CheckpointTuple:
+        writes = await repo.writes(row.thread_id, row.checkpoint_ns, row.checkpoint_id)
+        return CheckpointTuple(
+            config=_config(row.thread_id, row.checkpoint_ns, row.checkpoint_id),
+            checkpoint=self.serde.loads_typed((row.checkpoint_type, row.checkpoint)),
+            metadata=self.serde.loads_typed((row.metadata_type, row.checkpoint_metadata)),
+            parent_config=(
+                _config(row.thread_id, row.checkpoint_ns, row.parent_checkpoint_id)
+                if row.parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (write.task_id, write.channel, self.serde.loads_typed((write.value_type, write.value)))
+                for write in writes
+            ],
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        configurable = config["configurable"]
+        async with self._session_factory() as session:
+            repo = ChatCheckpointRepository(session)
+            row = await repo.get(
+                configurable["thread_id"],
+                configurable.get("checkpoint_ns", ""),
+                get_checkpoint_id(config),
+            )
+            return None if row is None else await self._tuple(repo, row)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        configurable = config["configurable"] if config else {}
+        async with self._session_factory() as session:
+            repo = ChatCheckpointRepository(session)
+            rows = await repo.list(
+                configurable.get("thread_id"),
+                configurable.get("checkpoint_ns"),
+                configurable.get("checkpoint_id"),
+                get_checkpoint_id(before) if before else None,
+                # Metadata is filtered after loading
+                None if filter else limit,
+            )
+            for row in rows:
+                if limit is not None and limit <= 0:
+                    break
+                item = await self._tuple(repo, row)
+                if filter and any(item.metadata.get(k) != v for k, v in filter.items()):
+                    continue
+                if limit is not None:
+                    limit -= 1
+                yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        configurable = config["configurable"]
+        thread_id = configurable["thread_id"]
+        checkpoint_ns = configurable.get("checkpoint_ns", "")
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(checkpoint)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        now = datetime.datetime.now(datetime.UTC)
+
+        async with self._session_factory() as session:
+            repo = ChatCheckpointRepository(session)
+            await repo.put(
+                {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint["id"],
+                    "parent_checkpoint_id": configurable.get("checkpoint_id"),
+                    "checkpoint_type": checkpoint_type,
+                    "checkpoint": checkpoint_blob,
+                    "metadata_type": metadata_type,
+                    "checkpoint_metadata": metadata_blob,
+                    "created_at": now,
+                }
+            )
+            await repo.trim(thread_id, checkpoint_ns, self._max_checkpoints)
+            if time.monotonic() - self._purged_at > PURGE_INTERVAL_SECONDS:
+                self._purged_at = time.monotonic()
+                await repo.delete_idle(now - self._ttl)
+            await repo.commit()
+        return _config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        configurable = config["configurable"]
+        records = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, value_blob = self.serde.dumps_typed(value)
+            records.append(
+                {
+                    "thread_id": configurable["thread_id"],
+                    "checkpoint_ns": configurable.get("checkpoint_ns", ""),
+                    "checkpoint_id": configurable["checkpoint_id"],
+                    "task_id": task_id,
+                    "idx": WRITES_IDX_MAP.get(channel, idx),
+                    "channel": channel,
+                    "value_type": value_type,
+                    "value": value_blob,
+                    "task_path": task_path,
+                }
+            )
+        async with self._session_factory() as session:
+            repo = ChatCheckpointRepository(session)
+            # Special writes (errors, interrupts) replace earlier ones; regular writes are kept
+            await repo.put_writes([r for r in records if r["idx"] >= 0], replace=False)
+            await repo.put_writes([r for r in records if r["idx"] < 0], replace=True)
+            await repo.commit()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        async with self._session_factory() as session:
+            repo = ChatCheckpointRepository(session)
+            await repo.delete_thread(thread_id)
+            await repo.commit()
+
+
+def create_checkpointer():
+    """Checkpointer for the chatbot graph, configured from CHAT_MEMORY_*."""
+    backend = os.getenv("CHAT_MEMORY_BACKEND", "memory").lower()
+    ttl_seconds = float(os.getenv("CHAT_MEMORY_TTL_HOURS", "72")) * 3600
+
+    if backend == "sql":
+        from app.db.postgres import AsyncSessionLocal
+
+        return SqlCheckpointSaver(
+            AsyncSessionLocal,
+            max_checkpoints=int(os.getenv("CHAT_MEMORY_MAX_CHECKPOINTS", "20")),
+            ttl_seconds=ttl_seconds,
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown CHAT_MEMORY_BACKEND {backend!r}; use 'memory' or 'sql'")
+    return BoundedMemorySaver(
+        max_threads=int(os.getenv("CHAT_MEMORY_MAX_THREADS", "1000")),
+        ttl_seconds=ttl_seconds,
+    )
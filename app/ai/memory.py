@@ -0,0 +1,252 @@
+"""
+Bounded chat memory for the chatbot, with cached embeddings.
+
+okane_chat_agent remembers every user message and reply of a thread and
+recalls the ones closest to the new message as context. Memories are kept by
+one of two backends, chosen with CHAT_MEMORY_BACKEND:
+
+    memory   (default) in process; at most CHAT_MEMORY_MAX_THREADS threads,
+             least recently used and idle ones evicted first
+    sql      the chat_memories table through app.db (Postgres, or SQLite when
+             DATABASE_URL points at it), so memories survive restarts
+
+Either way a thread keeps its newest CHAT_MEMORY_MAX_ITEMS memories and
+threads idle for CHAT_MEMORY_TTL_HOURS are dropped, so memory use stays flat
+however long the process runs. The graph's conversation threads follow the
+same setting; see app/ai/checkpoints.py.
+
+Embeddings are looked up by the sha256 of the text in an LRU cache of
+EMBEDDING_CACHE_SIZE vectors (and the embedding_cache table with the sql
+backend) before the embedding model is called, so identical text is only
+embedded once. Cached rows older than CHAT_MEMORY_TTL_HOURS are purged along
+with the idle threads.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from collections.abc import Callable
+
+import numpy as np
+from cachetools import LRUCache, TTLCache
+
+from app.db.repository import ChatMemoryRepository, EmbeddingCacheRepository
+
+DEFAULT_SEARCH_LIMIT = 10
+# The sql backend purges idle threads at most this often
+PURGE_INTERVAL_SECONDS = 600
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC)
+
+
+def rank(query: np.ndarray, vectors: list[np.ndarray], limit: int) -> list[int]:
+    """Indices of ``vectors`` by descending cosine similarity to ``query``."""
+    if not vectors:
+        return []
+    matrix = np.vstack(vectors)
+    norms = np.linalg.norm(matrix, axis=1) * (np.linalg.norm(query) or 1.0)
+    scores = matrix @ query / np.where(norms == 0, 1.0, norms)
+    return [int(i) for i in np.argsort(-scores, kind="stable")[:limit]]
+
+
+class ThreadLru:
+    """
+    Last use of conversation threads: which to evict so that at most
+    ``max_threads`` remain and none has been idle for ``ttl_seconds``.
+    """
+
+    def __init__(
+        self, max_threads: int = 1000, ttl_seconds: float = 72 * 3600, clock: Callable = time.monotonic
+    ) -> None:
+        self.max_threads = max_threads
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._last_used: OrderedDict[str, float] = OrderedDict()
+
+    def touch(self, thread_id: str) -> list[str]:
+        """Record a use of ``thread_id``; returns the threads to evict, least recently used first."""
+        now = self._clock()
+        self._last_used[thread_id] = now
+        self._last_used.move_to_end(thread_id)
+        evicted = []
+        while self._last_used:
+            oldest, used = next(iter(self._last_used.items()))
+            if len(self._last_used) <= self.max_threads and now - used < self.ttl_seconds:
+                break
+            del self._last_used[oldest]
+            evicted.append(oldest)
+        return evicted
+
+
+class CachedEmbedder:
+    """
+    Embeds text through a LangChain Embeddings model, caching vectors by
+    content hash in process (LRU) and optionally in the embedding_cache table.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        model: str,
+        size: int = 5000,
+        session_factory: Callable | None = None,
+    ) -> None:
+        self._embeddings = embeddings
+        self._model = model
+        self._cache: LRUCache = LRUCache(maxsize=size)
+        self._session_factory = session_factory
+        self.hits = 0
+        self.misses = 0
+
+    async def embed(self, texts: list[str]) -> list[np.ndarray]:
+        hashes = [content_hash(text) for text in texts]
+        vectors = {h: self._cache[h] for h in set(hashes) if h in self._cache}
+
+        missing = [h for h in dict.fromkeys(hashes) if h not in vectors]
+        if missing and self._session_factory is not None:
+            async with self._session_factory() as session:
+                stored = await EmbeddingCacheRepository(session).get_many(self._model, missing)
+            for h, blob in stored.items():
+                vectors[h] = np.frombuffer(blob, dtype=np.float32)
+            missing = [h for h in missing if h not in vectors]
+
+        self.hits += len(hashes) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            texts_by_hash = dict(zip(hashes, texts))
+            embedded = await self._embeddings.aembed_documents([texts_by_hash[h] for h in missing])
+            new = {h: np.asarray(v, dtype=np.float32) for h, v in zip(missing, embedded)}
+            vectors.update(new)
+            if self._session_factory is not None:
+                async with self._session_factory() as session:
+                    await EmbeddingCacheRepository(session).put_many(
+                        self._model, {h: v.tobytes() for h, v in new.items()}, _utcnow()
+                    )
+
+        for h, vector in vectors.items():
+            self._cache[h] = vector
+        return [vectors[h] for h in hashes]
+
+
+class ChatMemoryBackend(ABC):
+    """Memories of conversation threads; backends implement put and history."""
+
+    _embedder: CachedEmbedder
+
+    @abstractmethod
+    async def put(self, thread_id: str, text: str, role: str = "user") -> None:
+        """Remember ``text`` as a message of the thread."""
+
+    @abstractmethod
+    async def history(self, thread_id: str) -> list[dict]:
+        """A thread's memories as {"role", "content"} messages, oldest first."""
+
+    async def search(self, thread_id: str, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> list[str]:
+        """Contents of the ``limit`` memories most similar to ``query``."""
+        memories = [message["content"] for message in await self.history(thread_id)]
+        if not memories or not query:
+            return memories[-limit:]
+        query_vector, *vectors = await self._embedder.embed([query, *memories])
+        return [memories[i] for i in rank(query_vector, vectors, limit)]
+
+
+class InMemoryChatMemory(ChatMemoryBackend):
+    """Memories per thread in process: capped per thread, threads evicted by LRU and TTL."""
+
+    def __init__(
+        self,
+        embedder: CachedEmbedder,
+        max_items: int = 200,
+        max_threads: int = 1000,
+        ttl_seconds: float = 72 * 3600,
+    ) -> None:
+        self._embedder = embedder
+        self._max_items = max_items
+        self._threads: TTLCache = TTLCache(maxsize=max_threads, ttl=ttl_seconds)
+
+    def _thread(self, thread_id: str) -> deque:
+        memories = self._threads.get(thread_id)
+        if memories is None:
+            memories = deque(maxlen=self._max_items)
+        # Re-inserting refreshes both the LRU order and the TTL
+        self._threads[thread_id] = memories
+        return memories
+
+    async def put(self, thread_id: str, text: str, role: str = "user") -> None:
+        if text:
+            self._thread(thread_id).append({"role": role, "content": text})
+
+    async def history(self, thread_id: str) -> list[dict]:
+        return list(self._threads.get(thread_id) or [])
+
+
+class SqlChatMemory(ChatMemoryBackend):
+    """
+    Memories in the chat_memories table: capped per thread, idle threads and
+    old cached embeddings purged.
+    """
+
+    def __init__(
+        self,
+        embedder: CachedEmbedder,
+        session_factory: Callable,
+        max_items: int = 200,
+        ttl_seconds: float = 72 * 3600,
+    ) -> None:
+        self._embedder = embedder
+        self._session_factory = session_factory
+        self._max_items = max_items
+        self._ttl = datetime.timedelta(seconds=ttl_seconds)
+        self._purged_at = 0.0
+
+    async def put(self, thread_id: str, text: str, role: str = "user") -> None:
+        if not text:
+            return
+        now = _utcnow()
+        async with self._session_factory() as session:
+            repo = ChatMemoryRepository(session)
+            await repo.add(thread_id, role, text, content_hash(text), now)
+            await repo.trim(thread_id, self._max_items)
+            if time.monotonic() - self._purged_at > PURGE_INTERVAL_SECONDS:
+                self._purged_at = time.monotonic()
+                await repo.delete_idle(now - self._ttl)
+                await EmbeddingCacheRepository(session).delete_before(now - self._ttl)
+            await repo.commit()
+
+    async def history(self, thread_id: str) -> list[dict]:
+        async with self._session_factory() as session:
+            rows = await ChatMemoryRepository(session).list_for_thread(thread_id)
+        return [{"role": role, "content": content} for role, content in rows]
+
+
+def create_chat_memory(embeddings, model: str):
+    """Chat memory configured from CHAT_MEMORY_* / EMBEDDING_CACHE_SIZE."""
+    backend = os.getenv("CHAT_MEMORY_BACKEND", "memory").lower()
+    max_items = int(os.getenv("CHAT_MEMORY_MAX_ITEMS", "200"))
+    ttl_seconds = float(os.getenv("CHAT_MEMORY_TTL_HOURS", "72")) * 3600
+    cache_size = int(os.getenv("EMBEDDING_CACHE_SIZE", "5000"))
+
+    if backend == "sql":
+        from app.db.postgres import AsyncSessionLocal
+
+        embedder = CachedEmbedder(embeddings, model, cache_size, session_factory=AsyncSessionLocal)
+        return SqlChatMemory(embedder, AsyncSessionLocal, max_items=max_items, ttl_seconds=ttl_seconds)
+    if backend != "memory":
+        raise ValueError(f"Unknown CHAT_MEMORY_BACKEND {backend!r}; use 'memory' or 'sql'")
+    return InMemoryChatMemory(
+        CachedEmbedder(embeddings, model, cache_size),
+        max_items=max_items,
+        max_threads=int(os.getenv("CHAT_MEMORY_MAX_THREADS", "1000")),
+        ttl_seconds=ttl_seconds,
+    )
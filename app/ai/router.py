@@ -1,7 +1,9 @@
 from io import BytesIO
-from fastapi import APIRouter, HTTPException
+from typing import Annotated
+from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
-from app.ai.chatbot import get_langgraph_graph
+from app.ai.chatbot import get_langgraph_graph, tool_cache
+from app.auth.basic_auth import get_current_username
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from app.ai.service import get_chatbot_response_stream
@@ -174,3 +176,14 @@ async def get_chat(thread_id: str):
     except Exception as e:
         print(f"Error in get_chat endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/tool-cache/metrics")
+async def get_tool_cache_metrics(
+    username: Annotated[str, Depends(get_current_username)],
+):
+    return {
+        "status": 200,
+        "message": "Tool cache metrics",
+        "data": tool_cache.metrics(),
+    }
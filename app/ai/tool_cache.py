@@ -0,0 +1,226 @@
+"""
+TTL cache for chatbot tool results.
+
+BasicToolNode looks every tool call up by tool name and normalised arguments
+(strings stripped and whitespace collapsed, dict keys sorted). Arguments of the
+ticker tools in CASE_INSENSITIVE_TOOLS are case-folded too, so "AAPL" and
+" aapl " asked again within the tool's TTL are answered without refetching;
+other tools (web search) keep the case, as it can change their results.
+Identical calls already in flight are joined rather than repeated. Failed
+calls and error payloads ({"status": >= 400}) are never cached.
+
+Backends, chosen with TOOL_CACHE_BACKEND:
+
+    memory   (default) per process, at most TOOL_CACHE_SIZE results
+    mongo    the tool_result_cache collection, shared by all workers; expired
+             entries are removed by a TTL index on expires_at
+
+TTLs are per tool (TOOL_TTLS, TOOL_CACHE_DEFAULT_TTL seconds for the rest).
+Hits, misses and errors are counted per tool; see ToolResultCache.metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import defaultdict
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from cachetools import TLRUCache
+
+from app.base.utils.mongodb import COLLECTIONS, connect_mongodb
+
+# Seconds a result stays fresh, by tool name
+TOOL_TTLS = {
+    "get_news_sentiment": 15 * 60,
+    "fetch_yfinance_news": 10 * 60,
+    "DuckDuckGoSearchRun": 30 * 60,
+}
+
+# Tools whose arguments are tickers, looked up regardless of case
+CASE_INSENSITIVE_TOOLS = {"get_news_sentiment", "fetch_yfinance_news"}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_args(args: Any, casefold: bool = False) -> Any:
+    if isinstance(args, str):
+        args = _WHITESPACE.sub(" ", args.strip())
+        return args.casefold() if casefold else args
+    if isinstance(args, dict):
+        items = sorted(args.items(), key=lambda item: str(item[0]))
+        return {str(k): normalize_args(v, casefold) for k, v in items}
+    if isinstance(args, (list, tuple)):
+        return [normalize_args(v, casefold) for v in args]
+    return args
+
+
+def cache_key(tool_name: str, args: Any) -> str:
+    normalized = normalize_args(args, casefold=tool_name in CASE_INSENSITIVE_TOOLS)
+    payload = json.dumps(normalized, sort_keys=True, default=str)
+    return f"{tool_name}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def is_error(result: Any) -> bool:
+    if isinstance(result, dict):
+        status = result.get("status")
+        return isinstance(status, int) and status >= 400
+    return False
+
+
+class MemoryBackend:
+    """Size-bounded in-process store with a TTL per entry."""
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        # Values are (ttl, result); ttu turns the ttl into the entry's expiry
+        self._cache: TLRUCache = TLRUCache(
+            maxsize=maxsize, ttu=lambda _key, value, now: now + value[0]
+        )
+
+    async def get(self, key: str):
+        entry = self._cache.get(key)
+        return None if entry is None else (True, entry[1])
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._cache[key] = (ttl, value)
+
+    def size(self) -> int:
+        return len(self._cache)
+
+
+class MongoBackend:
+    """Entries in a MongoDB collection, shared by every worker process."""
+
+    def __init__(self, collection=None) -> None:
+        self._collection = collection
+        self._index_ready = False
+
+    async def _get_collection(self):
+        if self._collection is None:
+            db = await connect_mongodb()
+            self._collection = db[COLLECTIONS["tool_result_cache"]]
+        return self._collection
+
+    async def _ensure_index(self) -> None:
+        if self._index_ready:
+            return
+        try:
+            collection = await self._get_collection()
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        except Exception as e:
+            logging.warning("Failed to create the tool cache TTL index: %s", e)
+
+    async def get(self, key: str):
+        # The TTL monitor only runs once a minute; filter out expired entries too
+        now = datetime.datetime.now(datetime.UTC)
+        collection = await self._get_collection()
+        doc = await collection.find_one({"_id": key, "expires_at": {"$gt": now}})
+        return None if doc is None else (True, doc["value"])
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._ensure_index()
+        expires_at = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=ttl)
+        collection = await self._get_collection()
+        await collection.replace_one(
+            {"_id": key}, {"_id": key, "value": value, "expires_at": expires_at}, upsert=True
+        )
+
+    def size(self) -> int | None:
+        return None
+
+
+class ToolResultCache:
+    def __init__(
+        self, backend, ttls: dict[str, float] | None = None, default_ttl: float = 300
+    ) -> None:
+        self.backend = backend
+        self.ttls = dict(TOOL_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self._counts: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "errors": 0}
+        )
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def ttl(self, tool_name: str) -> float:
+        return self.ttls.get(tool_name, self.default_ttl)
+
+    async def get_or_call(
+        self, tool_name: str, args: Any, call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Cached result of the tool call, or ``call()``'s result, stored for the tool's TTL."""
+        ttl = self.ttl(tool_name)
+        if ttl <= 0:
+            return await call()
+        counts = self._counts[tool_name]
+        key = cache_key(tool_name, args)
+
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            logging.warning("Tool cache lookup failed: %s", e)
+            cached = None
+        if cached is not None:
+            counts["hits"] += 1
+            return cached[1]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            counts["hits"] += 1
+            return await asyncio.shield(inflight)
+
+        counts["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await call()
+        except BaseException as e:
+            counts["errors"] += 1
+            future.set_exception(e)
+            # Joined callers re-raise it; don't warn about an unretrieved exception
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if is_error(result):
+                counts["errors"] += 1
+            else:
+                try:
+                    await self.backend.set(key, result, ttl)
+                except Exception as e:
+                    logging.warning("Tool cache store failed: %s", e)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def metrics(self) -> dict:
+        tools = {}
+        for name, counts in self._counts.items():
+            calls = counts["hits"] + counts["misses"]
+            hit_rate = round(counts["hits"] / calls, 3) if calls else None
+            tools[name] = {**counts, "hit_rate": hit_rate}
+        return {
+            "backend": type(self.backend).__name__,
+            "size": self.backend.size(),
+            "ttls": self.ttls,
+            "default_ttl": self.default_ttl,
+            "tools": tools,
+        }
+
+
+def create_tool_cache() -> ToolResultCache:
+    """Tool cache configured from TOOL_CACHE_* variables."""
+    backend_name = os.getenv("TOOL_CACHE_BACKEND", "memory").lower()
+    if backend_name == "mongo":
+        backend = MongoBackend()
+    elif backend_name == "memory":
+        backend = MemoryBackend(maxsize=int(os.getenv("TOOL_CACHE_SIZE", "1024")))
+    else:
+        raise ValueError(f"Unknown TOOL_CACHE_BACKEND {backend_name!r}; use 'memory' or 'mongo'")
+    return ToolResultCache(backend, default_ttl=float(os.getenv("TOOL_CACHE_DEFAULT_TTL", "300")))
@@ -23,6 +23,10 @@ COLLECTIONS = {
     "news_with_sentiment": "news_with_sentiment",
     "price_histories": "price_histories",
     "ticker_infos": "ticker_infos",
+    "news_sentiment_rollups": "news_sentiment_rollups",
+    "price_bars": "price_bars",
+    "tool_result_cache": "tool_result_cache",
+    "leases": "leases",
 }
 
 # ---------------------------------------------------------------------------
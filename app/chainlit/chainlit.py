@@ -6,12 +6,9 @@ from langchain.memory import ConversationBufferMemory
 from chainlit.types import ThreadDict
 from chainlit.input_widget import Select, Slider
 from app.ai.chatbot import (
-    create_chatbot_graph,
+    get_chatbot_graph,
     State,
-)  # Import the graph creation function and State
-from app.ai.models.gemini import (
-    create_gemini_flash_model,
-)  # Import the model creation function
+)  # Import the cached graph accessor and State
 from langchain_core.messages import (
     HumanMessage,
     AIMessage,
@@ -28,14 +25,11 @@ async def setup_runnable(settings: Dict):
     gemini_model_name = settings.get("Gemini_Model", "gemini-2.0-flash")
     gemini_temperature = settings.get("Gemini_Temperature", 1.0)  # Ensure float type
 
-    # Create the LLM instance using the function from models.gemini
-    llm = create_gemini_flash_model(
+    # Compiled graphs are shared by every session using the same model settings
+    compiled_graph = get_chatbot_graph(
         model_name=gemini_model_name, temperature=gemini_temperature
     )
 
-    # Create and compile the chatbot graph with the selected LLM
-    compiled_graph = create_chatbot_graph(llm=llm)
-
     # Store the compiled graph in the user session
     cl.user_session.set("runnable", compiled_graph)
 
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class PoolMetricsResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: dict[str, Any] | None = Field(
+        None, description="Pool state and checkout metrics; null until the engine is first used"
+    )
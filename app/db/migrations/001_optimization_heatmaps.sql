@@ -0,0 +1,22 @@
+-- Optimisation heatmaps persisted next to backtest_stats.
+-- Apply in Supabase → SQL Editor before deploying the matching API version.
+
+CREATE TABLE IF NOT EXISTS optimization_heatmaps (
+    id               SERIAL PRIMARY KEY,
+    backtest_id      INTEGER REFERENCES backtest_stats (id) ON DELETE CASCADE,
+    ticker           TEXT,
+    strategy         TEXT,
+    period           TEXT,
+    interval         TEXT,
+    strategy_version TEXT NOT NULL,
+    data_fingerprint TEXT NOT NULL,
+    objective        TEXT NOT NULL,
+    points           JSONB NOT NULL,
+    updated_at       TIMESTAMPTZ,
+    CONSTRAINT uq_optimization_heatmaps_key UNIQUE (
+        ticker, strategy, period, interval, strategy_version, data_fingerprint, objective
+    )
+);
+
+CREATE INDEX IF NOT EXISTS ix_optimization_heatmaps_backtest_id
+    ON optimization_heatmaps (backtest_id);
@@ -0,0 +1,8 @@
+-- Compact plot data per backtest; the report HTML is rendered lazily from it.
+-- Apply in Supabase → SQL Editor before deploying the matching API version.
+
+CREATE TABLE IF NOT EXISTS backtest_artifacts (
+    backtest_id INTEGER PRIMARY KEY REFERENCES backtest_stats (id) ON DELETE CASCADE,
+    payload     BYTEA NOT NULL,
+    updated_at  TIMESTAMPTZ
+);
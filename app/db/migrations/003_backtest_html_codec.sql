@@ -0,0 +1,5 @@
+-- Record the codec of the stored report HTML and allow raw-bytes storage.
+-- Existing rows keep html_codec NULL, which decodes as legacy zlib + base64.
+
+ALTER TABLE backtest_stats ADD COLUMN IF NOT EXISTS html_bytes BYTEA;
+ALTER TABLE backtest_stats ADD COLUMN IF NOT EXISTS html_codec TEXT;
@@ -0,0 +1,54 @@
+-- One backtest_stats row per strategy config, so the upsert can be a single
+-- INSERT ... ON CONFLICT (ticker, strategy, period, interval) DO UPDATE.
+-- NULLS NOT DISTINCT (Postgres 15+) keeps rows with a NULL period matching.
+
+-- Remove duplicate configs first, keeping the oldest row (the one the previous
+-- SELECT-then-UPDATE upsert kept updating). Duplicates found by:
+--   SELECT ticker, strategy, period, interval, count(*) FROM backtest_stats
+--   GROUP BY 1, 2, 3, 4 HAVING count(*) > 1;
+BEGIN;
+
+-- Duplicate row → the row kept for its config (PARTITION BY groups NULLs together)
+CREATE TEMPORARY TABLE backtest_stats_duplicates ON COMMIT DROP AS
+SELECT id, keep_id
+FROM (
+    SELECT id, min(id) OVER (PARTITION BY ticker, strategy, period, interval) AS keep_id
+    FROM backtest_stats
+) grouped
+WHERE id <> keep_id;
+
+-- Point the child rows at the kept row before deleting the duplicates;
+-- trade_actions would otherwise be orphaned (ON DELETE SET NULL) and the
+-- heatmaps deleted with them (ON DELETE CASCADE).
+UPDATE trade_actions t
+SET backtest_id = d.keep_id
+FROM backtest_stats_duplicates d
+WHERE t.backtest_id = d.id;
+
+UPDATE optimization_heatmaps h
+SET backtest_id = d.keep_id
+FROM backtest_stats_duplicates d
+WHERE h.backtest_id = d.id;
+
+-- One artifact per backtest: the kept row takes the newest duplicate's
+-- artifact if it has none. Plot data of older runs is dropped with its row.
+UPDATE backtest_artifacts a
+SET backtest_id = newest.keep_id
+FROM (
+    SELECT DISTINCT ON (d.keep_id) d.keep_id, d.id
+    FROM backtest_stats_duplicates d
+    JOIN backtest_artifacts x ON x.backtest_id = d.id
+    ORDER BY d.keep_id, x.updated_at DESC NULLS LAST, d.id DESC
+) newest
+WHERE a.backtest_id = newest.id
+  AND NOT EXISTS (SELECT 1 FROM backtest_artifacts k WHERE k.backtest_id = newest.keep_id);
+
+DELETE FROM backtest_stats b
+USING backtest_stats_duplicates d
+WHERE b.id = d.id;
+
+ALTER TABLE backtest_stats
+    ADD CONSTRAINT uq_backtest_stats_strategy_key
+    UNIQUE NULLS NOT DISTINCT (ticker, strategy, period, interval);
+
+COMMIT;
@@ -0,0 +1,29 @@
+-- Move the report HTML out of backtest_stats so list/upsert queries on the
+-- stats table no longer drag multi-hundred-KB blobs through the heap and WAL.
+-- One report per backtest; content_hash (sha256 of the uncompressed HTML)
+-- lets an identical re-render skip the write.
+
+CREATE TABLE IF NOT EXISTS backtest_reports (
+    backtest_id  INTEGER PRIMARY KEY REFERENCES backtest_stats (id) ON DELETE CASCADE,
+    content_hash TEXT NOT NULL,
+    html_codec   TEXT NOT NULL,
+    html         TEXT,
+    html_bytes   BYTEA,
+    updated_at   TIMESTAMPTZ
+);
+
+-- Copy existing reports. Their hash is not the sha256 of the HTML (that would
+-- need decompressing every row), so it is prefixed and never matches a new one.
+INSERT INTO backtest_reports (backtest_id, content_hash, html_codec, html, html_bytes, updated_at)
+SELECT id,
+       'legacy:' || md5(COALESCE(html, encode(html_bytes, 'base64'))),
+       COALESCE(html_codec, 'zlib'),
+       html,
+       html_bytes,
+       updated_at
+FROM backtest_stats
+WHERE html IS NOT NULL OR html_bytes IS NOT NULL
+ON CONFLICT (backtest_id) DO NOTHING;
+
+-- The old backtest_stats columns are dropped separately by
+-- 011_drop_backtest_stats_html.sql, once nothing reads them any more.
@@ -0,0 +1,16 @@
+-- One trade action per (backtest, bar, action), so inserts can deduplicate with
+-- INSERT ... ON CONFLICT (backtest_id, datetime, trade_action) DO NOTHING.
+
+-- Remove duplicates first, keeping the oldest row. Review before running:
+--   SELECT backtest_id, datetime, trade_action, count(*) FROM trade_actions
+--   GROUP BY 1, 2, 3 HAVING count(*) > 1;
+DELETE FROM trade_actions t
+USING trade_actions keep
+WHERE keep.backtest_id = t.backtest_id
+  AND keep.datetime = t.datetime
+  AND keep.trade_action = t.trade_action
+  AND keep.id < t.id;
+
+ALTER TABLE trade_actions
+    ADD CONSTRAINT uq_trade_actions_backtest_datetime_action
+    UNIQUE (backtest_id, datetime, trade_action);
@@ -0,0 +1,6 @@
+-- Index for the keyset-paginated GET /signals/backtests list, which orders by
+-- updated_at DESC NULLS LAST, id DESC. Trade-action pages use the
+-- (backtest_id, datetime, trade_action) unique index from 006.
+
+CREATE INDEX IF NOT EXISTS ix_backtest_stats_updated_at_id
+    ON backtest_stats (updated_at DESC NULLS LAST, id DESC);
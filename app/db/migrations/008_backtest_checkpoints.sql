@@ -0,0 +1,15 @@
+-- Continuation checkpoints for the nightly strategy job: the last flat bar of a
+-- backtest's latest full run, so following runs only re-simulate the tail.
+-- Apply in Supabase → SQL Editor before deploying the matching API version.
+
+CREATE TABLE IF NOT EXISTS backtest_checkpoints (
+    backtest_id        INTEGER PRIMARY KEY REFERENCES backtest_stats (id) ON DELETE CASCADE,
+    restart_at         TEXT NOT NULL,
+    last_bar           TEXT NOT NULL,
+    strategy_version   TEXT,
+    params             JSONB NOT NULL,
+    actions_digest     TEXT NOT NULL,
+    runs_since_rebuild INTEGER NOT NULL DEFAULT 0,
+    rebuilt_at         TIMESTAMPTZ,
+    updated_at         TIMESTAMPTZ
+);
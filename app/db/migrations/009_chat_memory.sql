@@ -0,0 +1,28 @@
+-- Persistent chatbot memory (CHAT_MEMORY_BACKEND=sql): remembered messages per
+-- conversation thread, and embeddings cached by content hash so identical text
+-- is embedded once.
+-- Apply in Supabase → SQL Editor before deploying the matching API version.
+
+CREATE TABLE IF NOT EXISTS chat_memories (
+    id           SERIAL PRIMARY KEY,
+    thread_id    TEXT NOT NULL,
+    role         TEXT NOT NULL,
+    content      TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    created_at   TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS ix_chat_memories_thread_id_id
+    ON chat_memories (thread_id, id);
+
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    content_hash TEXT NOT NULL,
+    model        TEXT NOT NULL,
+    vector       BYTEA NOT NULL,
+    created_at   TIMESTAMPTZ,
+    PRIMARY KEY (content_hash, model)
+);
+
+-- Vectors older than the chat memory TTL are purged by created_at
+CREATE INDEX IF NOT EXISTS ix_embedding_cache_created_at
+    ON embedding_cache (created_at);
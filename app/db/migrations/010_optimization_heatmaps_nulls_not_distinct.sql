@@ -0,0 +1,25 @@
+-- Heatmaps are upserted with INSERT ... ON CONFLICT on uq_optimization_heatmaps_key.
+-- NULLS NOT DISTINCT (Postgres 15+) makes configs with a NULL period or
+-- interval conflict too, instead of adding a row on every optimisation.
+
+-- Remove duplicate keys first, keeping the newest row. Review before running:
+--   SELECT ticker, strategy, period, interval, strategy_version, data_fingerprint,
+--          objective, count(*) FROM optimization_heatmaps
+--   GROUP BY 1, 2, 3, 4, 5, 6, 7 HAVING count(*) > 1;
+DELETE FROM optimization_heatmaps h
+USING optimization_heatmaps keep
+WHERE keep.ticker IS NOT DISTINCT FROM h.ticker
+  AND keep.strategy IS NOT DISTINCT FROM h.strategy
+  AND keep.period IS NOT DISTINCT FROM h.period
+  AND keep.interval IS NOT DISTINCT FROM h.interval
+  AND keep.strategy_version = h.strategy_version
+  AND keep.data_fingerprint = h.data_fingerprint
+  AND keep.objective = h.objective
+  AND keep.id > h.id;
+
+ALTER TABLE optimization_heatmaps
+    DROP CONSTRAINT uq_optimization_heatmaps_key,
+    ADD CONSTRAINT uq_optimization_heatmaps_key
+    UNIQUE NULLS NOT DISTINCT (
+        ticker, strategy, period, interval, strategy_version, data_fingerprint, objective
+    );
@@ -0,0 +1,9 @@
+-- Drop the report columns of backtest_stats, superseded by backtest_reports
+-- (005_backtest_reports.sql). The frontend reads backtest_stats directly from
+-- Supabase: run this only after both the API and the frontend version reading
+-- backtest_reports are deployed. Check nothing still selects them first.
+
+ALTER TABLE backtest_stats
+    DROP COLUMN IF EXISTS html,
+    DROP COLUMN IF EXISTS html_bytes,
+    DROP COLUMN IF EXISTS html_codec;
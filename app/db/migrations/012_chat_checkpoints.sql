@@ -0,0 +1,33 @@
+-- Persistent chatbot conversation threads (CHAT_MEMORY_BACKEND=sql): LangGraph
+-- checkpoints and their pending writes, so threads survive restarts.
+-- Apply in Supabase → SQL Editor before deploying the matching API version.
+
+CREATE TABLE IF NOT EXISTS chat_checkpoints (
+    thread_id            TEXT NOT NULL,
+    checkpoint_ns        TEXT NOT NULL DEFAULT '',
+    checkpoint_id        TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    checkpoint_type      TEXT NOT NULL,
+    checkpoint           BYTEA NOT NULL,
+    metadata_type        TEXT NOT NULL,
+    checkpoint_metadata  BYTEA NOT NULL,
+    created_at           TIMESTAMPTZ,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+
+-- Threads idle for the chat memory TTL are purged by created_at
+CREATE INDEX IF NOT EXISTS ix_chat_checkpoints_created_at
+    ON chat_checkpoints (created_at);
+
+CREATE TABLE IF NOT EXISTS chat_checkpoint_writes (
+    thread_id     TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id       TEXT NOT NULL,
+    idx           INTEGER NOT NULL,
+    channel       TEXT NOT NULL,
+    value_type    TEXT NOT NULL,
+    value         BYTEA NOT NULL,
+    task_path     TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
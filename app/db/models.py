@@ -5,6 +5,12 @@ Tables reflected:
   - backtest_stats
   - trade_actions
   - unique_strategies  (read-only view / table)
+  - optimization_heatmaps
+  - backtest_artifacts
+  - backtest_reports
+  - backtest_checkpoints
+  - chat_memories
+  - embedding_cache
 """
 
 from __future__ import annotations
@@ -12,7 +18,20 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import TIMESTAMP, BigInteger, Boolean, Double, ForeignKey, Integer, Text
+from sqlalchemy import (
+    JSON,
+    TIMESTAMP,
+    BigInteger,
+    Boolean,
+    Double,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    Text,
+    UniqueConstraint,
+)
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.dialects.postgresql import TIMESTAMP as TIMESTAMPTZ
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -24,8 +43,19 @@ from app.db.postgres import Base
 # ---------------------------------------------------------------------------
 
 
+# One backtest_stats row per strategy config; target of the upsert's ON CONFLICT
+BACKTEST_STAT_KEY = ("ticker", "strategy", "period", "interval")
+
+
 class BacktestStat(Base):
     __tablename__ = "backtest_stats"
+    __table_args__ = (
+        UniqueConstraint(
+            *BACKTEST_STAT_KEY,
+            name="uq_backtest_stats_strategy_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
 
     id: Mapped[int] = mapped_column(
         Integer,
@@ -83,8 +113,7 @@ class BacktestStat(Base):
     # Notifications
     notifications_on: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
 
-    # The backtest HTML (deflated + base64)
-    html: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # The report HTML lives in backtest_reports so this row stays narrow
 
     # Timestamps
     updated_at: Mapped[datetime | None] = mapped_column(TIMESTAMPTZ, nullable=True)
@@ -101,8 +130,15 @@ class BacktestStat(Base):
 # ---------------------------------------------------------------------------
 
 
+# A trade action is identified by its backtest, bar and action; target of ON CONFLICT DO NOTHING
+TRADE_ACTION_KEY = ("backtest_id", "datetime", "trade_action")
+
+
 class TradeAction(Base):
     __tablename__ = "trade_actions"
+    __table_args__ = (
+        UniqueConstraint(*TRADE_ACTION_KEY, name="uq_trade_actions_backtest_datetime_action"),
+    )
 
     id: Mapped[int] = mapped_column(
         BigInteger,
@@ -150,3 +186,235 @@ class UniqueStrategy(Base):
     tpsl_ratio: Mapped[float | None] = mapped_column(Double, nullable=True)
     sl_coef: Mapped[float | None] = mapped_column(Double, nullable=True)
     tp_coef: Mapped[float | None] = mapped_column(Double, nullable=True)
+
+
+# ---------------------------------------------------------------------------
+# optimization_heatmaps
+# ---------------------------------------------------------------------------
+
+
+# One heatmap per strategy config, data, code version and objective; target of the upsert's ON CONFLICT
+OPTIMIZATION_HEATMAP_KEY = (
+    "ticker",
+    "strategy",
+    "period",
+    "interval",
+    "strategy_version",
+    "data_fingerprint",
+    "objective",
+)
+
+
+class OptimizationHeatmap(Base):
+    """
+    Grid-search heatmap of one strategy optimisation.
+
+    Keyed by the strategy config plus a fingerprint of the backtested data and
+    the strategy code version, so identical grid points are never re-run.
+    """
+
+    __tablename__ = "optimization_heatmaps"
+    __table_args__ = (
+        UniqueConstraint(
+            *OPTIMIZATION_HEATMAP_KEY,
+            name="uq_optimization_heatmaps_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(
+        Integer,
+        primary_key=True,
+        autoincrement=True,
+    )
+
+    # Foreign key to backtest_stats
+    backtest_id: Mapped[int | None] = mapped_column(
+        Integer,
+        ForeignKey("backtest_stats.id", ondelete="CASCADE"),
+        nullable=True,
+        index=True,
+    )
+
+    # Cache key
+    ticker: Mapped[str | None] = mapped_column(Text, nullable=True)
+    strategy: Mapped[str | None] = mapped_column(Text, nullable=True)
+    period: Mapped[str | None] = mapped_column(Text, nullable=True)
+    interval: Mapped[str | None] = mapped_column(Text, nullable=True)
+    strategy_version: Mapped[str] = mapped_column(Text, nullable=False)
+    data_fingerprint: Mapped[str] = mapped_column(Text, nullable=False)
+    objective: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # [{"params": {...}, "value": float | None, "trades": int | None}, ...]
+    points: Mapped[list] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+
+    updated_at: Mapped[datetime | None] = mapped_column(TIMESTAMPTZ, nullable=True)
+
+
+# ---------------------------------------------------------------------------
+# backtest_artifacts
+# ---------------------------------------------------------------------------
+
+
+class BacktestArtifact(Base):
+    """
+    Compact plot data of the latest run of a backtest (OHLCV, equity, trades,
+    indicators as a compressed .npz archive). The report HTML is rendered from
+    it on first request instead of on every run.
+    """
+
+    __tablename__ = "backtest_artifacts"
+
+    backtest_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("backtest_stats.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(TIMESTAMPTZ, nullable=True)
+
+
+# ---------------------------------------------------------------------------
+# backtest_reports
+# ---------------------------------------------------------------------------
+
+
+class BacktestReport(Base):
+    """
+    Rendered report HTML of a backtest, kept out of backtest_stats so metric
+    scans and listings never load it. Either `html` (base64 text) or
+    `html_bytes` (raw) holds the compressed report; `html_codec` names the codec.
+    """
+
+    __tablename__ = "backtest_reports"
+
+    backtest_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("backtest_stats.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    # sha256 of the uncompressed HTML
+    content_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    html_codec: Mapped[str] = mapped_column(Text, nullable=False)
+    html: Mapped[str | None] = mapped_column(Text, nullable=True)
+    html_bytes: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(TIMESTAMPTZ, nullable=True)
+
+
+# ---------------------------------------------------------------------------
+# backtest_checkpoints
+# ---------------------------------------------------------------------------
+
+
+class BacktestCheckpoint(Base):
+    """
+    Continuation point of a backtest's latest full run: the last bar the
+    strategy was flat on, the parameters it ran with and a digest of the trade
+    actions emitted after that bar. See app/signals/strategies/continuation.py.
+    """
+
+    __tablename__ = "backtest_checkpoints"
+
+    backtest_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("backtest_stats.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    restart_at: Mapped[str] = mapped_column(Text, nullable=False)
+    last_bar: Mapped[str] = mapped_column(Text, nullable=False)
+    strategy_version: Mapped[str | None] = mapped_column(Text, nullable=True)
+    params: Mapped[dict] = mapped_column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    actions_digest: Mapped[str] = mapped_column(Text, nullable=False)
+    # Continuation runs since the last full rebuild
+    runs_since_rebuild: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rebuilt_at: Mapped[datetime | None] = mapped_column(TIMESTAMPTZ, nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(TIMESTAMPTZ, nullable=True)
+
+
+# ---------------------------------------------------------------------------
+# chat_memories
+# ---------------------------------------------------------------------------
+
+
+class ChatMemory(Base):
+    """
+    One remembered chatbot message of a conversation thread. The number kept
+    per thread is capped and idle threads are purged; see app/ai/memory.py.
+    """
+
+    __tablename__ = "chat_memories"
+    __table_args__ = (Index("ix_chat_memories_thread_id_id", "thread_id", "id"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    thread_id: Mapped[str] = mapped_column(Text, nullable=False)
+    # "user" or "assistant"
+    role: Mapped[str] = mapped_column(Text, nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    # sha256 of content; key into embedding_cache
+    content_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime | None] = mapped_column(TIMESTAMPTZ, nullable=True)
+
+
+# ---------------------------------------------------------------------------
+# embedding_cache
+# ---------------------------------------------------------------------------
+
+
+class EmbeddingCache(Base):
+    """
+    Embedding vector (float32 bytes) of a text, by content hash and embedding
+    model. Rows older than the chat memory TTL are purged; see app/ai/memory.py.
+    """
+
+    __tablename__ = "embedding_cache"
+    __table_args__ = (Index("ix_embedding_cache_created_at", "created_at"),)
+
+    content_hash: Mapped[str] = mapped_column(Text, primary_key=True)
+    model: Mapped[str] = mapped_column(Text, primary_key=True)
+    vector: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime | None] = mapped_column(TIMESTAMPTZ, nullable=True)
+
+
+# ---------------------------------------------------------------------------
+# chat_checkpoints / chat_checkpoint_writes
+# ---------------------------------------------------------------------------
+
+
+class ChatCheckpoint(Base):
+    """
+    Serialized LangGraph checkpoint of a chatbot thread (CHAT_MEMORY_BACKEND=sql).
+    The newest few are kept per thread and idle threads are purged; see
+    app/ai/checkpoints.py.
+    """
+
+    __tablename__ = "chat_checkpoints"
+    __table_args__ = (Index("ix_chat_checkpoints_created_at", "created_at"),)
+
+    thread_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(Text, primary_key=True, default="")
+    # uuid6, so ids sort by creation
+    checkpoint_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    parent_checkpoint_id: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Serializer type tag and payload of the checkpoint and of its metadata
+    checkpoint_type: Mapped[str] = mapped_column(Text, nullable=False)
+    checkpoint: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    metadata_type: Mapped[str] = mapped_column(Text, nullable=False)
+    checkpoint_metadata: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime | None] = mapped_column(TIMESTAMPTZ, nullable=True)
+
+
+class ChatCheckpointWrite(Base):
+    """Pending write of a task against a chat checkpoint (serialized channel value)."""
+
+    __tablename__ = "chat_checkpoint_writes"
+
+    thread_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    checkpoint_ns: Mapped[str] = mapped_column(Text, primary_key=True, default="")
+    checkpoint_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    task_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    # Position in the task's writes; negative for special channels (errors, interrupts)
+    idx: Mapped[int] = mapped_column(Integer, primary_key=True)
+    channel: Mapped[str] = mapped_column(Text, nullable=False)
+    value_type: Mapped[str] = mapped_column(Text, nullable=False)
+    value: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    task_path: Mapped[str] = mapped_column(Text, nullable=False, default="")
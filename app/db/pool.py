@@ -0,0 +1,239 @@
+"""
+Connection pool configuration and metrics for the async engine.
+
+Pool sizing comes from the environment so it can be tuned per deployment
+without a code change:
+
+    DB_POOL_SIZE            persistent connections (default 5)
+    DB_MAX_OVERFLOW         extra connections opened under load (default 10)
+    DB_POOL_TIMEOUT         seconds to wait for a free connection (default 30)
+    DB_POOL_RECYCLE         seconds before a connection is replaced (default 1800)
+    DB_POOL_PRE_PING        "always", "idle" (default) or "never"
+    DB_POOL_PRE_PING_IDLE   with "idle": ping connections unused for this many seconds (default 30)
+
+"always" is SQLAlchemy's pool_pre_ping — one extra round trip per checkout,
+which is noticeable against the remote Supabase pooler. "idle" only pings a
+connection that has sat in the pool long enough to have been dropped.
+
+InstrumentedPool records checkout latency, time spent waiting for a
+connection, overflow connections and timeouts; pool_metrics() returns them
+together with the pool's current state.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+PRE_PING_MODES = ("always", "idle", "never")
+
+# Latency percentiles are computed over this many recent checkouts
+_SAMPLES = 1024
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0
+    pool_recycle: int = 1800
+    pre_ping: str = "idle"
+    pre_ping_idle: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> PoolSettings:
+        pre_ping = os.getenv("DB_POOL_PRE_PING", cls.pre_ping).lower()
+        if pre_ping not in PRE_PING_MODES:
+            raise ValueError(f"DB_POOL_PRE_PING must be one of {PRE_PING_MODES}, got {pre_ping!r}")
+        return cls(
+            pool_size=int(os.getenv("DB_POOL_SIZE", cls.pool_size)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", cls.max_overflow)),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", cls.pool_timeout)),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", cls.pool_recycle)),
+            pre_ping=pre_ping,
+            pre_ping_idle=float(os.getenv("DB_POOL_PRE_PING_IDLE", cls.pre_ping_idle)),
+        )
+
+    def engine_kwargs(self) -> dict:
+        """Keyword arguments for create_async_engine()."""
+        return {
+            "poolclass": InstrumentedPool,
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_pre_ping": self.pre_ping == "always",
+        }
+
+
+class _Latencies:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent: deque[float] = deque(maxlen=_SAMPLES)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self._recent.append(ms)
+
+    def snapshot(self) -> dict:
+        recent = sorted(self._recent)
+
+        def percentile(p: float) -> float | None:
+            return round(recent[min(len(recent) - 1, int(p * len(recent)))], 3) if recent else None
+
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class PoolMetrics:
+    """Counters for one pool. Updated from the event loop and pool events."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkout = _Latencies()
+        self.wait = _Latencies()
+        self.connects = 0
+        self.overflow_events = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.ping_failures = 0
+
+    def record(self, name: str, ms: float) -> None:
+        with self._lock:
+            getattr(self, name).add(ms)
+
+    def increment(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkout": self.checkout.snapshot(),
+                "wait": self.wait.snapshot(),
+                "connects": self.connects,
+                "overflow_events": self.overflow_events,
+                "timeouts": self.timeouts,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+            }
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that times checkouts and counts overflow and timeouts."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self) -> InstrumentedPool:
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.increment("timeouts")
+            raise
+        self.metrics.record("checkout", (time.perf_counter() - start) * 1000)
+        return connection
+
+    def _do_get(self):
+        # Time until a pooled or newly opened connection is handed out; excludes pings
+        start = time.perf_counter()
+        record = super()._do_get()
+        self.metrics.record("wait", (time.perf_counter() - start) * 1000)
+        return record
+
+    def _inc_overflow(self) -> bool:
+        allowed = super()._inc_overflow()
+        # _overflow starts at -pool_size, so > 0 means beyond the persistent pool
+        if allowed and self._overflow > 0:
+            self.metrics.increment("overflow_events")
+        return allowed
+
+
+def install_idle_pre_ping(engine, idle_seconds: float) -> None:
+    """Ping a connection on checkout only if it has been idle for idle_seconds or more."""
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        metrics = getattr(pool, "metrics", None)
+        if metrics is not None:
+            metrics.increment("pings")
+        try:
+            alive = sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            alive = False
+        if not alive:
+            if metrics is not None:
+                metrics.increment("ping_failures")
+            # The pool replaces the connection and retries the checkout
+            raise exc.DisconnectionError("Idle connection failed pre-ping")
+
+
+def install_connect_counter(engine) -> None:
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics = getattr(pool, "metrics", None)
+        if metrics is not None:
+            metrics.increment("connects")
+
+
+def pool_metrics(engine, settings: PoolSettings | None = None) -> dict:
+    """Current pool state plus the counters collected since start-up."""
+    pool = engine.sync_engine.pool
+    data: dict = {
+        "pool_class": type(pool).__name__,
+        "status": pool.status(),
+    }
+    if settings is not None:
+        data["settings"] = {
+            "pool_size": settings.pool_size,
+            "max_overflow": settings.max_overflow,
+            "pool_timeout": settings.pool_timeout,
+            "pool_recycle": settings.pool_recycle,
+            "pre_ping": settings.pre_ping,
+            "pre_ping_idle": settings.pre_ping_idle,
+        }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        data.update(
+            {
+                "in_use": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": max(0, pool.overflow()),
+            }
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        data.update(metrics.snapshot())
+    return data
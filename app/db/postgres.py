@@ -10,7 +10,8 @@ to postgresql+psycopg:// for psycopg3 async driver):
     sqlite+aiosqlite://         ← used by unit tests
 
 The engine is created lazily on first use so this module can be imported
-during testing even when DATABASE_URL is not yet set.
+during testing even when DATABASE_URL is not yet set. Pool sizing and the
+pre-ping strategy are read from DB_POOL_* variables (see app.db.pool).
 """
 
 from __future__ import annotations
@@ -26,6 +27,8 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.orm import DeclarativeBase
 
+from app.db.pool import PoolSettings, install_connect_counter, install_idle_pre_ping, pool_metrics
+
 load_dotenv()
 
 
@@ -63,10 +66,11 @@ def _get_database_url() -> str:
 
 _engine = None
 _factory: async_sessionmaker | None = None
+_pool_settings: PoolSettings | None = None
 
 
 def _get_factory() -> async_sessionmaker:
-    global _engine, _factory
+    global _engine, _factory, _pool_settings
     if _factory is None:
         url = _get_database_url()
         connect_args: dict = {}
@@ -82,13 +86,20 @@ def _get_factory() -> async_sessionmaker:
             # Supabase requires SSL on all pooler connections.
             if "supabase" in url or "pooler" in url:
                 connect_args["sslmode"] = "require"
+        pool_kwargs: dict = {}
+        if not url.startswith("sqlite"):
+            _pool_settings = PoolSettings.from_env()
+            pool_kwargs = _pool_settings.engine_kwargs()
         _engine = create_async_engine(
             url,
             echo=False,
-            pool_pre_ping=True,
-            pool_recycle=1800,
             connect_args=connect_args,
+            **pool_kwargs,
         )
+        if _pool_settings is not None:
+            install_connect_counter(_engine)
+            if _pool_settings.pre_ping == "idle":
+                install_idle_pre_ping(_engine, _pool_settings.pre_ping_idle)
         _factory = async_sessionmaker(_engine, expire_on_commit=False, class_=AsyncSession)
     return _factory
 
@@ -104,6 +115,13 @@ def AsyncSessionLocal() -> AsyncSession:  # noqa: N802
     return _get_factory()()
 
 
+def get_pool_metrics() -> dict | None:
+    """Pool state and checkout metrics, or None if the engine hasn't been created yet."""
+    if _engine is None:
+        return None
+    return pool_metrics(_engine, _pool_settings)
+
+
 class Base(DeclarativeBase):
     """Shared declarative base for all SQLAlchemy ORM models."""
 
@@ -7,20 +7,66 @@ They replace all direct supabase.table(...) calls.
 
 from __future__ import annotations
 
-from types import SimpleNamespace
+from collections.abc import AsyncIterator
 from typing import Any, Protocol, runtime_checkable
 
-from sqlalchemy import select
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy import delete as sa_delete
 from sqlalchemy import update as sa_update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import BacktestStat, TradeAction, UniqueStrategy
+from app.db.models import (
+    BACKTEST_STAT_KEY,
+    OPTIMIZATION_HEATMAP_KEY,
+    TRADE_ACTION_KEY,
+    BacktestArtifact,
+    BacktestCheckpoint,
+    BacktestReport,
+    BacktestStat,
+    ChatCheckpoint,
+    ChatCheckpointWrite,
+    ChatMemory,
+    EmbeddingCache,
+    OptimizationHeatmap,
+    TradeAction,
+    UniqueStrategy,
+)
+
+
+def _dialect_insert(session: AsyncSession):
+    """INSERT construct with ON CONFLICT support for the session's dialect (SQLite in tests)."""
+    return sqlite_insert if session.bind.dialect.name == "sqlite" else pg_insert
+
+
+def _keyset_after(sort_col, id_col, after: tuple | None):
+    """
+    WHERE clause for the page after ``after`` = (sort value, id) in
+    ``sort_col DESC NULLS LAST, id DESC`` order; None means the first page.
+    """
+    if after is None:
+        return None
+    value, last_id = after
+    if value is None:
+        return and_(sort_col.is_(None), id_col < last_id)
+    return or_(
+        sort_col < value,
+        and_(sort_col == value, id_col < last_id),
+        sort_col.is_(None),
+    )
+
+
+def _keyset_page(stmt, sort_col, id_col, limit: int, after: tuple | None):
+    where = _keyset_after(sort_col, id_col, after)
+    if where is not None:
+        stmt = stmt.where(where)
+    return stmt.order_by(sort_col.desc().nulls_last(), id_col.desc()).limit(limit)
 
 
 @runtime_checkable
 class BacktestStatLike(Protocol):
-    """Structural interface satisfied by both BacktestStat and the slim upsert result."""
+    """Structural interface satisfied by both BacktestStat and the upsert result row."""
 
     id: int
     notifications_on: bool | None
@@ -31,68 +77,110 @@ class BacktestStatLike(Protocol):
 # ---------------------------------------------------------------------------
 
 
+# Columns returned by list views; everything needed to rank strategies at a glance
+BACKTEST_SUMMARY_COLUMNS = (
+    BacktestStat.id,
+    BacktestStat.ticker,
+    BacktestStat.strategy,
+    BacktestStat.period,
+    BacktestStat.interval,
+    BacktestStat.return_percentage,
+    BacktestStat.sharpe_ratio,
+    BacktestStat.win_rate,
+    BacktestStat.trade_count,
+    BacktestStat.max_drawdown_percentage,
+    BacktestStat.profit_factor,
+    BacktestStat.notifications_on,
+    BacktestStat.updated_at,
+    BacktestStat.last_optimized_at,
+)
+
+
 class BacktestStatRepository:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
 
     async def upsert(self, data: dict[str, Any]) -> BacktestStatLike | None:
         """
-        Update an existing backtest stat matching the strategy config, or insert if none exists.
-        Postgres doesn't have a unique constraint on these 4 columns, so we manually query.
+        Insert or update the backtest stat for a strategy config in one statement:
+        INSERT ... ON CONFLICT (ticker, strategy, period, interval) DO UPDATE ... RETURNING.
 
-        Only fetches `id` and `notifications_on` from the DB — avoids pulling the large
-        html column (40–80 KB) just to check for row existence.
+        `notifications_on` is only written when the stored value is NULL —
+        COALESCE keeps a flag that was already set (e.g. by the user).
 
-        On the UPDATE path, returns a SimpleNamespace(id, notifications_on) built entirely
-        from in-memory data — no additional SELECT is needed, so html is never fetched.
-        On the INSERT path, returns the full BacktestStat ORM object as before.
+        Returns Row(id, notifications_on) with the values as stored after the write.
         """
-        # Slim select: only the two columns we actually need
-        stmt = select(BacktestStat.id, BacktestStat.notifications_on).where(
-            BacktestStat.ticker == data.get("ticker"),
-            BacktestStat.strategy == data.get("strategy"),
-            BacktestStat.period == data.get("period"),
-            BacktestStat.interval == data.get("interval"),
-        )
-        result = await self._session.execute(stmt)
-        existing = result.first()  # Row(id, notifications_on) or None
+        insert = _dialect_insert(self._session)
+        stmt = insert(BacktestStat).values(**data)
 
-        if existing:
-            # Update in place via SQL UPDATE — no need to load the full ORM object
-            update_data = {k: v for k, v in data.items() if k != "id"}
-            await self._session.execute(
-                sa_update(BacktestStat).where(BacktestStat.id == existing.id).values(**update_data)
-            )
-            await self._session.commit()
-
-            # Build the return value from what we already have in memory.
-            # The caller (_persist_backtest_result) only reads .id and .notifications_on,
-            # so we never need to issue a get_by_id() SELECT (which would load html).
-            return SimpleNamespace(
-                id=existing.id,
-                notifications_on=update_data.get("notifications_on"),
+        update_data = {
+            k: stmt.excluded[k]
+            for k in data
+            if k not in ("id", "notifications_on", *BACKTEST_STAT_KEY)
+        }
+        if "notifications_on" in data:
+            update_data["notifications_on"] = func.coalesce(
+                BacktestStat.notifications_on, stmt.excluded.notifications_on
             )
-        else:
-            return await self.insert(data)
 
-    async def insert(self, data: dict[str, Any]) -> BacktestStat | None:
-        """INSERT a new row and return the created model."""
-        stmt = pg_insert(BacktestStat).values(**data).returning(BacktestStat)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(BACKTEST_STAT_KEY),
+            set_=update_data,
+        ).returning(BacktestStat.id, BacktestStat.notifications_on)
+
         result = await self._session.execute(stmt)
+        row = result.first()
         await self._session.commit()
-        return result.scalar_one_or_none()
+        return row
 
     async def get_by_id(self, backtest_id: int) -> BacktestStat | None:
-        """Return a BacktestStat by its ID."""
-        stmt = select(BacktestStat).where(BacktestStat.id == backtest_id)
+        """Return a BacktestStat by its ID (refreshed from the DB, upserts bypass the ORM)."""
+        stmt = (
+            select(BacktestStat)
+            .where(BacktestStat.id == backtest_id)
+            .execution_options(populate_existing=True)
+        )
         result = await self._session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def list_page(
+        self, limit: int, after: tuple | None = None, **filters: Any
+    ) -> list:
+        """
+        Return up to ``limit`` summary rows, most recently updated first.
+
+        Keyset pagination: ``after`` is the (updated_at, id) of the last row of
+        the previous page. ``filters`` are equality filters on summary columns
+        (None values are ignored).
+        """
+        stmt = select(*BACKTEST_SUMMARY_COLUMNS).where(
+            *(getattr(BacktestStat, k) == v for k, v in filters.items() if v is not None)
+        )
+        stmt = _keyset_page(stmt, BacktestStat.updated_at, BacktestStat.id, limit, after)
+        return list(await self._session.execute(stmt))
+
+    async def get_row(self, backtest_id: int):
+        """Return all columns of a backtest as a Row (no ORM identity map), or None."""
+        stmt = select(*BacktestStat.__table__.c).where(BacktestStat.id == backtest_id)
+        return (await self._session.execute(stmt)).first()
+
+    async def exists(self, backtest_id: int) -> bool:
+        """Return whether a backtest with this ID exists."""
+        stmt = select(BacktestStat.id).where(BacktestStat.id == backtest_id)
+        return (await self._session.execute(stmt)).scalar_one_or_none() is not None
+
 
 # ---------------------------------------------------------------------------
 # TradeActionRepository
 # ---------------------------------------------------------------------------
 
+# Columns of a trade schedule (replay input, exports), in the order the bulk reads return them
+TRADE_SCHEDULE_COLUMNS = ("datetime", "trade_action", "entry_price", "price", "sl", "tp", "size")
+
+# Rows per INSERT of insert_many: 8 columns × 1,000 rows stays far below the
+# 65,535 bind parameters Postgres allows in one statement
+INSERT_CHUNK_SIZE = 1000
+
 
 class TradeActionRepository:
     def __init__(self, session: AsyncSession) -> None:
@@ -109,14 +197,70 @@ class TradeActionRepository:
         result = await self._session.execute(stmt)
         return result.scalar_one_or_none()
 
-    async def insert_many(self, records: list[dict[str, Any]]) -> list[TradeAction]:
-        """Bulk-insert trade action records and return the created models."""
+    async def insert_many(
+        self, records: list[dict[str, Any]], chunk_size: int = INSERT_CHUNK_SIZE
+    ) -> list[TradeAction]:
+        """
+        Bulk-insert trade action records and return the created models.
+
+        Records go in multi-row INSERTs of ``chunk_size`` rows, keeping each
+        statement well below Postgres's 65,535 bind parameter limit, and are
+        committed together. Records that already exist for (backtest_id,
+        datetime, trade_action) are skipped by ON CONFLICT DO NOTHING, so only
+        newly stored actions come back.
+        """
         if not records:
             return []
-        stmt = pg_insert(TradeAction).values(records).returning(TradeAction)
-        result = await self._session.execute(stmt)
+        insert = _dialect_insert(self._session)
+        inserted: list[TradeAction] = []
+        for i in range(0, len(records), chunk_size):
+            stmt = (
+                insert(TradeAction)
+                .values(records[i : i + chunk_size])
+                .on_conflict_do_nothing(index_elements=list(TRADE_ACTION_KEY))
+                .returning(TradeAction)
+            )
+            result = await self._session.execute(stmt)
+            inserted.extend(result.scalars().all())
         await self._session.commit()
-        return list(result.scalars().all())
+        return inserted
+
+    async def list_page(self, backtest_id: int, limit: int, after: tuple | None = None) -> list:
+        """
+        Return up to ``limit`` trade actions of a backtest as Rows, newest first.
+
+        Keyset pagination: ``after`` is the (datetime, id) of the last row of the previous page.
+        """
+        stmt = select(*TradeAction.__table__.c).where(TradeAction.backtest_id == backtest_id)
+        stmt = _keyset_page(stmt, TradeAction.datetime, TradeAction.id, limit, after)
+        return list(await self._session.execute(stmt))
+
+    @staticmethod
+    def _schedule_select(backtest_id: int):
+        columns = [TradeAction.__table__.c[name] for name in TRADE_SCHEDULE_COLUMNS]
+        return (
+            select(*columns)
+            .where(TradeAction.backtest_id == backtest_id)
+            .order_by(TradeAction.datetime.asc(), TradeAction.id.asc())
+        )
+
+    async def get_schedule_rows(self, backtest_id: int) -> list:
+        """
+        Return all trade actions of a backtest as Rows (plain tuples) in
+        TRADE_SCHEDULE_COLUMNS order, oldest first. A Core select: no ORM objects
+        or identity map.
+        """
+        result = await self._session.execute(self._schedule_select(backtest_id))
+        return list(result)
+
+    async def stream_schedule_rows(
+        self, backtest_id: int, batch_size: int = 5000
+    ) -> AsyncIterator[list]:
+        """Like get_schedule_rows, but yields batches of up to ``batch_size`` rows from a server-side cursor."""
+        stmt = self._schedule_select(backtest_id).execution_options(yield_per=batch_size)
+        result = await self._session.stream(stmt)
+        async for batch in result.partitions(batch_size):
+            yield list(batch)
 
     async def get_all_for_backtest(self, backtest_id: int) -> list[TradeAction]:
         """Return all TradeActions for a given backtest_id, ordered by datetime."""
@@ -142,3 +286,410 @@ class UniqueStrategyRepository:
         """Return all unique strategies."""
         result = await self._session.execute(select(UniqueStrategy))
         return list(result.scalars().all())
+
+
+# ---------------------------------------------------------------------------
+# OptimizationHeatmapRepository
+# ---------------------------------------------------------------------------
+
+
+class OptimizationHeatmapRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    @staticmethod
+    def _key_filter(data: dict[str, Any]) -> tuple:
+        # IS NOT DISTINCT FROM so configs with a NULL period/interval still match
+        return tuple(
+            getattr(OptimizationHeatmap, column).is_not_distinct_from(data.get(column))
+            for column in OPTIMIZATION_HEATMAP_KEY
+            if column != "objective"
+        )
+
+    async def get_cached_points(self, key: dict[str, Any]) -> dict[str, list[dict]]:
+        """
+        Return previously evaluated grid points for a strategy config + data fingerprint,
+        grouped by optimisation objective.
+        """
+        stmt = select(OptimizationHeatmap.objective, OptimizationHeatmap.points).where(
+            *self._key_filter(key)
+        )
+        result = await self._session.execute(stmt)
+        return {row.objective: list(row.points or []) for row in result}
+
+    async def upsert(self, data: dict[str, Any]) -> int:
+        """
+        Replace the points of the heatmap matching the key (including objective),
+        or insert a new row, in one statement:
+        INSERT ... ON CONFLICT (key columns) DO UPDATE ... RETURNING id.
+        """
+        insert = _dialect_insert(self._session)
+        stmt = insert(OptimizationHeatmap).values(**data)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(OPTIMIZATION_HEATMAP_KEY),
+            set_={
+                k: stmt.excluded[k] for k in data if k not in ("id", *OPTIMIZATION_HEATMAP_KEY)
+            },
+        ).returning(OptimizationHeatmap.id)
+        result = await self._session.execute(stmt)
+        heatmap_id = result.scalar_one()
+        await self._session.commit()
+        return heatmap_id
+
+    async def get_latest_for_backtest(self, backtest_id: int) -> OptimizationHeatmap | None:
+        """Return the most recently updated heatmap saved for a backtest."""
+        stmt = (
+            select(OptimizationHeatmap)
+            .where(OptimizationHeatmap.backtest_id == backtest_id)
+            .order_by(OptimizationHeatmap.updated_at.desc(), OptimizationHeatmap.id.desc())
+            .limit(1)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalar_one_or_none()
+
+
+# ---------------------------------------------------------------------------
+# BacktestArtifactRepository
+# ---------------------------------------------------------------------------
+
+
+class BacktestArtifactRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def upsert(self, data: dict[str, Any]) -> None:
+        """
+        Replace the artifact of a backtest, or insert it if none exists:
+        INSERT ... ON CONFLICT (backtest_id) DO UPDATE.
+        """
+        insert = _dialect_insert(self._session)
+        stmt = insert(BacktestArtifact).values(**data)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BacktestArtifact.backtest_id],
+            set_={k: stmt.excluded[k] for k in data if k != "backtest_id"},
+        )
+        await self._session.execute(stmt)
+        await self._session.commit()
+
+    async def get_payload(self, backtest_id: int) -> bytes | None:
+        """Return the packed artifact bytes for a backtest, or None."""
+        stmt = select(BacktestArtifact.payload).where(BacktestArtifact.backtest_id == backtest_id)
+        return (await self._session.execute(stmt)).scalar_one_or_none()
+
+
+# ---------------------------------------------------------------------------
+# BacktestReportRepository
+# ---------------------------------------------------------------------------
+
+
+class BacktestReportRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get(self, backtest_id: int) -> BacktestReport | None:
+        """Return the stored report of a backtest, or None if it hasn't been rendered."""
+        stmt = select(BacktestReport).where(BacktestReport.backtest_id == backtest_id)
+        return (await self._session.execute(stmt)).scalar_one_or_none()
+
+    async def upsert(self, data: dict[str, Any]) -> None:
+        """
+        Store the report of a backtest. The row is left untouched when the stored
+        content hash already matches, so re-saving an identical report writes nothing.
+        """
+        insert = _dialect_insert(self._session)
+        stmt = insert(BacktestReport).values(**data)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BacktestReport.backtest_id],
+            set_={k: stmt.excluded[k] for k in data if k != "backtest_id"},
+            where=BacktestReport.content_hash != stmt.excluded.content_hash,
+        )
+        await self._session.execute(stmt)
+        await self._session.commit()
+
+    async def delete(self, backtest_id: int) -> None:
+        """Drop the stored report so it is re-rendered on the next request."""
+        await self._session.execute(
+            sa_delete(BacktestReport).where(BacktestReport.backtest_id == backtest_id)
+        )
+        await self._session.commit()
+
+
+# ---------------------------------------------------------------------------
+# BacktestCheckpointRepository
+# ---------------------------------------------------------------------------
+
+
+class BacktestCheckpointRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get_for_config(
+        self, ticker: str, strategy: str, period: str, interval: str
+    ) -> BacktestCheckpoint | None:
+        """Return the checkpoint of the backtest stored for a strategy config, or None."""
+        stmt = (
+            select(BacktestCheckpoint)
+            .join(BacktestStat, BacktestStat.id == BacktestCheckpoint.backtest_id)
+            .where(
+                BacktestStat.ticker == ticker,
+                BacktestStat.strategy == strategy,
+                BacktestStat.period == period,
+                BacktestStat.interval == interval,
+            )
+        )
+        return (await self._session.execute(stmt)).scalar_one_or_none()
+
+    async def upsert(self, data: dict[str, Any]) -> None:
+        """Insert or replace the checkpoint of a backtest."""
+        insert = _dialect_insert(self._session)
+        stmt = insert(BacktestCheckpoint).values(**data)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BacktestCheckpoint.backtest_id],
+            set_={k: stmt.excluded[k] for k in data if k != "backtest_id"},
+        )
+        await self._session.execute(stmt)
+        await self._session.commit()
+
+    async def update(self, backtest_id: int, values: dict[str, Any]) -> None:
+        await self._session.execute(
+            sa_update(BacktestCheckpoint)
+            .where(BacktestCheckpoint.backtest_id == backtest_id)
+            .values(**values)
+        )
+        await self._session.commit()
+
+
+# ---------------------------------------------------------------------------
+# ChatMemoryRepository
+# ---------------------------------------------------------------------------
+
+
+class ChatMemoryRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def add(self, thread_id: str, role: str, content: str, content_hash: str, created_at) -> None:
+        self._session.add(
+            ChatMemory(
+                thread_id=thread_id,
+                role=role,
+                content=content,
+                content_hash=content_hash,
+                created_at=created_at,
+            )
+        )
+        await self._session.flush()
+
+    async def list_for_thread(self, thread_id: str) -> list[tuple[str, str]]:
+        """(role, content) of a thread's memories, oldest first."""
+        stmt = (
+            select(ChatMemory.role, ChatMemory.content)
+            .where(ChatMemory.thread_id == thread_id)
+            .order_by(ChatMemory.id)
+        )
+        return [tuple(row) for row in (await self._session.execute(stmt)).all()]
+
+    async def trim(self, thread_id: str, keep: int) -> int:
+        """Delete all but the newest ``keep`` memories of a thread. Returns rows deleted."""
+        cutoff = (
+            await self._session.execute(
+                select(ChatMemory.id)
+                .where(ChatMemory.thread_id == thread_id)
+                .order_by(ChatMemory.id.desc())
+                .offset(keep)
+                .limit(1)
+            )
+        ).scalar_one_or_none()
+        if cutoff is None:
+            return 0
+        result = await self._session.execute(
+            sa_delete(ChatMemory).where(ChatMemory.thread_id == thread_id, ChatMemory.id <= cutoff)
+        )
+        return result.rowcount
+
+    async def delete_idle(self, before) -> int:
+        """Delete the threads whose newest memory is older than ``before``."""
+        idle = (
+            select(ChatMemory.thread_id)
+            .group_by(ChatMemory.thread_id)
+            .having(func.max(ChatMemory.created_at) < before)
+        )
+        result = await self._session.execute(
+            sa_delete(ChatMemory).where(ChatMemory.thread_id.in_(idle))
+        )
+        return result.rowcount
+
+    async def commit(self) -> None:
+        await self._session.commit()
+
+
+# ---------------------------------------------------------------------------
+# EmbeddingCacheRepository
+# ---------------------------------------------------------------------------
+
+
+class EmbeddingCacheRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get_many(self, model: str, content_hashes: list[str]) -> dict[str, bytes]:
+        if not content_hashes:
+            return {}
+        stmt = select(EmbeddingCache.content_hash, EmbeddingCache.vector).where(
+            EmbeddingCache.model == model,
+            EmbeddingCache.content_hash.in_(content_hashes),
+        )
+        return {row.content_hash: row.vector for row in (await self._session.execute(stmt)).all()}
+
+    async def put_many(self, model: str, vectors: dict[str, bytes], created_at=None) -> None:
+        """Store vectors by content hash; hashes already cached are left as they are."""
+        if not vectors:
+            return
+        insert = _dialect_insert(self._session)
+        stmt = insert(EmbeddingCache).values(
+            [
+                {"content_hash": h, "model": model, "vector": v, "created_at": created_at}
+                for h, v in vectors.items()
+            ]
+        )
+        await self._session.execute(stmt.on_conflict_do_nothing())
+        await self._session.commit()
+
+    async def delete_before(self, before) -> int:
+        """Delete vectors cached before ``before``; they are re-embedded if needed again."""
+        result = await self._session.execute(
+            sa_delete(EmbeddingCache).where(EmbeddingCache.created_at < before)
+        )
+        return result.rowcount
+
+
+# ---------------------------------------------------------------------------
+# ChatCheckpointRepository
+# ---------------------------------------------------------------------------
+
+
+class ChatCheckpointRepository:
+    """Serialized LangGraph checkpoints and pending writes of chatbot threads."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get(
+        self, thread_id: str, checkpoint_ns: str, checkpoint_id: str | None = None
+    ) -> ChatCheckpoint | None:
+        """The checkpoint ``checkpoint_id`` of a thread, or its newest one."""
+        stmt = select(ChatCheckpoint).where(
+            ChatCheckpoint.thread_id == thread_id,
+            ChatCheckpoint.checkpoint_ns == checkpoint_ns,
+        )
+        if checkpoint_id is not None:
+            stmt = stmt.where(ChatCheckpoint.checkpoint_id == checkpoint_id)
+        stmt = stmt.order_by(ChatCheckpoint.checkpoint_id.desc()).limit(1)
+        return (await self._session.execute(stmt)).scalar_one_or_none()
+
+    async def list(
+        self,
+        thread_id: str | None = None,
+        checkpoint_ns: str | None = None,
+        checkpoint_id: str | None = None,
+        before: str | None = None,
+        limit: int | None = None,
+    ) -> list[ChatCheckpoint]:
+        """Checkpoints matching the given filters, newest first."""
+        stmt = select(ChatCheckpoint)
+        if thread_id is not None:
+            stmt = stmt.where(ChatCheckpoint.thread_id == thread_id)
+        if checkpoint_ns is not None:
+            stmt = stmt.where(ChatCheckpoint.checkpoint_ns == checkpoint_ns)
+        if checkpoint_id is not None:
+            stmt = stmt.where(ChatCheckpoint.checkpoint_id == checkpoint_id)
+        if before is not None:
+            stmt = stmt.where(ChatCheckpoint.checkpoint_id < before)
+        stmt = stmt.order_by(ChatCheckpoint.thread_id, ChatCheckpoint.checkpoint_id.desc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return list((await self._session.execute(stmt)).scalars().all())
+
+    async def writes(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> list[ChatCheckpointWrite]:
+        stmt = (
+            select(ChatCheckpointWrite)
+            .where(
+                ChatCheckpointWrite.thread_id == thread_id,
+                ChatCheckpointWrite.checkpoint_ns == checkpoint_ns,
+                ChatCheckpointWrite.checkpoint_id == checkpoint_id,
+            )
+            .order_by(ChatCheckpointWrite.task_id, ChatCheckpointWrite.idx)
+        )
+        return list((await self._session.execute(stmt)).scalars().all())
+
+    async def put(self, data: dict) -> None:
+        """Insert or replace a checkpoint."""
+        insert = _dialect_insert(self._session)
+        stmt = insert(ChatCheckpoint).values(**data)
+        key = ("thread_id", "checkpoint_ns", "checkpoint_id")
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={k: stmt.excluded[k] for k in data if k not in key},
+        )
+        await self._session.execute(stmt)
+
+    async def put_writes(self, records: list[dict], replace: bool) -> None:
+        """Store pending writes; existing ones are kept unless ``replace``."""
+        if not records:
+            return
+        insert = _dialect_insert(self._session)
+        stmt = insert(ChatCheckpointWrite).values(records)
+        key = ("thread_id", "checkpoint_ns", "checkpoint_id", "task_id", "idx")
+        if replace:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(key),
+                set_={k: stmt.excluded[k] for k in ("channel", "value_type", "value", "task_path")},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing()
+        await self._session.execute(stmt)
+
+    async def trim(self, thread_id: str, checkpoint_ns: str, keep: int) -> int:
+        """Delete all but the newest ``keep`` checkpoints of a thread. Returns checkpoints deleted."""
+        cutoff = (
+            await self._session.execute(
+                select(ChatCheckpoint.checkpoint_id)
+                .where(
+                    ChatCheckpoint.thread_id == thread_id,
+                    ChatCheckpoint.checkpoint_ns == checkpoint_ns,
+                )
+                .order_by(ChatCheckpoint.checkpoint_id.desc())
+                .offset(keep)
+                .limit(1)
+            )
+        ).scalar_one_or_none()
+        if cutoff is None:
+            return 0
+        for model in (ChatCheckpointWrite, ChatCheckpoint):
+            result = await self._session.execute(
+                sa_delete(model).where(
+                    model.thread_id == thread_id,
+                    model.checkpoint_ns == checkpoint_ns,
+                    model.checkpoint_id <= cutoff,
+                )
+            )
+        return result.rowcount
+
+    async def delete_idle(self, before) -> int:
+        """Delete the threads whose newest checkpoint is older than ``before``. Returns checkpoints deleted."""
+        idle = (
+            select(ChatCheckpoint.thread_id)
+            .group_by(ChatCheckpoint.thread_id)
+            .having(func.max(ChatCheckpoint.created_at) < before)
+        )
+        # Writes first: the subquery reads the checkpoints
+        for model in (ChatCheckpointWrite, ChatCheckpoint):
+            result = await self._session.execute(sa_delete(model).where(model.thread_id.in_(idle)))
+        return result.rowcount
+
+    async def delete_thread(self, thread_id: str) -> None:
+        for model in (ChatCheckpointWrite, ChatCheckpoint):
+            await self._session.execute(sa_delete(model).where(model.thread_id == thread_id))
+
+    async def commit(self) -> None:
+        await self._session.commit()
@@ -0,0 +1,33 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+from starlette.status import HTTP_200_OK
+
+from app.auth.basic_auth import get_current_username
+from app.db.dto import PoolMetricsResponseDTO
+from app.db.postgres import get_pool_metrics
+
+router = APIRouter(
+    prefix="/db",
+    tags=["db"],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/pool", status_code=HTTP_200_OK, response_model=PoolMetricsResponseDTO)
+async def get_pool(
+    username: Annotated[str, Depends(get_current_username)],
+) -> PoolMetricsResponseDTO:
+    """
+    Get the Postgres connection pool state and metrics.
+
+    Returns the configured size/overflow/timeouts, connections in use and idle,
+    checkout latency and wait-time percentiles, overflow events and timeouts
+    since start-up. Use it to size DB_POOL_SIZE / DB_MAX_OVERFLOW for the
+    concurrent backtest fan-out.
+    """
+    return {
+        "status": HTTP_200_OK,
+        "message": "Database pool metrics",
+        "data": get_pool_metrics(),
+    }
@@ -0,0 +1,161 @@
+"""
+Pluggable codecs for large text blobs (backtest report HTML).
+
+Every stored blob records the codec it was written with, so the default can be
+changed at any time and older rows still decode. Available codecs:
+
+  identity        no compression
+  zlib            deflate at a fast level (pako-compatible)
+  zlib+bokeh-v1   deflate with a preset dictionary of Bokeh report boilerplate
+  zstd            Zstandard
+  zstd+bokeh-v1   Zstandard with the same dictionary
+
+Dictionaries are versioned files under ``dictionaries/`` and must never be
+edited once rows reference them — add a new version instead.
+"""
+
+from __future__ import annotations
+
+import base64
+import zlib
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import cache, partial
+from pathlib import Path
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+# Rows written before codecs were recorded are zlib + base64 text
+LEGACY_CODEC = "zlib"
+DEFAULT_CODEC = "zlib"
+
+# Level 6 is ~35% cheaper than 9 on report HTML for a ~0.2% larger output
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Texts are fed to the compressor in chunks to avoid one full-size bytes copy
+_CHUNK = 64 * 1024
+
+_DICTIONARY_DIR = Path(__file__).parent / "dictionaries"
+
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    compress: Callable[[str], bytes]
+    decompress: Callable[[bytes], str]
+
+
+@cache
+def _dictionary(name: str) -> bytes:
+    return (_DICTIONARY_DIR / f"{name}.html").read_bytes()
+
+
+def _chunks(text: str):
+    for i in range(0, len(text), _CHUNK):
+        yield text[i : i + _CHUNK].encode("utf-8")
+
+
+@cache
+def _zlib_dictionary(name: str) -> bytes:
+    # Deflate only sees the last 32 KB of a preset dictionary
+    return _dictionary(name)[-32768:]
+
+
+def _zlib_compress(text: str, dictionary: str | None = None) -> bytes:
+    if dictionary:
+        compressor = zlib.compressobj(ZLIB_LEVEL, zdict=_zlib_dictionary(dictionary))
+    else:
+        compressor = zlib.compressobj(ZLIB_LEVEL)
+    out = [compressor.compress(chunk) for chunk in _chunks(text)]
+    out.append(compressor.flush())
+    return b"".join(out)
+
+
+def _zlib_decompress(data: bytes, dictionary: str | None = None) -> str:
+    if dictionary:
+        decompressor = zlib.decompressobj(zdict=_zlib_dictionary(dictionary))
+    else:
+        decompressor = zlib.decompressobj()
+    return (decompressor.decompress(data) + decompressor.flush()).decode("utf-8")
+
+
+@cache
+def _zstd_dictionary(name: str):
+    return zstandard.ZstdCompressionDict(_dictionary(name), dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+
+
+def _zstd_compress(text: str, dictionary: str | None = None) -> bytes:
+    if not HAS_ZSTD:
+        raise RuntimeError("zstd codec requires the 'zstandard' package")
+    dict_data = _zstd_dictionary(dictionary) if dictionary else None
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data)
+    stream = compressor.compressobj()
+    out = [stream.compress(chunk) for chunk in _chunks(text)]
+    out.append(stream.flush())
+    return b"".join(out)
+
+
+def _zstd_decompress(data: bytes, dictionary: str | None = None) -> str:
+    if not HAS_ZSTD:
+        raise RuntimeError("zstd codec requires the 'zstandard' package")
+    dict_data = _zstd_dictionary(dictionary) if dictionary else None
+    # Streaming decompressor: frames written by compressobj carry no content size
+    stream = zstandard.ZstdDecompressor(dict_data=dict_data).decompressobj()
+    return stream.decompress(data).decode("utf-8")
+
+
+CODECS: dict[str, Codec] = {
+    "identity": Codec("identity", lambda text: text.encode("utf-8"), lambda data: data.decode("utf-8")),
+    "zlib": Codec("zlib", _zlib_compress, _zlib_decompress),
+    "zlib+bokeh-v1": Codec(
+        "zlib+bokeh-v1",
+        partial(_zlib_compress, dictionary="bokeh_report_v1"),
+        partial(_zlib_decompress, dictionary="bokeh_report_v1"),
+    ),
+    "zstd": Codec("zstd", _zstd_compress, _zstd_decompress),
+    "zstd+bokeh-v1": Codec(
+        "zstd+bokeh-v1",
+        partial(_zstd_compress, dictionary="bokeh_report_v1"),
+        partial(_zstd_decompress, dictionary="bokeh_report_v1"),
+    ),
+}
+
+
+def get_codec(name: str | None) -> Codec:
+    """Return the codec registered under ``name`` (None → legacy zlib)."""
+    try:
+        return CODECS[name or LEGACY_CODEC]
+    except KeyError:
+        raise ValueError(f"Unknown blob codec: {name}") from None
+
+
+def resolve_codec(name: str | None) -> str:
+    """Validate a configured codec name; a zstd codec without zstandard installed is an error."""
+    name = name or DEFAULT_CODEC
+    get_codec(name)
+    if name.startswith("zstd") and not HAS_ZSTD:
+        raise RuntimeError(f"Blob codec {name!r} requires the 'zstandard' package")
+    return name
+
+
+def encode(text: str, codec: str | None = None) -> tuple[str, bytes]:
+    """Compress ``text``; returns (codec name, bytes)."""
+    name = resolve_codec(codec)
+    return name, get_codec(name).compress(text)
+
+
+def decode(data: bytes, codec: str | None) -> str:
+    return get_codec(codec).decompress(data)
+
+
+def to_base64(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii")
+
+
+def from_base64(text: str) -> bytes:
+    return base64.b64decode(text)
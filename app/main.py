@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from app.base.interface import RootResponse
 from app.news.router import router as newsRouter
@@ -5,6 +7,9 @@ from app.ticker.router import router as tickerRouter
 from app.signals.router import router as signalsRouter
 from app.ai.router import router as aiRouter
 from app.notification.router import router as notificationRouter
+from app.db.router import router as dbRouter
+from app.news.ingest import close_http_client
+from app.signals.service import shutdown_render_pool
 from fastapi.middleware.cors import CORSMiddleware
 from chainlit.utils import mount_chainlit
 from fastapi.staticfiles import StaticFiles
@@ -25,7 +30,16 @@ origins = [
     "http://localhost:3000",
 ]
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Don't leave forked plot workers behind
+    shutdown_render_pool()
+    await close_http_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -41,6 +55,7 @@ app.include_router(tickerRouter)
 app.include_router(signalsRouter)
 app.include_router(aiRouter)
 app.include_router(notificationRouter)
+app.include_router(dbRouter)
 app.mount("/public", StaticFiles(directory="public"), name="public")
 app.mount("/logo", StaticFiles(directory="public"), name="public")
 
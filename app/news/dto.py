@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, Optional
 from typing import List
 
 class AlphaVantageNewsQueryDTO(BaseModel):
@@ -39,3 +39,5 @@ class AlphaVantageNewsDTO(BaseModel):
 class AlphaVantageNewsResponseDTO(BaseModel):
     status: int = Field(...)
     message: str = Field(...)
+    # received / inserted / updated / skipped article counts
+    data: Optional[Dict[str, int]] = Field(None)
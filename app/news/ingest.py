@@ -0,0 +1,126 @@
+"""
+Alpha Vantage NEWS_SENTIMENT ingestion.
+
+The feed is fetched with a shared httpx.AsyncClient (pooled keep-alive
+connections, no blocking call on the event loop; closed on app shutdown). Its
+body is read in chunks up to MAX_RESPONSE_BYTES, then parsed whole with orjson,
+and every article is written as an idempotent upsert keyed on its URL in one
+unordered bulk_write. Overlapping 6-hour windows
+therefore update the articles they share instead of inserting them again.
+
+ALPHA_VANTAGE_URL overrides the endpoint (tests point it at a local stub).
+"""
+
+from __future__ import annotations
+
+import datetime
+import os
+
+import httpx
+import orjson
+from pymongo import UpdateOne
+
+DEFAULT_URL = "https://www.alphavantage.co/query"
+# A NEWS_SENTIMENT response with limit=1000 is a few MB; anything far larger is not a feed
+MAX_RESPONSE_BYTES = 64 * 1024 * 1024
+
+_client: httpx.AsyncClient | None = None
+
+
+class AlphaVantageError(Exception):
+    """The API answered without a feed (rate limit, bad key or parameters)."""
+
+
+def get_http_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def fetch_news_feed(params: dict) -> list[dict]:
+    """Fetch the raw NEWS_SENTIMENT feed for ``params`` (None / empty values are dropped)."""
+    query = {"function": "NEWS_SENTIMENT", **{k: v for k, v in params.items() if v not in (None, "")}}
+    url = os.environ.get("ALPHA_VANTAGE_URL", DEFAULT_URL)
+
+    body = bytearray()
+    async with get_http_client().stream("GET", url, params=query) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if len(body) > MAX_RESPONSE_BYTES:
+                raise AlphaVantageError("Response too large")
+
+    data = orjson.loads(body)
+    if "feed" not in data:
+        # Alpha Vantage reports errors and rate limits with HTTP 200 and a message
+        message = data.get("Information") or data.get("Note") or data.get("Error Message") or data
+        raise AlphaVantageError(str(message))
+    return data["feed"]
+
+
+def normalise_article(news: dict) -> dict:
+    """Archived form of a feed item: ISO time_published and float scores."""
+    news["time_published"] = datetime.datetime.strptime(
+        news["time_published"], "%Y%m%dT%H%M%S"
+    ).isoformat()
+    for topic in news.get("topics") or []:
+        topic["relevance_score"] = float(topic["relevance_score"])
+    for sentiment in news.get("ticker_sentiment") or []:
+        sentiment["relevance_score"] = float(sentiment["relevance_score"])
+        sentiment["ticker_sentiment_score"] = float(sentiment["ticker_sentiment_score"])
+    return news
+
+
+def article_upserts(feed: list[dict]) -> tuple[list[UpdateOne], list[dict], int]:
+    """
+    Upserts keyed on URL for the feed, the articles they write (in the same
+    order) and the number of items skipped (no URL, malformed, or repeated in the feed).
+    """
+    updates, articles, skipped = [], [], 0
+    seen = set()
+    for news in feed:
+        url = news.get("url")
+        if not url or url in seen:
+            skipped += 1
+            continue
+        try:
+            article = normalise_article(news)
+        except (KeyError, TypeError, ValueError):
+            skipped += 1
+            continue
+        seen.add(url)
+        updates.append(UpdateOne({"url": url}, {"$set": article}, upsert=True))
+        articles.append(article)
+    return updates, articles, skipped
+
+
+async def upsert_articles(collection, feed: list[dict]) -> tuple[dict, list[dict]]:
+    """
+    Write the feed with one unordered bulk upsert.
+
+    Returns the inserted / updated / skipped counts and the newly inserted
+    articles. "updated" articles existed and changed; unchanged repeats count
+    as skipped.
+    """
+    updates, articles, skipped = article_upserts(feed)
+    counts = {"received": len(feed), "inserted": 0, "updated": 0, "skipped": skipped}
+    if not updates:
+        return counts, []
+
+    result = await collection.bulk_write(updates, ordered=False)
+    inserted = [articles[i] for i in sorted(result.upserted_ids)]
+    counts["inserted"] = result.upserted_count
+    counts["updated"] = result.modified_count
+    counts["skipped"] += result.matched_count - result.modified_count
+    return counts, inserted
@@ -0,0 +1,253 @@
+"""
+Per-ticker sentiment rollups maintained while news is ingested.
+
+For every ticker mentioned in an article, the article is added to an hourly
+and a daily rollup document in the news_sentiment_rollups collection:
+
+    {
+        "_id": "AAPL:hour:2024-01-01T13:00:00",
+        "ticker": "AAPL",
+        "granularity": "hour",            # or "day"
+        "bucket": datetime(2024, 1, 1, 13),
+        "day": datetime(2024, 1, 1),
+        "overall":   {"sum", "count", "min", "max"},   # overall_sentiment_score
+        "sentiment": {"sum", "count", "min", "max"},   # ticker_sentiment_score
+        "relevance": {"sum", "count", "min", "max"},   # relevance_score
+    }
+
+A feed is pre-aggregated per bucket in Python and written with one bulk of
+$inc / $min / $max upserts. Periodic sentiment then reads daily rollups for
+whole days and hourly rollups for the partial days at the edges of each
+range, so ranges are aligned to whole hours (UTC).
+
+Ingestion only adds new articles, so the rollups cover the whole archive only
+once they have been rebuilt from it; a rebuild stores the coverage document
+{"_id": ROLLUP_COVERAGE_ID, "rebuilt_at", "articles"} and readers fall back to
+aggregating the articles until it exists.
+
+A rebuild holds a lease document (REBUILD_LEASE_ID in the leases collection)
+so only one runs at a time; ingestion leaves the rollups to the rebuild while
+the lease is held.
+"""
+
+from __future__ import annotations
+
+import datetime
+from collections import defaultdict
+
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+HOUR = "hour"
+DAY = "day"
+
+# Rollup field → (article field, ticker_sentiment field); one of the two is None
+ROLLUP_METRICS = {
+    "overall": ("overall_sentiment_score", None),
+    "sentiment": (None, "ticker_sentiment_score"),
+    "relevance": (None, "relevance_score"),
+}
+
+# _id of the document marking rollups rebuilt from the whole archive
+ROLLUP_COVERAGE_ID = "_coverage"
+# _id of the lease held by a running rebuild
+REBUILD_LEASE_ID = "news_sentiment_rollups_rebuild"
+
+ROLLUP_INDEXES = [
+    [("ticker", ASCENDING), ("granularity", ASCENDING), ("bucket", ASCENDING)],
+    [("ticker", ASCENDING), ("granularity", ASCENDING), ("day", ASCENDING)],
+]
+
+
+def floor_hour(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def floor_day(value: datetime.datetime) -> datetime.datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _published_at(article: dict) -> datetime.datetime | None:
+    value = article.get("time_published")
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime.datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _add(stats: dict, value) -> None:
+    if value is None:
+        return
+    value = float(value)
+    stats["sum"] += value
+    stats["count"] += 1
+    stats["min"] = value if stats["min"] is None else min(stats["min"], value)
+    stats["max"] = value if stats["max"] is None else max(stats["max"], value)
+
+
+def _empty_stats() -> dict:
+    return {name: {"sum": 0.0, "count": 0, "min": None, "max": None} for name in ROLLUP_METRICS}
+
+
+def build_rollups(articles) -> dict[tuple, dict]:
+    """
+    Aggregate articles into {(ticker, granularity, bucket): {metric: stats}}.
+
+    Articles must carry ISO ``time_published`` strings (as archived) or datetimes;
+    scores may still be strings as returned by Alpha Vantage.
+    """
+    rollups: dict[tuple, dict] = defaultdict(_empty_stats)
+    for article in articles:
+        published = _published_at(article)
+        if published is None:
+            continue
+        tickers = {}
+        for sentiment in article.get("ticker_sentiment") or []:
+            # An article lists each ticker once; keep the first entry if not
+            tickers.setdefault(sentiment.get("ticker"), sentiment)
+        for ticker, sentiment in tickers.items():
+            if not ticker:
+                continue
+            for granularity, bucket in ((HOUR, floor_hour(published)), (DAY, floor_day(published))):
+                stats = rollups[(ticker, granularity, bucket)]
+                for name, (article_field, sentiment_field) in ROLLUP_METRICS.items():
+                    source = article if article_field else sentiment
+                    _add(stats[name], source.get(article_field or sentiment_field))
+    return rollups
+
+
+def rollup_updates(rollups: dict[tuple, dict]) -> list[UpdateOne]:
+    """One upsert per bucket: counts and sums are $inc'ed, extremes go through $min/$max."""
+    updates = []
+    for (ticker, granularity, bucket), stats in rollups.items():
+        inc, low, high = {}, {}, {}
+        for name, values in stats.items():
+            inc[f"{name}.sum"] = values["sum"]
+            inc[f"{name}.count"] = values["count"]
+            if values["count"]:
+                low[f"{name}.min"] = values["min"]
+                high[f"{name}.max"] = values["max"]
+        update = {
+            "$setOnInsert": {
+                "ticker": ticker,
+                "granularity": granularity,
+                "bucket": bucket,
+                "day": floor_day(bucket),
+            },
+            "$inc": inc,
+        }
+        if low:
+            update["$min"] = low
+            update["$max"] = high
+        updates.append(
+            UpdateOne({"_id": f"{ticker}:{granularity}:{bucket.isoformat()}"}, update, upsert=True)
+        )
+    return updates
+
+
+async def apply_rollups(collection, articles) -> int:
+    """Add articles to the rollup collection. Returns the number of buckets touched."""
+    updates = rollup_updates(build_rollups(articles))
+    if updates:
+        await collection.bulk_write(updates, ordered=False)
+    return len(updates)
+
+
+async def rollups_complete(collection) -> bool:
+    """Whether the rollups were rebuilt from the whole archive (see ROLLUP_COVERAGE_ID)."""
+    return await collection.find_one({"_id": ROLLUP_COVERAGE_ID}, {"_id": 1}) is not None
+
+
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+async def acquire_rebuild_lease(leases, owner: str, seconds: float) -> bool:
+    """Take the rebuild lease for ``seconds`` unless another owner holds an unexpired one."""
+    now = _utcnow()
+    try:
+        await leases.update_one(
+            {"_id": REBUILD_LEASE_ID, "expires_at": {"$lte": now}},
+            {"$set": {"owner": owner, "expires_at": now + datetime.timedelta(seconds=seconds)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return False
+    return True
+
+
+async def release_rebuild_lease(leases, owner: str) -> None:
+    await leases.delete_one({"_id": REBUILD_LEASE_ID, "owner": owner})
+
+
+async def rebuild_in_progress(leases) -> bool:
+    lease = {"_id": REBUILD_LEASE_ID, "expires_at": {"$gt": _utcnow()}}
+    return await leases.find_one(lease, {"_id": 1}) is not None
+
+
+def _split_range(start: datetime.datetime, end: datetime.datetime):
+    """Split the hour-aligned range [start, end) into (hourly head, whole days, hourly tail)."""
+    first_day = floor_day(start)
+    if first_day < start:
+        first_day += datetime.timedelta(days=1)
+    last_day = floor_day(end)
+    if first_day >= last_day:
+        return (start, end), None, None
+    return (start, first_day), (first_day, last_day), (last_day, end)
+
+
+async def read_sentiment_sums(
+    collection, ticker: str, ranges: dict[str, tuple[datetime.datetime, datetime.datetime]]
+) -> dict[str, tuple[float, int]] | None:
+    """
+    (sum, count) of overall_sentiment_score per named hour-aligned range, read
+    from rollups. Returns None if the ticker has no rollups at all.
+    """
+    splits = {name: _split_range(*bounds) for name, bounds in ranges.items()}
+    earliest_day = min(floor_day(start) for start, _ in ranges.values())
+    # An hourly part lies within one day, or two when a short range crosses midnight
+    edge_days = sorted(
+        {
+            floor_day(moment)
+            for head, _, tail in splits.values()
+            for part in (head, tail)
+            if part and part[0] < part[1]
+            for moment in (part[0], part[1] - datetime.timedelta(microseconds=1))
+        }
+    )
+
+    projection = {"_id": 0, "bucket": 1, "overall.sum": 1, "overall.count": 1}
+    daily = {
+        doc["bucket"]: doc["overall"]
+        async for doc in collection.find(
+            {"ticker": ticker, "granularity": DAY, "bucket": {"$gte": earliest_day}}, projection
+        )
+    }
+    hourly = {
+        doc["bucket"]: doc["overall"]
+        async for doc in collection.find(
+            {"ticker": ticker, "granularity": HOUR, "day": {"$in": edge_days}}, projection
+        )
+    }
+    if not daily and not hourly:
+        if await collection.find_one({"ticker": ticker}, {"_id": 1}) is None:
+            return None
+
+    def total(buckets: dict, bounds) -> tuple[float, int]:
+        if bounds is None:
+            return 0.0, 0
+        start, end = bounds
+        picked = [stats for bucket, stats in buckets.items() if start <= bucket < end]
+        return sum(s["sum"] for s in picked), sum(s["count"] for s in picked)
+
+    sums = {}
+    for name, (head, days, tail) in splits.items():
+        parts = [total(hourly, head), total(daily, days), total(hourly, tail)]
+        sums[name] = (sum(p[0] for p in parts), sum(p[1] for p in parts))
+    return sums
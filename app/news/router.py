@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends
 from dotenv import load_dotenv
+from app.auth.basic_auth import get_current_username
 from app.news.dto import AlphaVantageNewsQueryDTO, AlphaVantageNewsResponseDTO
 from app.news import service
 from starlette.status import HTTP_200_OK
-from typing import Dict, List, Any
+from typing import Annotated, Dict, List, Any
 
 load_dotenv()
 
@@ -30,3 +31,11 @@ async def archive_ticker_news(ticker: str, limit: int = 10):
 @router.get("/periodic-sentiment", response_model=Dict[str, Any], status_code=HTTP_200_OK)
 async def get_news(ticker: str):
     return await service.get_news_sentiment_per_period_by_ticker(ticker)
+
+
+@router.post("/sentiment-rollups/rebuild", status_code=HTTP_200_OK)
+async def rebuild_sentiment_rollups(
+    username: Annotated[str, Depends(get_current_username)],
+):
+    """Rebuild the sentiment rollups from the archive; run once after rollout."""
+    return await service.rebuild_sentiment_rollups()
@@ -1,10 +1,24 @@
 import os
 import json
+import uuid
 import datetime
-import requests
+import httpx
+from bson import ObjectId
 from app.base.utils.mongodb import connect_mongodb, COLLECTIONS
 from app.news.dto import AlphaVantageNewsQueryDTO
-from starlette.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from app.news.ingest import AlphaVantageError, fetch_news_feed, upsert_articles
+from app.news.rollups import (
+    ROLLUP_COVERAGE_ID,
+    ROLLUP_INDEXES,
+    acquire_rebuild_lease,
+    apply_rollups,
+    floor_hour,
+    read_sentiment_sums,
+    rebuild_in_progress,
+    release_rebuild_lease,
+    rollups_complete,
+)
+from starlette.status import HTTP_200_OK, HTTP_400_BAD_REQUEST, HTTP_409_CONFLICT
 import yfinance as yf
 
 """
@@ -30,50 +44,34 @@ async def fetch_alpha_vantage_news(_params: AlphaVantageNewsQueryDTO):
     db = await connect_mongodb()
     collection = db[COLLECTIONS["news_with_sentiment"]]
 
-    base_url = "https://www.alphavantage.co/query"
     params = {
-        "function": "NEWS_SENTIMENT",
         "apikey": os.environ["ALPHA_VANTAGE_API_KEY"],
         "from_date": _params.from_date,
         "to_date": _params.to_date,
         "tickers": _params.tickers,
         "limit": _params.limit,
-        "sort": "RELEVANCE",
+        "sort": _params.sort or "RELEVANCE",
     }
 
-    # Remove keys with None values
-    params = {k: v for k, v in params.items() if (
-        v != None or v != "")}
-
     # fetch news and sentiment data
-    r = requests.get(base_url, params=params)
-    data = r.json()
+    try:
+        feed = await fetch_news_feed(params)
+    except (AlphaVantageError, httpx.HTTPError, ValueError) as e:
+        return {
+            # HTTP 400 status
+            "status": HTTP_400_BAD_REQUEST,
+            "message": f"Failed to fetch news and sentiment data from Alpha Vantage. Error: {e}",
+        }
 
     # ------------------------------------------
     # # read json file for mock response
-    # data = await get_mock_news_sentiment()
+    # feed = (await get_mock_news_sentiment())["feed"]
     # ------------------------------------------
 
-    # loop through the feed and convert time_published to time format (from string)
-    for news in data["feed"]:
-        time_published = news["time_published"]
-        news["time_published"] = datetime.datetime.strptime(
-            time_published, "%Y%m%dT%H%M%S"
-        ).isoformat()
-
-        for topic in news["topics"]:
-            score = topic["relevance_score"]
-            topic["relevance_score"] = float(score)
-
-        for sentiment in news["ticker_sentiment"]:
-            relevance_score = sentiment["relevance_score"]
-            sentiment_score = sentiment["ticker_sentiment_score"]
-            sentiment["relevance_score"] = float(relevance_score)
-            sentiment["ticker_sentiment_score"] = float(sentiment_score)
-
-    # save the data to mongodb
+    # save the data to mongodb, one upsert per article URL
+    await _ensure_sentiment_indexes(db)
     try:
-        collection.insert_many(data["feed"])
+        counts, inserted = await upsert_articles(collection, feed)
     except Exception as e:
         return {
             # HTTP 400 status
@@ -81,10 +79,20 @@ async def fetch_alpha_vantage_news(_params: AlphaVantageNewsQueryDTO):
             "message": f"Failed to archive news and sentiment data to MongoDB. Error: {e}",
         }
 
+    # keep the per-ticker hourly / daily sentiment rollups in step with the archive;
+    # only new articles are added, re-fetched ones are already counted, and a
+    # running rebuild adds them itself
+    try:
+        if not await rebuild_in_progress(db[COLLECTIONS["leases"]]):
+            await apply_rollups(db[COLLECTIONS["news_sentiment_rollups"]], inserted)
+    except Exception as e:
+        print(f"Failed to update news sentiment rollups: {e}")
+
     return {
         # HTTP 200 status
         "status": HTTP_200_OK,
         "message": "Successfully archived news and sentiment data to MongoDB",
+        "data": counts,
     }
 
 
@@ -94,13 +102,13 @@ async def fetch_alpha_vantage_news_6h():
     _from_date = (_date_utc - datetime.timedelta(hours=6)
                   ).strftime("%Y%m%dT%H%M")
     _to_date = _date_utc.strftime("%Y%m%dT%H%M")
-    _params = {
-        "from_date": _from_date,
-        "to_date": _to_date,
-        "tickers": "",
-        "limit": 1000,
-        "sort": "RELEVANCE",
-    }
+    _params = AlphaVantageNewsQueryDTO(
+        from_date=_from_date,
+        to_date=_to_date,
+        tickers="",
+        limit=1000,
+        sort="RELEVANCE",
+    )
     res = await fetch_alpha_vantage_news(_params)
     return res
 
@@ -122,65 +130,265 @@ async def fetch_yfinance_news(ticker: str, limit: int = 10):
         }
 
 
-async def get_news_sentiment_per_period_by_ticker(ticker: str):
-    db = await connect_mongodb()
-    collection = db[COLLECTIONS["news_with_sentiment"]]
+# Trailing windows of the periodic sentiment, newest first
+SENTIMENT_WINDOWS = {
+    "6 hours": {"hours": 6},
+    "1 day": {"days": 1},
+    "1 week": {"days": 7},
+    "1 month": {"days": 30},
+    "3 months": {"days": 90},
+}
+SENTIMENT_WEEKS = 10
+
+# Serves the ticker + time range $match of the periodic sentiment pipeline
+SENTIMENT_INDEX = [("ticker_sentiment.ticker", 1), ("time_published", 1)]
+_sentiment_index_ready = False
+# Set once the rollups are known to cover the whole archive
+_rollups_complete = False
+# Upper bound on a rebuild; a crashed rebuild's lease lapses after this
+REBUILD_LEASE_SECONDS = 6 * 3600
+
+
+def _sentiment_timestamp(value: datetime.datetime) -> str:
+    # Same string form as the query bounds always used against time_published
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+async def _ensure_sentiment_indexes(db):
+    global _sentiment_index_ready
+    if _sentiment_index_ready:
+        return
+    try:
+        articles = db[COLLECTIONS["news_with_sentiment"]]
+        await articles.create_index(
+            SENTIMENT_INDEX, name="ticker_sentiment_ticker_time_published"
+        )
+        try:
+            await articles.create_index("url", name="url", unique=True)
+        except Exception as e:
+            # Archives written before ingestion upserted by URL may hold duplicates;
+            # the upserts still only need the lookup
+            print(f"Could not create a unique url index, using a plain one: {e}")
+            await articles.create_index("url", name="url")
+        rollups = db[COLLECTIONS["news_sentiment_rollups"]]
+        for keys in ROLLUP_INDEXES:
+            await rollups.create_index(keys)
+        _sentiment_index_ready = True
+    except Exception as e:
+        print(f"Failed to create the news sentiment indexes: {e}")
+
+
+def _periodic_sentiment_pipeline(ticker: str, now: datetime.datetime) -> tuple[list[dict], dict[str, str]]:
+    """
+    One aggregation for all trailing windows and weekly buckets of a ticker.
+
+    Returns the pipeline and the lower bound of each weekly bucket by week name.
+    """
+    window_starts = {
+        name: _sentiment_timestamp(now - datetime.timedelta(**delta))
+        for name, delta in SENTIMENT_WINDOWS.items()
+    }
+    week_starts = {
+        _week_name(i): _sentiment_timestamp(now - datetime.timedelta(days=i * 7))
+        for i in range(1, SENTIMENT_WEEKS + 1)
+    }
+    earliest = min([*window_starts.values(), *week_starts.values()])
+
+    average = {"_id": None, "average": {"$avg": "$overall_sentiment_score"}}
+    facets = {
+        name: [{"$match": {"time_published": {"$gte": start}}}, {"$group": average}]
+        for name, start in window_starts.items()
+    }
+    facets["weekly_sentiment"] = [
+        {
+            "$bucket": {
+                "groupBy": "$time_published",
+                "boundaries": sorted(week_starts.values()) + [_sentiment_timestamp(now)],
+                # Older than the weekly range, or published after `now`
+                "default": "other",
+                "output": {"average": {"$avg": "$overall_sentiment_score"}},
+            }
+        }
+    ]
+
+    pipeline = [
+        {"$match": {"ticker_sentiment.ticker": ticker, "time_published": {"$gte": earliest}}},
+        {"$project": {"_id": 0, "time_published": 1, "overall_sentiment_score": 1}},
+        {"$facet": facets},
+    ]
+    return pipeline, week_starts
+
+
+def _week_name(i: int) -> str:
+    return f"{i} week{'s' if i > 1 else ''} ago"
+
 
-    intervals = {
-        "6 hours": {"hours": 6},
-        "1 day": {"days": 1},
-        "1 week": {"days": 7},
-        "1 month": {"days": 30},
-        "3 months": {"days": 90},
+def _rollup_ranges(now: datetime.datetime) -> dict[str, tuple[datetime.datetime, datetime.datetime]]:
+    """Hour-aligned [start, end) of every trailing window and weekly bucket, in UTC."""
+    end = floor_hour(now) + datetime.timedelta(hours=1)
+    ranges = {
+        name: (floor_hour(now - datetime.timedelta(**delta)), end)
+        for name, delta in SENTIMENT_WINDOWS.items()
     }
+    for i in range(1, SENTIMENT_WEEKS + 1):
+        week_end = end if i == 1 else floor_hour(now - datetime.timedelta(days=(i - 1) * 7))
+        ranges[_week_name(i)] = (floor_hour(now - datetime.timedelta(days=i * 7)), week_end)
+    return ranges
+
+
+async def _periodic_sentiment_from_rollups(db, ticker: str, now: datetime.datetime):
+    global _rollups_complete
+    collection = db[COLLECTIONS["news_sentiment_rollups"]]
+    if not _rollups_complete:
+        # Before the first rebuild, rollups only hold news ingested since the deploy
+        if not await rollups_complete(collection):
+            return None
+        _rollups_complete = True
+    sums = await read_sentiment_sums(collection, ticker, _rollup_ranges(now))
+    if sums is None:
+        return None
+
+    def average(name):
+        total, count = sums[name]
+        return total / count if count else 0
+
+    results = {name: {"timeframe": average(name)} for name in SENTIMENT_WINDOWS}
+    results["weekly_sentiment"] = {
+        _week_name(i): average(_week_name(i)) for i in range(1, SENTIMENT_WEEKS + 1)
+    }
+    return results
+
+
+async def _periodic_sentiment_from_articles(db, ticker: str, now: datetime.datetime):
+    collection = db[COLLECTIONS["news_with_sentiment"]]
+    pipeline, week_starts = _periodic_sentiment_pipeline(ticker, now)
+    facets = (await collection.aggregate(pipeline).to_list(length=1) or [{}])[0]
 
     results = {}
+    for interval_name in SENTIMENT_WINDOWS:
+        groups = facets.get(interval_name) or []
+        results[interval_name] = {"timeframe": (groups[0]["average"] or 0) if groups else 0}
 
-    for interval_name, interval_delta in intervals.items():
-        _date_utc = datetime.datetime.utcnow()
-        from_date = (_date_utc - datetime.timedelta(**interval_delta)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    bucket_averages = {bucket["_id"]: bucket["average"] for bucket in facets.get("weekly_sentiment", [])}
+    results["weekly_sentiment"] = {
+        week_name: bucket_averages.get(start) or 0 for week_name, start in week_starts.items()
+    }
+    return results
 
-        print(from_date)
-        news_cursor = collection.find({
-            "ticker_sentiment": {
-                "$elemMatch": {
-                    "ticker": ticker
-                }
-            },
-            "time_published": {
-                "$gte": from_date,
-            }
-        })
-
-        sentiment_scores = [doc["overall_sentiment_score"] async for doc in news_cursor]
-        average_sentiment_score = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
-        
-        results[interval_name] = {"timeframe": average_sentiment_score}
-    
-    weekly_sentiments = {}
-    for i in range(1, 11):
-        week_name = f"{i} week{'s' if i > 1 else ''} ago"
-        _date_utc = datetime.datetime.utcnow()
-        from_date = (_date_utc - datetime.timedelta(days=i * 7)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-        to_date = (_date_utc - datetime.timedelta(days=(i - 1) * 7)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-
-        news_cursor = collection.find({
-            "ticker_sentiment": {
-                "$elemMatch": {
-                    "ticker": ticker
-                }
-            },
-            "time_published": {
-                "$gte": from_date,
-                "$lt": to_date,
-            }
-        })
-        
-        sentiment_scores = [doc["overall_sentiment_score"] async for doc in news_cursor]
-        average_sentiment_score = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
-        weekly_sentiments[week_name] = average_sentiment_score
 
-    results["weekly_sentiment"] = weekly_sentiments
+async def get_news_sentiment_per_period_by_ticker(ticker: str):
+    """
+    Average overall sentiment of a ticker's news over trailing windows and the
+    last 10 weeks. Read from the ingest-time rollups once they have been rebuilt
+    from the whole archive; until then, and for tickers without any rollups, one
+    aggregation over the archived articles is used instead.
+    """
+    db = await connect_mongodb()
+    await _ensure_sentiment_indexes(db)
+
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    results = await _periodic_sentiment_from_rollups(db, ticker, now)
+    if results is None:
+        results = await _periodic_sentiment_from_articles(db, ticker, now)
     results["ticker"] = ticker
     print(results)
     return results
+
+
+async def _add_to_rollups(rollups, cursor, seen: set, since: ObjectId, batch_size: int) -> tuple[int, int]:
+    """
+    Apply the articles of ``cursor`` not in ``seen`` to ``rollups``, remembering
+    the ids from ``since`` on in ``seen``. Returns (articles, bucket updates).
+    """
+    articles, buckets = 0, 0
+    batch = []
+    async for article in cursor:
+        article_id = article["_id"]
+        if article_id in seen:
+            continue
+        if isinstance(article_id, ObjectId) and article_id >= since:
+            seen.add(article_id)
+        batch.append(article)
+        if len(batch) >= batch_size:
+            buckets += await apply_rollups(rollups, batch)
+            articles += len(batch)
+            batch = []
+    if batch:
+        buckets += await apply_rollups(rollups, batch)
+        articles += len(batch)
+    return articles, buckets
+
+
+async def rebuild_sentiment_rollups(batch_size: int = 1000):
+    """
+    Recompute all sentiment rollups from the archived articles (backfill / repair).
+
+    Run once after rollout, and whenever the rollups need repairing. The
+    rollups are built in a new collection and renamed over the live one, so
+    readers never see a partial rebuild. Only one rebuild runs at a time, and
+    while it does ingestion leaves new articles to it: they are added by
+    catch-up passes before and after the rename.
+    """
+    db = await connect_mongodb()
+    await _ensure_sentiment_indexes(db)
+    leases = db[COLLECTIONS["leases"]]
+    owner = uuid.uuid4().hex
+    if not await acquire_rebuild_lease(leases, owner, REBUILD_LEASE_SECONDS):
+        return {
+            "status": HTTP_409_CONFLICT,
+            "message": "A news sentiment rollup rebuild is already running",
+        }
+
+    name = COLLECTIONS["news_sentiment_rollups"]
+    rollups = db[f"{name}_rebuild_{owner[:8]}"]
+    articles = db[COLLECTIONS["news_with_sentiment"]]
+
+    # ObjectIds start with their creation time; leave a margin for clock skew
+    started = ObjectId.from_datetime(
+        datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(minutes=5)
+    )
+    projection = {"time_published": 1, "overall_sentiment_score": 1, "ticker_sentiment": 1}
+    recent = {"_id": {"$gte": started}}
+    seen: set = set()
+    try:
+        try:
+            counted, buckets = await _add_to_rollups(
+                rollups, articles.find({}, projection), seen, started, batch_size
+            )
+            caught_up, caught_up_buckets = await _add_to_rollups(
+                rollups, articles.find(recent, projection), seen, started, batch_size
+            )
+            counted += caught_up
+            buckets += caught_up_buckets
+
+            for keys in ROLLUP_INDEXES:
+                await rollups.create_index(keys)
+            await rollups.insert_one(
+                {
+                    "_id": ROLLUP_COVERAGE_ID,
+                    "rebuilt_at": datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None),
+                    "articles": counted,
+                }
+            )
+            await rollups.rename(name, dropTarget=True)
+        except BaseException:
+            # Failed or cancelled (e.g. on shutdown): don't leave the partial build behind
+            await rollups.drop()
+            raise
+
+        # Articles ingested between the last pass and the rename
+        live = db[name]
+        late, late_buckets = await _add_to_rollups(
+            live, articles.find(recent, projection), seen, started, batch_size
+        )
+        if late:
+            await live.update_one({"_id": ROLLUP_COVERAGE_ID}, {"$inc": {"articles": late}})
+        counted += late
+        buckets += late_buckets
+    finally:
+        await release_rebuild_lease(leases, owner)
+
+    return {
+        "status": HTTP_200_OK,
+        "message": f"Rebuilt news sentiment rollups from {counted} articles ({buckets} bucket updates)",
+    }
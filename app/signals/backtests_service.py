@@ -0,0 +1,180 @@
+"""
+Read API for stored backtests: list, detail and trade actions.
+
+Responses are built from narrow column projections (no report HTML), paged
+with keyset cursors over (updated_at, id) — or (datetime, id) for trade
+actions — and cached in-process for BACKTEST_READ_CACHE_TTL seconds
+(default 30). The cache is cleared whenever a backtest result is persisted
+by this process; other workers pick up the change once their TTL expires.
+
+Every response carries an ETag (a hash of the body) so clients can revalidate
+with If-None-Match and get a 304 instead of the payload.
+
+The CSV export is not cached: it streams a backtest's full trade history from a
+server-side cursor in batches of BACKTEST_EXPORT_BATCH_SIZE rows (default 5000).
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import datetime
+
+from cachetools import TTLCache
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from starlette.status import HTTP_200_OK
+
+from app.db.postgres import AsyncSessionLocal
+from app.db.repository import (
+    TRADE_SCHEDULE_COLUMNS,
+    BacktestStatRepository,
+    TradeActionRepository,
+)
+from app.signals.strategies.replay.trade_schedule import schedule_frame, schedule_from_rows
+
+_cache: TTLCache = TTLCache(
+    maxsize=int(os.getenv("BACKTEST_READ_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("BACKTEST_READ_CACHE_TTL", "30")),
+)
+EXPORT_BATCH_SIZE = int(os.getenv("BACKTEST_EXPORT_BATCH_SIZE", "5000"))
+
+
+def invalidate_backtest_reads() -> None:
+    """Drop every cached read; called after a backtest result is written."""
+    _cache.clear()
+
+
+def encode_cursor(sort_value: datetime | None, row_id: int) -> str:
+    raw = json.dumps([sort_value.isoformat() if sort_value is not None else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str | None) -> tuple | None:
+    if not cursor:
+        return None
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return (datetime.fromisoformat(sort_value) if sort_value is not None else None, int(row_id))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header value matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in tags
+
+
+async def _cached(key: tuple, load: Callable[[], Awaitable[dict]]) -> tuple[dict, str]:
+    """Return (response body, ETag) for ``key``, loading and caching it on a miss."""
+    hit = _cache.get(key)
+    if hit is not None:
+        return hit
+
+    body = jsonable_encoder(await load())
+    digest = hashlib.sha1(json.dumps(body, sort_keys=True).encode("utf-8")).hexdigest()
+    entry = (body, f'W/"{digest}"')
+    _cache[key] = entry
+    return entry
+
+
+def _page(rows: list, limit: int, sort_key: str) -> dict:
+    # Repositories are asked for limit + 1 rows so the last page has no cursor
+    items = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last[sort_key], last["id"])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def list_backtests(
+    limit: int,
+    cursor: str | None = None,
+    ticker: str | None = None,
+    strategy: str | None = None,
+    period: str | None = None,
+    interval: str | None = None,
+) -> tuple[dict, str]:
+    """Page of backtest summaries, most recently updated first. Returns (body, ETag)."""
+    after = decode_cursor(cursor)
+
+    async def load():
+        async with AsyncSessionLocal() as session:
+            rows = await BacktestStatRepository(session).list_page(
+                limit + 1, after, ticker=ticker, strategy=strategy, period=period, interval=interval
+            )
+        return {
+            "status": HTTP_200_OK,
+            "message": "Backtests",
+            "data": _page(rows, limit, "updated_at"),
+        }
+
+    return await _cached(("list", limit, cursor, ticker, strategy, period, interval), load)
+
+
+async def get_backtest(backtest_id: int) -> tuple[dict, str]:
+    """All stored stats of one backtest. Returns (body, ETag)."""
+
+    async def load():
+        async with AsyncSessionLocal() as session:
+            row = await BacktestStatRepository(session).get_row(backtest_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Backtest with ID {backtest_id} not found")
+        return {"status": HTTP_200_OK, "message": "Backtest", "data": dict(row._mapping)}
+
+    return await _cached(("detail", backtest_id), load)
+
+
+async def list_trade_actions(
+    backtest_id: int, limit: int, cursor: str | None = None
+) -> tuple[dict, str]:
+    """Page of a backtest's trade actions, newest first. Returns (body, ETag)."""
+    after = decode_cursor(cursor)
+
+    async def load():
+        async with AsyncSessionLocal() as session:
+            if not await BacktestStatRepository(session).exists(backtest_id):
+                raise HTTPException(
+                    status_code=404, detail=f"Backtest with ID {backtest_id} not found"
+                )
+            rows = await TradeActionRepository(session).list_page(backtest_id, limit + 1, after)
+        return {
+            "status": HTTP_200_OK,
+            "message": "Trade actions",
+            "data": _page(rows, limit, "datetime"),
+        }
+
+    return await _cached(("trade_actions", backtest_id, limit, cursor), load)
+
+
+async def export_trade_actions_csv(backtest_id: int) -> AsyncIterator[str]:
+    """
+    CSV of all trade actions of a backtest, oldest first, as an iterator of chunks.
+
+    The 404 for an unknown backtest is raised here, before the response starts.
+    """
+    async with AsyncSessionLocal() as session:
+        if not await BacktestStatRepository(session).exists(backtest_id):
+            raise HTTPException(status_code=404, detail=f"Backtest with ID {backtest_id} not found")
+
+    async def chunks():
+        yield ",".join(TRADE_SCHEDULE_COLUMNS) + "\n"
+        async with AsyncSessionLocal() as session:
+            batches = TradeActionRepository(session).stream_schedule_rows(
+                backtest_id, EXPORT_BATCH_SIZE
+            )
+            async for rows in batches:
+                yield schedule_frame(schedule_from_rows(rows)).to_csv(
+                    index=False, header=False, date_format="%Y-%m-%dT%H:%M:%S"
+                )
+
+    return chunks()
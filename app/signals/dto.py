@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import datetime as dt
 from typing import Any, Literal
 
 from pydantic import BaseModel, Field
@@ -92,6 +93,33 @@ class BacktestProcessResponseDTO(BaseModel):
     data: str = Field(...)
 
 
+class BacktestJobRequestDTO(SignalRequestDTO):
+    priority: int = Field(0, ge=-10, le=10, description="Higher runs first; FIFO within a priority")
+
+
+class BacktestJob(BaseModel):
+    id: str
+    status: Literal["queued", "running", "done", "failed"]
+    priority: int = 0
+    stage: str | None = None
+    progress: float = Field(0.0, description="Approximate completion, 0 to 1")
+    backtest_id: int | None = Field(None, description="ID of the stored backtest once saved")
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    request: dict[str, Any] = Field(default_factory=dict)
+    queued_at: dt.datetime
+    started_at: dt.datetime | None = None
+    finished_at: dt.datetime | None = None
+    queue_seconds: float
+    run_seconds: float | None = None
+
+
+class BacktestJobResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: BacktestJob = Field(...)
+
+
 class TradeAction(BaseModel):
     backtest_id: int = Field(...)
     datetime: str = Field(...)
@@ -113,6 +141,204 @@ class BacktestReplayResponseDTO(BaseModel):
     data: BacktestStats = Field(...)
 
 
+class BacktestHtmlRequestDTO(BaseModel):
+    backtest_id: int = Field(..., description="The ID of the backtest whose report to return")
+
+
+class BacktestHtml(BaseModel):
+    backtest_id: int
+    content_hash: str = Field(..., description="sha256 of the uncompressed report HTML")
+    html: str = Field(..., description="Report HTML, zlib-compressed + base64-encoded")
+
+
+class BacktestHtmlResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: BacktestHtml = Field(...)
+
+
+class BacktestListRequestDTO(BaseModel):
+    ticker: str | None = Field(None)
+    strategy: str | None = Field(None)
+    period: str | None = Field(None)
+    interval: str | None = Field(None)
+    limit: int = Field(50, ge=1, le=200, description="Page size")
+    cursor: str | None = Field(None, description="next_cursor of the previous page")
+
+
+class BacktestSummary(BaseModel):
+    id: int
+    ticker: str | None = None
+    strategy: str | None = None
+    period: str | None = None
+    interval: str | None = None
+    return_percentage: float | None = None
+    sharpe_ratio: float | None = None
+    win_rate: float | None = None
+    trade_count: int | None = None
+    max_drawdown_percentage: float | None = None
+    profit_factor: float | None = None
+    notifications_on: bool | None = None
+    updated_at: dt.datetime | None = None
+    last_optimized_at: dt.datetime | None = None
+
+
+class BacktestSummaryPage(BaseModel):
+    items: list[BacktestSummary]
+    next_cursor: str | None = Field(None, description="Cursor of the next page; null on the last page")
+
+
+class BacktestListResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: BacktestSummaryPage = Field(...)
+
+
+class BacktestDetail(BacktestSummary):
+    ref_id: str | None = None
+    return_annualized: float | None = None
+    buy_and_hold_return: float | None = None
+    sortino_ratio: float | None = None
+    calmar_ratio: float | None = None
+    volatility_annualized: float | None = None
+    final_equity: float | None = None
+    peak_equity: float | None = None
+    average_drawdown_percentage: float | None = None
+    max_drawdown_duration: str | None = None
+    average_drawdown_duration: str | None = None
+    best_trade: float | None = None
+    worst_trade: float | None = None
+    avg_trade: float | None = None
+    max_trade_duration: str | None = None
+    average_trade_duration: str | None = None
+    exposure_time_percentage: float | None = None
+    start_time: str | None = None
+    end_time: str | None = None
+    duration: str | None = None
+    tpsl_ratio: float | None = None
+    sl_coef: float | None = None
+    tp_coef: float | None = None
+
+
+class BacktestDetailResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: BacktestDetail = Field(...)
+
+
+class TradeActionListRequestDTO(BaseModel):
+    limit: int = Field(100, ge=1, le=500, description="Page size")
+    cursor: str | None = Field(None, description="next_cursor of the previous page")
+
+
+class TradeActionRecord(BaseModel):
+    id: int
+    backtest_id: int | None = None
+    datetime: dt.datetime | None = None
+    trade_action: str | None = None
+    entry_price: float | None = None
+    price: float | None = None
+    sl: float | None = None
+    tp: float | None = None
+    size: float | None = None
+
+
+class TradeActionPage(BaseModel):
+    items: list[TradeActionRecord]
+    next_cursor: str | None = Field(None, description="Cursor of the next page; null on the last page")
+
+
+class TradeActionListResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: TradeActionPage = Field(...)
+
+
+class OptimizationHeatmapRequestDTO(BaseModel):
+    backtest_id: int = Field(..., description="The ID of the backtest whose heatmap to return")
+
+
+class HeatmapPoint(BaseModel):
+    params: dict[str, Any] = Field(...)
+    value: float | None = Field(None, description="Objective value; null when the run made no trades")
+    trades: int | None = Field(None, description="Number of trades made with these parameters")
+
+
+class OptimizationHeatmap(BaseModel):
+    backtest_id: int
+    ticker: str | None
+    strategy: str | None
+    period: str | None
+    interval: str | None
+    strategy_version: str
+    data_fingerprint: str
+    objective: str
+    parameters: list[str]
+    points: list[HeatmapPoint]
+    updated_at: Any
+
+
+class OptimizationHeatmapResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: OptimizationHeatmap = Field(...)
+
+
+class WalkForwardRequestDTO(SignalRequestDTO):
+    n_folds: int = Field(4, ge=1, le=12, description="Number of rolling train/test folds")
+    train_ratio: float = Field(
+        3.0, gt=0, le=10, description="Train window length as a multiple of the test window"
+    )
+
+
+class WalkForwardFold(BaseModel):
+    fold: int
+    train_start: Any
+    train_end: Any
+    test_start: Any
+    test_end: Any
+    best_params: dict[str, Any]
+    in_sample_return_percentage: float | None
+    in_sample_win_rate: float | None
+    return_percentage: float | None
+    win_rate: float | None
+    trade_count: int
+    max_drawdown_percentage: float | None
+    sharpe_ratio: float | None
+    profit_factor: float | None
+
+
+class WalkForwardSummary(BaseModel):
+    fold_count: int
+    profitable_folds: int
+    return_percentage: float
+    average_fold_return_percentage: float
+    trade_count: int
+    win_rate: float
+    avg_trade_percentage: float
+    profit_factor: float | None
+    max_drawdown_percentage: float | None
+    average_sharpe_ratio: float | None
+    walk_forward_efficiency: float | None
+
+
+class WalkForwardResult(BaseModel):
+    ticker: str
+    strategy: str
+    period: str | None
+    interval: str
+    n_folds: int
+    train_ratio: float
+    folds: list[WalkForwardFold]
+    out_of_sample: WalkForwardSummary
+
+
+class WalkForwardResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: WalkForwardResult = Field(...)
+
+
 class StrategyInfo(BaseModel):
     """Information about a single trading strategy."""
 
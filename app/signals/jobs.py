@@ -0,0 +1,253 @@
+"""
+Registry and worker queue for asynchronous jobs, backtest runs by default.
+
+/signals/backtest submits a job instead of firing an unbounded BackgroundTask.
+Jobs wait in a bounded priority queue (higher priority first, FIFO within a
+priority) and are run by a fixed number of workers, so a burst of requests
+can't start dozens of optimisations at once. Each job records its state
+(queued → running → done | failed), timings, progress stage and, once saved,
+the id of the backtest_stats row it wrote.
+
+Configuration:
+
+    BACKTEST_JOB_WORKERS      concurrent backtests (default 2)
+    BACKTEST_JOB_QUEUE_SIZE   queued jobs before submissions get a 503 (default 50)
+    BACKTEST_JOB_HISTORY      finished jobs kept for polling (default 200)
+
+The registry lives in process memory: job ids are only known to the worker
+that accepted them, and history is lost on restart.
+
+Other job kinds (e.g. the ticker archive jobs) use their own registry with a
+``name`` and the generic ``Job`` type.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from fastapi import HTTPException
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+Runner = Callable[..., Awaitable[Any]]
+
+
+@dataclass
+class Job:
+    id: str
+    # Keyword arguments the job was submitted with
+    request: dict[str, Any]
+    priority: int = 0
+    status: str = QUEUED
+    stage: str | None = None
+    progress: float = 0.0
+    # Runner-defined summary reported through on_progress (e.g. per-ticker outcomes)
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    queued_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    # Replaced on every update; watchers wait on the instance they saw last
+    _changed: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def snapshot(self) -> dict[str, Any]:
+        now = datetime.now(UTC)
+        queue_end = self.started_at or self.finished_at or now
+        return {
+            "id": self.id,
+            "status": self.status,
+            "priority": self.priority,
+            "stage": self.stage,
+            "progress": round(self.progress, 3),
+            "result": self.result,
+            "error": self.error,
+            "request": self.request,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_seconds": round((queue_end - self.queued_at).total_seconds(), 3),
+            "run_seconds": (
+                round(((self.finished_at or now) - self.started_at).total_seconds(), 3)
+                if self.started_at
+                else None
+            ),
+        }
+
+
+@dataclass
+class BacktestJob(Job):
+    # Set once the run has saved its backtest_stats row
+    backtest_id: int | None = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {**super().snapshot(), "backtest_id": self.backtest_id}
+
+
+class JobRegistry:
+    """Tracks jobs of one kind (``name``) and runs them from a bounded priority queue."""
+
+    def __init__(
+        self,
+        runner: Runner,
+        workers: int = 2,
+        queue_size: int = 50,
+        history: int = 200,
+        job_id_arg: str = "backtest_process_uuid",
+        name: str = "backtest",
+        job_type: type[Job] = BacktestJob,
+    ) -> None:
+        self._runner = runner
+        self._name = name
+        self._job_type = job_type
+        self._job_id_arg = job_id_arg
+        self._worker_count = workers
+        self._queue_size = queue_size
+        self._history = history
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._queue: asyncio.PriorityQueue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_env(cls, runner: Runner) -> JobRegistry:
+        return cls(
+            runner,
+            workers=int(os.getenv("BACKTEST_JOB_WORKERS", "2")),
+            queue_size=int(os.getenv("BACKTEST_JOB_QUEUE_SIZE", "50")),
+            history=int(os.getenv("BACKTEST_JOB_HISTORY", "200")),
+        )
+
+    def _start(self) -> None:
+        # Started on first use so the queue and workers belong to the serving event loop
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue(maxsize=self._queue_size)
+        self._workers = [task for task in self._workers if not task.done()]
+        while len(self._workers) < self._worker_count:
+            self._workers.append(asyncio.create_task(self._work()))
+
+    def submit(self, request: dict[str, Any], job_id: str | None = None, priority: int = 0) -> Job:
+        """
+        Queue a job. ``request`` holds the runner's keyword arguments
+        (get_backtest_result's for backtests).
+
+        Re-submitting the id of an unfinished job returns that job. Raises a 503
+        HTTPException when the queue is full.
+        """
+        self._start()
+        if job_id is not None:
+            existing = self._jobs.get(job_id)
+            if existing is not None and not existing.finished:
+                return existing
+
+        job = self._job_type(id=job_id or str(uuid.uuid4()), request=request, priority=priority)
+        try:
+            self._queue.put_nowait((-priority, next(self._seq), job))
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=503, detail=f"Too many {self._name} jobs queued; try again later"
+            ) from None
+        self._jobs[job.id] = job
+        self._jobs.move_to_end(job.id)
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def counts(self) -> dict[str, int]:
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    async def watch(self, job_id: str, keepalive: float = 15.0) -> AsyncIterator[dict | None]:
+        """
+        Yield the job's snapshot now and after every update until it finishes.
+        Yields None when nothing changed for ``keepalive`` seconds.
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        while True:
+            changed = job._changed
+            yield job.snapshot()
+            if job.finished:
+                return
+            while True:
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=keepalive)
+                    break
+                except TimeoutError:
+                    yield None
+
+    def _update(self, job: Job, **values) -> None:
+        for name, value in values.items():
+            setattr(job, name, value)
+        changed, job._changed = job._changed, asyncio.Event()
+        changed.set()
+
+    def _progress(self, job: Job) -> Callable[..., None]:
+        def on_progress(stage: str, progress: float, **details) -> None:
+            self._update(job, stage=stage, progress=progress, **details)
+
+        return on_progress
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(0, len(finished) - self._history)]:
+            del self._jobs[job_id]
+
+    async def _work(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        self._update(job, status=RUNNING, started_at=datetime.now(UTC))
+        try:
+            await self._runner(
+                **job.request,
+                **{self._job_id_arg: job.id},
+                on_progress=self._progress(job),
+            )
+        except asyncio.CancelledError:
+            self._update(job, status=FAILED, error="Cancelled", finished_at=datetime.now(UTC))
+            raise
+        except Exception as e:
+            logging.error("%s job %s failed: %s", self._name.capitalize(), job.id, e)
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            self._update(job, status=FAILED, error=str(error), finished_at=datetime.now(UTC))
+        else:
+            self._update(job, status=DONE, progress=1.0, finished_at=datetime.now(UTC))
+        self._prune()
+
+
+_registry: JobRegistry | None = None
+
+
+def get_registry() -> JobRegistry:
+    global _registry
+    if _registry is None:
+        from app.signals.service import get_backtest_result
+
+        _registry = JobRegistry.from_env(get_backtest_result)
+    return _registry
@@ -1,19 +1,34 @@
-import uuid
+import json
 from typing import Annotated
 
-from fastapi import APIRouter, BackgroundTasks, Depends
-from starlette.status import HTTP_200_OK
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.status import HTTP_200_OK, HTTP_304_NOT_MODIFIED
 
 from app.auth.basic_auth import get_current_username
-from app.signals import service
+from app.signals import backtests_service, jobs, service
 from app.signals.dto import (
+    BacktestDetailResponseDTO,
+    BacktestHtmlRequestDTO,
+    BacktestHtmlResponseDTO,
+    BacktestJobRequestDTO,
+    BacktestJobResponseDTO,
+    BacktestListRequestDTO,
+    BacktestListResponseDTO,
     BacktestProcessResponseDTO,
     BacktestReplayRequestDTO,
     BacktestReplayResponseDTO,
     BacktestResponseDTO,
+    OptimizationHeatmapRequestDTO,
+    OptimizationHeatmapResponseDTO,
     SignalRequestDTO,
     SignalResponseDTO,
     StrategyListResponseDTO,
+    TradeActionListRequestDTO,
+    TradeActionListResponseDTO,
+    WalkForwardRequestDTO,
+    WalkForwardResponseDTO,
 )
 from app.signals.hmm_service import get_hmm_regime_data
 from app.signals.hmm_dto import HMMRequestDTO, HMMResponseDTO
@@ -46,25 +61,79 @@ async def get_signals(
 @router.get("/backtest", status_code=HTTP_200_OK, response_model=str)
 async def backtest(
     username: Annotated[str, Depends(get_current_username)],
-    background_tasks: BackgroundTasks,
-    params: SignalRequestDTO = Depends(),
+    params: BacktestJobRequestDTO = Depends(),
 ) -> BacktestProcessResponseDTO:
-    backtest_process_uuid = uuid.uuid4()
+    """
+    Queue a backtest and return its job id.
 
-    # Schedule the async work as a FastAPI background task
-    background_tasks.add_task(
-        service.get_backtest_result,
-        ticker=params.ticker,
-        interval=params.interval,
-        period=params.period,
-        strategy=params.strategy,
-        parameters=params.parameters,
-        start=params.start,
-        end=params.end,
-        strategy_id=params.strategy_id,
-        backtest_process_uuid=params.backtest_process_uuid,
+    The id is also stored as the backtest's ref_id. Poll
+    /signals/backtest/jobs/{job_id} (or subscribe to its /events stream) for
+    the status and, once saved, the backtest_id. Passing backtest_process_uuid
+    uses it as the job id. Returns 503 when the queue is full.
+    """
+    job = jobs.get_registry().submit(
+        {
+            "ticker": params.ticker,
+            "interval": params.interval,
+            "period": params.period,
+            "strategy": params.strategy,
+            "parameters": params.parameters,
+            "start": params.start,
+            "end": params.end,
+            "strategy_id": params.strategy_id,
+        },
+        job_id=params.backtest_process_uuid,
+        priority=params.priority,
+    )
+    return job.id
+
+
+def _get_job(job_id: str):
+    job = jobs.get_registry().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Backtest job {job_id} not found")
+    return job
+
+
+@router.get(
+    "/backtest/jobs/{job_id}", status_code=HTTP_200_OK, response_model=BacktestJobResponseDTO
+)
+async def get_backtest_job(
+    job_id: str,
+    username: Annotated[str, Depends(get_current_username)],
+) -> BacktestJobResponseDTO:
+    """
+    Get the status of a queued backtest: queued, running, done or failed,
+    with its progress stage, timings, error and (once saved) backtest_id.
+    """
+    return {
+        "status": HTTP_200_OK,
+        "message": "Backtest job",
+        "data": _get_job(job_id).snapshot(),
+    }
+
+
+@router.get("/backtest/jobs/{job_id}/events", status_code=HTTP_200_OK, response_class=StreamingResponse)
+async def stream_backtest_job(
+    job_id: str,
+    username: Annotated[str, Depends(get_current_username)],
+) -> StreamingResponse:
+    """
+    Server-sent events for a backtest job: a `status` event with the job on
+    every change, ending after it is done or failed.
+    """
+    _get_job(job_id)
+
+    async def events():
+        async for snapshot in jobs.get_registry().watch(job_id):
+            if snapshot is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: status\ndata: {json.dumps(jsonable_encoder(snapshot))}\n\n"
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"}
     )
-    return str(backtest_process_uuid)
 
 
 @router.get("/backtest/sync", status_code=HTTP_200_OK, response_model=BacktestResponseDTO)
@@ -92,7 +161,10 @@ async def replay_backtest_endpoint(
     Replay a backtest from stored TradeAction records.
 
     Fetches fresh historical price data from yfinance and applies the stored trades
-    to calculate backtest results. No caching - calculates on the fly.
+    to calculate backtest results. Results are kept in an in-process LRU cache
+    (REPLAY_CACHE_SIZE entries) keyed by backtest ID, the hash of the trade
+    schedule and the last price bar, so a replay is only recomputed when a new
+    bar or trade action arrives.
 
     Args:
         backtest_id: The ID of the backtest to replay
@@ -105,6 +177,199 @@ async def replay_backtest_endpoint(
     )
 
 
+@router.get("/backtest/html", status_code=HTTP_200_OK, response_model=BacktestHtmlResponseDTO)
+async def get_backtest_html(
+    username: Annotated[str, Depends(get_current_username)],
+    params: BacktestHtmlRequestDTO = Depends(),
+) -> BacktestHtmlResponseDTO:
+    """
+    Get the HTML report of a backtest.
+
+    Reports are rendered lazily: runs that skipped plotting (e.g. the nightly
+    strategy job) only store compact plot data, and the report is rendered and
+    cached the first time it is requested.
+
+    Args:
+        backtest_id: The ID of the backtest
+
+    Returns:
+        The report HTML, zlib-compressed + base64-encoded, and its content hash
+    """
+    return await service.get_backtest_html(
+        backtest_id=params.backtest_id,
+    )
+
+
+@router.get(
+    "/backtest/heatmap", status_code=HTTP_200_OK, response_model=OptimizationHeatmapResponseDTO
+)
+async def get_optimization_heatmap(
+    username: Annotated[str, Depends(get_current_username)],
+    params: OptimizationHeatmapRequestDTO = Depends(),
+) -> OptimizationHeatmapResponseDTO:
+    """
+    Get the stored optimisation heatmap of a backtest for a parameter sensitivity view.
+
+    Each point is one evaluated parameter combination with its objective value and
+    trade count. Served from the database — no backtest is re-run.
+
+    Args:
+        backtest_id: The ID of the backtest
+
+    Returns:
+        The heatmap points and the objective they were optimised for
+    """
+    return await service.get_optimization_heatmap(
+        backtest_id=params.backtest_id,
+    )
+
+
+@router.get(
+    "/backtest/walk-forward", status_code=HTTP_200_OK, response_model=WalkForwardResponseDTO
+)
+async def walk_forward_backtest(
+    username: Annotated[str, Depends(get_current_username)],
+    params: WalkForwardRequestDTO = Depends(),
+) -> WalkForwardResponseDTO:
+    """
+    Run a walk-forward backtest and return out-of-sample results.
+
+    The period is split into rolling train/test folds. Each fold optimises the
+    strategy on its train window and evaluates the chosen parameters on the
+    unseen test window that follows; folds run in parallel. Results are not
+    persisted.
+
+    Args:
+        n_folds: Number of folds (default 4)
+        train_ratio: Train window length relative to the test window (default 3.0)
+
+    Returns:
+        Per-fold results and aggregated out-of-sample stats
+    """
+    return await service.get_walk_forward_result(
+        ticker=params.ticker,
+        interval=params.interval,
+        period=params.period,
+        strategy=params.strategy,
+        parameters=params.parameters,
+        start=params.start,
+        end=params.end,
+        n_folds=params.n_folds,
+        train_ratio=params.train_ratio,
+    )
+
+
+def _conditional(result: tuple[dict, str], if_none_match: str | None, response: Response):
+    """Return the cached body with its ETag, or an empty 304 if the client already has it."""
+    body, etag = result
+    if backtests_service.etag_matches(if_none_match, etag):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return body
+
+
+@router.get("/backtests", status_code=HTTP_200_OK, response_model=BacktestListResponseDTO)
+async def list_backtests(
+    username: Annotated[str, Depends(get_current_username)],
+    response: Response,
+    params: BacktestListRequestDTO = Depends(),
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> BacktestListResponseDTO:
+    """
+    List stored backtests, most recently updated first.
+
+    Returns summary columns only (no report HTML). Pass the returned
+    next_cursor as `cursor` to fetch the next page. Responses carry an ETag;
+    send it back in If-None-Match to get a 304 when nothing changed.
+
+    Args:
+        ticker, strategy, period, interval: Optional exact-match filters
+        limit: Page size (default 50, max 200)
+        cursor: next_cursor of the previous page
+
+    Returns:
+        A page of backtest summaries and the cursor of the next page
+    """
+    result = await backtests_service.list_backtests(
+        limit=params.limit,
+        cursor=params.cursor,
+        ticker=params.ticker,
+        strategy=params.strategy,
+        period=params.period,
+        interval=params.interval,
+    )
+    return _conditional(result, if_none_match, response)
+
+
+@router.get(
+    "/backtests/{backtest_id}", status_code=HTTP_200_OK, response_model=BacktestDetailResponseDTO
+)
+async def get_backtest(
+    backtest_id: int,
+    username: Annotated[str, Depends(get_current_username)],
+    response: Response,
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> BacktestDetailResponseDTO:
+    """
+    Get all stored stats of a backtest (without the report; see /signals/backtest/html).
+
+    Supports If-None-Match like the list endpoint.
+    """
+    result = await backtests_service.get_backtest(backtest_id)
+    return _conditional(result, if_none_match, response)
+
+
+@router.get(
+    "/backtests/{backtest_id}/trade-actions",
+    status_code=HTTP_200_OK,
+    response_model=TradeActionListResponseDTO,
+)
+async def list_trade_actions(
+    backtest_id: int,
+    username: Annotated[str, Depends(get_current_username)],
+    response: Response,
+    params: TradeActionListRequestDTO = Depends(),
+    if_none_match: Annotated[str | None, Header()] = None,
+) -> TradeActionListResponseDTO:
+    """
+    List the stored trade actions of a backtest, newest first.
+
+    Paged with `cursor` / next_cursor and cached like the list endpoint.
+
+    Args:
+        limit: Page size (default 100, max 500)
+        cursor: next_cursor of the previous page
+    """
+    result = await backtests_service.list_trade_actions(
+        backtest_id, limit=params.limit, cursor=params.cursor
+    )
+    return _conditional(result, if_none_match, response)
+
+
+@router.get(
+    "/backtests/{backtest_id}/trade-actions/export",
+    status_code=HTTP_200_OK,
+    response_class=StreamingResponse,
+)
+async def export_trade_actions(
+    backtest_id: int,
+    username: Annotated[str, Depends(get_current_username)],
+) -> StreamingResponse:
+    """
+    Download all trade actions of a backtest as CSV, oldest first.
+
+    Streamed in batches, so arbitrarily long trade histories are never held in memory.
+    """
+    chunks = await backtests_service.export_trade_actions_csv(backtest_id)
+    return StreamingResponse(
+        chunks,
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f'attachment; filename="backtest-{backtest_id}-trade-actions.csv"'
+        },
+    )
+
+
 @router.post("/strategy-notification-job", status_code=HTTP_200_OK)
 async def strategy_notification(
     username: Annotated[str, Depends(get_current_username)],
@@ -1,37 +1,61 @@
 import asyncio
-import base64
+import hashlib
 import json
 import logging
 import math
+import multiprocessing as mp
 import os
 import warnings
-import zlib
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import UTC, datetime
 
+from cachetools import LRUCache
 from fastapi import HTTPException
 from starlette.status import HTTP_200_OK
 
-# Suppress bokeh np.datetime64 timezone warning
-warnings.filterwarnings(
-    "ignore",
-    message="no explicit representation of timezones available for np.datetime64",
-    module="bokeh",
-)
-
 from app.db.postgres import AsyncSessionLocal
 from app.db.repository import (
+    BacktestArtifactRepository,
+    BacktestCheckpointRepository,
+    BacktestReportRepository,
     BacktestStatRepository,
+    OptimizationHeatmapRepository,
     TradeActionRepository,
     UniqueStrategyRepository,
 )
+from app.lib.utils import blob_codec
 from app.notification.service import send_trade_action_notification
+from app.signals.backtests_service import invalidate_backtest_reads
 from app.signals.strategies.calculate import calculate_signals, calculate_signals_async
-from app.signals.strategies.perform_backtest import perform_backtest
+from app.signals.strategies.continuation import build_checkpoint, continue_backtest, has_new_bars
+from app.signals.strategies.optimization import data_fingerprint, heatmap_session
+from app.signals.strategies.perform_backtest import perform_backtest, strategy_version
+from app.signals.strategies.replay.trade_schedule import schedule_from_rows, schedule_hash
+from app.signals.strategies.walk_forward import walk_forward_backtest
+from app.signals.utils.backtest_artifact import (
+    backtest_html,
+    pack_backtest_artifact,
+    render_backtest_html,
+)
 from app.signals.utils.signals import get_all_signals, get_latest_signal
 from app.signals.utils.yfinance import getYFinanceData, getYFinanceDataAsync
 
+# Suppress bokeh np.datetime64 timezone warning
+warnings.filterwarnings(
+    "ignore",
+    message="no explicit representation of timezones available for np.datetime64",
+    module="bokeh",
+)
+
 executor = ThreadPoolExecutor(max_workers=5)
+_render_pool: ProcessPoolExecutor | None = None
+# Replay responses by (backtest_id, trade schedule hash, last bar timestamp)
+_replay_cache: LRUCache = LRUCache(maxsize=int(os.getenv("REPLAY_CACHE_SIZE", "32")))
+# Nightly continuation runs allowed before a strategy is fully re-simulated again
+FULL_REBUILD_EVERY = int(os.getenv("BACKTEST_FULL_REBUILD_EVERY", "7"))
+# Parameters of the nightly strategy runs, both continued and full
+NIGHTLY_PARAMETERS = {"max_longs": 2, "max_shorts": 2}
 
 
 def safe_float(value, default=0.0, decimals=3):
@@ -86,6 +110,27 @@ async def get_signals(ticker, interval, period, strategy, parameters, start=None
         raise HTTPException(status_code=400, detail=f"Failed to get signals. Error: {e}")
 
 
+def _calculate_backtest_signals(
+    ticker, interval, period, strategy, parameters_dict, start=None, end=None
+):
+    """Sync: fetch price data and compute the strategy's signals frame."""
+    df = getYFinanceData(ticker, interval, period, start, end)
+    df1d = getYFinanceData(ticker, "1d", period, start, end) if strategy == "macd_1" else None
+    return calculate_signals(df, df1d, strategy, parameters_dict)
+
+
+def _base_backtest_parameters(ticker, parameters_dict):
+    """Default strategy parameters passed to perform_backtest before optimisation."""
+    return {
+        "best": False,
+        "size": 0.01 if ticker == "BTC-USD" else 0.03,
+        "slcoef": 2.2,
+        "tpslRatio": 2.0,
+        "max_longs": parameters_dict.get("max_longs", 1),
+        "max_shorts": parameters_dict.get("max_shorts", 1),
+    }
+
+
 async def get_backtest_result(
     ticker,
     interval,
@@ -99,6 +144,8 @@ async def get_backtest_result(
     notifications_on=False,
     skip_optimization=False,
     best_params=None,
+    render_html=True,
+    on_progress=None,
 ):
     """
     Get the backtest result for a given ticker, interval, period, strategy, and parameters.
@@ -106,7 +153,16 @@ async def get_backtest_result(
     The heavy CPU work (data fetch + backtest computation) runs in a thread pool
     via asyncio.to_thread() so it doesn't block the event loop.
     DB writes are done directly in the async portion.
+
+    The plot data is always stored as a compact artifact. With render_html=False
+    Bokeh is skipped entirely and the report is rendered on first request
+    (see get_backtest_html).
+
+    on_progress(stage, progress, **details), if given, is called as the run
+    moves through its stages (see app.signals.jobs); the "saved" stage passes
+    the backtest_id of the stored stats row.
     """
+    report = on_progress or (lambda stage, progress, **details: None)
     print(f"\n--- BACKTEST BEGINS --\n--- Start backtest for {ticker} ---\n")
     print(f"Interval: {interval}")
     print(f"Period: {period}")
@@ -125,35 +181,52 @@ async def get_backtest_result(
     # -----------------------------------------------------------------
     # Run CPU-bound work in a thread (doesn't block the event loop)
     # -----------------------------------------------------------------
-    def _run_backtest():
-        """Sync work: fetch data + compute backtest. Returns (bt, stats, trade_actions, strategy_parameters)."""
-        df = getYFinanceData(ticker, interval, period, start, end)
-        df1d = getYFinanceData(ticker, "1d", period, start, end) if strategy == "macd_1" else None
-
-        signals_df = calculate_signals(df, df1d, strategy, parameters_dict)
-
-        size = 0.01 if ticker == "BTC-USD" else 0.03
-
-        return perform_backtest(
-            signals_df,
-            strategy,
-            {
-                "best": False,
-                "size": size,
-                "slcoef": 2.2,
-                "tpslRatio": 2.0,
-                "max_longs": parameters_dict.get("max_longs", 1),
-                "max_shorts": parameters_dict.get("max_shorts", 1),
-            },
-            skip_optimization,
-            best_params,
+    def _prepare_signals():
+        """Sync work: fetch data + compute signals. Returns (signals_df, data fingerprint)."""
+        signals_df = _calculate_backtest_signals(
+            ticker, interval, period, strategy, parameters_dict, start, end
         )
+        fingerprint = data_fingerprint(signals_df) if signals_df is not None else None
+        return signals_df, fingerprint
+
+    def _run_backtest(signals_df, cached_points):
+        """
+        Sync work: compute backtest.
+        Returns ((bt, stats, trade_actions, strategy_parameters), heatmap session).
+        """
+        with heatmap_session(cached_points) as session:
+            result = perform_backtest(
+                signals_df,
+                strategy,
+                _base_backtest_parameters(ticker, parameters_dict),
+                skip_optimization,
+                best_params,
+            )
+        return result, session
+
+    heatmap_key = {
+        "ticker": ticker,
+        "strategy": strategy,
+        "period": period,
+        "interval": interval,
+        "strategy_version": strategy_version(strategy),
+    }
 
     try:
-        bt, stats, trade_actions, strategy_parameters = await asyncio.wait_for(
-            asyncio.to_thread(_run_backtest),
-            timeout=600.0,  # 10-minute hard limit; optimization can be slow but not infinite
-        )
+        # 10-minute hard limit for data fetch + backtest; optimization can be slow but not infinite
+        async with asyncio.timeout(600.0):
+            report("fetching_data", 0.05)
+            signals_df, fingerprint = await asyncio.to_thread(_prepare_signals)
+            heatmap_key["data_fingerprint"] = fingerprint
+
+            cached_points = {}
+            if not skip_optimization and fingerprint and heatmap_key["strategy_version"]:
+                cached_points = await _load_cached_heatmap(heatmap_key)
+
+            report("backtesting", 0.2)
+            (bt, stats, trade_actions, strategy_parameters), heatmap_run = await asyncio.to_thread(
+                _run_backtest, signals_df, cached_points
+            )
         if bt is None or stats is None:
             raise HTTPException(
                 status_code=400,
@@ -173,39 +246,46 @@ async def get_backtest_result(
             raise e
         raise HTTPException(status_code=400, detail=f"Failed to run backtest. Error: {e}")
 
-    # Generate the HTML plot (also sync/CPU-bound)
-    def _render_html():
+    optimization_heatmap = None
+    if heatmap_run.points and fingerprint and heatmap_key["strategy_version"]:
+        print(
+            f"Optimization heatmap: {heatmap_run.evaluated} points evaluated, "
+            f"{heatmap_run.reused} reused from cache"
+        )
+        optimization_heatmap = {
+            **heatmap_key,
+            "objective": heatmap_run.objective,
+            "points": heatmap_run.points,
+        }
+
+    report("rendering", 0.7)
+    try:
+        artifact = await asyncio.to_thread(pack_backtest_artifact, bt, stats)
+    except Exception as e:
+        logging.error("Failed to pack backtest artifact: %s", e)
+        artifact = None
+
+    # Generate the HTML plot (CPU-bound; rendered in the plot worker pool)
+    async def _render_html():
         try:
-            # Try plotting without superimposition to avoid upsampling issues
-            bt.plot(open_browser=False, filename="backtest.html", superimpose=False)
-            with open("backtest.html") as f:
-                content = f.read()
-            os.remove("backtest.html")
-            return content
+            if artifact is not None:
+                return await _render_report(artifact)
+            return await asyncio.to_thread(backtest_html, bt)
         except Exception as e:
-            logging.warning(f"Plot generation failed: {e}. Falling back to basic plot.")
-            try:
-                # Fallback: try basic plot
-                bt.plot(open_browser=False, filename="backtest.html")
-                with open("backtest.html") as f:
-                    content = f.read()
-                os.remove("backtest.html")
-                return content
-            except Exception as e2:
-                logging.error(f"Basic plot also failed: {e2}. Generating minimal HTML.")
-                # Final fallback: return minimal HTML with just stats
-                return f"""
-                <html>
-                <head><title>Backtest Results</title></head>
-                <body>
-                    <h1>Backtest Results</h1>
-                    <pre>{stats}</pre>
-                    <p>Plot generation failed: {str(e2)}</p>
-                </body>
-                </html>
-                """
-
-    html_content = await asyncio.to_thread(_render_html)
+            logging.error(f"Plot generation failed: {e}. Generating minimal HTML.")
+            # Fallback: return minimal HTML with just stats
+            return f"""
+            <html>
+            <head><title>Backtest Results</title></head>
+            <body>
+                <h1>Backtest Results</h1>
+                <pre>{stats}</pre>
+                <p>Plot generation failed: {str(e)}</p>
+            </body>
+            </html>
+            """
+
+    html_content = await _render_html() if render_html else None
     logging.info("get_backtest_result finished")
 
     print("Original trade actions:", len(trade_actions))
@@ -216,6 +296,7 @@ async def get_backtest_result(
     # -----------------------------------------------------------------
     # Persist results to DB (async — runs on the event loop directly)
     # -----------------------------------------------------------------
+    report("saving", 0.85)
     result = await _persist_backtest_result(
         ticker=ticker,
         interval=interval,
@@ -228,11 +309,30 @@ async def get_backtest_result(
         strategy_parameters=strategy_parameters,
         trade_actions=trade_actions,
         notifications_on=notifications_on,
+        optimization_heatmap=optimization_heatmap,
+        artifact=artifact,
     )
 
-    notifications_on = result["notifications_on"]
-    saved_trade_actions = result["trade_actions"]
+    report("saved", 0.95, backtest_id=result["backtest_id"])
+    if result["backtest_id"] is not None:
+        await _save_checkpoint(
+            result["backtest_id"], strategy, signals_df, stats, trade_actions, strategy_parameters
+        )
+
+    _notify_trade_actions(
+        strategy, ticker, interval, result["notifications_on"], result["trade_actions"]
+    )
 
+    print("\n--- COMPLETE ---\n")
+
+    return {
+        "status": HTTP_200_OK,
+        "message": "Backtest results",
+        "data": backtest_process_uuid,
+    }
+
+
+def _notify_trade_actions(strategy, ticker, interval, notifications_on, saved_trade_actions):
     print("\n--- Sending trade action notifications ---\n")
     print(
         f"Notifications flag: {notifications_on}, Trade actions count: {len(saved_trade_actions)}"
@@ -259,12 +359,245 @@ async def get_backtest_result(
         if not saved_trade_actions:
             print("No trade actions to notify about.")
 
-    print("\n--- COMPLETE ---\n")
+
+async def _save_checkpoint(
+    backtest_id, strategy, signals_df, stats, trade_actions, strategy_parameters
+):
+    """
+    Record where the nightly job can continue this backtest from;
+    see _continue_strategy_backtest.
+    """
+    try:
+        checkpoint = build_checkpoint(signals_df, stats, trade_actions, strategy_parameters)
+        if checkpoint is None:
+            return
+        now = datetime.now(UTC)
+        async with AsyncSessionLocal() as session:
+            await BacktestCheckpointRepository(session).upsert(
+                {
+                    **checkpoint,
+                    "backtest_id": backtest_id,
+                    "strategy_version": strategy_version(strategy),
+                    "runs_since_rebuild": 0,
+                    "rebuilt_at": now,
+                    "updated_at": now,
+                }
+            )
+    except Exception as e:
+        logging.error("Failed to save backtest checkpoint: %s", e)
+
+
+async def get_walk_forward_result(
+    ticker,
+    interval,
+    period,
+    strategy,
+    parameters,
+    start=None,
+    end=None,
+    n_folds=4,
+    train_ratio=3.0,
+):
+    """
+    Walk-forward backtest: optimise on rolling train windows and report the
+    stats of the following, unseen test windows.
+
+    Signals are computed once for the whole period and shared by every fold;
+    folds run concurrently in worker processes. Nothing is persisted.
+    """
+    print(f"\n--- WALK-FORWARD BACKTEST for {ticker} ({strategy}, {n_folds} folds) ---\n")
+
+    try:
+        parameters_dict = json.loads(parameters) if parameters is not None else {}
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse parameters. Error: {e}")
+
+    def _run():
+        signals_df = _calculate_backtest_signals(
+            ticker, interval, period, strategy, parameters_dict, start, end
+        )
+        return walk_forward_backtest(
+            signals_df,
+            strategy,
+            _base_backtest_parameters(ticker, parameters_dict),
+            n_folds=n_folds,
+            train_ratio=train_ratio,
+        )
+
+    try:
+        async with asyncio.timeout(600.0):
+            result = await asyncio.to_thread(_run)
+    except asyncio.TimeoutError:
+        logging.error(
+            "Walk-forward backtest timed out after 600s. "
+            "ticker=%s strategy=%s interval=%s period=%s",
+            ticker, strategy, interval, period,
+        )
+        raise HTTPException(
+            status_code=408,
+            detail=(
+                "Walk-forward backtest timed out after 10 minutes. "
+                "Try fewer folds or a shorter period."
+            ),
+        )
+    except Exception as e:
+        if isinstance(e, HTTPException):
+            raise e
+        raise HTTPException(
+            status_code=400, detail=f"Failed to run walk-forward backtest. Error: {e}"
+        )
+
+    for fold in result["folds"]:
+        fold.pop("trade_returns", None)
 
     return {
         "status": HTTP_200_OK,
-        "message": "Backtest results",
-        "data": backtest_process_uuid,
+        "message": "Walk-forward backtest results",
+        "data": {
+            "ticker": ticker,
+            "strategy": strategy,
+            "period": period,
+            "interval": interval,
+            "n_folds": n_folds,
+            "train_ratio": train_ratio,
+            **result,
+        },
+    }
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """
+    Worker processes for Bokeh rendering. Bokeh document state is per process,
+    so renders only run in parallel across processes, not threads.
+    """
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=int(os.getenv("PLOT_RENDER_WORKERS", "2")),
+            mp_context=mp.get_context("fork"),
+        )
+    return _render_pool
+
+
+def shutdown_render_pool() -> None:
+    """Stop the plot worker processes; called on app shutdown and when the pool breaks."""
+    global _render_pool
+    pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _render_report(artifact: bytes) -> str:
+    """Render report HTML from a packed artifact in the plot worker pool."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_render_pool(), render_backtest_html, artifact)
+    except BrokenProcessPool as e:
+        logging.warning("Plot worker pool broke (%s); rendering in-process.", e)
+        shutdown_render_pool()
+        return await asyncio.to_thread(render_backtest_html, artifact)
+
+
+def _deflate_html(html_content: str) -> str:
+    """
+    Compress report HTML to the wire format (zlib + base64), inflated by the
+    frontend with pako.
+    """
+    _, compressed = blob_codec.encode(html_content, "zlib")
+    return blob_codec.to_base64(compressed)
+
+
+def _report_row(backtest_id: int, html_content: str) -> dict:
+    """
+    backtest_reports row for a report in the configured codec and storage format.
+
+    BACKTEST_HTML_CODEC picks the codec (default zlib) and BACKTEST_HTML_STORAGE
+    stores either base64 text in `html` ("text", default) or raw bytes in
+    `html_bytes` ("bytes").
+    """
+    codec, data = blob_codec.encode(html_content, os.getenv("BACKTEST_HTML_CODEC"))
+    row = {
+        "backtest_id": backtest_id,
+        "content_hash": hashlib.sha256(html_content.encode("utf-8")).hexdigest(),
+        "html_codec": codec,
+        "html": None,
+        "html_bytes": None,
+        "updated_at": datetime.now(UTC),
+    }
+    if os.getenv("BACKTEST_HTML_STORAGE", "text") == "bytes":
+        row["html_bytes"] = data
+    else:
+        row["html"] = blob_codec.to_base64(data)
+    return row
+
+
+def _wire_html(html, html_bytes, html_codec) -> str | None:
+    """Convert a stored report to the zlib + base64 wire format, re-encoding only if needed."""
+    if html is not None and html_codec in (None, blob_codec.LEGACY_CODEC):
+        return html
+    if html_bytes is not None:
+        return _deflate_html(blob_codec.decode(html_bytes, html_codec))
+    if html is not None:
+        return _deflate_html(blob_codec.decode(blob_codec.from_base64(html), html_codec))
+    return None
+
+
+async def get_backtest_html(backtest_id: int):
+    """
+    Return the report HTML of a backtest, rendering it on first request.
+
+    The rendered report is cached in backtest_reports; it is dropped whenever a
+    new run is persisted without rendering, so stale plots are never served.
+    Stored reports may use any codec; the response is always zlib + base64.
+    """
+    async with AsyncSessionLocal() as session:
+        if not await BacktestStatRepository(session).exists(backtest_id):
+            raise HTTPException(status_code=404, detail=f"Backtest with ID {backtest_id} not found")
+
+        report_repo = BacktestReportRepository(session)
+        stored = await report_repo.get(backtest_id)
+        html = None
+        content_hash = None
+        if stored is not None:
+            try:
+                html = _wire_html(stored.html, stored.html_bytes, stored.html_codec)
+                content_hash = stored.content_hash
+            except Exception as e:
+                # Undecodable (e.g. codec unavailable on this instance) — render again
+                logging.warning(
+                    "Failed to decode stored report for backtest %s: %s", backtest_id, e
+                )
+
+        if html is None:
+            payload = await BacktestArtifactRepository(session).get_payload(backtest_id)
+            if payload is None:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"No report or plot data stored for backtest ID {backtest_id}",
+                )
+
+            try:
+                html_content = await _render_report(payload)
+            except Exception as e:
+                logging.error(
+                    "Failed to render backtest %s report: %s", backtest_id, e, exc_info=True
+                )
+                raise HTTPException(
+                    status_code=500, detail=f"Failed to render backtest report. Error: {e}"
+                )
+
+            html = _deflate_html(html_content)
+            report = _report_row(backtest_id, html_content)
+            content_hash = report["content_hash"]
+            try:
+                await report_repo.upsert(report)
+            except Exception as e:
+                logging.error("Failed to cache rendered report for backtest %s: %s", backtest_id, e)
+
+    return {
+        "status": HTTP_200_OK,
+        "message": "Backtest report",
+        "data": {"backtest_id": backtest_id, "content_hash": content_hash, "html": html},
     }
 
 
@@ -277,15 +610,25 @@ async def _persist_backtest_result(
     strategy_id,
     backtest_process_uuid,
     stats,
-    html_content: str,
+    html_content: str | None,
     strategy_parameters: dict,
     trade_actions: list[dict],
     notifications_on: bool,
+    optimization_heatmap: dict | None = None,
+    artifact: bytes | None = None,
 ) -> dict:
-    """Async DB writes for a completed backtest."""
+    """
+    Async DB writes for a completed backtest.
+
+    html_content=None drops the stored report so it is re-rendered from the
+    new artifact on the next request.
+    """
     async with AsyncSessionLocal() as session:
         backtest_repo = BacktestStatRepository(session)
         trade_repo = TradeActionRepository(session)
+        heatmap_repo = OptimizationHeatmapRepository(session)
+        artifact_repo = BacktestArtifactRepository(session)
+        report_repo = BacktestReportRepository(session)
 
         # Build backtest_stats payload
         backtest_stats_data: dict = {
@@ -315,7 +658,6 @@ async def _persist_backtest_result(
             "max_trade_duration": str(stats["Max. Trade Duration"]),
             "average_trade_duration": str(stats["Avg. Trade Duration"]),
             "profit_factor": round(float(stats["Profit Factor"]), 3),
-            "html": html_content,
             "strategy": strategy,
             "period": period,
             "interval": interval,
@@ -339,14 +681,18 @@ async def _persist_backtest_result(
             ),
         }
 
-        # Deflate HTML
-        try:
-            compressed = zlib.compress(html_content.encode("utf-8"), level=9)
-            backtest_stats_data["html"] = base64.b64encode(compressed).decode("utf-8")
-        except Exception as e:
-            logging.error("Failed to deflate HTML: %s", e)
+        # Metrics-based notifications flag. It is only stored when the row has no
+        # flag yet (COALESCE in the upsert), so a flag set earlier is never overwritten.
+        # NOTE: this does NOT override the `notifications_on` parameter that was
+        # passed into this function — that value (from strategy.notifications_on)
+        # is the authoritative source for whether to actually send a notification.
+        good_sharpe = backtest_stats_data["sharpe_ratio"] > 0
+        good_return = backtest_stats_data["return_percentage"] > 0
+        good_winrate = backtest_stats_data["win_rate"] > 60
+        computed_notifications_on = (good_sharpe and good_return) or good_winrate
+        backtest_stats_data["notifications_on"] = computed_notifications_on
 
-        # Upsert backtest_stats first to get the existing record (if any)
+        # Single INSERT ... ON CONFLICT DO UPDATE ... RETURNING id, notifications_on
         updated_stat = None
         try:
             logging.info(
@@ -359,99 +705,154 @@ async def _persist_backtest_result(
         except Exception as e:
             logging.error("Failed to save backtest stats: %s", e)
 
-        # Compute the metrics-based flag and persist it to the DB record.
-        # NOTE: this does NOT override the `notifications_on` parameter that was
-        # passed into this function — that value (from strategy.notifications_on)
-        # is the authoritative source for whether to actually send a notification.
-        # Only set notifications_on if the existing value is None (empty/initial).
-        good_sharpe = backtest_stats_data["sharpe_ratio"] > 0
-        good_return = backtest_stats_data["return_percentage"] > 0
-        good_winrate = backtest_stats_data["win_rate"] > 60
-        computed_notifications_on = (good_sharpe and good_return) or good_winrate
-
-        # Check if there's an existing record with a notifications_on value
-        existing_notifications_on = None
-        if updated_stat and updated_stat.notifications_on is not None:
-            existing_notifications_on = updated_stat.notifications_on
-
-        # Only set notifications_on if it was previously None (empty/initial)
-        if existing_notifications_on is None:
-            backtest_stats_data["notifications_on"] = computed_notifications_on
-            # Update the record again with the computed value
-            try:
-                updated_stat = await backtest_repo.upsert(backtest_stats_data)
-            except Exception as e:
-                logging.error("Failed to update notifications_on: %s", e)
-        else:
-            backtest_stats_data["notifications_on"] = existing_notifications_on
-
+        stored_notifications_on = updated_stat.notifications_on if updated_stat else None
         print(
             f"Notifications — strategy flag: {notifications_on}, "
             f"computed flag: {computed_notifications_on}, "
-            f"existing flag: {existing_notifications_on}, "
-            f"final flag: {backtest_stats_data['notifications_on']} "
+            f"stored flag: {stored_notifications_on} "
             f"(sharpe>0={good_sharpe}, return>0={good_return}, winrate>60={good_winrate})"
         )
 
-        # Determine which trade actions are "new" by querying against the correct backtest_stat ID
+        # The report goes to backtest_reports; a run without one drops the stale report
         if updated_stat is not None:
-            latest_ta = await trade_repo.get_latest_for_strategy(updated_stat.id)
-
-            if latest_ta is not None:
-                # Strip tzinfo from both sides so naive/aware mismatches never raise TypeError.
-                # psycopg3 can return TIMESTAMP WITHOUT TIME ZONE as tz-aware in some configs.
-                cutoff_dt = latest_ta.datetime
-                if hasattr(cutoff_dt, "tzinfo") and cutoff_dt.tzinfo is not None:
-                    cutoff_dt = cutoff_dt.replace(tzinfo=None)
-
-                new_trade_actions = []
-                for ta in trade_actions:
-                    raw_dt = ta.get("datetime", "")
-                    try:
-                        ta_dt = datetime.strptime(raw_dt, "%Y-%m-%d %H:%M:%S.%f")
-                    except (ValueError, TypeError):
-                        try:
-                            ta_dt = datetime.strptime(raw_dt, "%Y-%m-%d %H:%M:%S")
-                        except (ValueError, TypeError):
-                            continue
-                    passed = ta_dt > cutoff_dt
-                    if passed:
-                        new_trade_actions.append(ta)
-                trade_actions = new_trade_actions
-            else:
-                trade_actions = trade_actions[-1:]
-
-            for ta in trade_actions:
-                ta["backtest_id"] = updated_stat.id
+            try:
+                if html_content is None:
+                    await report_repo.delete(updated_stat.id)
+                else:
+                    await report_repo.upsert(_report_row(updated_stat.id, html_content))
+            except Exception as e:
+                logging.error("Failed to save backtest report: %s", e)
 
-        else:
-            logging.error("updated_stat is empty — backtest_id not set on trade actions")
-            trade_actions = trade_actions[-1:]
+        if artifact is not None and updated_stat is not None:
+            try:
+                await artifact_repo.upsert(
+                    {
+                        "backtest_id": updated_stat.id,
+                        "payload": artifact,
+                        "updated_at": datetime.now(UTC),
+                    }
+                )
+            except Exception as e:
+                logging.error("Failed to save backtest artifact: %s", e)
+
+        # Persist the optimisation heatmap next to the stats row so later runs on the
+        # same data can reuse evaluated grid points.
+        if optimization_heatmap and updated_stat is not None:
+            try:
+                await heatmap_repo.upsert(
+                    {
+                        **optimization_heatmap,
+                        "backtest_id": updated_stat.id,
+                        "updated_at": datetime.now(UTC),
+                    }
+                )
+            except Exception as e:
+                logging.error("Failed to save optimization heatmap: %s", e)
 
-        # Insert trade actions
+        # Insert trade actions. The (backtest_id, datetime, trade_action) constraint
+        # skips the ones already stored, so only new actions come back.
         saved_trade_actions = []
-        try:
-            logging.info("Saving trade actions to DB. Ticker: %s", ticker)
-            if trade_actions:
-                saved_trade_actions = await trade_repo.insert_many(trade_actions)
-                print(f"Trade actions saved to DB. Count: {len(saved_trade_actions)}")
-            else:
-                print("No new trade actions to save (all filtered by deduplication).")
-        except Exception as e:
-            logging.error("Failed to save trade actions: %s", e)
+        if updated_stat is None:
+            logging.error("updated_stat is empty — trade actions not saved")
+        else:
+            try:
+                logging.info("Saving trade actions to DB. Ticker: %s", ticker)
+                latest_ta = await trade_repo.get_latest_for_strategy(updated_stat.id)
+                inserted = await trade_repo.insert_many(
+                    [
+                        {**ta, "backtest_id": updated_stat.id, "datetime": _naive(ta["datetime"])}
+                        for ta in trade_actions
+                    ]
+                )
+                print(f"Trade actions saved to DB. Count: {len(inserted)}")
+                saved_trade_actions = _actions_to_notify(
+                    inserted, latest_ta.datetime if latest_ta is not None else None
+                )
+            except Exception as e:
+                logging.error("Failed to save trade actions: %s", e)
+
+    invalidate_backtest_reads()
 
     return {
+        "backtest_id": updated_stat.id if updated_stat is not None else None,
         "notifications_on": notifications_on,
         "trade_actions": saved_trade_actions,
     }
 
 
+def _naive(dt: datetime | None) -> datetime | None:
+    """Wall-clock datetime without tzinfo, as stored in trade_actions.datetime (TIMESTAMP)."""
+    if dt is not None and dt.tzinfo is not None:
+        return dt.replace(tzinfo=None)
+    return dt
+
+
+def _actions_to_notify(inserted: list, previous_latest: datetime | None) -> list:
+    """
+    Newly stored trade actions that are worth a notification.
+
+    Actions that were back-filled into the history (older than the latest action
+    stored before this run) are not live signals; a strategy with no stored
+    actions yet only notifies its most recent one.
+    """
+    inserted = sorted(inserted, key=lambda ta: _naive(ta.datetime) or datetime.min)
+    if previous_latest is None:
+        return inserted[-1:]
+    cutoff = _naive(previous_latest)
+    return [ta for ta in inserted if ta.datetime is not None and _naive(ta.datetime) > cutoff]
+
+
+async def _load_cached_heatmap(key: dict) -> dict[str, list[dict]]:
+    """Fetch previously evaluated grid points; a cache miss or DB error just means a full run."""
+    try:
+        async with AsyncSessionLocal() as session:
+            return await OptimizationHeatmapRepository(session).get_cached_points(key)
+    except Exception as e:
+        logging.warning("Failed to load cached optimization heatmap: %s", e)
+        return {}
+
+
+async def get_optimization_heatmap(backtest_id: int):
+    """
+    Return the stored optimisation heatmap for a backtest (parameter sensitivity view).
+
+    Served straight from the optimization_heatmaps table — nothing is recomputed.
+    """
+    async with AsyncSessionLocal() as session:
+        heatmap = await OptimizationHeatmapRepository(session).get_latest_for_backtest(backtest_id)
+
+    if heatmap is None:
+        raise HTTPException(
+            status_code=404, detail=f"No optimization heatmap found for backtest ID {backtest_id}"
+        )
+
+    points = heatmap.points or []
+    return {
+        "status": HTTP_200_OK,
+        "message": "Optimization heatmap",
+        "data": {
+            "backtest_id": backtest_id,
+            "ticker": heatmap.ticker,
+            "strategy": heatmap.strategy,
+            "period": heatmap.period,
+            "interval": heatmap.interval,
+            "strategy_version": heatmap.strategy_version,
+            "data_fingerprint": heatmap.data_fingerprint,
+            "objective": heatmap.objective,
+            "parameters": list(points[0]["params"].keys()) if points else [],
+            "points": points,
+            "updated_at": heatmap.updated_at,
+        },
+    }
+
+
 async def replay_backtest(backtest_id: int):
     """
     Replay a backtest from stored TradeAction records.
 
     Fetches historical data fresh from yfinance and applies the stored trades.
-    No caching - calculates on the fly.
+    The result is cached per (backtest_id, trade schedule hash, last bar), so a
+    repeated view only re-runs the replay once new trades or bars arrive.
 
     The HTML chart is returned compressed (zlib + base64) to match the format
     stored in the DB, which reduces response payload size by ~60-70%.
@@ -479,32 +880,17 @@ async def replay_backtest(backtest_id: int):
             f"[REPLAY] Found backtest: {backtest_stat.ticker} {backtest_stat.strategy} {backtest_stat.interval}"
         )
 
-        # Get all trade actions
-        trade_actions = await trade_repo.get_all_for_backtest(backtest_id)
-        if not trade_actions:
+        # Get all trade actions as plain column tuples (no ORM objects)
+        schedule_rows = await trade_repo.get_schedule_rows(backtest_id)
+        if not schedule_rows:
             print(f"[REPLAY] No trade actions found for backtest ID {backtest_id}")
             raise HTTPException(
                 status_code=404, detail=f"No trade actions found for backtest ID {backtest_id}"
             )
 
-        print(f"[REPLAY] Found {len(trade_actions)} trade actions in database")
+        print(f"[REPLAY] Found {len(schedule_rows)} trade actions in database")
 
-        # Convert TradeAction ORM models to dicts for the strategy
-        trade_schedule = []
-        for ta in trade_actions:
-            trade_schedule.append(
-                {
-                    "datetime": ta.datetime.strftime("%Y-%m-%d %H:%M:%S.%f")
-                    if ta.datetime
-                    else None,
-                    "trade_action": ta.trade_action,
-                    "entry_price": ta.entry_price,
-                    "price": ta.price,
-                    "sl": ta.sl,
-                    "tp": ta.tp,
-                    "size": ta.size,
-                }
-            )
+    trade_schedule = schedule_from_rows(schedule_rows)
 
     # Extract backtest parameters
     ticker = backtest_stat.ticker
@@ -514,7 +900,7 @@ async def replay_backtest(backtest_id: int):
     end_time = backtest_stat.end_time
 
     print(f"Replaying backtest for {ticker} from {start_time} to {end_time}")
-    print(f"Found {len(trade_schedule)} trade actions to replay")
+    print(f"Found {len(schedule_rows)} trade actions to replay")
 
     # Validate required fields
     if not all([ticker, interval, period]):
@@ -531,14 +917,9 @@ async def replay_backtest(backtest_id: int):
         )
 
     # -----------------------------------------------------------------
-    # Run CPU-bound work in a thread (doesn't block the event loop)
+    # Run blocking / CPU-bound work in threads (doesn't block the event loop)
     # -----------------------------------------------------------------
-    def _run_replay():
-        """Sync work: fetch data + compute backtest replay."""
-        from app.signals.strategies.replay.predefined_trade_strategy import (
-            backtest as replay_backtest_func,
-        )
-
+    def _fetch_replay_data():
         # Fetch fresh historical data from yfinance
         print(f"[REPLAY] Fetching yfinance data for {ticker} {interval} {period}")
         df = getYFinanceData(
@@ -549,12 +930,35 @@ async def replay_backtest(backtest_id: int):
             raise ValueError(f"No data returned from yfinance for {ticker}")
 
         print(f"[REPLAY] Got yfinance data: shape={df.shape}")
+        return df
+
+    def _run_replay(df):
+        """Sync work: compute backtest replay."""
+        from app.signals.strategies.replay.predefined_trade_strategy import (
+            backtest as replay_backtest_func,
+        )
 
-        # Run the replay backtest
         return replay_backtest_func(df, trade_schedule)
 
     try:
-        bt, stats, trade_actions, strategy_parameters = await asyncio.to_thread(_run_replay)
+        df = await asyncio.to_thread(_fetch_replay_data)
+    except Exception as e:
+        print(f"[REPLAY] Error during replay: {e}")
+        raise HTTPException(status_code=400, detail=f"Failed to replay backtest. Error: {e}")
+
+    cache_key = (backtest_id, schedule_hash(trade_schedule), df.index[-1])
+    cached = _replay_cache.get(cache_key)
+    if cached is not None:
+        print(f"[REPLAY] Cache hit (last bar {df.index[-1]})")
+        return {
+            "status": HTTP_200_OK,
+            "message": "Backtest replay results",
+            # A copy, so callers can't change the cached entry (a flat dict of scalars)
+            "data": dict(cached),
+        }
+
+    try:
+        bt, stats, trade_actions, strategy_parameters = await asyncio.to_thread(_run_replay, df)
         if bt is None or stats is None:
             print("[REPLAY] Backtest returned None")
             raise HTTPException(
@@ -571,25 +975,16 @@ async def replay_backtest(backtest_id: int):
         traceback.print_exc()
         raise HTTPException(status_code=400, detail=f"Failed to replay backtest. Error: {e}")
 
-    # Generate the HTML plot (also sync/CPU-bound)
-    def _render_html():
-        bt.plot(open_browser=False, filename="backtest_replay.html")
-        with open("backtest_replay.html", "r", encoding="utf-8") as f:
-            content = f.read()
-        os.remove("backtest_replay.html")
-        print(f"[REPLAY] HTML content length: {len(content)} characters")
-        print(f"[REPLAY] HTML starts with: {content[:200]}")
-        print(f"[REPLAY] HTML ends with: {content[-200:]}")
-        return content
-
-    html_content = await asyncio.to_thread(_render_html)
+    # Generate the HTML plot (CPU-bound; rendered in the plot worker pool)
+    artifact = await asyncio.to_thread(pack_backtest_artifact, bt, stats)
+    html_content = await _render_report(artifact)
+    print(f"[REPLAY] HTML content length: {len(html_content)} characters")
     logging.info("replay_backtest finished")
 
     # Compress the HTML to match the format stored in the DB (zlib + base64).
     # This cuts the response payload from ~200 KB raw to ~60-80 KB — a ~65% reduction.
     try:
-        compressed = zlib.compress(html_content.encode("utf-8"), level=9)
-        html_compressed = base64.b64encode(compressed).decode("utf-8")
+        html_compressed = _deflate_html(html_content)
     except Exception as e:
         logging.error("Failed to compress replay HTML: %s", e)
         html_compressed = html_content  # fallback to raw if compression fails
@@ -626,6 +1021,7 @@ async def replay_backtest(backtest_id: int):
         "tpslRatio": 0.0,  # Not applicable for replay
         "sl_coef": 0.0,  # Not applicable for replay
     }
+    _replay_cache[cache_key] = dict(backtest_stats_data)
 
     return {
         "status": HTTP_200_OK,
@@ -655,6 +1051,90 @@ def _build_best_params(strategy):
         }
 
 
+async def _continue_strategy_backtest(strategy) -> bool:
+    """
+    Bring a strategy's trade actions up to date without a full re-simulation.
+
+    Re-runs the strategy from the checkpoint of its last full run over the new
+    bars only, stores and notifies the new trade actions and leaves the stats,
+    artifact and report as they are (they are refreshed by the next full run).
+    Returns False when a full run is needed instead: no or outdated checkpoint,
+    FULL_REBUILD_EVERY continuation runs reached, or a tail that no longer
+    reproduces the stored run.
+    """
+    async with AsyncSessionLocal() as session:
+        checkpoint = await BacktestCheckpointRepository(session).get_for_config(
+            strategy.ticker, strategy.strategy, strategy.period, strategy.interval
+        )
+    if checkpoint is None:
+        return False
+    if checkpoint.strategy_version != strategy_version(strategy.strategy):
+        return False
+    if checkpoint.runs_since_rebuild >= FULL_REBUILD_EVERY:
+        return False
+
+    parameters_dict = NIGHTLY_PARAMETERS
+    state = {
+        "restart_at": checkpoint.restart_at,
+        "last_bar": checkpoint.last_bar,
+        "params": checkpoint.params,
+        "actions_digest": checkpoint.actions_digest,
+    }
+    async with asyncio.timeout(600.0):
+        signals_df = await asyncio.to_thread(
+            _calculate_backtest_signals,
+            strategy.ticker, strategy.interval, strategy.period, strategy.strategy, parameters_dict,
+        )
+        if signals_df is None or signals_df.empty:
+            return False
+        if not has_new_bars(signals_df, state):
+            print(f"No new bars for {strategy.ticker} {strategy.strategy}; nothing to do.")
+            return True
+        continued = await asyncio.to_thread(
+            continue_backtest,
+            signals_df,
+            strategy.strategy,
+            _base_backtest_parameters(strategy.ticker, parameters_dict),
+            state,
+        )
+    if continued is None:
+        logging.info(
+            "Checkpoint of backtest %s can't be continued; running a full backtest",
+            checkpoint.backtest_id,
+        )
+        return False
+
+    trade_actions, _, next_checkpoint = continued
+    async with AsyncSessionLocal() as session:
+        trade_repo = TradeActionRepository(session)
+        latest_ta = await trade_repo.get_latest_for_strategy(checkpoint.backtest_id)
+        inserted = await trade_repo.insert_many(
+            [
+                {**ta, "backtest_id": checkpoint.backtest_id, "datetime": _naive(ta["datetime"])}
+                for ta in trade_actions
+            ]
+        )
+        await BacktestCheckpointRepository(session).update(
+            checkpoint.backtest_id,
+            {
+                **next_checkpoint,
+                "runs_since_rebuild": checkpoint.runs_since_rebuild + 1,
+                "updated_at": datetime.now(UTC),
+            },
+        )
+    invalidate_backtest_reads()
+    print(f"Continued backtest {checkpoint.backtest_id}: {len(inserted)} new trade actions")
+
+    _notify_trade_actions(
+        strategy.strategy,
+        strategy.ticker,
+        strategy.interval,
+        strategy.notifications_on,
+        _actions_to_notify(inserted, latest_ta.datetime if latest_ta is not None else None),
+    )
+    return True
+
+
 async def strategy_notification_job():
     """
     Fetch all unique strategies and run backtests + send notifications.
@@ -687,6 +1167,14 @@ async def strategy_notification_job():
             time_difference = (datetime.now(UTC) - last_optimized_at).days
         print("Skip optimization:", time_difference < 3)
 
+        # Between optimisations only the new bars need simulating
+        if time_difference < 3:
+            try:
+                if await _continue_strategy_backtest(strategy):
+                    continue
+            except Exception as e:
+                logging.error("Failed to continue backtest for strategy: %s", e)
+
         try:
             # Build strategy-specific best_params from DB columns.
             # Each backtest function expects its own key names, so map accordingly.
@@ -697,13 +1185,15 @@ async def strategy_notification_job():
                 interval=strategy.interval,
                 period=strategy.period,
                 strategy=strategy.strategy,
-                parameters='{"max_longs": 2, "max_shorts": 2}',
+                parameters=json.dumps(NIGHTLY_PARAMETERS),
                 start=None,
                 end=None,
                 strategy_id=str(strategy.id) if strategy.id else None,
                 notifications_on=strategy.notifications_on,
                 skip_optimization=time_difference < 3,
                 best_params=best_params,
+                # Nightly results are rarely opened; render the report on first request
+                render_html=False,
             )
         except Exception as e:
             logging.error("Failed to run backtest for strategy: %s", e)
@@ -12,6 +12,7 @@ from backtesting import Backtest
 import logging
 import multiprocessing as mp
 import numpy as np
+from app.signals.strategies.optimization import optimize_heatmap
 
 logger = logging.getLogger(__name__)
 
@@ -97,7 +98,7 @@ class FiveMinORBStrat(Strategy):
 
             if self.__class__.record_trades:
                 self.__class__.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": current_price,
                     "price": current_price,
@@ -129,7 +130,7 @@ class FiveMinORBStrat(Strategy):
 
             if self.__class__.record_trades:
                 self.__class__.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": current_price,
                     "price": current_price,
@@ -203,14 +204,14 @@ def _run_backtest(df, strategy_parameters, size, skip_optimization, best_params)
         logger.debug("[ORB backtest] Starting optimization (2×2×2 = 8 combos)...")
         bt = Backtest(dftest, FiveMinORBStrat, cash=cash, margin=margin, finalize_trades=True)
 
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             spread_buffer_pips=[1, 3],
             tp1_multiplier=[0.5, 1.5],
             tp2_multiplier=[1.5, 2.5],
             maximize="Win Rate [%]",
             max_tries=8,
             random_state=0,
-            return_heatmap=True,
         )
         logger.debug("[ORB backtest] Optimization done in %.1fs", _time.time() - t_opt)
 
@@ -12,6 +12,7 @@ from backtesting import Strategy
 from backtesting import Backtest
 import multiprocessing as mp
 import numpy as np
+from app.signals.strategies.optimization import optimize_heatmap
 
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
@@ -101,7 +102,7 @@ class FiveMinORBConfirmationStrat(Strategy):
 
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -128,7 +129,7 @@ class FiveMinORBConfirmationStrat(Strategy):
 
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -184,14 +185,14 @@ def backtest(df, strategy_parameters, size=0.03, skip_optimization=False, best_p
         print("Optimizing five_min_orb_confirmation...")
         bt = Backtest(dftest, FiveMinORBConfirmationStrat, cash=cash, margin=margin, finalize_trades=True)
 
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             sl_buffer_pips=[3, 4, 5],
             tp1_multiplier=[i / 10 for i in range(12, 19, 3)],  # 1.2, 1.5, 1.8
             tp2_multiplier=[i / 10 for i in range(20, 31, 5)],  # 2.0, 2.5, 3.0
             maximize="Win Rate [%]",
             max_tries=200,
             random_state=0,
-            return_heatmap=True,
         )
 
         # Convert multiindex series to dataframe
@@ -1,6 +1,7 @@
 from backtesting import Strategy
 from backtesting import Backtest
 import multiprocessing as mp
+from app.signals.strategies.optimization import optimize_heatmap
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
 
@@ -40,7 +41,7 @@ def backtest(df, strategy_parameters, size = 0.01, skip_optimization=False, best
                     
                     if (strategy_parameters['best']):
                         self.trades_actions.append({
-                            "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                            "datetime": self.data.index[-1].to_pydatetime(),
                             "trade_action": "buy",
                             "entry_price": self.data.Close[-1],
                             "price": self.data.Close[-1],
@@ -56,7 +57,7 @@ def backtest(df, strategy_parameters, size = 0.01, skip_optimization=False, best
                     
                     if (strategy_parameters['best']):
                         self.trades_actions.append({
-                            "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                            "datetime": self.data.index[-1].to_pydatetime(),
                             "trade_action": "sell",
                             "entry_price": self.data.Close[-1],
                             "price": self.data.Close[-1],
@@ -71,11 +72,14 @@ def backtest(df, strategy_parameters, size = 0.01, skip_optimization=False, best
     if (not skip_optimization):
         print("Optimizing...")
         bt = Backtest(df, CLFControlTpAndSlSeparately, cash=100000, margin=1/100, commission=0.000) #0.0002
-        stats, heatmap = bt.optimize(slcoef=[i/10 for i in range(60, 100, 5)],
-                            TPcoef=[i/10 for i in range(80, 130, 5)],
-                            maximize='Sharpe Ratio', max_tries=500,
-                                random_state=0,
-                                return_heatmap=True)
+        heatmap = optimize_heatmap(
+            bt,
+            slcoef=[i/10 for i in range(60, 100, 5)],
+            TPcoef=[i/10 for i in range(80, 130, 5)],
+            maximize='Sharpe Ratio',
+            max_tries=500,
+            random_state=0,
+        )
         
         # Convert multiindex series to dataframe
         heatmap_df = heatmap.unstack()
@@ -0,0 +1,149 @@
+"""
+Incremental continuation of a strategy backtest.
+
+The nightly job re-simulates the whole ``period`` window every run even
+though only the last few bars are new. backtesting.py cannot resume a
+finished engine, but a simulation restarted from a bar where the strategy
+was flat — no open position and no order about to fill — reproduces the
+full run from that bar on, because the signal columns are computed on the
+full frame (indicator tails are exact) and trade actions record the size
+fraction, not units.
+
+After a full run, ``build_checkpoint`` records the last such restart bar and
+a digest of the trade actions emitted after it. A continuation run slices
+the freshly computed signals frame from the restart bar, re-runs the
+strategy on that tail only with the checkpointed parameters, and checks the
+actions it emits for the already-known bars against the digest. A mismatch
+(revised price data, strategy state that depends on earlier history) means
+the tail has drifted and the caller falls back to a full rebuild, which it
+also does every few runs regardless.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+
+import numpy as np
+import pandas as pd
+
+from .perform_backtest import perform_backtest
+
+
+def _bar(value) -> pd.Timestamp:
+    """Timezone-free bar timestamp, as stored on trade actions."""
+    return pd.Timestamp(value).replace(tzinfo=None)
+
+
+def restart_position(trades: pd.DataFrame, n_bars: int) -> int | None:
+    """
+    Last bar position ``s`` from which a fresh simulation matches the full run.
+
+    The strategy must be flat after bar ``s`` and have no entry filling at
+    ``s + 1`` (that order would be placed on bar ``s``, which a tail starting at
+    ``s`` never calls next() for): every trade has ExitBar <= s or EntryBar >= s + 2.
+    Trades exiting on the last bar may just have been closed by finalize_trades,
+    so they are treated as still open.
+    """
+    if n_bars < 2:
+        return None
+    blocked = np.zeros(n_bars + 1, dtype=np.int64)
+    if len(trades):
+        entries = np.maximum(trades["EntryBar"].to_numpy(dtype=np.int64) - 1, 0)
+        exits = trades["ExitBar"].to_numpy(dtype=np.int64)
+        exits = np.where(exits >= n_bars - 1, n_bars, exits)
+        np.add.at(blocked, entries, 1)
+        np.add.at(blocked, exits, -1)
+    # An order placed on the last bar hasn't filled yet, so it is never a restart point
+    free = np.flatnonzero(np.cumsum(blocked)[: n_bars - 1] == 0)
+    return int(free[-1]) if len(free) else None
+
+
+def actions_digest(trade_actions: list[dict], after=None, until=None) -> str:
+    """
+    Digest of the (bar, action) sequence of trade actions in (after, until].
+
+    Prices are left out on purpose: yfinance re-adjusts history slightly between
+    downloads, which should not force a rebuild when the signals are unchanged.
+    """
+    lower = _bar(after) if after is not None else None
+    upper = _bar(until) if until is not None else None
+    keys = []
+    for action in trade_actions:
+        bar = _bar(action["datetime"])
+        if (lower is None or bar > lower) and (upper is None or bar <= upper):
+            keys.append([str(bar), action["trade_action"]])
+    return hashlib.sha256(json.dumps(keys).encode("utf-8")).hexdigest()
+
+
+def build_checkpoint(
+    signals_df: pd.DataFrame, stats, trade_actions: list[dict], strategy_parameters: dict
+):
+    """
+    Checkpoint of a finished full run, or None if it never went flat.
+
+    Returns a dict with the restart and last bars (as text), the parameters to
+    continue with and the digest of the actions emitted after the restart bar.
+    """
+    position = restart_position(stats["_trades"], len(signals_df))
+    if position is None:
+        return None
+    restart_at = signals_df.index[position]
+    last_bar = signals_df.index[-1]
+    return {
+        "restart_at": str(restart_at),
+        "last_bar": str(last_bar),
+        "params": {k: _to_builtin(v) for k, v in strategy_parameters.items() if k != "best"},
+        "actions_digest": actions_digest(trade_actions, after=restart_at),
+    }
+
+
+def _to_builtin(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+def has_new_bars(signals_df: pd.DataFrame, checkpoint: dict) -> bool:
+    return signals_df.index[-1] > pd.Timestamp(checkpoint["last_bar"])
+
+
+def continue_backtest(signals_df: pd.DataFrame, strategy: str, parameters: dict, checkpoint: dict):
+    """
+    Re-run the strategy on the bars from the checkpoint's restart bar onwards.
+
+    Returns (trade_actions, stats, checkpoint) of the tail run — the checkpoint
+    to continue from next time — or None when this one can't be continued
+    (restart bar outside the new window, no new bars, or the tail no longer
+    reproduces the actions of the known bars) and a full run is needed.
+    """
+    restart_at = pd.Timestamp(checkpoint["restart_at"])
+    last_bar = pd.Timestamp(checkpoint["last_bar"])
+    try:
+        position = signals_df.index.get_loc(restart_at)
+    except KeyError:
+        return None
+    if not isinstance(position, int) or not has_new_bars(signals_df, checkpoint):
+        return None
+
+    tail = signals_df.iloc[position:]
+    _, stats, trade_actions, _ = perform_backtest(
+        tail,
+        strategy,
+        dict(parameters),
+        skip_optimization=True,
+        best_params=dict(checkpoint["params"]),
+    )
+    if stats is None:
+        return None
+    digest = actions_digest(trade_actions, after=restart_at, until=last_bar)
+    if digest != checkpoint["actions_digest"]:
+        return None
+
+    next_checkpoint = build_checkpoint(tail, stats, trade_actions, checkpoint["params"])
+    if next_checkpoint is None:
+        # Never flat on the new bars: keep the restart bar, extend the digest
+        next_checkpoint = {
+            **checkpoint,
+            "last_bar": str(tail.index[-1]),
+            "actions_digest": actions_digest(trade_actions, after=restart_at),
+        }
+    return trade_actions, stats, next_checkpoint
@@ -7,6 +7,7 @@ Position sizing: Dynamic based on ATR volatility.
 from backtesting import Strategy
 from backtesting import Backtest
 import multiprocessing as mp
+from app.signals.strategies.optimization import optimize_heatmap
 
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
@@ -79,7 +80,7 @@ class DoubleCandleStrat(Strategy):
             # Record trade action
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -101,7 +102,7 @@ class DoubleCandleStrat(Strategy):
             # Record trade action
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -152,13 +153,13 @@ def backtest(df, strategy_parameters, size=0.01, skip_optimization=False, best_p
         print("Optimizing double_candle...")
         bt = Backtest(dftest, DoubleCandleStrat, cash=cash, margin=margin, finalize_trades=True)
 
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             slcoef=[i / 10 for i in range(10, 31, 2)],  # 1.0 to 3.0
             TPSLRatio=[i / 10 for i in range(15, 31, 2)],  # 1.5 to 3.0
             maximize="Win Rate [%]",
             max_tries=300,
             random_state=0,
-            return_heatmap=True,
         )
 
         # Convert multiindex series to dataframe
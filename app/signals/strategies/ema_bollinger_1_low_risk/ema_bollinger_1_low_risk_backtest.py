@@ -1,6 +1,7 @@
 from backtesting import Strategy
 from backtesting import Backtest
 import multiprocessing as mp
+from app.signals.strategies.optimization import optimize_heatmap
 
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
@@ -37,7 +38,7 @@ class EMABollingerLowRiskStrat(Strategy):
                 trade.close()
                 if _strategy_parameters and _strategy_parameters.get('best', False):
                     self.trades_actions.append({
-                        "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                        "datetime": self.data.index[-1].to_pydatetime(),
                         "trade_action": "close",
                         "entry_price": trade.entry_price,
                         "price": self.data.Close[-1],
@@ -50,7 +51,7 @@ class EMABollingerLowRiskStrat(Strategy):
                 trade.close()
                 if _strategy_parameters and _strategy_parameters.get('best', False):
                     self.trades_actions.append({
-                        "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                        "datetime": self.data.index[-1].to_pydatetime(),
                         "trade_action": "close",
                         "entry_price": trade.entry_price,
                         "price": self.data.Close[-1],
@@ -67,7 +68,7 @@ class EMABollingerLowRiskStrat(Strategy):
 
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -83,7 +84,7 @@ class EMABollingerLowRiskStrat(Strategy):
 
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -134,13 +135,13 @@ def backtest(df, strategy_parameters, size=0.03, skip_optimization=False, best_p
         print("Optimizing ema_bollinger_1_low_risk...")
         bt = Backtest(dftest, EMABollingerLowRiskStrat, cash=cash, margin=margin, finalize_trades=True)
 
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             slcoef=[i / 10 for i in range(10, 41, 2)],
             TPSLRatio=[i / 10 for i in range(10, 31, 2)],
             maximize="Sharpe Ratio",
             max_tries=300,
             random_state=0,
-            return_heatmap=True,
         )
 
         # Convert multiindex series to dataframe
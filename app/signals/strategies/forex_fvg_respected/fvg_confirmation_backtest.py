@@ -2,6 +2,7 @@ from backtesting import Strategy, Backtest
 import pandas_ta as ta
 import pandas as pd
 import multiprocessing as mp
+from app.signals.strategies.optimization import optimize_heatmap
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
 
@@ -47,7 +48,7 @@ class QuantFVGStrategy(Strategy):
                         self.sell(sl=sl, tp=tp, size=self.mysize)
                         if self.log_trades:
                             self.trades_actions.append({
-                                "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                                "datetime": self.data.index[-1].to_pydatetime(),
                                 "trade_action": "sell",
                                 "entry_price": entry_price,
                                 "price": self.data.Close[-1],
@@ -65,7 +66,7 @@ class QuantFVGStrategy(Strategy):
                         self.buy(sl=sl, tp=tp, size=self.mysize)
                         if self.log_trades:
                             self.trades_actions.append({
-                                "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                                "datetime": self.data.index[-1].to_pydatetime(),
                                 "trade_action": "buy",
                                 "entry_price": entry_price,
                                 "price": self.data.Close[-1],
@@ -124,15 +125,15 @@ def backtest(df, strategy_parameters, size=0.03, skip_optimization=False, best_p
         QuantFVGStrategy.log_trades = False
         bt = Backtest(dftest, QuantFVGStrategy, cash=cash, margin=margin)
         
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             tp_sl_ratio=[1.25, 1.5, 2.0, 2.5],
             maximize='Win Rate [%]',
-            return_heatmap=True,
         )
         
-        if stats is not None and '_strategy' in stats:
+        if heatmap.notna().any():
             best_params = {
-                'tpslRatio': stats['_strategy'].tp_sl_ratio
+                'tpslRatio': heatmap.idxmax()[0]
             }
         else:
             best_params = {
@@ -1,5 +1,6 @@
 from backtesting import Strategy, Backtest
 import multiprocessing as mp
+from app.signals.strategies.optimization import optimize_heatmap
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
 import numpy as np
@@ -73,7 +74,7 @@ class GridTradingStrategy(Strategy):
                 self.buy(tp=current_price + self.grid_distance, sl=sl_buy, size=self.mysize)
 
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": self.data.Close[-1],
                     "price": current_price,
@@ -88,7 +89,7 @@ class GridTradingStrategy(Strategy):
                 self.sell(tp=current_price - self.grid_distance, sl=sl_sell, size=self.mysize)
 
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": self.data.Close[-1],
                     "price": current_price,
@@ -109,7 +110,7 @@ class GridTradingStrategy(Strategy):
 
                 self.sell(tp=self.current_grid_level - self.grid_distance, sl=sl_new_sell, size=self.mysize)
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": self.data.Close[-1],
                     "price": current_price,
@@ -120,7 +121,7 @@ class GridTradingStrategy(Strategy):
 
                 self.buy(tp=self.current_grid_level + self.grid_distance, sl=sl_new_buy, size=self.mysize)
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": self.data.Close[-1],
                     "price": current_price,
@@ -141,7 +142,7 @@ class GridTradingStrategy(Strategy):
 
                 self.sell(tp=self.current_grid_level - self.grid_distance, sl=sl_new_sell, size=self.mysize)
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": self.data.Close[-1],
                     "price": current_price,
@@ -152,7 +153,7 @@ class GridTradingStrategy(Strategy):
 
                 self.buy(tp=self.current_grid_level + self.grid_distance, sl=sl_new_buy, size=self.mysize)
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": self.data.Close[-1],
                     "price": current_price,
@@ -205,13 +206,13 @@ def backtest(df, strategy_parameters=None, skip_optimization=False, best_params=
         bt_temp = Backtest(dftest, GridTradingStrategy, cash=cash, hedging=True,
                           margin=margin, commission=commission, finalize_trades=True)
 
-        stats, heatmap = bt_temp.optimize(
+        heatmap = optimize_heatmap(
+            bt_temp,
             grid_distance=[i for i in range(10, 50, 5)],
             grid_range=[1000],
             maximize='Max. Drawdown [%]',
             max_tries=500,
             random_state=0,
-            return_heatmap=True
         )
 
         # Convert multiindex series to dataframe
@@ -1,6 +1,7 @@
 from backtesting import Strategy
 from backtesting import Backtest
 import multiprocessing as mp
+from app.signals.strategies.optimization import optimize_heatmap
 
 if mp.get_start_method(allow_none=True) != "fork":
     mp.set_start_method("fork", force=True)
@@ -43,7 +44,7 @@ class MACDStrat(Strategy):
             self.position.close()
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime("%Y-%m-%d %H:%M:%S.%f"),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "close",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -58,7 +59,7 @@ class MACDStrat(Strategy):
                     trade.close()
                     if _strategy_parameters and _strategy_parameters.get('best', False):
                         self.trades_actions.append({
-                            "datetime": self.data.index[-1].strftime("%Y-%m-%d %H:%M:%S.%f"),
+                            "datetime": self.data.index[-1].to_pydatetime(),
                             "trade_action": "close",
                             "entry_price": trade.entry_price,
                             "price": self.data.Close[-1],
@@ -70,7 +71,7 @@ class MACDStrat(Strategy):
                     trade.close()
                     if _strategy_parameters and _strategy_parameters.get('best', False):
                         self.trades_actions.append({
-                            "datetime": self.data.index[-1].strftime("%Y-%m-%d %H:%M:%S.%f"),
+                            "datetime": self.data.index[-1].to_pydatetime(),
                             "trade_action": "close",
                             "entry_price": trade.entry_price,
                             "price": self.data.Close[-1],
@@ -86,7 +87,7 @@ class MACDStrat(Strategy):
             self.latestEntry = self.data.Close[-1]
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime("%Y-%m-%d %H:%M:%S.%f"),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -102,7 +103,7 @@ class MACDStrat(Strategy):
             self.latestEntry = self.data.Close[-1]
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime("%Y-%m-%d %H:%M:%S.%f"),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -154,13 +155,13 @@ def backtest(df, strategy_parameters, size=0.03, skip_optimization=False, best_p
         print("Optimizing macd_1...")
         bt = Backtest(dftest, MACDStrat, cash=cash, margin=margin, finalize_trades=True)
 
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             slcoef=[i / 10 for i in range(10, 25)],
             TPSLRatio=[i / 10 for i in range(15, 30)],
             maximize="Win Rate [%]",
             max_tries=500,
             random_state=0,
-            return_heatmap=True,
         )
 
         # Convert multiindex series to dataframe
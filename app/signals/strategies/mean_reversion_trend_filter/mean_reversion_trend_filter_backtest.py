@@ -9,6 +9,7 @@ from backtesting import Strategy
 from backtesting import Backtest
 import multiprocessing as mp
 import pandas as pd
+from app.signals.strategies.optimization import optimize_heatmap
 
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
@@ -134,7 +135,7 @@ class MeanReversionTrendFilterStrat(Strategy):
             # Record trade action
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -154,7 +155,7 @@ class MeanReversionTrendFilterStrat(Strategy):
             # Record trade action
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -207,13 +208,13 @@ def backtest(df, strategy_parameters, size=0.01, skip_optimization=False, best_p
         print("Optimizing mean_reversion_trend_filter...")
         bt = Backtest(dftest, MeanReversionTrendFilterStrat, cash=cash, margin=margin, finalize_trades=True)
 
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             slcoef=[i / 10 for i in range(30, 71, 3)],  # 3.0 to 7.0
             tpratio=[i / 10 for i in range(25, 51, 3)],  # 2.5 to 5.0
             maximize="Sharpe Ratio",
             max_tries=300,
             random_state=0,
-            return_heatmap=True,
         )
 
         # Convert multiindex series to dataframe
@@ -0,0 +1,173 @@
+"""
+Shared grid optimisation with a memoised heatmap.
+
+Every strategy backtest used to call ``bt.optimize(..., return_heatmap=True)``
+directly, pick the ``idxmax`` and throw the heatmap away. ``optimize_heatmap``
+is a drop-in replacement that:
+
+  - skips grid points already evaluated for the same data fingerprint and
+    strategy version (supplied by the caller through ``heatmap_session``),
+  - records the trade count next to the objective for every evaluated point,
+  - returns the merged heatmap (cached + new points) in the exact shape
+    ``bt.optimize`` returns, so the existing ``unstack()/idxmax()`` code keeps
+    working unchanged.
+
+When no session is active the helper behaves like a plain ``bt.optimize``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class HeatmapSession:
+    """Cached grid points for one backtest run, plus the points it produced."""
+
+    # objective name → list of {"params": {...}, "value": float | None, "trades": int | None}
+    cached: dict[str, list[dict]] = field(default_factory=dict)
+    objective: str | None = None
+    points: list[dict] = field(default_factory=list)
+    evaluated: int = 0
+    reused: int = 0
+
+
+_session: ContextVar[HeatmapSession | None] = ContextVar("heatmap_session", default=None)
+
+
+@contextmanager
+def heatmap_session(cached: dict[str, list[dict]] | None = None) -> Iterator[HeatmapSession]:
+    """
+    Activate a heatmap session for the duration of one backtest.
+
+    Usage:
+        with heatmap_session(cached_points) as session:
+            perform_backtest(...)
+        session.points  # merged heatmap, ready to persist
+    """
+    session = HeatmapSession(cached=cached or {})
+    token = _session.set(session)
+    try:
+        yield session
+    finally:
+        _session.reset(token)
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Stable content hash of a DataFrame (index + values)."""
+    hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    digest = hashlib.sha256(hashed.tobytes())
+    digest.update(",".join(map(str, df.columns)).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def _point_key(params: dict[str, Any]) -> tuple:
+    return tuple((name, _to_builtin(value)) for name, value in params.items())
+
+
+def _to_builtin(value: Any) -> Any:
+    """Convert numpy scalars to plain Python so points are JSON-serialisable."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _clean_value(value: Any) -> float | None:
+    if value is None:
+        return None
+    value = float(value)
+    return None if math.isnan(value) or math.isinf(value) else value
+
+
+def optimize_heatmap(
+    bt,
+    *,
+    maximize: str,
+    max_tries: int | float | None = None,
+    random_state: int | None = None,
+    **grid,
+) -> pd.Series:
+    """
+    Run ``bt.optimize`` over ``grid`` and return the full heatmap.
+
+    Grid points already present in the active session are not re-evaluated;
+    ``max_tries`` is spent on the remaining points only, so repeated runs on the
+    same data progressively cover more of the grid.
+    """
+    session = _session.get()
+    names = list(grid.keys())
+    cached = {}
+    if session is not None:
+        session.objective = maximize
+        for point in session.cached.get(maximize, []):
+            params = point.get("params") or {}
+            if list(params.keys()) == names:
+                cached[_point_key(params)] = point
+
+    def _admissible(params) -> bool:
+        return _point_key(dict(params)) not in cached
+
+    new_points: list[dict] = []
+    if any(_admissible(dict(zip(names, values))) for values in product(*grid.values())):
+        trade_counts: list[int] = []
+
+        def _objective(stats, _key=maximize):
+            # Called in the parent process once per run that made trades, in heatmap order
+            trade_counts.append(int(stats["# Trades"]))
+            return stats[_key]
+
+        _objective.__name__ = maximize
+
+        _, heatmap = bt.optimize(
+            maximize=_objective,
+            max_tries=max_tries,
+            random_state=random_state,
+            constraint=_admissible if cached else None,
+            return_heatmap=True,
+            **grid,
+        )
+
+        # Runs without trades come back as NaN and never reach _objective. If an
+        # objective is itself NaN the counts can't be attributed, so drop them.
+        traded = heatmap.notna().to_numpy()
+        counts_reliable = len(trade_counts) == int(traded.sum())
+        counts = iter(trade_counts)
+        for values, value, has_trades in zip(heatmap.index, heatmap.to_numpy(), traded):
+            if not isinstance(values, tuple):
+                values = (values,)
+            trades = (next(counts) if has_trades else 0) if counts_reliable else None
+            new_points.append(
+                {
+                    "params": {n: _to_builtin(v) for n, v in zip(names, values)},
+                    "value": _clean_value(value),
+                    "trades": trades,
+                }
+            )
+
+    points = list(cached.values()) + new_points
+    if session is not None:
+        session.points = points
+        session.evaluated = len(new_points)
+        session.reused = len(cached)
+
+    return points_to_heatmap(points, names, maximize)
+
+
+def points_to_heatmap(points: list[dict], names: list[str], objective: str) -> pd.Series:
+    """Rebuild the MultiIndex heatmap Series ``bt.optimize`` would have returned."""
+    index = pd.MultiIndex.from_tuples(
+        [tuple(point["params"][n] for n in names) for point in points],
+        names=names,
+    )
+    values = [np.nan if point["value"] is None else point["value"] for point in points]
+    return pd.Series(values, index=index, name=objective, dtype=float).sort_index()
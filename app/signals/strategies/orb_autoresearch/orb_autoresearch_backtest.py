@@ -15,6 +15,7 @@ import time as _time
 
 import numpy as np
 from backtesting import Backtest, Strategy
+from app.signals.strategies.optimization import optimize_heatmap
 
 logger = logging.getLogger(__name__)
 
@@ -110,7 +111,7 @@ class ORBAutoresearchStrat(Strategy):
 
             if self.__class__.record_trades:
                 self.__class__.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime("%Y-%m-%d %H:%M:%S.%f"),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": current_price,
                     "price": current_price,
@@ -139,7 +140,7 @@ class ORBAutoresearchStrat(Strategy):
 
             if self.__class__.record_trades:
                 self.__class__.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime("%Y-%m-%d %H:%M:%S.%f"),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": current_price,
                     "price": current_price,
@@ -210,14 +211,14 @@ def backtest(df, strategy_parameters, size=0.03, skip_optimization=False, best_p
         logger.debug("[ORB autoresearch backtest] Starting optimization (3×3×2 = 18 combos)...")
         bt = Backtest(dftest, ORBAutoresearchStrat, cash=cash, margin=margin, finalize_trades=True)
 
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             narrow_threshold=[0.0015, 0.002, 0.0025],
             sl_narrow_fraction=[0.5, 0.6667, 0.8],
             tp_multiplier=[1.0, 1.5],
             maximize="Sharpe Ratio",
             max_tries=18,
             random_state=0,
-            return_heatmap=True,
         )
         logger.debug("[ORB autoresearch backtest] Optimization done in %.1fs", _time.time() - t_opt)
 
@@ -1,5 +1,8 @@
+import hashlib
 import importlib
+import inspect
 import logging
+from functools import lru_cache
 
 from fastapi import HTTPException
 
@@ -33,42 +36,74 @@ five_min_orb_backtest = five_min_orb_module.backtest
 five_min_orb_confirmation_module = importlib.import_module('app.signals.strategies.5_min_orb_confirmation.five_min_orb_confirmation_backtest')
 five_min_orb_confirmation_backtest = five_min_orb_confirmation_module.backtest
 
+# Strategy name → backtest function; the single dispatch table for perform_backtest,
+# perform_backtest_async and strategy_version.
+BACKTEST_FUNCTIONS = {
+    "ema_bollinger": ema_bollinger_backtest,
+    "ema_bollinger_1_low_risk": ema_bollinger_1_low_risk_backtest,
+    "macd_1": macd_1_backtest,
+    "clf_bollinger_rsi": clf_bollinger_rsi_backtest,
+    "clf_bollinger_rsi_15m": clf_bollinger_rsi_backtest_15m,
+    "eurjpy_bollinger_rsi_60m": eurjpy_bollinger_rsi_60m_backtest,
+    "grid_trading": grid_trading_backtest,
+    "super_safe_strategy": super_safe_strategy_backtest,
+    "fvg_confirmation": fvg_confirmation_backtest,
+    "swing-1": swing_1_backtest,
+    "double_candle": double_candle_backtest,
+    "mean_reversion_trend_filter": mean_reversion_trend_filter_backtest,
+    "5_min_orb": five_min_orb_backtest,
+    "5_min_orb_confirmation": five_min_orb_confirmation_backtest,
+    "orb_autoresearch": orb_autoresearch_backtest,
+}
+
+# Position size used when the request doesn't give one; the others require 'size'
+DEFAULT_SIZES = {
+    "double_candle": 0.01,
+    "mean_reversion_trend_filter": 0.01,
+    "5_min_orb": 0.03,
+    "5_min_orb_confirmation": 0.03,
+    "orb_autoresearch": 0.03,
+}
+
+# Strategies whose backtest takes no size argument
+SIZELESS_STRATEGIES = {"grid_trading"}
+
+
+def _backtest_function(strategy):
+    func = BACKTEST_FUNCTIONS.get(strategy)
+    if func is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return func
+
+
+def _size_args(strategy, parameters) -> tuple:
+    if strategy in SIZELESS_STRATEGIES:
+        return ()
+    if strategy in DEFAULT_SIZES:
+        return (parameters.get('size', DEFAULT_SIZES[strategy]),)
+    return (parameters['size'],)
+
+
+@lru_cache(maxsize=None)
+def strategy_version(strategy):
+    """
+    Short hash of the strategy's backtest module source.
+
+    Any edit to the backtest code changes the version, which invalidates
+    optimisation heatmaps cached for the previous implementation.
+    """
+    func = BACKTEST_FUNCTIONS.get(strategy)
+    if func is None:
+        return None
+    source = inspect.getsource(inspect.getmodule(func))
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+
 
 def perform_backtest(df, strategy, parameters, skip_optimization=False, best_params=None):
     print(strategy)
     try:
-        if strategy == "ema_bollinger":
-            return ema_bollinger_backtest(df, parameters, parameters['size'], skip_optimization, best_params)
-        if strategy == "ema_bollinger_1_low_risk":
-            return ema_bollinger_1_low_risk_backtest(df, parameters, parameters['size'], skip_optimization, best_params)
-        elif strategy == "macd_1":
-            return macd_1_backtest(df, parameters, parameters['size'], skip_optimization, best_params)
-        elif strategy == "clf_bollinger_rsi":
-            return clf_bollinger_rsi_backtest(df, parameters, parameters['size'], skip_optimization, best_params)
-        elif strategy == "clf_bollinger_rsi_15m":
-            return clf_bollinger_rsi_backtest_15m(df, parameters, parameters['size'], skip_optimization, best_params)
-        elif strategy == "eurjpy_bollinger_rsi_60m":
-            return eurjpy_bollinger_rsi_60m_backtest(df, parameters, parameters['size'], skip_optimization, best_params)
-        elif strategy == "grid_trading":
-            return grid_trading_backtest(df, parameters, skip_optimization, best_params)
-        elif strategy == "super_safe_strategy":
-            return super_safe_strategy_backtest(df, parameters, parameters['size'], skip_optimization, best_params)
-        elif strategy == "fvg_confirmation":
-            return fvg_confirmation_backtest(df, parameters, parameters['size'], skip_optimization, best_params)
-        elif strategy == "swing-1":
-            return swing_1_backtest(df, parameters, parameters['size'], skip_optimization, best_params)
-        elif strategy == "double_candle":
-            return double_candle_backtest(df, parameters, parameters.get('size', 0.01), skip_optimization, best_params)
-        elif strategy == "mean_reversion_trend_filter":
-            return mean_reversion_trend_filter_backtest(df, parameters, parameters.get('size', 0.01), skip_optimization, best_params)
-        elif strategy == "5_min_orb":
-            return five_min_orb_backtest(df, parameters, parameters.get('size', 0.03), skip_optimization, best_params)
-        elif strategy == "5_min_orb_confirmation":
-            return five_min_orb_confirmation_backtest(df, parameters, parameters.get('size', 0.03), skip_optimization, best_params)
-        elif strategy == "orb_autoresearch":
-            return orb_autoresearch_backtest(df, parameters, parameters.get('size', 0.03), skip_optimization, best_params)
-        else:
-            raise HTTPException(status_code=404, detail="Not found")
+        backtest = _backtest_function(strategy)
+        return backtest(df, parameters, *_size_args(strategy, parameters), skip_optimization, best_params)
     except Exception as e:
         logging.error("perform_backtest failed for strategy=%s: %s", strategy, e, exc_info=True)
         raise
@@ -76,35 +111,5 @@ def perform_backtest(df, strategy, parameters, skip_optimization=False, best_par
 
 async def perform_backtest_async(df, strategy, parameters):
     print(strategy)
-    if strategy == "ema_bollinger":
-        return ema_bollinger_backtest(df, parameters, parameters['size'])
-    if strategy == "ema_bollinger_1_low_risk":
-        return ema_bollinger_1_low_risk_backtest(df, parameters, parameters['size'])
-    elif strategy == "macd_1":
-        return macd_1_backtest(df, parameters, parameters['size'])
-    elif strategy == "clf_bollinger_rsi":
-        return clf_bollinger_rsi_backtest(df, parameters, parameters['size'])
-    elif strategy == "clf_bollinger_rsi_15m":
-        return clf_bollinger_rsi_backtest_15m(df, parameters, parameters['size'])
-    elif strategy == "eurjpy_bollinger_rsi_60m":
-        return eurjpy_bollinger_rsi_60m_backtest(df, parameters, parameters['size'])
-    elif strategy == "grid_trading":
-        return grid_trading_backtest(df, parameters)
-    elif strategy == "super_safe_strategy":
-        return super_safe_strategy_backtest(df, parameters, parameters['size'])
-    elif strategy == "fvg_confirmation":
-        return fvg_confirmation_backtest(df, parameters, parameters['size'])
-    elif strategy == "swing-1":
-        return swing_1_backtest(df, parameters, parameters['size'])
-    elif strategy == "double_candle":
-        return double_candle_backtest(df, parameters, parameters.get('size', 0.01))
-    elif strategy == "mean_reversion_trend_filter":
-        return mean_reversion_trend_filter_backtest(df, parameters, parameters.get('size', 0.01))
-    elif strategy == "5_min_orb":
-        return five_min_orb_backtest(df, parameters, parameters.get('size', 0.03))
-    elif strategy == "5_min_orb_confirmation":
-        return five_min_orb_confirmation_backtest(df, parameters, parameters.get('size', 0.03))
-    elif strategy == "orb_autoresearch":
-        return orb_autoresearch_backtest(df, parameters, parameters.get('size', 0.03))
-    else:
-        raise HTTPException(status_code=404, detail="Not found")
+    backtest = _backtest_function(strategy)
+    return backtest(df, parameters, *_size_args(strategy, parameters))
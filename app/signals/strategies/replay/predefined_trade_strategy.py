@@ -6,10 +6,13 @@ allowing for replay of backtests with fresh historical price data.
 """
 
 import multiprocessing as mp
+from collections.abc import Mapping
 
-import pandas as pd
+import numpy as np
 from backtesting import Backtest, Strategy
 
+from .trade_schedule import schedule_from_records
+
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
 
@@ -20,8 +23,8 @@ def backtest(df, trade_schedule, cash=100000, margin=1/500):
 
     Args:
         df: DataFrame with OHLC data and datetime index
-        trade_schedule: List of dicts with keys:
-            - datetime: str (format: '%Y-%m-%d %H:%M:%S.%f' or '%Y-%m-%d %H:%M:%S')
+        trade_schedule: Columnar schedule (see trade_schedule.py), or a list of dicts with keys:
+            - datetime: datetime (strings in '%Y-%m-%d %H:%M:%S[.%f]' format are also accepted)
             - trade_action: str ('buy', 'sell', 'close')
             - entry_price: float
             - price: float
@@ -43,156 +46,129 @@ def backtest(df, trade_schedule, cash=100000, margin=1/500):
     print(f"[REPLAY] DataFrame shape: {dftest.shape}")
     print(f"[REPLAY] DataFrame index range: {dftest.index.min()} to {dftest.index.max()}")
     print(f"[REPLAY] DataFrame index tzinfo: {dftest.index.tz}")
-    print(f"[REPLAY] Trade schedule count: {len(trade_schedule)}")
-
-    # Parse trade schedule datetimes and convert to pandas Timestamps
-    # Ensure they are timezone-naive to match yfinance data
-    parsed_schedule = []
-    for trade in trade_schedule:
-        dt_str = trade['datetime']
-        try:
-            dt = pd.to_datetime(dt_str, format='%Y-%m-%d %H:%M:%S.%f')
-        except ValueError:
-            dt = pd.to_datetime(dt_str, format='%Y-%m-%d %H:%M:%S')
-
-        # Remove timezone info to match yfinance data (which is tz-naive)
-        if dt.tz is not None:
-            dt = dt.tz_localize(None)
-
-        parsed_schedule.append({
-            'datetime': dt,
-            'trade_action': trade['trade_action'].lower(),
-            'entry_price': trade['entry_price'],
-            'price': trade['price'],
-            'sl': trade.get('sl'),
-            'tp': trade.get('tp'),
-            'size': trade['size'],
-        })
-
-    # Sort by datetime
-    parsed_schedule.sort(key=lambda x: x['datetime'])
-
-    # Filter out trades that are older than the yfinance data range
-    # This prevents old trades from piling up on the first bar
-    df_start = dftest.index.min()
-    original_count = len(parsed_schedule)
-    parsed_schedule = [t for t in parsed_schedule if t['datetime'] >= df_start]
-    filtered_count = original_count - len(parsed_schedule)
-
-    print(f"[REPLAY] Parsed {len(parsed_schedule)} trades")
+
+    if not isinstance(trade_schedule, Mapping):
+        trade_schedule = schedule_from_records(trade_schedule)
+    schedule_count = len(trade_schedule["datetime"])
+    print(f"[REPLAY] Trade schedule count: {schedule_count}")
+
+    # Sort by datetime (stable, so same-bar actions keep their stored order) and
+    # drop trades older than the yfinance data range so they don't pile up on the first bar
+    df_start = dftest.index.min().to_datetime64()
+    order = np.argsort(trade_schedule["datetime"], kind="stable")
+    order = order[trade_schedule["datetime"][order] >= df_start]
+    schedule = {name: column[order] for name, column in trade_schedule.items()}
+    filtered_count = schedule_count - len(order)
+
+    print(f"[REPLAY] Parsed {len(order)} trades")
     if filtered_count > 0:
         print(f"[REPLAY] Filtered out {filtered_count} trades older than yfinance data start ({df_start})")
-    if parsed_schedule:
-        print(f"[REPLAY] First trade: {parsed_schedule[0]['datetime']} (tz: {parsed_schedule[0]['datetime'].tz}) - {parsed_schedule[0]['trade_action']}")
-        print(f"[REPLAY] Last trade: {parsed_schedule[-1]['datetime']} (tz: {parsed_schedule[-1]['datetime'].tz}) - {parsed_schedule[-1]['trade_action']}")
+    if len(order):
+        print(f"[REPLAY] First trade: {schedule['datetime'][0]} - {schedule['trade_action'][0]}")
+        print(f"[REPLAY] Last trade: {schedule['datetime'][-1]} - {schedule['trade_action'][-1]}")
+
+    # Bar position at which each trade becomes due: the first bar at or after its
+    # datetime (len(index) if it falls after the last bar, so it never executes)
+    due_bars = dftest.index.searchsorted(schedule["datetime"], side='left')
+    actions = schedule["trade_action"]
+    sizes = schedule["size"]
+    # NULL stop-loss / take-profit levels are NaN in the schedule; orders need None
+    stop_losses = [None if np.isnan(v) else float(v) for v in schedule["sl"]]
+    take_profits = [None if np.isnan(v) else float(v) for v in schedule["tp"]]
 
     class PredefinedTradeStrategy(Strategy):
         trades_actions = []
-        executed_trades = set()
 
         def init(self):
             super().init()
-            self.trade_schedule = parsed_schedule
-            # Track which trades have been executed
-            self.executed_trade_indices = set()
+            # The schedule is sorted, so a single pointer tracks the next trade to execute
+            self.next_trade = 0
 
         def next(self):
             super().next()
 
             current_dt = self.data.index[-1]
+            bar = len(self.data) - 1
+
+            # Execute every trade due at or before this bar. A trade whose time has no
+            # exact bar in the yfinance data runs on the first bar after it.
+            while self.next_trade < len(due_bars) and due_bars[self.next_trade] <= bar:
+                i = self.next_trade
+                self.next_trade += 1
+
+                action = actions[i]
+
+                if action == 'buy':
+                    sl = stop_losses[i]
+                    tp = take_profits[i]
+                    size = float(sizes[i])
+
+                    # Only buy if we don't have an open position
+                    if len(self.trades) == 0:
+                        # Try to execute with TP/SL, fall back to without if validation fails
+                        try:
+                            self.buy(sl=sl, tp=tp, size=size)
+                            print(f"[REPLAY] BUY at {current_dt} - price: {self.data.Close[-1]:.5f}, size: {size}, SL: {sl}, TP: {tp}")
+                        except ValueError as e:
+                            if "require" in str(e).lower() or "tp" in str(e).lower() or "sl" in str(e).lower():
+                                print(f"[REPLAY] BUY at {current_dt} - Invalid TP/SL, executing without: {e}")
+                                self.buy(size=size)
+                            else:
+                                raise
+
+                        self.trades_actions.append({
+                            "datetime": current_dt.to_pydatetime(),
+                            "trade_action": "buy",
+                            "entry_price": self.data.Close[-1],
+                            "price": self.data.Close[-1],
+                            "sl": sl,
+                            "tp": tp,
+                            "size": size,
+                        })
 
-            # Find trades that should be executed at or before this bar
-            # Use a time window to account for timing differences
-            for i, trade in enumerate(self.trade_schedule):
-                if i in self.executed_trade_indices:
-                    continue
-
-                trade_dt = trade['datetime']
-
-                # Check if this trade should be executed now
-                # Execute if the trade datetime is within the time window of current bar
-                # or if we've passed the trade time
-                time_diff = (current_dt - trade_dt).total_seconds()
-
-                # Execute if we're close to the trade time (within 2 intervals) or passed it
-                # This handles cases where yfinance data doesn't have exact time matches
-                if time_diff >= 0:
-                    action = trade['trade_action']
-
-                    if action == 'buy':
-                        sl = trade['sl']
-                        tp = trade['tp']
-                        size = trade['size']
-
-                        # Only buy if we don't have an open position
-                        if len(self.trades) == 0:
-                            # Try to execute with TP/SL, fall back to without if validation fails
-                            try:
-                                self.buy(sl=sl, tp=tp, size=size)
-                                print(f"[REPLAY] BUY at {current_dt} - price: {self.data.Close[-1]:.5f}, size: {size}, SL: {sl}, TP: {tp}")
-                            except ValueError as e:
-                                if "require" in str(e).lower() or "tp" in str(e).lower() or "sl" in str(e).lower():
-                                    print(f"[REPLAY] BUY at {current_dt} - Invalid TP/SL, executing without: {e}")
-                                    self.buy(size=size)
-                                else:
-                                    raise
-
-                            self.trades_actions.append({
-                                "datetime": current_dt.strftime('%Y-%m-%d %H:%M:%S.%f'),
-                                "trade_action": "buy",
-                                "entry_price": self.data.Close[-1],
-                                "price": self.data.Close[-1],
-                                "sl": sl,
-                                "tp": tp,
-                                "size": size,
-                            })
-
-                    elif action == 'sell':
-                        sl = trade['sl']
-                        tp = trade['tp']
-                        size = trade['size']
-
-                        # Only sell if we don't have an open position
-                        if len(self.trades) == 0:
-                            # Try to execute with TP/SL, fall back to without if validation fails
-                            try:
-                                self.sell(sl=sl, tp=tp, size=size)
-                                print(f"[REPLAY] SELL at {current_dt} - price: {self.data.Close[-1]:.5f}, size: {size}, SL: {sl}, TP: {tp}")
-                            except ValueError as e:
-                                if "require" in str(e).lower() or "tp" in str(e).lower() or "sl" in str(e).lower():
-                                    print(f"[REPLAY] SELL at {current_dt} - Invalid TP/SL, executing without: {e}")
-                                    self.sell(size=size)
-                                else:
-                                    raise
-
-                            self.trades_actions.append({
-                                "datetime": current_dt.strftime('%Y-%m-%d %H:%M:%S.%f'),
-                                "trade_action": "sell",
-                                "entry_price": self.data.Close[-1],
-                                "price": self.data.Close[-1],
-                                "sl": sl,
-                                "tp": tp,
-                                "size": size,
-                            })
-
-                    elif action == 'close':
-                        # Close all open trades
-                        for trade_obj in list(self.trades):
-                            trade_obj.close()
-                            print(f"[REPLAY] CLOSE at {current_dt} - price: {self.data.Close[-1]:.5f}")
+                elif action == 'sell':
+                    sl = stop_losses[i]
+                    tp = take_profits[i]
+                    size = float(sizes[i])
+
+                    # Only sell if we don't have an open position
+                    if len(self.trades) == 0:
+                        # Try to execute with TP/SL, fall back to without if validation fails
+                        try:
+                            self.sell(sl=sl, tp=tp, size=size)
+                            print(f"[REPLAY] SELL at {current_dt} - price: {self.data.Close[-1]:.5f}, size: {size}, SL: {sl}, TP: {tp}")
+                        except ValueError as e:
+                            if "require" in str(e).lower() or "tp" in str(e).lower() or "sl" in str(e).lower():
+                                print(f"[REPLAY] SELL at {current_dt} - Invalid TP/SL, executing without: {e}")
+                                self.sell(size=size)
+                            else:
+                                raise
 
                         self.trades_actions.append({
-                            "datetime": current_dt.strftime('%Y-%m-%d %H:%M:%S.%f'),
-                            "trade_action": "close",
-                            "entry_price": None,
+                            "datetime": current_dt.to_pydatetime(),
+                            "trade_action": "sell",
+                            "entry_price": self.data.Close[-1],
                             "price": self.data.Close[-1],
-                            "sl": None,
-                            "tp": None,
-                            "size": None,
+                            "sl": sl,
+                            "tp": tp,
+                            "size": size,
                         })
 
-                    # Mark this trade as executed
-                    self.executed_trade_indices.add(i)
+                elif action == 'close':
+                    # Close all open trades
+                    for trade_obj in list(self.trades):
+                        trade_obj.close()
+                        print(f"[REPLAY] CLOSE at {current_dt} - price: {self.data.Close[-1]:.5f}")
+
+                    self.trades_actions.append({
+                        "datetime": current_dt.to_pydatetime(),
+                        "trade_action": "close",
+                        "entry_price": None,
+                        "price": self.data.Close[-1],
+                        "sl": None,
+                        "tp": None,
+                        "size": None,
+                    })
 
     # Run the backtest
     bt = Backtest(dftest, PredefinedTradeStrategy, cash=cash, margin=margin)
@@ -204,7 +180,7 @@ def backtest(df, trade_schedule, cash=100000, margin=1/500):
 
     strategy_parameters = {
         "replay": True,
-        "trade_count": len(trade_schedule),
+        "trade_count": schedule_count,
     }
 
     return bt, stats, trades_actions, strategy_parameters
@@ -0,0 +1,66 @@
+"""
+Columnar trade schedules for backtest replay and exports.
+
+A schedule is a dict of equal-length NumPy arrays keyed by
+TRADE_SCHEDULE_COLUMNS: ``datetime`` as tz-naive datetime64[ns],
+``trade_action`` as lowercase strings and the price/size columns as float64
+with NaN where the stored value is NULL. It is built straight from the
+tuples returned by TradeActionRepository.get_schedule_rows, so replaying a
+strategy with tens of thousands of trades never creates per-trade objects.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable, Mapping
+
+import numpy as np
+import pandas as pd
+
+from app.db.repository import TRADE_SCHEDULE_COLUMNS
+
+FLOAT_COLUMNS = ("entry_price", "price", "sl", "tp", "size")
+
+
+def _datetimes(values) -> np.ndarray:
+    index = pd.DatetimeIndex(pd.to_datetime(list(values), format="mixed")) if len(values) else pd.DatetimeIndex([])
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.as_unit("ns").to_numpy()
+
+
+def schedule_from_rows(rows: Iterable[tuple]) -> dict[str, np.ndarray]:
+    """Build a schedule from rows in TRADE_SCHEDULE_COLUMNS order."""
+    rows = list(rows)
+    columns = list(zip(*rows)) if rows else [() for _ in TRADE_SCHEDULE_COLUMNS]
+    raw = dict(zip(TRADE_SCHEDULE_COLUMNS, columns))
+    schedule = {
+        "datetime": _datetimes(raw["datetime"]),
+        "trade_action": np.array([str(a).lower() for a in raw["trade_action"]], dtype=object),
+    }
+    for name in FLOAT_COLUMNS:
+        # None → NaN via the float64 conversion
+        schedule[name] = np.array(raw[name], dtype=np.float64) if rows else np.empty(0)
+    return schedule
+
+
+def schedule_from_records(records: Iterable[Mapping]) -> dict[str, np.ndarray]:
+    """Build a schedule from trade action dicts (missing sl/tp default to NULL)."""
+    return schedule_from_rows(
+        tuple(record.get(name) for name in TRADE_SCHEDULE_COLUMNS) for record in records
+    )
+
+
+def schedule_hash(schedule: Mapping[str, np.ndarray]) -> str:
+    """Stable hash of a schedule; changes when any trade is added or edited."""
+    digest = hashlib.sha256()
+    digest.update(schedule["datetime"].view(np.int64).tobytes())
+    digest.update("\0".join(schedule["trade_action"]).encode("utf-8"))
+    for name in FLOAT_COLUMNS:
+        digest.update(np.ascontiguousarray(schedule[name]).tobytes())
+    return digest.hexdigest()
+
+
+def schedule_frame(schedule: Mapping[str, np.ndarray]) -> pd.DataFrame:
+    """DataFrame view of a schedule, columns in TRADE_SCHEDULE_COLUMNS order."""
+    return pd.DataFrame({name: schedule[name] for name in TRADE_SCHEDULE_COLUMNS})
@@ -3,6 +3,7 @@ from backtesting import Backtest
 import multiprocessing as mp
 import numpy as np
 import pandas as pd
+from app.signals.strategies.optimization import optimize_heatmap
 
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
@@ -76,7 +77,7 @@ class SuperSafeStrategy(Strategy):
                     trade.close()
                     if _strategy_parameters and _strategy_parameters.get('best', False):
                         self.trades_actions.append({
-                            "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                            "datetime": self.data.index[-1].to_pydatetime(),
                             "trade_action": "close_trail_sl",
                             "entry_price": trade.entry_price,
                             "price": self.trailing_stops[trade_id],
@@ -97,7 +98,7 @@ class SuperSafeStrategy(Strategy):
                     trade.close()
                     if _strategy_parameters and _strategy_parameters.get('best', False):
                         self.trades_actions.append({
-                            "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                            "datetime": self.data.index[-1].to_pydatetime(),
                             "trade_action": "close_trail_sl",
                             "entry_price": trade.entry_price,
                             "price": self.trailing_stops[trade_id],
@@ -112,7 +113,7 @@ class SuperSafeStrategy(Strategy):
                 trade.close()
                 if _strategy_parameters and _strategy_parameters.get('best', False):
                     self.trades_actions.append({
-                        "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                        "datetime": self.data.index[-1].to_pydatetime(),
                         "trade_action": "close",
                         "entry_price": trade.entry_price,
                         "price": self.data.Close[-1],
@@ -127,7 +128,7 @@ class SuperSafeStrategy(Strategy):
                 trade.close()
                 if _strategy_parameters and _strategy_parameters.get('best', False):
                     self.trades_actions.append({
-                        "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                        "datetime": self.data.index[-1].to_pydatetime(),
                         "trade_action": "close",
                         "entry_price": trade.entry_price,
                         "price": self.data.Close[-1],
@@ -174,7 +175,7 @@ class SuperSafeStrategy(Strategy):
 
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": current_price,
                     "price": current_price,
@@ -205,7 +206,7 @@ class SuperSafeStrategy(Strategy):
 
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": current_price,
                     "price": current_price,
@@ -268,7 +269,8 @@ def backtest(df, strategy_parameters, size=0.01, skip_optimization=False, best_p
         print("Optimizing super_safe_strategy...")
         bt = Backtest(dftest, SuperSafeStrategy, cash=cash, margin=margin, finalize_trades=True)
 
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             slcoef=[2.0, 4.0, 8.0, 12.0, 16.0, 20.0],
             TPSLRatio=[1.5, 2.0, 2.5, 3.0, 3.5, 4.0],
             trailing_sl=[1.5, 2.0, 2.5, 3.0, 3.5],
@@ -278,19 +280,11 @@ def backtest(df, strategy_parameters, size=0.01, skip_optimization=False, best_p
             maximize="Sharpe Ratio",
             max_tries=300,
             random_state=0,
-            return_heatmap=True,
         )
 
         # Find best parameters
         try:
-            heatmap_df = heatmap.unstack()
-            heatmap_df = heatmap_df.fillna(-999)
-            max_value = heatmap_df.max().max()
-
-            best_params = {}
-            best_opt_params = bt._optimizer.best_params
-            for param, value in best_opt_params.items():
-                best_params[param] = value
+            best_params = dict(zip(heatmap.index.names, heatmap.fillna(-999).idxmax()))
 
             print(f"Best parameters found: {best_params}")
         except Exception as e:
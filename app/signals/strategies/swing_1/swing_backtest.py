@@ -4,6 +4,7 @@ Backtest wrapper for the swing-1 support/resistance pattern strategy.
 from backtesting import Strategy
 from backtesting import Backtest
 import multiprocessing as mp
+from app.signals.strategies.optimization import optimize_heatmap
 
 if mp.get_start_method(allow_none=True) != 'fork':
     mp.set_start_method('fork', force=True)
@@ -53,7 +54,7 @@ class SwingStrat(Strategy):
             # Record trade action
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "buy",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -71,7 +72,7 @@ class SwingStrat(Strategy):
             # Record trade action
             if _strategy_parameters and _strategy_parameters.get('best', False):
                 self.trades_actions.append({
-                    "datetime": self.data.index[-1].strftime('%Y-%m-%d %H:%M:%S.%f'),
+                    "datetime": self.data.index[-1].to_pydatetime(),
                     "trade_action": "sell",
                     "entry_price": self.data.Close[-1],
                     "price": self.data.Close[-1],
@@ -122,13 +123,13 @@ def backtest(df, strategy_parameters, size=0.03, skip_optimization=False, best_p
         print("Optimizing swing-1...")
         bt = Backtest(dftest, SwingStrat, cash=cash, margin=margin)
 
-        stats, heatmap = bt.optimize(
+        heatmap = optimize_heatmap(
+            bt,
             slcoef=[i / 10 for i in range(10, 51, 2)],
             TPSLRatio=[i / 10 for i in range(15, 25, 2)],
             maximize="Win Rate [%]",
             max_tries=300,
             random_state=0,
-            return_heatmap=True,
         )
 
         # Convert multiindex series to dataframe
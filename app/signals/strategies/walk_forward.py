@@ -0,0 +1,238 @@
+"""
+Walk-forward optimisation with out-of-sample evaluation.
+
+A regular backtest optimises and evaluates on the same window, so the "best"
+parameters always look good in-sample. Walk-forward mode splits the frame into
+rolling train/test folds instead:
+
+    |---- train 0 ----|- test 0 -|
+              |---- train 1 ----|- test 1 -|
+                        |---- train 2 ----|- test 2 -|
+
+Each fold optimises on its train window and is then scored, with those
+parameters, on the unseen test window that directly follows it. Only the test
+windows count towards the reported stats.
+
+Signals are computed once on the full frame by the caller and sliced per fold,
+so indicators are already warmed up at the start of every test window. Folds
+run concurrently in forked worker processes which inherit the signals frame
+(nothing is pickled), and each worker's optimiser pool is sized so the folds
+together don't oversubscribe the CPU.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from .perform_backtest import perform_backtest
+
+# Signals frame inherited by forked fold workers (set in _init_worker)
+_signals_df: pd.DataFrame | None = None
+
+
+def walk_forward_folds(n_bars, n_folds=4, train_ratio=3.0):
+    """
+    Split ``n_bars`` into rolling (train_start, train_end, test_end) positions.
+
+    Test windows are contiguous and non-overlapping; each train window is
+    ``train_ratio`` times the size of a test window and ends where its test
+    window begins. Any remainder bars are dropped from the start of the frame
+    so the last test window always ends on the most recent bar.
+    """
+    if n_folds < 1:
+        raise ValueError("n_folds must be at least 1")
+    if train_ratio <= 0:
+        raise ValueError("train_ratio must be positive")
+
+    test_bars = int(n_bars // (n_folds + train_ratio))
+    train_bars = int(test_bars * train_ratio)
+    if test_bars < 1 or train_bars < 1:
+        raise ValueError(
+            f"Not enough data for {n_folds} walk-forward folds: {n_bars} bars available"
+        )
+
+    offset = n_bars - (train_bars + n_folds * test_bars)
+    folds = []
+    for i in range(n_folds):
+        train_start = offset + i * test_bars
+        train_end = train_start + train_bars
+        folds.append((train_start, train_end, train_end + test_bars))
+    return folds
+
+
+def _init_worker(signals_df, optimizer_processes):
+    global _signals_df
+    _signals_df = signals_df
+
+    # bt.optimize() creates its pool via backtesting.Pool; cap its size so
+    # concurrent folds share the CPU instead of each claiming every core.
+    import backtesting
+
+    backtesting.Pool = partial(backtesting.Pool, optimizer_processes)
+
+
+def _fold_stats(stats):
+    """Pick the JSON-friendly subset of a backtesting stats Series used for aggregation."""
+    trades = stats["_trades"]
+    return {
+        "return_percentage": _finite(stats["Return [%]"]),
+        "win_rate": _finite(stats["Win Rate [%]"]),
+        "trade_count": int(stats["# Trades"]),
+        "max_drawdown_percentage": _finite(stats["Max. Drawdown [%]"]),
+        "sharpe_ratio": _finite(stats["Sharpe Ratio"]),
+        "profit_factor": _finite(stats["Profit Factor"]),
+        "trade_returns": [float(r) for r in trades["ReturnPct"]] if len(trades) else [],
+    }
+
+
+def _finite(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) or math.isinf(value) else value
+
+
+def _run_fold(fold_index, train_start, train_end, test_end, strategy, parameters):
+    """Optimise on the train slice, then evaluate the chosen params on the test slice."""
+    train_df = _signals_df.iloc[train_start:train_end]
+    test_df = _signals_df.iloc[train_end:test_end]
+
+    _, train_stats, _, train_parameters = perform_backtest(
+        train_df, strategy, dict(parameters), skip_optimization=False
+    )
+    if train_stats is None:
+        raise ValueError(f"Fold {fold_index}: in-sample backtest returned no results")
+
+    best_params = {k: v for k, v in train_parameters.items() if k != "best"}
+    _, test_stats, _, _ = perform_backtest(
+        test_df, strategy, dict(parameters), skip_optimization=True, best_params=dict(best_params)
+    )
+    if test_stats is None:
+        raise ValueError(f"Fold {fold_index}: out-of-sample backtest returned no results")
+
+    in_sample = _fold_stats(train_stats)
+    return {
+        "fold": fold_index,
+        "train_start": train_df.index[0],
+        "train_end": train_df.index[-1],
+        "test_start": test_df.index[0],
+        "test_end": test_df.index[-1],
+        "best_params": {k: _to_builtin(v) for k, v in best_params.items()},
+        "in_sample_return_percentage": in_sample["return_percentage"],
+        "in_sample_win_rate": in_sample["win_rate"],
+        **_fold_stats(test_stats),
+    }
+
+
+def _to_builtin(value):
+    return value.item() if hasattr(value, "item") else value
+
+
+def aggregate_out_of_sample(folds):
+    """
+    Combine per-fold out-of-sample results into one summary.
+
+    Returns are compounded across folds (each test window starts from the
+    previous one's equity), trade statistics are pooled over every
+    out-of-sample trade, and walk-forward efficiency is the mean
+    out-of-sample return divided by the mean in-sample return.
+    """
+    growth = 1.0
+    for fold in folds:
+        growth *= 1 + (fold["return_percentage"] or 0.0) / 100
+
+    trade_returns = [r for fold in folds for r in fold["trade_returns"]]
+    gross_profit = sum(r for r in trade_returns if r > 0)
+    gross_loss = -sum(r for r in trade_returns if r < 0)
+    wins = sum(1 for r in trade_returns if r > 0)
+
+    drawdowns = [
+        f["max_drawdown_percentage"] for f in folds if f["max_drawdown_percentage"] is not None
+    ]
+    sharpes = [f["sharpe_ratio"] for f in folds if f["sharpe_ratio"] is not None]
+    oos_returns = [f["return_percentage"] or 0.0 for f in folds]
+    is_returns = [f["in_sample_return_percentage"] or 0.0 for f in folds]
+    mean_is = sum(is_returns) / len(is_returns) if is_returns else 0.0
+
+    return {
+        "fold_count": len(folds),
+        "profitable_folds": sum(1 for r in oos_returns if r > 0),
+        "return_percentage": (growth - 1) * 100,
+        "average_fold_return_percentage": (
+            sum(oos_returns) / len(oos_returns) if oos_returns else 0.0
+        ),
+        "trade_count": len(trade_returns),
+        "win_rate": wins / len(trade_returns) * 100 if trade_returns else 0.0,
+        "avg_trade_percentage": (
+            sum(trade_returns) / len(trade_returns) * 100 if trade_returns else 0.0
+        ),
+        "profit_factor": gross_profit / gross_loss if gross_loss else None,
+        # Drawdowns are reported as negative percentages by backtesting.py
+        "max_drawdown_percentage": min(drawdowns) if drawdowns else None,
+        "average_sharpe_ratio": sum(sharpes) / len(sharpes) if sharpes else None,
+        "walk_forward_efficiency": (
+            (sum(oos_returns) / len(oos_returns)) / mean_is if oos_returns and mean_is > 0 else None
+        ),
+    }
+
+
+def walk_forward_backtest(
+    signals_df, strategy, parameters, n_folds=4, train_ratio=3.0, max_workers=None
+):
+    """
+    Run a walk-forward backtest over a precomputed signals frame.
+
+    Args:
+        signals_df: DataFrame with OHLCV data and the strategy's signal columns
+        strategy: Strategy name, as accepted by perform_backtest
+        parameters: Base strategy parameters (size, defaults, ...)
+        n_folds: Number of rolling train/test folds
+        train_ratio: Train window length as a multiple of the test window length
+        max_workers: Concurrent fold processes (defaults to min(n_folds, CPU count))
+
+    Returns:
+        Dict with the per-fold results ("folds") and the aggregated
+        out-of-sample stats ("out_of_sample").
+    """
+    if signals_df is None or signals_df.empty:
+        raise ValueError("walk_forward_backtest: signals_df is None or empty")
+
+    folds = walk_forward_folds(len(signals_df), n_folds, train_ratio)
+
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(max_workers or cpu_count, len(folds)))
+    optimizer_processes = max(1, cpu_count // workers)
+    print(f"Walk-forward {strategy}: {len(folds)} folds on {workers} workers")
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp.get_context("fork"),
+        initializer=_init_worker,
+        initargs=(signals_df, optimizer_processes),
+    ) as pool:
+        futures = [
+            pool.submit(_run_fold, i, train_start, train_end, test_end, strategy, parameters)
+            for i, (train_start, train_end, test_end) in enumerate(folds)
+        ]
+        try:
+            results = [future.result() for future in futures]
+        except Exception as e:
+            logging.error(
+                "walk_forward_backtest failed for strategy=%s: %s", strategy, e, exc_info=True
+            )
+            for future in futures:
+                future.cancel()
+            raise
+
+    return {
+        "folds": results,
+        "out_of_sample": aggregate_out_of_sample(results),
+    }
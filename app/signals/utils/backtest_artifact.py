@@ -0,0 +1,196 @@
+"""
+Compact, re-renderable snapshot of a finished backtest.
+
+Rendering the Bokeh report is one of the slowest steps of a backtest run and
+most nightly results are never opened. Instead of always calling ``bt.plot``,
+the run stores the arrays the plot is built from — OHLCV, equity curve,
+trades and strategy indicators — as a compressed ``.npz`` archive. The HTML
+is rendered from that archive only when it is first requested.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from backtesting import _plotting
+from backtesting._util import _Indicator
+from bokeh.embed import file_html
+from bokeh.resources import CDN
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+EQUITY_COLUMNS = ["Equity", "DrawdownPct", "DrawdownDuration"]
+TRADE_NUMERIC_COLUMNS = [
+    "Size", "EntryBar", "ExitBar", "EntryPrice", "ExitPrice", "SL", "TP", "PnL", "ReturnPct",
+]
+TRADE_TIME_COLUMNS = ["EntryTime", "ExitTime"]
+# Indicator options that affect rendering; the rest (e.g. index) is rebuilt on load
+INDICATOR_OPTS = ("plot", "overlay", "scatter", "color")
+
+_BOKEH_LOCK = threading.Lock()
+
+
+def _datetimes_to_ns(values) -> np.ndarray:
+    return pd.DatetimeIndex(values).tz_localize(None).asi8 if len(values) else np.empty(0, np.int64)
+
+
+def _timedeltas_to_float(values) -> np.ndarray:
+    # NaT → NaN so the column fits in a float array
+    return pd.to_timedelta(values).to_numpy(dtype="timedelta64[ns]").astype("float64").copy()
+
+
+def _json_opt(value):
+    """Indicator names/options may be numpy scalars, arrays or tuples; make them JSON-safe."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, np.ndarray) and value.ndim == 0:
+        return _json_opt(value.item())
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_json_opt(v) for v in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    return str(value)
+
+
+def pack_backtest_artifact(bt, stats) -> bytes:
+    """Serialise the data needed to re-render ``bt.plot()`` into compressed bytes."""
+    data = bt._data
+    equity = stats["_equity_curve"]
+    trades = stats["_trades"]
+    indicators = stats["_strategy"]._indicators
+
+    tz = getattr(data.index, "tz", None)
+    arrays = {
+        "index": _datetimes_to_ns(data.index),
+        "ohlcv": data[OHLCV_COLUMNS].to_numpy(dtype="float64"),
+        "equity": np.column_stack(
+            [
+                equity["Equity"].to_numpy(dtype="float64"),
+                equity["DrawdownPct"].to_numpy(dtype="float64"),
+                _timedeltas_to_float(equity["DrawdownDuration"]),
+            ]
+        ),
+        "trades": trades[TRADE_NUMERIC_COLUMNS]
+        .to_numpy(dtype="float64")
+        .reshape(-1, len(TRADE_NUMERIC_COLUMNS)),
+        "trade_times": np.column_stack(
+            [_datetimes_to_ns(trades[c]) for c in TRADE_TIME_COLUMNS]
+        ).reshape(-1, len(TRADE_TIME_COLUMNS)),
+    }
+
+    indicator_meta = []
+    for i, indicator in enumerate(indicators):
+        arrays[f"indicator_{i}"] = np.atleast_2d(np.asarray(indicator, dtype="float64"))
+        opts = {k: _json_opt(indicator._opts.get(k)) for k in INDICATOR_OPTS}
+        indicator_meta.append({"name": _json_opt(indicator.name), "opts": opts})
+
+    meta = {
+        "strategy": str(stats["_strategy"]),
+        "tz": str(tz) if tz is not None else None,
+        "trade_tags": (
+            [None if pd.isna(t) else str(t) for t in trades["Tag"]] if "Tag" in trades else []
+        ),
+        "indicators": indicator_meta,
+    }
+    arrays["meta"] = np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def _to_index(ns: np.ndarray, tz: str | None) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(ns.astype("datetime64[ns]"))
+    return index.tz_localize(tz) if tz else index
+
+
+def unpack_backtest_artifact(payload: bytes) -> tuple[pd.Series, pd.DataFrame, list]:
+    """Rebuild ``(results, df, indicators)`` as expected by backtesting's plot()."""
+    with np.load(io.BytesIO(payload), allow_pickle=False) as archive:
+        arrays = {key: archive[key] for key in archive.files}
+    meta = json.loads(arrays["meta"].tobytes().decode("utf-8"))
+    tz = meta["tz"]
+
+    index = _to_index(arrays["index"], tz)
+    df = pd.DataFrame(arrays["ohlcv"], index=index, columns=OHLCV_COLUMNS)
+
+    equity_values = arrays["equity"]
+    equity = pd.DataFrame(
+        {
+            "Equity": equity_values[:, 0],
+            "DrawdownPct": equity_values[:, 1],
+            "DrawdownDuration": pd.to_timedelta(equity_values[:, 2], unit="ns"),
+        },
+        index=index,
+    )
+
+    trades = pd.DataFrame(arrays["trades"], columns=TRADE_NUMERIC_COLUMNS)
+    for col in ("EntryBar", "ExitBar"):
+        trades[col] = trades[col].astype(int)
+    trade_times = arrays["trade_times"]
+    for i, col in enumerate(TRADE_TIME_COLUMNS):
+        trades[col] = _to_index(trade_times[:, i], tz)
+    trades["Duration"] = trades["ExitTime"] - trades["EntryTime"]
+    trades["Tag"] = meta["trade_tags"] or [None] * len(trades)
+
+    indicators = []
+    for i, info in enumerate(meta["indicators"]):
+        values = arrays[f"indicator_{i}"]
+        values = values[0] if values.shape[0] == 1 else values
+        name = info["name"] if isinstance(info["name"], str) else list(info["name"])
+        indicators.append(_Indicator(values, name=name, index=index, **info["opts"]))
+
+    results = pd.Series(
+        {"_strategy": meta["strategy"], "_equity_curve": equity, "_trades": trades},
+        dtype=object,
+    )
+    return results, df, indicators
+
+
+@contextmanager
+def _without_show():
+    """
+    Make backtesting's plot skip its final ``show``, which would write the
+    report to ``<filename>.html``; the original is restored afterwards.
+    """
+    original = _plotting.show
+    _plotting.show = lambda *args, **kwargs: None
+    try:
+        yield
+    finally:
+        _plotting.show = original
+
+
+def plot_html(
+    results: pd.Series, df: pd.DataFrame, indicators: list, title: str = "Backtest"
+) -> str:
+    """
+    Render a backtesting.py report to an HTML string without touching the disk.
+
+    Bokeh keeps the current document in process-global state, so renders are
+    serialised per process; run them in separate processes for parallelism.
+    """
+    with _BOKEH_LOCK, _without_show():
+        try:
+            # Plot without superimposition first to avoid upsampling issues
+            fig = _plotting.plot(results=results, df=df, indicators=indicators, filename=title,
+                                 superimpose=False, open_browser=False)
+        except Exception:
+            fig = _plotting.plot(results=results, df=df, indicators=indicators, filename=title,
+                                 open_browser=False)
+        return file_html(fig, CDN, title)
+
+
+def backtest_html(bt) -> str:
+    """Render the report of a Backtest that has been run, in memory."""
+    results = bt._results
+    return plot_html(results, bt._data, results["_strategy"]._indicators)
+
+
+def render_backtest_html(payload: bytes) -> str:
+    """Render the backtest report HTML from a packed artifact."""
+    return plot_html(*unpack_backtest_artifact(payload))
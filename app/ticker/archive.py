@@ -0,0 +1,215 @@
+"""
+Batch archive jobs for a whole watchlist.
+
+One job archives the price history and/or fundamentals of many tickers
+(the request's list, or the latest stock_lists snapshot when none is given):
+
+- histories are downloaded with multi-ticker ``yf.download`` calls in chunks
+  of ARCHIVE_CHUNK_SIZE tickers, from the earliest last archived day of the
+  chunk (or 5 years back for tickers without bars), and each chunk's new bars
+  are upserted in one bulk write;
+- fundamentals refresh each ticker's stale sections with at most
+  ARCHIVE_INFO_CONCURRENCY tickers in flight, writing every chunk's updates
+  in one bulk write.
+
+Jobs run on a JobRegistry (see app/signals/jobs.py) with a single worker; the
+job's ``result`` reports the counts so far and the error of every failed ticker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+import pandas as pd
+import yfinance as yf
+from pymongo import UpdateOne
+
+from app.base.utils.mongodb import COLLECTIONS, connect_mongodb
+from app.signals.jobs import Job, JobRegistry
+from app.ticker.fundamentals import fetch_sections, section_update, stale_sections, utcnow
+from app.ticker.price_bars import bar_upserts, history_records, latest_bar_times
+
+CHUNK_SIZE = int(os.getenv("ARCHIVE_CHUNK_SIZE", "50"))
+INFO_CONCURRENCY = int(os.getenv("ARCHIVE_INFO_CONCURRENCY", "4"))
+
+
+def _chunks(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+async def watchlist_tickers(db) -> list[str]:
+    """Symbols of the most recent stock_lists snapshot."""
+    snapshot = await db[COLLECTIONS["stock_lists"]].find_one({}, sort=[("_id", -1)])
+    if not snapshot:
+        return []
+    return [row["Symbol"] for row in snapshot.get("data", []) if row.get("Symbol")]
+
+
+def download_histories(tickers: list[str], start: str | None) -> dict[str, pd.DataFrame]:
+    """Daily bars per ticker from one yf.download call (blocking)."""
+    kwargs = {"start": start} if start else {"period": "5y"}
+    frame = yf.download(
+        tickers,
+        interval="1d",
+        group_by="ticker",
+        auto_adjust=True,
+        threads=True,
+        progress=False,
+        **kwargs,
+    )
+    histories = {}
+    for ticker in tickers:
+        if isinstance(frame.columns, pd.MultiIndex):
+            if ticker not in frame.columns.get_level_values(0):
+                continue
+            history = frame[ticker]
+        else:
+            history = frame
+        history = history.dropna(how="all")
+        if not history.empty:
+            histories[ticker] = history
+    return histories
+
+
+class ArchiveProgress:
+    """Running totals of a job, reported through the registry's on_progress."""
+
+    def __init__(self, tickers: list[str], steps: int, on_progress=None):
+        self.on_progress = on_progress
+        self.total = max(len(tickers) * steps, 1)
+        self.done = 0
+        self.result = {
+            "tickers": len(tickers),
+            "history": {"inserted": 0, "updated": 0, "archived": 0},
+            "info": {"refreshed": 0, "fresh": 0},
+            "failed": {},
+        }
+
+    def fail(self, ticker: str, stage: str, error) -> None:
+        logging.warning("Archiving %s %s failed: %s", ticker, stage, error)
+        self.result["failed"].setdefault(ticker, {})[stage] = str(error)
+
+    def report(self, stage: str, tickers: int) -> None:
+        self.done += tickers
+        if self.on_progress is not None:
+            self.on_progress(stage, self.done / self.total, result=self.result)
+
+
+async def archive_histories(db, tickers: list[str], progress: ArchiveProgress) -> None:
+    collection = db[COLLECTIONS["price_bars"]]
+    for chunk in _chunks(tickers, CHUNK_SIZE):
+        last_times = await latest_bar_times(collection, chunk)
+        # Tickers without bars need the full window; the rest only the new days
+        groups = [
+            ([t for t in chunk if t not in last_times], None),
+            ([t for t in chunk if t in last_times], min(last_times.values(), default=None)),
+        ]
+        records = []
+        for group, start in groups:
+            if not group:
+                continue
+            try:
+                histories = await asyncio.to_thread(download_histories, group, start)
+            except Exception as e:
+                for ticker in group:
+                    progress.fail(ticker, "history", e)
+                continue
+            for ticker in group:
+                if ticker not in histories:
+                    progress.fail(ticker, "history", "No price data returned")
+                    continue
+                new = history_records(ticker, histories[ticker])
+                if ticker in last_times:
+                    new = [record for record in new if record["time"] >= last_times[ticker]]
+                records.extend(new)
+                progress.result["history"]["archived"] += 1
+
+        if records:
+            try:
+                result = await collection.bulk_write(bar_upserts(records), ordered=False)
+                progress.result["history"]["inserted"] += result.upserted_count
+                progress.result["history"]["updated"] += result.modified_count
+            except Exception as e:
+                for ticker in {record["ticker"] for record in records}:
+                    progress.fail(ticker, "history", e)
+        progress.report("history", len(chunk))
+
+
+async def archive_fundamentals(db, tickers: list[str], progress: ArchiveProgress) -> None:
+    collection = db[COLLECTIONS["ticker_infos"]]
+    semaphore = asyncio.Semaphore(INFO_CONCURRENCY)
+
+    async def refresh(ticker: str, document: dict | None, now):
+        stale = stale_sections(document, now)
+        if not stale:
+            progress.result["info"]["fresh"] += 1
+            return None
+        async with semaphore:
+            fetched = await fetch_sections(yf.Ticker(ticker), stale)
+        if not fetched:
+            progress.fail(ticker, "info", "No sections could be fetched")
+            return None
+        missing = sorted(set(stale) - set(fetched))
+        if missing:
+            progress.fail(ticker, "info", f"Failed sections: {', '.join(missing)}")
+        return ticker, UpdateOne({"ticker": ticker}, section_update(fetched, now), upsert=True)
+
+    for chunk in _chunks(tickers, CHUNK_SIZE):
+        now = utcnow()
+        documents = {
+            doc["ticker"]: doc
+            async for doc in collection.find({"ticker": {"$in": chunk}}, {"ticker": 1, "fetched_at": 1})
+        }
+        # (ticker, update) pairs, so a failed write can be reported per ticker
+        updates = await asyncio.gather(
+            *(refresh(ticker, documents.get(ticker), now) for ticker in chunk)
+        )
+        updates = [update for update in updates if update is not None]
+        if updates:
+            try:
+                await collection.bulk_write([update for _, update in updates], ordered=False)
+                progress.result["info"]["refreshed"] += len(updates)
+            except Exception as e:
+                for ticker, _ in updates:
+                    progress.fail(ticker, "info", e)
+        progress.report("info", len(chunk))
+
+
+async def run_archive_job(
+    tickers: list[str] | None = None,
+    history: bool = True,
+    info: bool = True,
+    job_id: str | None = None,
+    on_progress=None,
+) -> dict:
+    db = await connect_mongodb()
+    tickers = list(dict.fromkeys(tickers or await watchlist_tickers(db)))
+    progress = ArchiveProgress(tickers, int(history) + int(info), on_progress)
+    print(f"Archive job {job_id}: {len(tickers)} tickers")
+
+    if history:
+        await archive_histories(db, tickers, progress)
+    if info:
+        await archive_fundamentals(db, tickers, progress)
+    progress.report("done", 0)
+    return progress.result
+
+
+_registry: JobRegistry | None = None
+
+
+def get_archive_registry() -> JobRegistry:
+    global _registry
+    if _registry is None:
+        _registry = JobRegistry(
+            run_archive_job,
+            workers=1,
+            queue_size=int(os.getenv("ARCHIVE_JOB_QUEUE_SIZE", "5")),
+            job_id_arg="job_id",
+            name="archive",
+            job_type=Job,
+        )
+    return _registry
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any
 
 
 class TickerRequestDTO(BaseModel):
@@ -9,3 +9,45 @@ class TickerRequestDTO(BaseModel):
 class TickerResponseDTO(BaseModel):
     status: int = Field(...)
     message: str = Field(...)
+
+
+class PriceBarsQueryDTO(BaseModel):
+    ticker: str = Field(...)
+    # YYYY-MM-DD, inclusive
+    start: str | None = Field(None)
+    end: str | None = Field(None)
+
+
+class PriceBar(BaseModel):
+    time: str = Field(...)
+    open: float = Field(...)
+    high: float = Field(...)
+    low: float = Field(...)
+    close: float = Field(...)
+    volume: float = Field(...)
+
+
+class PriceHistoryResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    # inserted / updated bar counts
+    data: dict[str, int] | None = Field(None)
+
+
+class PriceBarsResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: list[PriceBar] = Field(...)
+
+
+class ArchiveJobRequestDTO(BaseModel):
+    # Defaults to the latest stock_lists snapshot
+    tickers: list[str] | None = Field(None)
+    history: bool = Field(True)
+    info: bool = Field(True)
+
+
+class ArchiveJobResponseDTO(BaseModel):
+    status: int = Field(...)
+    message: str = Field(...)
+    data: dict[str, Any] = Field(...)
@@ -0,0 +1,124 @@
+"""
+Per-section fundamentals cache for /tickers/info.
+
+The ticker_infos document of a ticker keeps every section (info, statements,
+holders, news) as its own field next to ``fetched_at.<section>``. A request
+only refetches the sections older than their TTL, concurrently in a bounded
+thread pool since every yfinance property is a blocking HTTP call, and
+$sets just those fields. Statements only change with a new filing, so they
+are refetched weekly; ``info`` daily and news hourly.
+
+DataFrames and Series are stored as their default ``to_json`` form (column →
+index → value, dates as epoch milliseconds), the shape clients already read.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+HOUR = datetime.timedelta(hours=1)
+DAY = datetime.timedelta(days=1)
+WEEK = datetime.timedelta(days=7)
+
+# Section → (yfinance Ticker attribute, TTL)
+SECTIONS = {
+    "info": ("info", DAY),
+    "dividend": ("dividends", DAY),
+    "income": ("income_stmt", WEEK),
+    "quarterly_income": ("quarterly_income_stmt", WEEK),
+    "balance": ("balance_sheet", WEEK),
+    "quarterly_balance": ("quarterly_balance_sheet", WEEK),
+    "cashflow": ("cashflow", WEEK),
+    "quarterly_cashflow": ("quarterly_cashflow", WEEK),
+    "major_holders": ("major_holders", WEEK),
+    "institutional_holders": ("institutional_holders", WEEK),
+    "mutualfund_holders": ("mutualfund_holders", WEEK),
+    "news": ("news", HOUR),
+}
+
+_pool: ThreadPoolExecutor | None = None
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("TICKER_FETCH_WORKERS", "6")),
+            thread_name_prefix="fundamentals",
+        )
+    return _pool
+
+
+def compact(value):
+    """Store-ready form of a yfinance section (``to_json`` form for frames and series)."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return json.loads(value.to_json())
+    return value
+
+
+def stale_sections(document: dict | None, now: datetime.datetime) -> list[str]:
+    fetched_at = (document or {}).get("fetched_at") or {}
+    return [
+        name
+        for name, (_, ttl) in SECTIONS.items()
+        if fetched_at.get(name) is None or now - fetched_at[name] >= ttl
+    ]
+
+
+def _fetch(ticker_data, name: str):
+    return compact(getattr(ticker_data, SECTIONS[name][0]))
+
+
+async def fetch_sections(ticker_data, names: list[str]) -> dict:
+    """Fetch sections concurrently; sections that fail are logged and left out."""
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    results = await asyncio.gather(
+        *(loop.run_in_executor(pool, _fetch, ticker_data, name) for name in names),
+        return_exceptions=True,
+    )
+    fetched = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logging.warning("Failed to fetch %s: %s", name, result)
+            continue
+        fetched[name] = result
+    return fetched
+
+
+def utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+def section_update(fetched: dict, now: datetime.datetime) -> dict:
+    """$set of freshly fetched sections and their fetched_at times."""
+    update = dict(fetched)
+    update.update({f"fetched_at.{name}": now for name in fetched})
+    return {"$set": update}
+
+
+async def refresh_fundamentals(
+    collection, ticker: str, ticker_data, now: datetime.datetime | None = None
+) -> dict:
+    """
+    Refetch the stale sections of ``ticker`` and return its full document
+    (without _id). ``ticker_data`` is the yfinance Ticker to read from.
+    """
+    now = now or utcnow()
+    document = await collection.find_one({"ticker": ticker}, {"_id": 0})
+    fetched = await fetch_sections(ticker_data, stale_sections(document, now))
+    if fetched:
+        await collection.update_one({"ticker": ticker}, section_update(fetched, now), upsert=True)
+
+    document = document or {"ticker": ticker}
+    document.update(fetched)
+    fetched_at = document.get("fetched_at") or {}
+    document["fetched_at"] = {**fetched_at, **{name: now for name in fetched}}
+    return document
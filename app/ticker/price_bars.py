@@ -0,0 +1,81 @@
+"""
+Append-only daily price history, one document per ticker and day.
+
+The price_bars collection holds
+
+    {
+        "_id": "AAPL:2024-01-02",
+        "ticker": "AAPL",
+        "time": "2024-01-02",        # trading day, sortable string
+        "open", "high", "low", "close", "volume",
+    }
+
+with a unique (ticker, time) index, so a refresh only upserts the bars from
+the last stored day on (that day is re-written in case it was still partial)
+and consumers read any date range with an index scan. A Mongo time-series
+collection would store the bars more compactly but does not support the
+upserts that make refreshes idempotent.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
+PRICE_BAR_INDEX = [("ticker", ASCENDING), ("time", ASCENDING)]
+
+
+def history_records(ticker: str, history: pd.DataFrame) -> list[dict]:
+    """Bar documents for a yfinance history frame, built column-wise."""
+    if history.empty:
+        return []
+    frame = history[["Open", "High", "Low", "Close", "Volume"]].astype("float64").round(5)
+    frame.columns = PRICE_COLUMNS
+    frame = frame.dropna(subset=["close"])
+    time = frame.index.strftime("%Y-%m-%d")
+    frame.insert(0, "time", time)
+    frame.insert(0, "ticker", ticker)
+    frame.insert(0, "_id", ticker + ":" + time)
+    return frame.to_dict("records")
+
+
+def bar_upserts(records: list[dict]) -> list[UpdateOne]:
+    return [UpdateOne({"_id": record["_id"]}, {"$set": record}, upsert=True) for record in records]
+
+
+async def latest_bar_time(collection, ticker: str) -> str | None:
+    doc = await collection.find_one(
+        {"ticker": ticker}, {"_id": 0, "time": 1}, sort=[("time", DESCENDING)]
+    )
+    return doc["time"] if doc else None
+
+
+async def latest_bar_times(collection, tickers: list[str]) -> dict[str, str]:
+    """Last archived day of each ticker that has bars, in one aggregation."""
+    pipeline = [
+        {"$match": {"ticker": {"$in": tickers}}},
+        {"$group": {"_id": "$ticker", "time": {"$max": "$time"}}},
+    ]
+    return {doc["_id"]: doc["time"] async for doc in collection.aggregate(pipeline)}
+
+
+async def write_bars(collection, records: list[dict]) -> dict:
+    """Upsert bars in one unordered bulk write; returns inserted / updated counts."""
+    if not records:
+        return {"inserted": 0, "updated": 0}
+    result = await collection.bulk_write(bar_upserts(records), ordered=False)
+    return {"inserted": result.upserted_count, "updated": result.modified_count}
+
+
+async def read_bars(collection, ticker: str, start: str | None = None, end: str | None = None) -> list[dict]:
+    """Bars of ``ticker`` with start <= time <= end (YYYY-MM-DD, either bound optional), oldest first."""
+    query: dict = {"ticker": ticker}
+    if start or end:
+        query["time"] = {}
+        if start:
+            query["time"]["$gte"] = start
+        if end:
+            query["time"]["$lte"] = end
+    projection = {"_id": 0, "time": 1, **{name: 1 for name in PRICE_COLUMNS}}
+    return [doc async for doc in collection.find(query, projection).sort("time", ASCENDING)]
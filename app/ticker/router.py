@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from dotenv import load_dotenv
-from app.ticker.dto import TickerRequestDTO, TickerResponseDTO
-from app.ticker import service
-from starlette.status import HTTP_200_OK
+from app.ticker.dto import (
+    ArchiveJobRequestDTO,
+    ArchiveJobResponseDTO,
+    PriceBarsQueryDTO,
+    PriceBarsResponseDTO,
+    PriceHistoryResponseDTO,
+    TickerRequestDTO,
+    TickerResponseDTO,
+)
+from app.ticker import archive, service
+from starlette.status import HTTP_200_OK, HTTP_202_ACCEPTED
 
 load_dotenv()
 
@@ -15,12 +23,17 @@ router = APIRouter(
 # run daily
 
 
-@router.get("/history", response_model=TickerResponseDTO, status_code=HTTP_200_OK)
+@router.get("/history", response_model=PriceHistoryResponseDTO, status_code=HTTP_200_OK)
 async def archieve_ticker_price_history(params: TickerRequestDTO = Depends()):
     ticker = params.ticker
     data = await service.get_ticker_price_history(ticker)
     return data
 
+
+@router.get("/history/bars", response_model=PriceBarsResponseDTO, status_code=HTTP_200_OK)
+async def get_ticker_price_bars(params: PriceBarsQueryDTO = Depends()):
+    return await service.get_ticker_price_bars(params.ticker, params.start, params.end)
+
 # run daily
 
 
@@ -29,3 +42,30 @@ async def achieve_ticker_info(params: TickerRequestDTO = Depends()):
     ticker = params.ticker
     data = await service.get_ticker_data(ticker)
     return data
+
+
+@router.post("/archive-jobs", response_model=ArchiveJobResponseDTO, status_code=HTTP_202_ACCEPTED)
+async def submit_archive_job(params: ArchiveJobRequestDTO):
+    """
+    Archive price history and/or fundamentals for many tickers in one job
+    (the latest stock_lists snapshot if no tickers are given). Poll
+    /tickers/archive-jobs/{job_id} for progress and per-ticker failures.
+    """
+    job = archive.get_archive_registry().submit(params.model_dump())
+    return {
+        "status": HTTP_202_ACCEPTED,
+        "message": "Archive job queued",
+        "data": job.snapshot(),
+    }
+
+
+@router.get("/archive-jobs/{job_id}", response_model=ArchiveJobResponseDTO, status_code=HTTP_200_OK)
+async def get_archive_job(job_id: str):
+    job = archive.get_archive_registry().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Archive job {job_id} not found")
+    return {
+        "status": HTTP_200_OK,
+        "message": "Archive job",
+        "data": job.snapshot(),
+    }
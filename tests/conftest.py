@@ -56,17 +56,75 @@ async def db_session() -> AsyncSession:
 # MongoDB mock engine for unit tests
 # ---------------------------------------------------------------------------
 
+def _accept_bulk_sort(monkeypatch) -> None:
+    """
+    Let mongomock's bulk builder take the ``sort`` argument that newer pymongo
+    passes from UpdateOne / ReplaceOne. Only the unsorted form is supported.
+    """
+    from mongomock.collection import BulkOperationBuilder
+
+    for name in ("add_update", "add_replace"):
+        original = getattr(BulkOperationBuilder, name)
+
+        def add(self, *args, _original=original, sort=None, **kwargs):
+            if sort is not None:
+                raise NotImplementedError("mongomock does not support sorted bulk updates")
+            return _original(self, *args, **kwargs)
+
+        monkeypatch.setattr(BulkOperationBuilder, name, add)
+
+
 @pytest_asyncio.fixture
-async def mock_mongo_db():
+async def mock_mongo_db(monkeypatch):
     """Return a mongomock-motor database instance."""
     import mongomock_motor
 
+    _accept_bulk_sort(monkeypatch)
     client = mongomock_motor.AsyncMongoMockClient()
     db = client["test_db"]
     yield db
     client.close()
 
 
+# ---------------------------------------------------------------------------
+# Alpha Vantage stub server
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def alpha_vantage_stub(monkeypatch):
+    """
+    Serve Alpha Vantage responses from a local HTTP server and point
+    ALPHA_VANTAGE_URL at it. Set ``stub.body`` (bytes) to change the response;
+    ``stub.requests`` records the query strings received.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from types import SimpleNamespace
+
+    stub = SimpleNamespace(body=b'{"feed": []}', requests=[])
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            stub.requests.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(stub.body)))
+            self.end_headers()
+            self.wfile.write(stub.body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setenv("ALPHA_VANTAGE_URL", f"http://127.0.0.1:{server.server_port}/query")
+    monkeypatch.setenv("ALPHA_VANTAGE_API_KEY", "test")
+    yield stub
+    server.shutdown()
+    server.server_close()
+
+
 # ---------------------------------------------------------------------------
 # Marks
 # ---------------------------------------------------------------------------
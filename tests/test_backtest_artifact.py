@@ -0,0 +1,139 @@
+"""
+Unit tests for the compact backtest artifact used for lazy report rendering.
+
+Uses backtesting.py's bundled GOOG sample data — no network or DB required.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import Backtest, Strategy
+from backtesting.lib import crossover
+from backtesting.test import GOOG, SMA
+
+from app.signals.utils.backtest_artifact import (
+    backtest_html,
+    pack_backtest_artifact,
+    render_backtest_html,
+    unpack_backtest_artifact,
+)
+
+
+class _SmaCross(Strategy):
+    def init(self):
+        self.fast = self.I(SMA, self.data.Close, 10)
+        self.slow = self.I(SMA, self.data.Close, 20)
+        self.band = self.I(
+            lambda x: np.vstack([x * 0.99, x * 1.01]), self.data.Close, name=("lower", "upper"), overlay=True
+        )
+
+    def next(self):
+        if crossover(self.fast, self.slow):
+            self.buy(sl=self.data.Close[-1] * 0.9)
+        elif crossover(self.slow, self.fast):
+            self.position.close()
+
+
+@pytest.fixture(scope="module")
+def finished_backtest():
+    df = GOOG.iloc[:400].copy()
+    df.index = df.index.tz_localize("UTC")
+    bt = Backtest(df, _SmaCross, cash=10_000, finalize_trades=True)
+    stats = bt.run()
+    return bt, stats
+
+
+class TestBacktestArtifact:
+    def test_round_trip_preserves_plot_inputs(self, finished_backtest):
+        bt, stats = finished_backtest
+        results, df, indicators = unpack_backtest_artifact(pack_backtest_artifact(bt, stats))
+
+        pd.testing.assert_frame_equal(df, bt._data[["Open", "High", "Low", "Close", "Volume"]], check_dtype=False, check_freq=False)
+        np.testing.assert_allclose(results["_equity_curve"]["Equity"], stats["_equity_curve"]["Equity"])
+
+        trades, expected = results["_trades"], stats["_trades"]
+        assert len(trades) == len(expected) > 0
+        assert list(trades["ExitBar"]) == list(expected["ExitBar"])
+        assert list(trades["EntryTime"]) == list(expected["EntryTime"])
+
+        assert [i.name for i in indicators] == [i.name for i in stats["_strategy"]._indicators]
+        assert indicators[2].shape == (2, len(df))
+
+    def test_payload_is_smaller_than_compressed_html(self, finished_backtest):
+        import zlib
+
+        bt, stats = finished_backtest
+        html = render_backtest_html(pack_backtest_artifact(bt, stats))
+        assert len(pack_backtest_artifact(bt, stats)) < len(zlib.compress(html.encode("utf-8"), 9))
+
+    def test_render_produces_bokeh_report(self, finished_backtest):
+        bt, stats = finished_backtest
+        html = render_backtest_html(pack_backtest_artifact(bt, stats))
+        assert html.lstrip().lower().startswith("<!doctype html>")
+        assert "Bokeh" in html
+
+    def test_backtest_without_trades(self):
+        class _Idle(Strategy):
+            def init(self):
+                pass
+
+            def next(self):
+                pass
+
+        bt = Backtest(GOOG.iloc[:100], _Idle, cash=10_000)
+        stats = bt.run()
+        results, _, _ = unpack_backtest_artifact(pack_backtest_artifact(bt, stats))
+        assert results["_trades"].empty
+        assert render_backtest_html(pack_backtest_artifact(bt, stats))
+
+
+class TestInMemoryRendering:
+    def test_backtest_html_writes_no_files(self, finished_backtest, tmp_path, monkeypatch):
+        bt, _ = finished_backtest
+        monkeypatch.chdir(tmp_path)
+        html = backtest_html(bt)
+        assert "Bokeh" in html
+        assert list(tmp_path.iterdir()) == []
+
+    def test_render_restores_plotting_show(self, finished_backtest):
+        from backtesting import _plotting
+
+        original = _plotting.show
+        backtest_html(finished_backtest[0])
+        assert _plotting.show is original
+
+    def test_concurrent_renders_are_isolated(self, finished_backtest):
+        from concurrent.futures import ThreadPoolExecutor
+
+        bt, stats = finished_backtest
+        payload = pack_backtest_artifact(bt, stats)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            pages = list(pool.map(lambda _: render_backtest_html(payload), range(4)))
+        # Bokeh ids differ per render, but no render may pick up another's document
+        assert all(abs(len(page) - len(pages[0])) < 0.01 * len(pages[0]) for page in pages)
+
+    def test_render_in_process_pool(self, finished_backtest):
+        import multiprocessing as mp
+        from concurrent.futures import ProcessPoolExecutor
+
+        bt, stats = finished_backtest
+        payload = pack_backtest_artifact(bt, stats)
+        with ProcessPoolExecutor(max_workers=2, mp_context=mp.get_context("fork")) as pool:
+            pages = list(pool.map(render_backtest_html, [payload, payload]))
+        assert all("Bokeh" in page for page in pages)
+
+
+class TestRenderPool:
+    def test_shutdown_render_pool_stops_workers(self):
+        from app.signals import service
+
+        pool = service._get_render_pool()
+        assert service._get_render_pool() is pool
+        service.shutdown_render_pool()
+        assert service._render_pool is None
+        with pytest.raises(RuntimeError):
+            pool.submit(int)
+        # Idempotent, e.g. after a broken pool was already dropped
+        service.shutdown_render_pool()
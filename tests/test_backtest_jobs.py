@@ -0,0 +1,105 @@
+"""
+Unit tests for the backtest job registry (app/signals/jobs.py).
+
+A fake runner stands in for get_backtest_result, so no data or DB is needed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.signals.jobs import DONE, FAILED, QUEUED, JobRegistry
+
+
+class FakeRunner:
+    def __init__(self) -> None:
+        self.started: list[str] = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, ticker, backtest_process_uuid, on_progress, **kwargs):
+        self.started.append(ticker)
+        on_progress("backtesting", 0.2)
+        await self.release.wait()
+        if ticker == "FAIL":
+            raise HTTPException(status_code=400, detail="no data")
+        on_progress("saved", 0.95, backtest_id=42)
+
+
+async def _settle(registry: JobRegistry, *job_ids: str) -> None:
+    for _ in range(100):
+        if all(registry.get(job_id).finished for job_id in job_ids):
+            return
+        await asyncio.sleep(0)
+
+
+class TestJobRegistry:
+    async def test_job_lifecycle_and_result_id(self):
+        runner = FakeRunner()
+        registry = JobRegistry(runner, workers=1)
+
+        job = registry.submit({"ticker": "GOOG"})
+        assert job.status == QUEUED
+        await asyncio.sleep(0)
+        assert (job.status, job.stage) == ("running", "backtesting")
+
+        runner.release.set()
+        await _settle(registry, job.id)
+        snapshot = registry.get(job.id).snapshot()
+        assert (snapshot["status"], snapshot["backtest_id"], snapshot["progress"]) == (DONE, 42, 1.0)
+        assert snapshot["run_seconds"] is not None
+
+    async def test_failure_is_recorded(self):
+        runner = FakeRunner()
+        runner.release.set()
+        registry = JobRegistry(runner, workers=1)
+
+        job = registry.submit({"ticker": "FAIL"})
+        await _settle(registry, job.id)
+        assert (job.status, job.error) == (FAILED, "no data")
+
+    async def test_priority_order_and_bounded_queue(self):
+        runner = FakeRunner()
+        registry = JobRegistry(runner, workers=1, queue_size=2)
+
+        first = registry.submit({"ticker": "A"})
+        await asyncio.sleep(0)  # the worker takes A, freeing its queue slot
+        low = registry.submit({"ticker": "LOW"}, priority=-1)
+        high = registry.submit({"ticker": "HIGH"}, priority=5)
+        with pytest.raises(HTTPException) as exc:
+            registry.submit({"ticker": "OVERFLOW"})
+        assert exc.value.status_code == 503
+
+        runner.release.set()
+        await _settle(registry, first.id, low.id, high.id)
+        assert runner.started == ["A", "HIGH", "LOW"]
+
+    async def test_resubmitting_unfinished_id_returns_same_job(self):
+        registry = JobRegistry(FakeRunner(), workers=1)
+        job = registry.submit({"ticker": "GOOG"}, job_id="abc")
+        assert registry.submit({"ticker": "GOOG"}, job_id="abc") is job
+
+    async def test_watch_streams_until_finished(self):
+        runner = FakeRunner()
+        registry = JobRegistry(runner, workers=1)
+        job = registry.submit({"ticker": "GOOG"})
+
+        async def collect():
+            return [s["status"] async for s in registry.watch(job.id, keepalive=5) if s is not None]
+
+        watcher = asyncio.create_task(collect())
+        await asyncio.sleep(0)
+        runner.release.set()
+        statuses = await asyncio.wait_for(watcher, timeout=5)
+        assert statuses[-1] == DONE and statuses.count(DONE) == 1
+
+    async def test_finished_history_is_bounded(self):
+        runner = FakeRunner()
+        runner.release.set()
+        registry = JobRegistry(runner, workers=1, history=2)
+
+        ids = [registry.submit({"ticker": f"T{i}"}).id for i in range(4)]
+        await _settle(registry, *ids[-1:])
+        assert [registry.get(job_id) is not None for job_id in ids] == [False, False, True, True]
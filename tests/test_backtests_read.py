@@ -0,0 +1,132 @@
+"""
+Unit tests for the backtest read API — keyset pagination, cursors, ETags and the
+read cache (app/signals/backtests_service.py, list_page in app/db/repository.py).
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from app.db.repository import BacktestStatRepository, TradeActionRepository
+from app.signals import backtests_service
+
+
+async def _insert_stats(session, count: int, **overrides) -> list[int]:
+    repo = BacktestStatRepository(session)
+    ids = []
+    for i in range(count):
+        stat = await repo.upsert(
+            {
+                "ticker": f"T{i}",
+                "strategy": "macd_1",
+                "period": "1y",
+                "interval": "1d",
+                # Pairs share a timestamp so the id tie-breaker is exercised
+                "updated_at": datetime(2024, 1, 1 + i // 2),
+                **overrides,
+            }
+        )
+        ids.append(stat.id)
+    return ids
+
+
+@pytest.fixture
+def read_service(db_session, monkeypatch):
+    @asynccontextmanager
+    async def session_local():
+        yield db_session
+
+    monkeypatch.setattr(backtests_service, "AsyncSessionLocal", session_local)
+    backtests_service.invalidate_backtest_reads()
+    yield backtests_service
+    backtests_service.invalidate_backtest_reads()
+
+
+class TestKeysetPagination:
+    async def test_pages_cover_all_rows_once_in_order(self, db_session):
+        ids = await _insert_stats(db_session, 5)
+        (legacy_id,) = await _insert_stats(db_session, 1, ticker="LEGACY", updated_at=None)
+        repo = BacktestStatRepository(db_session)
+
+        seen, after = [], None
+        while True:
+            rows = await repo.list_page(2, after)
+            if not rows:
+                break
+            seen.extend(rows)
+            after = (rows[-1].updated_at, rows[-1].id)
+
+        # Equal timestamps fall back to id order; rows without updated_at come last
+        assert [r.id for r in seen] == [ids[4], ids[3], ids[2], ids[1], ids[0], legacy_id]
+
+    async def test_filters_and_narrow_projection(self, db_session):
+        await _insert_stats(db_session, 2)
+        await _insert_stats(db_session, 1, strategy="swing_1")
+
+        rows = await BacktestStatRepository(db_session).list_page(10, strategy="swing_1", ticker=None)
+        assert [r.strategy for r in rows] == ["swing_1"]
+        assert "start_time" not in rows[0]._mapping
+
+    async def test_trade_actions_newest_first(self, db_session):
+        (stat_id,) = await _insert_stats(db_session, 1)
+        repo = TradeActionRepository(db_session)
+        await repo.insert_many(
+            [
+                {"id": 100 + d, "backtest_id": stat_id, "datetime": datetime(2024, 1, d), "trade_action": "buy"}
+                for d in (1, 2, 3)
+            ]
+        )
+
+        first = await repo.list_page(stat_id, 2)
+        second = await repo.list_page(stat_id, 2, (first[-1].datetime, first[-1].id))
+        assert [r.datetime.day for r in first + second] == [3, 2, 1]
+
+
+class TestReadService:
+    async def test_cursor_round_trip_and_last_page(self, read_service, db_session):
+        await _insert_stats(db_session, 3)
+
+        first, _ = await read_service.list_backtests(limit=2)
+        assert len(first["data"]["items"]) == 2 and first["data"]["next_cursor"]
+
+        second, _ = await read_service.list_backtests(limit=2, cursor=first["data"]["next_cursor"])
+        assert len(second["data"]["items"]) == 1
+        assert second["data"]["next_cursor"] is None
+
+    async def test_invalid_cursor_is_400(self, read_service):
+        with pytest.raises(HTTPException) as exc_info:
+            await read_service.list_backtests(limit=2, cursor="not-a-cursor")
+        assert exc_info.value.status_code == 400
+
+    async def test_cached_until_invalidated(self, read_service, db_session):
+        await _insert_stats(db_session, 1)
+        body, etag = await read_service.list_backtests(limit=10)
+
+        await _insert_stats(db_session, 1, ticker="NEW", updated_at=datetime(2025, 1, 1))
+        cached_body, cached_etag = await read_service.list_backtests(limit=10)
+        assert cached_etag == etag and len(cached_body["data"]["items"]) == 1
+
+        read_service.invalidate_backtest_reads()
+        fresh_body, fresh_etag = await read_service.list_backtests(limit=10)
+        assert fresh_etag != etag
+        assert fresh_body["data"]["items"][0]["ticker"] == "NEW"
+
+    async def test_detail_missing_is_404(self, read_service):
+        with pytest.raises(HTTPException) as exc_info:
+            await read_service.get_backtest(999)
+        assert exc_info.value.status_code == 404
+
+
+class TestEtagMatches:
+    def test_matches_weak_strong_lists_and_star(self):
+        etag = 'W/"abc"'
+        assert backtests_service.etag_matches('W/"abc"', etag)
+        assert backtests_service.etag_matches('"abc"', etag)
+        assert backtests_service.etag_matches('"x", W/"abc"', etag)
+        assert backtests_service.etag_matches("*", etag)
+        assert not backtests_service.etag_matches('"x"', etag)
+        assert not backtests_service.etag_matches(None, etag)
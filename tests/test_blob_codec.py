@@ -0,0 +1,97 @@
+"""
+Unit tests for the pluggable blob codecs used for stored report HTML.
+"""
+
+from __future__ import annotations
+
+import base64
+import zlib
+from pathlib import Path
+
+import pytest
+
+from app.lib.utils import blob_codec
+
+REPORT = (Path(blob_codec.__file__).parent / "dictionaries" / "bokeh_report_v1.html").read_text()
+# A report that differs from the dictionary sample, spanning several chunks
+SAMPLE = REPORT.replace("GOOG", "AAPL") * 6
+
+
+@pytest.mark.parametrize("codec", sorted(blob_codec.CODECS))
+def test_round_trip(codec):
+    if codec.startswith("zstd") and not blob_codec.HAS_ZSTD:
+        pytest.skip("zstandard not installed")
+    name, data = blob_codec.encode(SAMPLE, codec)
+    assert name == codec
+    assert blob_codec.decode(data, codec) == SAMPLE
+
+
+def test_zlib_output_is_plain_deflate():
+    """zlib rows must stay inflatable by pako / zlib.decompress without extra context."""
+    _, data = blob_codec.encode(SAMPLE, "zlib")
+    assert zlib.decompress(data).decode("utf-8") == SAMPLE
+
+
+def test_legacy_rows_decode_without_codec():
+    legacy = base64.b64encode(zlib.compress(SAMPLE.encode("utf-8"), level=9)).decode("utf-8")
+    assert blob_codec.decode(blob_codec.from_base64(legacy), None) == SAMPLE
+
+
+def test_dictionary_shrinks_small_reports():
+    small = REPORT.replace("GOOG", "AAPL")
+    _, plain = blob_codec.encode(small, "zlib")
+    _, with_dict = blob_codec.encode(small, "zlib+bokeh-v1")
+    assert len(with_dict) < len(plain)
+
+
+def test_unknown_codec_raises():
+    with pytest.raises(ValueError):
+        blob_codec.encode(SAMPLE, "lz4")
+
+
+def test_zstd_without_zstandard_fails_loudly(monkeypatch):
+    monkeypatch.setattr(blob_codec, "HAS_ZSTD", False)
+    with pytest.raises(RuntimeError):
+        blob_codec.resolve_codec("zstd+bokeh-v1")
+    assert blob_codec.resolve_codec(None) == "zlib"
+
+
+class TestReportStorage:
+    """Storage format of backtest_reports rows (app.signals.service)."""
+
+    @staticmethod
+    def _columns(row):
+        return {k: row[k] for k in ("html", "html_bytes", "html_codec")}
+
+    def test_default_is_pako_compatible_text(self, monkeypatch):
+        from app.signals.service import _report_row, _wire_html
+
+        monkeypatch.delenv("BACKTEST_HTML_CODEC", raising=False)
+        monkeypatch.delenv("BACKTEST_HTML_STORAGE", raising=False)
+        row = _report_row(1, SAMPLE)
+
+        assert row["html_codec"] == "zlib" and row["html_bytes"] is None
+        # Stored text is served as-is, no re-encoding
+        assert _wire_html(**self._columns(row)) is row["html"]
+
+    def test_bytes_storage_is_served_as_zlib(self, monkeypatch):
+        from app.signals.service import _report_row, _wire_html
+
+        monkeypatch.setenv("BACKTEST_HTML_CODEC", "zlib+bokeh-v1")
+        monkeypatch.setenv("BACKTEST_HTML_STORAGE", "bytes")
+        row = _report_row(1, SAMPLE)
+
+        assert row["html"] is None and row["html_codec"] == "zlib+bokeh-v1"
+        wire = _wire_html(**self._columns(row))
+        assert zlib.decompress(base64.b64decode(wire)).decode("utf-8") == SAMPLE
+
+    def test_content_hash_ignores_codec(self, monkeypatch):
+        from app.signals.service import _report_row
+
+        monkeypatch.setenv("BACKTEST_HTML_CODEC", "zlib")
+        zlib_row = _report_row(1, SAMPLE)
+        monkeypatch.setenv("BACKTEST_HTML_CODEC", "identity")
+        identity_row = _report_row(1, SAMPLE)
+
+        assert zlib_row["content_hash"] == identity_row["content_hash"]
+        assert zlib_row["content_hash"] != _report_row(1, SAMPLE + " ")["content_hash"]
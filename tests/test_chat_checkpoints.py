@@ -0,0 +1,114 @@
+"""
+Unit tests for the chatbot graph checkpointers in app/ai/checkpoints.py.
+
+A one-node graph stands in for the chatbot; the sql checkpointer runs on an
+in-memory SQLite database. Skipped when LangGraph is not installed.
+"""
+
+from __future__ import annotations
+
+import operator
+from typing import Annotated
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from typing_extensions import TypedDict
+
+pytest.importorskip("langgraph")
+
+from langgraph.graph import END, START, StateGraph  # noqa: E402
+
+from app.ai import checkpoints  # noqa: E402
+from app.db.models import Base  # noqa: E402
+from app.db.repository import ChatCheckpointRepository  # noqa: E402
+
+
+class State(TypedDict):
+    messages: Annotated[list, operator.add]
+
+
+def _graph(checkpointer):
+    builder = StateGraph(State)
+    builder.add_node("echo", lambda state: {"messages": [f"echo {state['messages'][-1]}"]})
+    builder.add_edge(START, "echo")
+    builder.add_edge("echo", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+async def _say(graph, thread_id: str, text: str) -> list:
+    config = {"configurable": {"thread_id": thread_id}}
+    return (await graph.ainvoke({"messages": [text]}, config))["messages"]
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    await engine.dispose()
+
+
+class TestBoundedMemorySaver:
+    async def test_least_recently_used_thread_is_evicted(self):
+        graph = _graph(checkpoints.BoundedMemorySaver(max_threads=2))
+
+        await _say(graph, "t1", "a")
+        await _say(graph, "t2", "b")
+        await _say(graph, "t1", "c")
+        await _say(graph, "t3", "d")
+
+        assert await _say(graph, "t1", "e") == ["a", "echo a", "c", "echo c", "e", "echo e"]
+        # t2 was evicted and starts over
+        assert await _say(graph, "t2", "f") == ["f", "echo f"]
+
+
+class TestSqlCheckpointSaver:
+    async def test_threads_survive_a_restart(self, session_factory):
+        await _say(_graph(checkpoints.SqlCheckpointSaver(session_factory)), "t1", "hello")
+
+        restarted = _graph(checkpoints.SqlCheckpointSaver(session_factory))
+
+        assert await _say(restarted, "t1", "again") == ["hello", "echo hello", "again", "echo again"]
+        assert await _say(restarted, "t2", "other") == ["other", "echo other"]
+
+    async def test_keeps_newest_checkpoints(self, session_factory):
+        saver = checkpoints.SqlCheckpointSaver(session_factory, max_checkpoints=2)
+        graph = _graph(saver)
+        for text in ("a", "b", "c"):
+            await _say(graph, "t1", text)
+
+        async with session_factory() as session:
+            assert len(await ChatCheckpointRepository(session).list("t1")) == 2
+        history = [item async for item in saver.alist({"configurable": {"thread_id": "t1"}})]
+        assert len(history) == 2
+        assert history[0].checkpoint["channel_values"]["messages"][-1] == "echo c"
+
+    async def test_list_filters_on_metadata(self, session_factory):
+        saver = checkpoints.SqlCheckpointSaver(session_factory)
+        await _say(_graph(saver), "t1", "hello")
+
+        config = {"configurable": {"thread_id": "t1"}}
+        loops = [item async for item in saver.alist(config, filter={"source": "loop"})]
+        assert loops and all(item.metadata["source"] == "loop" for item in loops)
+        assert len([item async for item in saver.alist(config, limit=1)]) == 1
+
+    async def test_delete_thread(self, session_factory):
+        saver = checkpoints.SqlCheckpointSaver(session_factory)
+        await _say(_graph(saver), "t1", "hello")
+
+        await saver.adelete_thread("t1")
+
+        assert await saver.aget_tuple({"configurable": {"thread_id": "t1"}}) is None
+
+
+def test_create_checkpointer_follows_the_memory_backend(monkeypatch):
+    monkeypatch.delenv("CHAT_MEMORY_BACKEND", raising=False)
+    assert isinstance(checkpoints.create_checkpointer(), checkpoints.BoundedMemorySaver)
+
+    monkeypatch.setenv("CHAT_MEMORY_BACKEND", "sql")
+    assert isinstance(checkpoints.create_checkpointer(), checkpoints.SqlCheckpointSaver)
+
+    monkeypatch.setenv("CHAT_MEMORY_BACKEND", "redis")
+    with pytest.raises(ValueError):
+        checkpoints.create_checkpointer()
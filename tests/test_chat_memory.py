@@ -0,0 +1,266 @@
+"""
+Unit tests for the bounded chat memory in app/ai/memory.py.
+
+A counting stand-in replaces the embedding model; the sql backend runs on an
+in-memory SQLite database.
+"""
+
+from __future__ import annotations
+
+import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.ai import memory
+from app.db.models import Base
+from app.db.repository import ChatCheckpointRepository, ChatMemoryRepository, EmbeddingCacheRepository
+
+
+class FakeEmbeddings:
+    """Embeds text as letter counts, recording every text it was asked for."""
+
+    def __init__(self):
+        self.calls: list[str] = []
+
+    async def aembed_documents(self, texts):
+        self.calls.extend(texts)
+        return [[text.count(letter) for letter in "abcdefghijklmnopqrstuvwxyz"] for text in texts]
+
+
+@pytest.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://", echo=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    await engine.dispose()
+
+
+class TestThreadLru:
+    def test_evicts_least_recently_used_beyond_max_threads(self):
+        threads = memory.ThreadLru(max_threads=2, ttl_seconds=3600, clock=lambda: 0.0)
+
+        assert threads.touch("t1") == []
+        assert threads.touch("t2") == []
+        assert threads.touch("t1") == []
+        assert threads.touch("t3") == ["t2"]
+        assert threads.touch("t4") == ["t1"]
+
+    def test_evicts_idle_threads(self):
+        now = [0.0]
+        threads = memory.ThreadLru(max_threads=10, ttl_seconds=60, clock=lambda: now[0])
+        threads.touch("old")
+        now[0] = 30.0
+        threads.touch("recent")
+
+        now[0] = 70.0
+        assert threads.touch("new") == ["old"]
+        now[0] = 200.0
+        assert threads.touch("new") == ["recent"]
+
+
+class TestCachedEmbedder:
+    async def test_identical_text_is_embedded_once(self):
+        embeddings = FakeEmbeddings()
+        embedder = memory.CachedEmbedder(embeddings, "test-model")
+
+        first = await embedder.embed(["apple", "banana", "apple"])
+        second = await embedder.embed(["banana", "cherry"])
+
+        assert embeddings.calls == ["apple", "banana", "cherry"]
+        np.testing.assert_array_equal(first[0], first[2])
+        np.testing.assert_array_equal(first[1], second[0])
+        assert first[0].dtype == np.float32
+
+    async def test_lru_evicts_old_vectors(self):
+        embeddings = FakeEmbeddings()
+        embedder = memory.CachedEmbedder(embeddings, "test-model", size=2)
+
+        await embedder.embed(["a", "b", "c"])
+        await embedder.embed(["a"])
+
+        assert embeddings.calls == ["a", "b", "c", "a"]
+
+    async def test_persistent_cache_survives_restarts(self, session_factory):
+        await memory.CachedEmbedder(FakeEmbeddings(), "m", session_factory=session_factory).embed(["apple"])
+
+        embeddings = FakeEmbeddings()
+        vectors = await memory.CachedEmbedder(embeddings, "m", session_factory=session_factory).embed(["apple"])
+
+        assert embeddings.calls == []
+        assert vectors[0][0] == 1.0  # one "a"
+        other_model = FakeEmbeddings()
+        await memory.CachedEmbedder(other_model, "other", session_factory=session_factory).embed(["apple"])
+        assert other_model.calls == ["apple"]
+
+
+class TestInMemoryChatMemory:
+    async def test_search_ranks_by_similarity(self):
+        chat = memory.InMemoryChatMemory(memory.CachedEmbedder(FakeEmbeddings(), "m"))
+        for text in ("zzz", "apple pie", "xyz"):
+            await chat.put("t1", text)
+
+        assert (await chat.search("t1", "apple", limit=1)) == ["apple pie"]
+        assert await chat.search("other", "apple") == []
+
+    async def test_caps_items_and_threads(self):
+        chat = memory.InMemoryChatMemory(
+            memory.CachedEmbedder(FakeEmbeddings(), "m"), max_items=2, max_threads=2
+        )
+        for text in ("one", "two", "three"):
+            await chat.put("t1", text)
+        await chat.put("t2", "hello")
+        await chat.put("t1", "four")
+        await chat.put("t3", "hi")
+
+        assert [m["content"] for m in await chat.history("t1")] == ["three", "four"]
+        # t2 was the least recently written thread
+        assert await chat.history("t2") == []
+        assert await chat.history("t3") == [{"role": "user", "content": "hi"}]
+
+
+class TestSqlChatMemory:
+    async def test_keeps_newest_items_with_roles(self, session_factory):
+        chat = memory.SqlChatMemory(
+            memory.CachedEmbedder(FakeEmbeddings(), "m", session_factory=session_factory),
+            session_factory,
+            max_items=3,
+        )
+        for i in range(3):
+            await chat.put("t1", f"question {i}")
+            await chat.put("t1", f"answer {i}", role="assistant")
+
+        history = await chat.history("t1")
+
+        assert history == [
+            {"role": "assistant", "content": "answer 1"},
+            {"role": "user", "content": "question 2"},
+            {"role": "assistant", "content": "answer 2"},
+        ]
+        assert await chat.search("t1", "question", limit=1) == ["question 2"]
+
+    async def test_idle_threads_are_purged(self, session_factory):
+        now = datetime.datetime.now(datetime.UTC)
+        async with session_factory() as session:
+            repo = ChatMemoryRepository(session)
+            await repo.add("old", "user", "hello", memory.content_hash("hello"), now - datetime.timedelta(days=5))
+            await repo.add("new", "user", "hello", memory.content_hash("hello"), now)
+            await repo.commit()
+
+        chat = memory.SqlChatMemory(
+            memory.CachedEmbedder(FakeEmbeddings(), "m"), session_factory, ttl_seconds=24 * 3600
+        )
+        await chat.put("new", "again")
+
+        assert await chat.history("old") == []
+        assert len(await chat.history("new")) == 2
+
+    async def test_old_embeddings_are_purged(self, session_factory):
+        now = datetime.datetime.now(datetime.UTC)
+        async with session_factory() as session:
+            repo = EmbeddingCacheRepository(session)
+            await repo.put_many("m", {"old": b"\x00" * 4}, now - datetime.timedelta(days=5))
+            await repo.put_many("m", {"new": b"\x00" * 4}, now)
+
+        chat = memory.SqlChatMemory(
+            memory.CachedEmbedder(FakeEmbeddings(), "m"), session_factory, ttl_seconds=24 * 3600
+        )
+        await chat.put("t1", "hello")
+
+        async with session_factory() as session:
+            assert set(await EmbeddingCacheRepository(session).get_many("m", ["old", "new"])) == {"new"}
+
+    def test_backends_must_implement_put_and_history(self):
+        class Incomplete(memory.ChatMemoryBackend):
+            async def put(self, thread_id, text, role="user"):
+                pass
+
+        with pytest.raises(TypeError):
+            Incomplete()
+
+
+def _checkpoint(thread_id: str, checkpoint_id: str, created_at, parent: str | None = None) -> dict:
+    return {
+        "thread_id": thread_id,
+        "checkpoint_ns": "",
+        "checkpoint_id": checkpoint_id,
+        "parent_checkpoint_id": parent,
+        "checkpoint_type": "msgpack",
+        "checkpoint": checkpoint_id.encode(),
+        "metadata_type": "msgpack",
+        "checkpoint_metadata": b"",
+        "created_at": created_at,
+    }
+
+
+def _write(checkpoint_id: str, idx: int, value: bytes) -> dict:
+    return {
+        "thread_id": "t1",
+        "checkpoint_ns": "",
+        "checkpoint_id": checkpoint_id,
+        "task_id": "task",
+        "idx": idx,
+        "channel": "messages",
+        "value_type": "msgpack",
+        "value": value,
+        "task_path": "",
+    }
+
+
+class TestChatCheckpointRepository:
+    async def test_latest_and_by_id(self, session_factory):
+        now = datetime.datetime.now(datetime.UTC)
+        async with session_factory() as session:
+            repo = ChatCheckpointRepository(session)
+            for checkpoint_id in ("c1", "c3", "c2"):
+                await repo.put(_checkpoint("t1", checkpoint_id, now))
+            await repo.commit()
+
+            assert (await repo.get("t1", "")).checkpoint_id == "c3"
+            assert (await repo.get("t1", "", "c1")).checkpoint == b"c1"
+            assert await repo.get("t2", "") is None
+            assert [row.checkpoint_id for row in await repo.list("t1", before="c3", limit=1)] == ["c2"]
+
+    async def test_regular_writes_are_kept_special_writes_replaced(self, session_factory):
+        async with session_factory() as session:
+            repo = ChatCheckpointRepository(session)
+            await repo.put_writes([_write("c1", 0, b"first"), _write("c1", -1, b"error")], replace=False)
+            await repo.put_writes([_write("c1", 0, b"again")], replace=False)
+            await repo.put_writes([_write("c1", -1, b"error again")], replace=True)
+            await repo.commit()
+
+            writes = await repo.writes("t1", "", "c1")
+
+        assert [(w.idx, w.value) for w in writes] == [(-1, b"error again"), (0, b"first")]
+
+    async def test_trim_keeps_newest_checkpoints_and_their_writes(self, session_factory):
+        now = datetime.datetime.now(datetime.UTC)
+        async with session_factory() as session:
+            repo = ChatCheckpointRepository(session)
+            for checkpoint_id in ("c1", "c2", "c3"):
+                await repo.put(_checkpoint("t1", checkpoint_id, now))
+                await repo.put_writes([_write(checkpoint_id, 0, b"")], replace=False)
+
+            assert await repo.trim("t1", "", keep=2) == 1
+            await repo.commit()
+
+            assert [row.checkpoint_id for row in await repo.list("t1")] == ["c3", "c2"]
+            assert await repo.writes("t1", "", "c1") == []
+            assert len(await repo.writes("t1", "", "c2")) == 1
+
+    async def test_idle_threads_are_purged(self, session_factory):
+        now = datetime.datetime.now(datetime.UTC)
+        async with session_factory() as session:
+            repo = ChatCheckpointRepository(session)
+            await repo.put(_checkpoint("t1", "c1", now - datetime.timedelta(days=5)))
+            await repo.put_writes([_write("c1", 0, b"")], replace=False)
+            await repo.put(_checkpoint("t2", "c1", now - datetime.timedelta(days=5)))
+            await repo.put(_checkpoint("t2", "c2", now))
+
+            await repo.delete_idle(now - datetime.timedelta(days=1))
+            await repo.commit()
+
+            assert [row.thread_id for row in await repo.list()] == ["t2", "t2"]
+            assert await repo.writes("t1", "", "c1") == []
@@ -0,0 +1,154 @@
+"""
+Unit tests for the chatbot graph in app/ai/chatbot.py.
+
+Tools are stand-ins with fixed latencies and the LLM factory is monkeypatched;
+no LLM is called. Skipped when the LangChain / LangGraph dependencies are not
+installed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+from cachetools import LRUCache
+
+# app.ai.models.gemini prompts for a key when none is set
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+pytest.importorskip("langgraph")
+pytest.importorskip("langchain_google_genai")
+pytest.importorskip("langchain_community")
+chatbot = pytest.importorskip("app.ai.chatbot")
+
+from app.ai.tool_cache import MemoryBackend, ToolResultCache  # noqa: E402
+
+
+class AsyncTool:
+    def __init__(self, name: str, delay: float):
+        self.name = name
+        self.delay = delay
+        self.calls = 0
+
+    async def arun(self, args):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"tool": self.name, "args": args}
+
+
+class SyncTool:
+    """A tool with only a blocking run(), as many LangChain tools are."""
+
+    def __init__(self, name: str, delay: float):
+        self.name = name
+        self.delay = delay
+
+    def run(self, args):
+        time.sleep(self.delay)
+        return {"tool": self.name, "args": args}
+
+
+def _message(*names: str):
+    return SimpleNamespace(
+        tool_calls=[{"name": name, "args": {"q": name}, "id": f"call-{i}"} for i, name in enumerate(names)]
+    )
+
+
+async def _run(node, *names: str):
+    return (await node({"messages": [_message(*names)]}))["messages"]
+
+
+class TestBasicToolNode:
+    async def test_calls_run_concurrently(self):
+        node = chatbot.BasicToolNode(
+            [AsyncTool("a", 0.3), SyncTool("b", 0.3), AsyncTool("c", 0.2)]
+        )
+
+        started = time.perf_counter()
+        outputs = await _run(node, "a", "b", "c")
+        elapsed = time.perf_counter() - started
+
+        # The slowest tool's latency, not the 0.8s sum; the sync tool ran in a thread
+        assert 0.3 <= elapsed < 0.6
+        assert [json.loads(m.content)["tool"] for m in outputs] == ["a", "b", "c"]
+
+    async def test_results_keep_tool_call_order(self):
+        node = chatbot.BasicToolNode([AsyncTool("slow", 0.2), AsyncTool("fast", 0.0)])
+
+        outputs = await _run(node, "slow", "fast")
+
+        assert [m.tool_call_id for m in outputs] == ["call-0", "call-1"]
+        assert [m.name for m in outputs] == ["slow", "fast"]
+
+    async def test_timed_out_tool_returns_error_payload(self):
+        node = chatbot.BasicToolNode(
+            [AsyncTool("slow", 5.0), SyncTool("fast", 0.0)], timeouts={"slow": 0.05}
+        )
+
+        started = time.perf_counter()
+        slow, fast = await _run(node, "slow", "fast")
+
+        assert time.perf_counter() - started < 1.0
+        assert json.loads(slow.content) == {"error": "slow timed out after 0.05 seconds"}
+        assert json.loads(fast.content)["tool"] == "fast"
+
+    async def test_unknown_tool_returns_error_payload(self):
+        node = chatbot.BasicToolNode([AsyncTool("known", 0.0)])
+
+        unknown, known = await _run(node, "missing", "known")
+
+        assert "Unknown tool missing" in json.loads(unknown.content)["error"]
+        assert json.loads(known.content)["tool"] == "known"
+
+    async def test_repeated_call_is_served_from_cache(self):
+        tool = AsyncTool("get_news_sentiment", 0.0)
+        node = chatbot.BasicToolNode([tool], cache=ToolResultCache(MemoryBackend()))
+
+        first = await _run(node, "get_news_sentiment")
+        second = await _run(node, "get_news_sentiment")
+
+        assert tool.calls == 1
+        assert first[0].content == second[0].content
+
+
+class FakeLLM:
+    def bind_tools(self, tools):
+        return self
+
+
+class TestGraphCache:
+    @pytest.fixture
+    def created(self, monkeypatch):
+        created = []
+
+        def create_model(model_name, temperature):
+            created.append((model_name, temperature))
+            return FakeLLM()
+
+        monkeypatch.setattr(chatbot, "create_gemini_flash_model", create_model)
+        monkeypatch.setattr(chatbot, "_graph_cache", LRUCache(maxsize=2))
+        return created
+
+    def test_same_configuration_reuses_the_compiled_graph(self, created):
+        first = chatbot.get_chatbot_graph("gemini-a", 0.6)
+
+        assert chatbot.get_chatbot_graph("gemini-a", 0.6) is first
+        # Temperatures are rounded, so near-identical values share a graph
+        assert chatbot.get_chatbot_graph("gemini-a", 0.601) is first
+        assert chatbot.get_chatbot_graph("gemini-a", 0.2) is not first
+        assert created == [("gemini-a", 0.6), ("gemini-a", 0.2)]
+
+    def test_least_recently_used_graph_is_evicted(self, created):
+        a = chatbot.get_chatbot_graph("gemini-a", 0.6)
+        chatbot.get_chatbot_graph("gemini-b", 0.6)
+        # Touch a so that b is the least recently used
+        chatbot.get_chatbot_graph("gemini-a", 0.6)
+        chatbot.get_chatbot_graph("gemini-c", 0.6)
+
+        assert len(chatbot._graph_cache) == 2
+        assert chatbot.get_chatbot_graph("gemini-a", 0.6) is a
+        chatbot.get_chatbot_graph("gemini-b", 0.6)
+        assert [name for name, _ in created] == ["gemini-a", "gemini-b", "gemini-c", "gemini-b"]
@@ -0,0 +1,112 @@
+"""
+Unit tests for incremental backtest continuation (app/signals/strategies/continuation.py).
+
+Runs the macd_1 backtest on backtesting.py's bundled GOOG data with a synthetic
+signals column — no network or DB required.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting.test import GOOG
+
+from app.signals.strategies.continuation import (
+    actions_digest,
+    build_checkpoint,
+    continue_backtest,
+    restart_position,
+)
+from app.signals.strategies.perform_backtest import perform_backtest
+
+BASE_PARAMS = {"best": False, "size": 0.03, "slcoef": 2.2, "tpslRatio": 2.0, "max_longs": 1, "max_shorts": 1}
+BEST_PARAMS = {"tpslRatio": 2.0, "slcoef": 1.5}
+
+
+@pytest.fixture(scope="module")
+def signals_df() -> pd.DataFrame:
+    df = GOOG.copy()
+    df["ATR"] = (df.High - df.Low).rolling(14, min_periods=1).mean()
+    df["RSI"] = 50.0
+    signal = np.zeros(len(df), dtype=int)
+    signal[::37] = 2
+    signal[20::53] = 1
+    df["TotalSignal"] = signal
+    return df
+
+
+def _run(df):
+    _, stats, trade_actions, strategy_parameters = perform_backtest(
+        df, "macd_1", dict(BASE_PARAMS), skip_optimization=True, best_params=dict(BEST_PARAMS)
+    )
+    return stats, trade_actions, strategy_parameters
+
+
+def _keys(trade_actions, after):
+    return [(ta["datetime"], ta["trade_action"]) for ta in trade_actions if ta["datetime"] > after]
+
+
+class TestRestartPosition:
+    def test_no_trades_restarts_before_last_bar(self):
+        assert restart_position(pd.DataFrame({"EntryBar": [], "ExitBar": []}), 10) == 8
+
+    def test_skips_bars_with_open_or_pending_trades(self):
+        trades = pd.DataFrame({"EntryBar": [3, 7], "ExitBar": [5, 8]})
+        # Bars 2-4 and 6-7 are blocked; 8 is the last bar before the final one
+        assert restart_position(trades, 10) == 8
+        assert restart_position(trades, 9) == 5
+
+    def test_trade_closed_on_last_bar_counts_as_open(self):
+        trades = pd.DataFrame({"EntryBar": [3], "ExitBar": [9]})
+        assert restart_position(trades, 10) == 1
+
+    def test_never_flat(self):
+        assert restart_position(pd.DataFrame({"EntryBar": [1], "ExitBar": [9]}), 10) is None
+
+
+class TestActionsDigest:
+    def test_ignores_prices_and_respects_bounds(self):
+        actions = [
+            {"datetime": datetime(2024, 1, d), "trade_action": "buy", "price": float(d)}
+            for d in (1, 2, 3)
+        ]
+        repriced = [{**ta, "price": ta["price"] + 0.5} for ta in actions]
+        assert actions_digest(actions) == actions_digest(repriced)
+        assert actions_digest(actions, after=datetime(2024, 1, 1), until=datetime(2024, 1, 2)) == (
+            actions_digest(actions[1:2])
+        )
+
+
+class TestContinueBacktest:
+    def test_tail_run_matches_full_run(self, signals_df):
+        known = signals_df.iloc[:1500]
+        stats, trade_actions, strategy_parameters = _run(known)
+        checkpoint = build_checkpoint(known, stats, trade_actions, strategy_parameters)
+        assert "best" not in checkpoint["params"]
+
+        extended = signals_df.iloc[:1560]
+        continued = continue_backtest(extended, "macd_1", dict(BASE_PARAMS), checkpoint)
+        assert continued is not None
+        tail_actions, _, next_checkpoint = continued
+
+        _, full_actions, _ = _run(extended)
+        last_known = known.index[-1]
+        assert _keys(tail_actions, last_known) == _keys(full_actions, last_known)
+        assert _keys(tail_actions, last_known)
+        assert next_checkpoint["last_bar"] == str(extended.index[-1])
+
+    def test_mismatched_digest_needs_full_run(self, signals_df):
+        known = signals_df.iloc[:1500]
+        checkpoint = build_checkpoint(known, *_run(known))
+        stale = {**checkpoint, "actions_digest": "stale"}
+        assert continue_backtest(signals_df.iloc[:1560], "macd_1", dict(BASE_PARAMS), stale) is None
+
+    def test_restart_bar_outside_window_or_no_new_bars(self, signals_df):
+        known = signals_df.iloc[:1500]
+        checkpoint = build_checkpoint(known, *_run(known))
+        assert continue_backtest(known, "macd_1", dict(BASE_PARAMS), checkpoint) is None
+        shifted = signals_df.iloc[1499:1560]
+        assert continue_backtest(shifted, "macd_1", dict(BASE_PARAMS), checkpoint) is None
@@ -0,0 +1,101 @@
+"""
+Unit tests for app/db/pool.py — pool settings, checkout metrics and idle pre-ping.
+
+Runs the instrumented pool against a file-backed SQLite DB (aiosqlite); an
+in-memory DB can't be shared across pooled connections.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.db.pool import InstrumentedPool, PoolSettings, install_idle_pre_ping, pool_metrics
+
+
+@pytest.fixture
+async def engine_factory(tmp_path):
+    engines = []
+
+    def make(**kwargs):
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedPool, **kwargs
+        )
+        engines.append(engine)
+        return engine
+
+    yield make
+    for engine in engines:
+        await engine.dispose()
+
+
+class TestPoolSettings:
+    def test_defaults(self, monkeypatch):
+        for name in ("DB_POOL_SIZE", "DB_MAX_OVERFLOW", "DB_POOL_PRE_PING"):
+            monkeypatch.delenv(name, raising=False)
+        settings = PoolSettings.from_env()
+        assert (settings.pool_size, settings.max_overflow, settings.pre_ping) == (5, 10, "idle")
+        assert settings.engine_kwargs()["pool_pre_ping"] is False
+
+    def test_reads_environment(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_SIZE", "12")
+        monkeypatch.setenv("DB_MAX_OVERFLOW", "0")
+        monkeypatch.setenv("DB_POOL_TIMEOUT", "2.5")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "ALWAYS")
+        settings = PoolSettings.from_env()
+        kwargs = settings.engine_kwargs()
+        assert (kwargs["pool_size"], kwargs["max_overflow"], kwargs["pool_timeout"]) == (12, 0, 2.5)
+        assert kwargs["pool_pre_ping"] is True
+
+    def test_rejects_unknown_pre_ping_mode(self, monkeypatch):
+        monkeypatch.setenv("DB_POOL_PRE_PING", "sometimes")
+        with pytest.raises(ValueError):
+            PoolSettings.from_env()
+
+
+class TestInstrumentedPool:
+    async def test_records_checkouts_and_in_use(self, engine_factory):
+        engine = engine_factory(pool_size=2, max_overflow=0)
+
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            assert pool_metrics(engine)["in_use"] == 1
+
+        metrics = pool_metrics(engine)
+        assert metrics["in_use"] == 0
+        assert metrics["checkout"]["count"] == 1
+        assert metrics["wait"]["count"] == 1
+        assert metrics["overflow_events"] == 0
+
+    async def test_counts_overflow_and_timeouts(self, engine_factory):
+        engine = engine_factory(pool_size=1, max_overflow=1, pool_timeout=0.05)
+
+        async with engine.connect(), engine.connect():
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+            metrics = pool_metrics(engine)
+            assert metrics["in_use"] == 2 and metrics["overflow"] == 1
+
+        metrics = pool_metrics(engine)
+        assert metrics["overflow_events"] == 1
+        assert metrics["timeouts"] == 1
+
+    async def test_idle_pre_ping_only_pings_idle_connections(self, engine_factory):
+        engine = engine_factory(pool_size=1, max_overflow=0)
+        install_idle_pre_ping(engine, idle_seconds=0.05)
+
+        async with engine.connect():
+            pass
+        async with engine.connect():
+            pass
+        assert pool_metrics(engine)["pings"] == 0
+
+        await asyncio.sleep(0.1)
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("SELECT 1"))).scalar() == 1
+        metrics = pool_metrics(engine)
+        assert (metrics["pings"], metrics["ping_failures"]) == (1, 0)
@@ -0,0 +1,108 @@
+"""
+Unit tests for the per-section fundamentals cache in app/ticker/fundamentals.py.
+
+A stand-in object replaces yfinance.Ticker; MongoDB is mongomock-motor.
+"""
+
+from __future__ import annotations
+
+import datetime
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.ticker import fundamentals
+from app.ticker.fundamentals import SECTIONS
+
+
+class FakeTicker:
+    """Answers every section attribute, recording which ones were read."""
+
+    def __init__(self, delay: float = 0.0, failing: tuple[str, ...] = ()):
+        self.delay, self.failing = delay, failing
+        self.reads: list[str] = []
+        self.threads: set[int] = set()
+        self._lock = threading.Lock()
+
+    def __getattr__(self, attribute):
+        with self._lock:
+            self.reads.append(attribute)
+            self.threads.add(threading.get_ident())
+        time.sleep(self.delay)
+        if attribute in self.failing:
+            raise RuntimeError(f"{attribute} unavailable")
+        if attribute == "info":
+            return {"symbol": "AAPL", "sector": "Technology"}
+        if attribute == "news":
+            return [{"title": "AAPL news"}]
+        if attribute == "dividends":
+            return pd.Series([0.24, 0.25], index=pd.to_datetime(["2024-02-09", "2024-05-10"]).tz_localize("America/New_York"))
+        return pd.DataFrame(
+            {pd.Timestamp("2024-09-30"): [1.5e9, np.nan], pd.Timestamp("2023-09-30"): [1.2e9, 3.0]},
+            index=["Net Income", "Diluted EPS"],
+        )
+
+
+class TestCompact:
+    def test_frames_keep_the_to_json_shape(self):
+        frame = FakeTicker().income_stmt
+        assert fundamentals.compact(frame) == {
+            "1727654400000": {"Net Income": 1.5e9, "Diluted EPS": None},
+            "1696032000000": {"Net Income": 1.2e9, "Diluted EPS": 3.0},
+        }
+
+    def test_series_and_plain_values(self):
+        series = fundamentals.compact(FakeTicker().dividends)
+        assert series == {"1707454800000": 0.24, "1715313600000": 0.25}
+        assert fundamentals.compact({"symbol": "AAPL"}) == {"symbol": "AAPL"}
+
+
+class TestStaleSections:
+    def test_ttls_per_section(self):
+        now = datetime.datetime(2024, 1, 10, 12)
+        document = {"fetched_at": {name: now - datetime.timedelta(days=2) for name in SECTIONS}}
+
+        stale = fundamentals.stale_sections(document, now)
+
+        assert set(stale) == {name for name, (_, ttl) in SECTIONS.items() if ttl <= datetime.timedelta(days=2)}
+        assert "income" not in stale and "info" in stale and "news" in stale
+        assert fundamentals.stale_sections(None, now) == list(SECTIONS)
+
+
+class TestRefreshFundamentals:
+    async def test_fetches_concurrently_and_only_stale_sections(self, mock_mongo_db):
+        collection = mock_mongo_db["ticker_infos"]
+        now = datetime.datetime(2024, 1, 10, 12)
+        ticker = FakeTicker(delay=0.05)
+
+        document = await fundamentals.refresh_fundamentals(collection, "AAPL", ticker, now)
+
+        assert sorted(ticker.reads) == sorted(attribute for attribute, _ in SECTIONS.values())
+        assert len(ticker.threads) > 1
+        assert document["info"]["sector"] == "Technology"
+        stored = await collection.find_one({"ticker": "AAPL"})
+        assert stored["income"]["1727654400000"]["Net Income"] == 1.5e9
+        assert stored["fetched_at"]["income"] == now
+
+        ticker = FakeTicker()
+        await fundamentals.refresh_fundamentals(collection, "AAPL", ticker, now + datetime.timedelta(hours=2))
+        assert ticker.reads == ["news"]
+        assert await collection.count_documents({"ticker": "AAPL"}) == 1
+
+    async def test_failed_sections_keep_previous_data(self, mock_mongo_db):
+        collection = mock_mongo_db["ticker_infos"]
+        now = datetime.datetime(2024, 1, 10, 12)
+        await fundamentals.refresh_fundamentals(collection, "AAPL", FakeTicker(), now)
+
+        later = now + datetime.timedelta(days=1)
+        document = await fundamentals.refresh_fundamentals(
+            collection, "AAPL", FakeTicker(failing=("info",)), later
+        )
+
+        assert document["info"]["symbol"] == "AAPL"
+        assert document["fetched_at"]["info"] == now
+        stored = await collection.find_one({"ticker": "AAPL"})
+        assert stored["fetched_at"]["info"] == now
+        assert stored["fetched_at"]["news"] == later
@@ -31,7 +31,17 @@ class TestMongoDBClient:
         """COLLECTIONS dict should expose all expected collection names."""
         from app.base.utils.mongodb import COLLECTIONS
 
-        expected = {"stock_lists", "news", "news_with_sentiment", "price_histories", "ticker_infos"}
+        expected = {
+            "stock_lists",
+            "news",
+            "news_with_sentiment",
+            "price_histories",
+            "ticker_infos",
+            "news_sentiment_rollups",
+            "price_bars",
+            "tool_result_cache",
+            "leases",
+        }
         assert expected == set(COLLECTIONS.keys())
 
     async def test_collections_values_are_strings(self):
@@ -0,0 +1,157 @@
+"""
+Unit tests for Alpha Vantage ingestion in app/news/ingest.py.
+
+The API is replaced by a local HTTP server (alpha_vantage_stub) serving the
+bundled example response; MongoDB by mongomock-motor.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from app.news import ingest, service
+
+EXAMPLE = os.path.join(
+    os.path.dirname(ingest.__file__), "example", "alphavantage_news_sentiment_response_example.json"
+)
+
+
+@pytest.fixture
+def example_feed() -> list[dict]:
+    with open(EXAMPLE) as f:
+        return json.load(f)["feed"]
+
+
+@pytest.fixture
+async def http_client():
+    yield
+    # Each test runs on its own event loop; don't carry pooled connections over
+    await ingest.close_http_client()
+
+
+class FakeArticles:
+    """Collection double recording bulk writes, answering like an upsert by URL."""
+
+    def __init__(self, existing=(), changed=()):
+        self.existing, self.changed, self.writes = set(existing), set(changed), []
+
+    async def bulk_write(self, updates, ordered=True):
+        self.writes.append((updates, ordered))
+        urls = [update._filter["url"] for update in updates]
+        matched = [url for url in urls if url in self.existing]
+        return SimpleNamespace(
+            upserted_ids={i: f"id{i}" for i, url in enumerate(urls) if url not in self.existing},
+            upserted_count=len(urls) - len(matched),
+            matched_count=len(matched),
+            modified_count=len([url for url in matched if url in self.changed]),
+        )
+
+
+class TestFetchNewsFeed:
+    async def test_streams_and_parses_the_feed(self, alpha_vantage_stub, http_client, example_feed):
+        with open(EXAMPLE, "rb") as f:
+            alpha_vantage_stub.body = f.read()
+
+        feed = await ingest.fetch_news_feed(
+            {"apikey": "test", "tickers": "AAPL", "from_date": None, "to_date": "", "limit": 50}
+        )
+
+        assert feed == example_feed
+        query = alpha_vantage_stub.requests[0]
+        assert "function=NEWS_SENTIMENT" in query and "tickers=AAPL" in query
+        assert "from_date" not in query and "to_date" not in query
+
+    async def test_reuses_the_client(self, alpha_vantage_stub, http_client):
+        await ingest.fetch_news_feed({"apikey": "test"})
+        client = ingest.get_http_client()
+        await ingest.fetch_news_feed({"apikey": "test"})
+        assert ingest.get_http_client() is client
+        assert len(alpha_vantage_stub.requests) == 2
+
+    async def test_rate_limit_message_raises(self, alpha_vantage_stub, http_client):
+        alpha_vantage_stub.body = b'{"Information": "API rate limit reached"}'
+        with pytest.raises(ingest.AlphaVantageError, match="rate limit"):
+            await ingest.fetch_news_feed({"apikey": "test"})
+
+    async def test_service_reports_fetch_errors(self, alpha_vantage_stub, http_client, mock_mongo_db, monkeypatch):
+        async def connect():
+            return mock_mongo_db
+
+        monkeypatch.setattr(service, "connect_mongodb", connect)
+        alpha_vantage_stub.body = b'{"Note": "Thank you for using Alpha Vantage"}'
+        params = service.AlphaVantageNewsQueryDTO(from_date="20240101T0000", to_date="20240102T0000")
+
+        result = await service.fetch_alpha_vantage_news(params)
+
+        assert result["status"] == 400
+        assert "Thank you" in result["message"]
+        assert await mock_mongo_db["news_with_sentiment"].count_documents({}) == 0
+
+
+class TestArticleUpserts:
+    def test_normalises_and_keys_on_url(self, example_feed):
+        updates, articles, skipped = ingest.article_upserts(copy.deepcopy(example_feed))
+
+        # The example feed repeats one article
+        assert (len(updates), skipped) == (329, 1)
+        assert updates[0]._filter == {"url": articles[0]["url"]}
+        assert updates[0]._upsert is True
+        assert articles[0]["time_published"] == "2023-12-16T12:45:54"
+        assert isinstance(articles[0]["ticker_sentiment"][0]["ticker_sentiment_score"], float)
+        assert isinstance(articles[0]["topics"][0]["relevance_score"], float)
+
+    def test_skips_items_without_url_or_time(self):
+        feed = [
+            {"title": "no url", "time_published": "20240101T000000"},
+            {"url": "https://example.com/a", "time_published": "yesterday"},
+            {"url": "https://example.com/b", "time_published": "20240101T000000"},
+        ]
+        updates, articles, skipped = ingest.article_upserts(feed)
+        assert skipped == 2
+        assert [a["url"] for a in articles] == ["https://example.com/b"]
+
+    async def test_counts_inserted_updated_and_skipped(self):
+        feed = [
+            {"url": f"https://example.com/{name}", "time_published": "20240101T000000"}
+            for name in ("new", "changed", "same", "same")
+        ]
+        collection = FakeArticles(
+            existing={"https://example.com/changed", "https://example.com/same"},
+            changed={"https://example.com/changed"},
+        )
+
+        counts, inserted = await ingest.upsert_articles(collection, feed)
+
+        assert counts == {"received": 4, "inserted": 1, "updated": 1, "skipped": 2}
+        assert [a["url"] for a in inserted] == ["https://example.com/new"]
+        assert len(collection.writes) == 1 and collection.writes[0][1] is False
+
+    async def test_overlapping_windows_do_not_duplicate(self, mock_mongo_db, example_feed):
+        collection = mock_mongo_db["news_with_sentiment"]
+        first, _ = await ingest.upsert_articles(collection, copy.deepcopy(example_feed[:200]))
+        second, inserted = await ingest.upsert_articles(collection, copy.deepcopy(example_feed[100:]))
+
+        assert first["inserted"] == 200
+        assert second["inserted"] == len(inserted) == 129
+        assert await collection.count_documents({}) == 329
+
+    async def test_counts_against_a_collection(self, mock_mongo_db):
+        collection = mock_mongo_db["news_with_sentiment"]
+
+        def item(name: str, title: str) -> dict:
+            return {"url": f"https://example.com/{name}", "time_published": "20240101T000000", "title": title}
+
+        await ingest.upsert_articles(collection, [item("changed", "v1"), item("same", "v1")])
+        counts, inserted = await ingest.upsert_articles(
+            collection, [item("new", "v1"), item("changed", "v2"), item("same", "v1")]
+        )
+
+        assert counts == {"received": 3, "inserted": 1, "updated": 1, "skipped": 1}
+        assert [a["url"] for a in inserted] == ["https://example.com/new"]
+        stored = await collection.find_one({"url": "https://example.com/changed"})
+        assert stored["title"] == "v2"
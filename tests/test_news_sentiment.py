@@ -0,0 +1,326 @@
+"""
+Unit tests for periodic news sentiment in app/news/service.py and the
+ingest-time rollups in app/news/rollups.py.
+
+Uses mongomock-motor — no live MongoDB connection required.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+
+import pytest
+
+from app.news import rollups, service
+
+pytestmark = pytest.mark.asyncio
+
+
+def _article(ticker: str, age: datetime.timedelta, score: float) -> dict:
+    published = datetime.datetime.now(datetime.timezone.utc) - age
+    return {
+        "title": f"{ticker} {age}",
+        # Stored the way fetch_alpha_vantage_news archives it
+        "time_published": published.replace(tzinfo=None).isoformat(),
+        "overall_sentiment_score": score,
+        "ticker_sentiment": [{"ticker": ticker, "ticker_sentiment_score": score}],
+    }
+
+
+@pytest.fixture
+async def news_db(mock_mongo_db, monkeypatch):
+    async def connect():
+        return mock_mongo_db
+
+    monkeypatch.setattr(service, "connect_mongodb", connect)
+    monkeypatch.setattr(service, "_sentiment_index_ready", False)
+    monkeypatch.setattr(service, "_rollups_complete", False)
+    return mock_mongo_db
+
+
+class TestPeriodicSentiment:
+    async def test_windows_and_weekly_buckets(self, news_db):
+        hours, days = datetime.timedelta(hours=1), datetime.timedelta(days=1)
+        await news_db["news_with_sentiment"].insert_many(
+            [
+                _article("AAPL", 2 * hours, 0.4),
+                _article("AAPL", 12 * hours, 0.2),
+                _article("AAPL", 3 * days, -0.2),
+                _article("AAPL", 10 * days, 0.6),
+                _article("AAPL", 80 * days, 1.0),
+                _article("AAPL", 120 * days, 5.0),
+                _article("MSFT", 2 * hours, -1.0),
+            ]
+        )
+
+        result = await service.get_news_sentiment_per_period_by_ticker("AAPL")
+
+        assert result["ticker"] == "AAPL"
+        assert result["6 hours"]["timeframe"] == pytest.approx(0.4)
+        assert result["1 day"]["timeframe"] == pytest.approx(0.3)
+        assert result["1 week"]["timeframe"] == pytest.approx(0.4 / 3)
+        assert result["3 months"]["timeframe"] == pytest.approx(2.0 / 5)
+        weekly = result["weekly_sentiment"]
+        assert list(weekly)[:2] == ["1 week ago", "2 weeks ago"]
+        assert weekly["1 week ago"] == pytest.approx(0.4 / 3)
+        assert weekly["2 weeks ago"] == pytest.approx(0.6)
+        assert weekly["10 weeks ago"] == 0
+
+    async def test_no_articles(self, news_db):
+        result = await service.get_news_sentiment_per_period_by_ticker("NONE")
+        assert all(result[name] == {"timeframe": 0} for name in service.SENTIMENT_WINDOWS)
+        assert set(result["weekly_sentiment"].values()) == {0}
+
+    async def test_creates_compound_index(self, news_db):
+        await service.get_news_sentiment_per_period_by_ticker("AAPL")
+        indexes = await news_db["news_with_sentiment"].index_information()
+        assert indexes["ticker_sentiment_ticker_time_published"]["key"] == service.SENTIMENT_INDEX
+
+
+async def _store_rollups(collection, articles, complete: bool = True) -> None:
+    """Write rollups as whole documents, as a rebuild would leave them."""
+    if complete:
+        await collection.insert_one({"_id": rollups.ROLLUP_COVERAGE_ID})
+    await collection.insert_many(
+        [
+            {
+                "_id": f"{ticker}:{granularity}:{bucket.isoformat()}",
+                "ticker": ticker,
+                "granularity": granularity,
+                "bucket": bucket,
+                "day": rollups.floor_day(bucket),
+                **stats,
+            }
+            for (ticker, granularity, bucket), stats in rollups.build_rollups(articles).items()
+        ]
+    )
+
+
+class RecordingCollection:
+    """Records the operations passed to bulk_write."""
+
+    def __init__(self):
+        self.writes = []
+
+    async def bulk_write(self, operations, ordered=True):
+        self.writes.append((operations, ordered))
+
+
+class TestSentimentRollups:
+    async def test_rollup_updates_use_inc_min_max(self):
+        feed = [_article("AAPL", datetime.timedelta(hours=1), 0.5)]
+        updates = rollups.rollup_updates(rollups.build_rollups(feed))
+
+        assert len(updates) == 2
+        update = updates[0]._doc
+        assert update["$inc"]["overall.count"] == 1 and update["$inc"]["overall.sum"] == 0.5
+        assert update["$min"]["overall.min"] == 0.5 and update["$max"]["overall.max"] == 0.5
+        assert update["$setOnInsert"]["ticker"] == "AAPL" and updates[0]._upsert
+
+    async def test_build_rollups_aggregates_per_ticker_and_bucket(self):
+        feed = [
+            {
+                "time_published": "2024-01-01T13:15:00",
+                "overall_sentiment_score": 0.5,
+                "ticker_sentiment": [
+                    {"ticker": "AAPL", "ticker_sentiment_score": "0.2", "relevance_score": "0.9"},
+                    {"ticker": "MSFT", "ticker_sentiment_score": "-0.1", "relevance_score": "0.3"},
+                ],
+            },
+            {
+                "time_published": "2024-01-01T18:00:00",
+                "overall_sentiment_score": -0.3,
+                "ticker_sentiment": [
+                    {"ticker": "AAPL", "ticker_sentiment_score": "0.6", "relevance_score": "0.1"},
+                ],
+            },
+        ]
+        built = rollups.build_rollups(feed)
+
+        day = built[("AAPL", rollups.DAY, datetime.datetime(2024, 1, 1))]
+        assert day["overall"] == {"sum": pytest.approx(0.2), "count": 2, "min": -0.3, "max": 0.5}
+        assert day["sentiment"]["max"] == 0.6 and day["relevance"]["min"] == 0.1
+        assert built[("AAPL", rollups.HOUR, datetime.datetime(2024, 1, 1, 13))]["overall"]["count"] == 1
+        assert len(built) == 5
+
+    async def test_apply_rollups_writes_one_unordered_bulk(self):
+        feed = [
+            _article("AAPL", datetime.timedelta(hours=1), 0.5),
+            _article("MSFT", datetime.timedelta(hours=1), -0.5),
+        ]
+        collection = RecordingCollection()
+
+        touched = await rollups.apply_rollups(collection, feed)
+
+        expected = rollups.rollup_updates(rollups.build_rollups(feed))
+        assert touched == len(expected) == 4
+        assert collection.writes == [(expected, False)]
+
+    async def test_apply_rollups_skips_empty_feeds(self):
+        collection = RecordingCollection()
+        assert await rollups.apply_rollups(collection, [{"title": "no tickers"}]) == 0
+        assert collection.writes == []
+
+    async def test_upserts_accumulate(self, news_db):
+        collection = news_db["news_sentiment_rollups"]
+        feed = [_article("AAPL", datetime.timedelta(hours=1), 0.5)]
+        await rollups.apply_rollups(collection, feed)
+        await rollups.apply_rollups(collection, [_article("AAPL", datetime.timedelta(hours=1), -0.5)])
+
+        docs = await collection.find({"ticker": "AAPL", "granularity": rollups.DAY}).to_list(None)
+        assert [(d["overall"]["count"], d["overall"]["min"], d["overall"]["max"]) for d in docs] == [
+            (2, -0.5, 0.5)
+        ]
+
+    async def test_rollup_read_matches_article_aggregation(self, news_db):
+        hours, days = datetime.timedelta(hours=1), datetime.timedelta(days=1)
+        articles = [
+            _article("AAPL", 2 * hours, 0.4),
+            _article("AAPL", 12 * hours, 0.2),
+            _article("AAPL", 3 * days, -0.2),
+            _article("AAPL", 10 * days, 0.6),
+            _article("AAPL", 40 * days, -0.8),
+            _article("AAPL", 80 * days, 1.0),
+        ]
+        await news_db["news_with_sentiment"].insert_many([dict(a) for a in articles])
+        from_articles = await service.get_news_sentiment_per_period_by_ticker("AAPL")
+
+        await _store_rollups(news_db["news_sentiment_rollups"], articles)
+        from_rollups = await service.get_news_sentiment_per_period_by_ticker("AAPL")
+
+        for name in service.SENTIMENT_WINDOWS:
+            assert from_rollups[name]["timeframe"] == pytest.approx(from_articles[name]["timeframe"])
+        assert from_rollups["weekly_sentiment"] == pytest.approx(from_articles["weekly_sentiment"])
+
+    async def test_ingest_and_rebuild_maintain_rollups(self, news_db, alpha_vantage_stub):
+        published = datetime.datetime(2024, 1, 2, 9, 30)
+        alpha_vantage_stub.body = json.dumps({
+            "feed": [
+                {
+                    "title": "AAPL beats",
+                    "url": "https://example.com/aapl-beats",
+                    "time_published": published.strftime("%Y%m%dT%H%M%S"),
+                    "topics": [{"topic": "Earnings", "relevance_score": "0.9"}],
+                    "overall_sentiment_score": 0.3,
+                    "ticker_sentiment": [
+                        {"ticker": "AAPL", "ticker_sentiment_score": "0.4", "relevance_score": "0.8"}
+                    ],
+                }
+            ]
+        }).encode()
+        params = service.AlphaVantageNewsQueryDTO(from_date="20240101T0000", to_date="20240103T0000", tickers="AAPL")
+
+        result = await service.fetch_alpha_vantage_news(params)
+        assert result["status"] == 200
+
+        collection = news_db["news_sentiment_rollups"]
+        hourly = await collection.find_one({"_id": "AAPL:hour:2024-01-02T09:00:00"})
+        assert hourly["sentiment"]["sum"] == pytest.approx(0.4)
+
+        await service.rebuild_sentiment_rollups()
+        assert await collection.count_documents({"ticker": "AAPL"}) == 2
+        assert await rollups.rollups_complete(collection)
+        rebuilt = await collection.find_one({"_id": "AAPL:hour:2024-01-02T09:00:00"})
+        assert rebuilt["overall"] == hourly["overall"]
+
+
+class TestRollupCoverage:
+    async def test_incomplete_rollups_fall_back_to_articles(self, news_db):
+        days = datetime.timedelta(days=1)
+        recent = _article("AAPL", 1 * days, 0.5)
+        archived = _article("AAPL", 20 * days, -0.5)
+        await news_db["news_with_sentiment"].insert_many([dict(recent), dict(archived)])
+        # Rollups written by ingestion after the deploy only know the recent article
+        await _store_rollups(news_db["news_sentiment_rollups"], [recent], complete=False)
+
+        result = await service.get_news_sentiment_per_period_by_ticker("AAPL")
+
+        assert result["1 month"]["timeframe"] == pytest.approx(0.0)
+        assert result["weekly_sentiment"]["3 weeks ago"] == pytest.approx(-0.5)
+
+    async def test_rebuild_counts_each_article_once_and_swaps_in(self, news_db, monkeypatch):
+        articles = news_db["news_with_sentiment"]
+        await articles.insert_many([dict(_article("AAPL", datetime.timedelta(hours=i), 0.1)) for i in range(5)])
+        live = news_db["news_sentiment_rollups"]
+        await live.insert_one({"_id": "AAPL:hour:stale", "ticker": "AAPL"})
+        applied = []
+
+        async def fake_apply(collection, batch):
+            if not applied:
+                # An ingest lands while the archive is being read
+                await articles.insert_one(dict(_article("AAPL", datetime.timedelta(0), 0.9)))
+            applied.extend(article["_id"] for article in batch)
+            await collection.insert_many([{"ticker": "AAPL", "n": 1} for _ in batch])
+            return len(batch)
+
+        monkeypatch.setattr(service, "apply_rollups", fake_apply)
+        result = await service.rebuild_sentiment_rollups(batch_size=2)
+
+        assert "from 6 articles" in result["message"]
+        assert len(applied) == len(set(applied)) == 6
+        assert await live.find_one({"_id": "AAPL:hour:stale"}) is None
+        assert await live.count_documents({"n": 1}) == 6
+        assert await rollups.rollups_complete(live)
+        # The temporary build collection was renamed into place
+        assert not [n for n in await news_db.list_collection_names() if "_rebuild_" in n]
+
+    async def test_articles_ingested_before_the_rename_are_added_after_it(self, news_db, monkeypatch):
+        articles = news_db["news_with_sentiment"]
+        await articles.insert_one({**_article("AAPL", datetime.timedelta(hours=1), 0.5), "url": "a"})
+        add_to_rollups = service._add_to_rollups
+        passes = []
+
+        async def add_then_ingest(*args, **kwargs):
+            result = await add_to_rollups(*args, **kwargs)
+            passes.append(result)
+            if len(passes) == 2:
+                # Lands after the catch-up pass, before the rename
+                await articles.insert_one({**_article("AAPL", datetime.timedelta(hours=1), -0.5), "url": "b"})
+            return result
+
+        monkeypatch.setattr(service, "_add_to_rollups", add_then_ingest)
+        result = await service.rebuild_sentiment_rollups()
+
+        assert "from 2 articles" in result["message"]
+        assert [articles for articles, _ in passes] == [1, 0, 1]
+        live = news_db["news_sentiment_rollups"]
+        day = await live.find_one({"ticker": "AAPL", "granularity": rollups.DAY})
+        assert (day["overall"]["count"], day["overall"]["min"], day["overall"]["max"]) == (2, -0.5, 0.5)
+        assert (await live.find_one({"_id": rollups.ROLLUP_COVERAGE_ID}))["articles"] == 2
+        assert not await rollups.rebuild_in_progress(news_db["leases"])
+
+    async def test_only_one_rebuild_runs_at_a_time(self, news_db):
+        leases = news_db["leases"]
+        assert await rollups.acquire_rebuild_lease(leases, "other", 60)
+
+        result = await service.rebuild_sentiment_rollups()
+
+        assert result["status"] == 409
+        assert not await rollups.rollups_complete(news_db["news_sentiment_rollups"])
+        # An expired lease is taken over
+        await rollups.release_rebuild_lease(leases, "other")
+        assert await rollups.acquire_rebuild_lease(leases, "crashed", -1)
+        assert (await service.rebuild_sentiment_rollups())["status"] == 200
+
+    async def test_ingest_leaves_rollups_to_a_running_rebuild(self, news_db, alpha_vantage_stub):
+        alpha_vantage_stub.body = json.dumps({
+            "feed": [
+                {
+                    "title": "AAPL beats",
+                    "url": "https://example.com/aapl-beats",
+                    "time_published": "20240102T093000",
+                    "overall_sentiment_score": 0.3,
+                    "ticker_sentiment": [
+                        {"ticker": "AAPL", "ticker_sentiment_score": "0.4", "relevance_score": "0.8"}
+                    ],
+                }
+            ]
+        }).encode()
+        await rollups.acquire_rebuild_lease(news_db["leases"], "rebuild", 60)
+        params = service.AlphaVantageNewsQueryDTO(from_date="20240101T0000", to_date="20240103T0000", tickers="AAPL")
+
+        result = await service.fetch_alpha_vantage_news(params)
+
+        assert result["data"]["inserted"] == 1
+        assert await news_db["news_sentiment_rollups"].count_documents({}) == 0
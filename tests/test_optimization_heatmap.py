@@ -0,0 +1,137 @@
+"""
+Unit tests for the memoised optimisation heatmap helper.
+
+Runs a tiny synthetic strategy through backtesting.py — no network or DB required.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting import Backtest, Strategy
+
+from app.signals.strategies.optimization import (
+    data_fingerprint,
+    heatmap_session,
+    optimize_heatmap,
+    points_to_heatmap,
+)
+
+
+class _PeriodicStrat(Strategy):
+    """Buys every `entry` bars and closes every `exit` bars."""
+
+    entry = 10
+    exit = 5
+
+    def init(self):
+        pass
+
+    def next(self):
+        if len(self.data) % self.entry == 0 and not self.position:
+            self.buy(size=0.1)
+        elif len(self.data) % self.exit == 0:
+            self.position.close()
+
+
+def _sample_df(n: int = 300) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + 1,
+            "Low": close - 1,
+            "Close": close,
+            "Volume": 1000,
+        },
+        index=pd.date_range("2024-01-01", periods=n, freq="1h"),
+    )
+
+
+@pytest.fixture
+def bt():
+    return Backtest(_sample_df(), _PeriodicStrat, cash=10_000, finalize_trades=True)
+
+
+GRID = {"entry": [10, 20], "exit": [3, 5, 7]}
+
+
+class TestOptimizeHeatmap:
+    def test_matches_plain_optimize(self, bt):
+        _, expected = bt.optimize(**GRID, maximize="Win Rate [%]", return_heatmap=True)
+        heatmap = optimize_heatmap(bt, **GRID, maximize="Win Rate [%]")
+
+        pd.testing.assert_series_equal(
+            heatmap, expected.sort_index(), check_names=False, check_index_type=False
+        )
+        assert heatmap.name == "Win Rate [%]"
+        assert list(heatmap.index.names) == ["entry", "exit"]
+
+    def test_session_records_points_and_trade_counts(self, bt):
+        with heatmap_session() as session:
+            optimize_heatmap(bt, **GRID, maximize="Win Rate [%]")
+
+        assert session.objective == "Win Rate [%]"
+        assert session.evaluated == 6
+        assert session.reused == 0
+        assert len(session.points) == 6
+        for point in session.points:
+            assert set(point["params"]) == {"entry", "exit"}
+            assert isinstance(point["trades"], int)
+
+    def test_cached_points_are_not_reevaluated(self, bt):
+        with heatmap_session() as first:
+            full = optimize_heatmap(bt, **GRID, maximize="Win Rate [%]")
+
+        cached = {"Win Rate [%]": first.points[:4]}
+        with heatmap_session(cached) as second:
+            merged = optimize_heatmap(bt, **GRID, maximize="Win Rate [%]")
+
+        assert second.reused == 4
+        assert second.evaluated == 2
+        pd.testing.assert_series_equal(merged, full)
+
+    def test_fully_cached_grid_skips_optimize(self, bt, monkeypatch):
+        with heatmap_session() as first:
+            full = optimize_heatmap(bt, **GRID, maximize="Win Rate [%]")
+
+        def _fail(*args, **kwargs):
+            raise AssertionError("bt.optimize should not run when every point is cached")
+
+        monkeypatch.setattr(bt, "optimize", _fail)
+        with heatmap_session({"Win Rate [%]": first.points}) as second:
+            merged = optimize_heatmap(bt, **GRID, maximize="Win Rate [%]")
+
+        assert second.evaluated == 0
+        pd.testing.assert_series_equal(merged, full)
+
+    def test_points_for_other_objective_are_ignored(self, bt):
+        with heatmap_session() as first:
+            optimize_heatmap(bt, **GRID, maximize="Win Rate [%]")
+
+        with heatmap_session({"Win Rate [%]": first.points}) as second:
+            optimize_heatmap(bt, **GRID, maximize="Return [%]")
+
+        assert second.reused == 0
+        assert second.evaluated == 6
+
+
+class TestHelpers:
+    def test_fingerprint_is_stable_and_content_sensitive(self):
+        df = _sample_df()
+        assert data_fingerprint(df) == data_fingerprint(df.copy())
+
+        changed = df.copy()
+        changed.iloc[-1, changed.columns.get_loc("Close")] += 0.01
+        assert data_fingerprint(changed) != data_fingerprint(df)
+
+    def test_points_to_heatmap_maps_none_to_nan(self):
+        points = [
+            {"params": {"a": 1, "b": 2}, "value": 1.5, "trades": 3},
+            {"params": {"a": 1, "b": 3}, "value": None, "trades": 0},
+        ]
+        heatmap = points_to_heatmap(points, ["a", "b"], "Sharpe Ratio")
+        assert heatmap[(1, 2)] == 1.5
+        assert np.isnan(heatmap[(1, 3)])
@@ -0,0 +1,54 @@
+"""Unit tests for the strategy dispatch table in perform_backtest."""
+
+from __future__ import annotations
+
+import pytest
+from fastapi import HTTPException
+
+from app.signals.strategies import perform_backtest as pb
+
+
+def _recorder(calls):
+    def backtest(*args):
+        calls.append(args)
+        return "result"
+
+    return backtest
+
+
+def test_dispatch_passes_size_from_parameters(monkeypatch):
+    calls = []
+    monkeypatch.setitem(pb.BACKTEST_FUNCTIONS, "macd_1", _recorder(calls))
+
+    assert pb.perform_backtest("df", "macd_1", {"size": 0.5}) == "result"
+    assert calls == [("df", {"size": 0.5}, 0.5, False, None)]
+
+
+def test_dispatch_uses_default_size_and_sizeless_strategies(monkeypatch):
+    calls = []
+    monkeypatch.setitem(pb.BACKTEST_FUNCTIONS, "5_min_orb", _recorder(calls))
+    monkeypatch.setitem(pb.BACKTEST_FUNCTIONS, "grid_trading", _recorder(calls))
+
+    pb.perform_backtest("df", "5_min_orb", {}, True, {"tp": 1})
+    pb.perform_backtest("df", "grid_trading", {})
+
+    assert calls == [("df", {}, 0.03, True, {"tp": 1}), ("df", {}, False, None)]
+
+
+async def test_async_dispatch_uses_same_table(monkeypatch):
+    calls = []
+    monkeypatch.setitem(pb.BACKTEST_FUNCTIONS, "double_candle", _recorder(calls))
+
+    assert await pb.perform_backtest_async("df", "double_candle", {}) == "result"
+    assert calls == [("df", {}, 0.01)]
+
+
+def test_unknown_strategy_is_not_found():
+    with pytest.raises(HTTPException) as exc:
+        pb.perform_backtest("df", "nope", {})
+    assert exc.value.status_code == 404
+    assert pb.strategy_version("nope") is None
+
+
+def test_every_strategy_has_a_version():
+    assert all(pb.strategy_version(name) for name in pb.BACKTEST_FUNCTIONS)
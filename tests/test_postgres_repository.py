@@ -14,7 +14,11 @@ from datetime import datetime
 import pytest
 
 from app.db.repository import (
+    BacktestArtifactRepository,
+    BacktestCheckpointRepository,
+    BacktestReportRepository,
     BacktestStatRepository,
+    OptimizationHeatmapRepository,
     TradeActionRepository,
 )
 
@@ -61,18 +65,6 @@ def _trade_action_payload(backtest_id: int, dt: str = "2024-01-01T00:00:00") ->
 
 
 class TestBacktestStatRepository:
-    async def test_insert_creates_record(self, db_session):
-        repo = BacktestStatRepository(db_session)
-        data = _backtest_payload()
-        stat = await repo.insert(data)
-        assert stat is not None
-        assert stat.ticker == "AAPL"
-
-    async def test_insert_returns_correct_id(self, db_session):
-        repo = BacktestStatRepository(db_session)
-        stat = await repo.insert(_backtest_payload(id=101))
-        assert stat.id == 101
-
     async def test_upsert_creates_when_missing(self, db_session):
         repo = BacktestStatRepository(db_session)
         data = _backtest_payload()
@@ -82,24 +74,45 @@ class TestBacktestStatRepository:
 
     async def test_upsert_updates_when_existing(self, db_session):
         repo = BacktestStatRepository(db_session)
-        stat = await repo.insert(_backtest_payload(ticker="NVDA", sharpe_ratio=1.0))
+        stat = await repo.upsert(_backtest_payload(ticker="NVDA", sharpe_ratio=1.0))
 
         updated = await repo.upsert(_backtest_payload(ticker="NVDA", sharpe_ratio=2.5))
         assert updated is not None
         assert updated.id == stat.id
 
-        # upsert on the update path returns a slim SimpleNamespace(id, notifications_on).
+        # upsert returns a slim Row(id, notifications_on).
         # Verify the actual column value was persisted by fetching the record.
         fetched = await repo.get_by_id(stat.id)
         assert fetched is not None
         assert fetched.sharpe_ratio == 2.5
 
-    async def test_insert_multiple_records(self, db_session):
+    async def test_upsert_returns_stored_notifications_flag(self, db_session):
         repo = BacktestStatRepository(db_session)
-        for i in range(3):
-            stat = await repo.insert(_backtest_payload(ticker=f"TICK{i}"))
-            assert stat is not None
-            assert stat.ticker == f"TICK{i}"
+        created = await repo.upsert(_backtest_payload(ticker="MSFT", notifications_on=False))
+        assert created.notifications_on is False
+
+        # An existing flag is kept — the computed value only fills a NULL
+        updated = await repo.upsert(_backtest_payload(ticker="MSFT", notifications_on=True))
+        assert updated.id == created.id
+        assert updated.notifications_on is False
+
+    async def test_upsert_fills_null_notifications_flag(self, db_session):
+        repo = BacktestStatRepository(db_session)
+        stat = await repo.upsert(_backtest_payload(ticker="AMD", notifications_on=None))
+
+        updated = await repo.upsert(_backtest_payload(ticker="AMD", notifications_on=True))
+        assert updated.id == stat.id
+        assert updated.notifications_on is True
+
+    async def test_upsert_keeps_one_row_per_strategy_key(self, db_session):
+        repo = BacktestStatRepository(db_session)
+        first = await repo.upsert(_backtest_payload(ticker="TSLA"))
+        await repo.upsert(_backtest_payload(ticker="TSLA", win_rate=70.0))
+        other = await repo.upsert(_backtest_payload(ticker="TSLA", interval="1h"))
+
+        assert other.id != first.id
+        fetched = await repo.get_by_id(first.id)
+        assert fetched.win_rate == 70.0
 
 
 # ---------------------------------------------------------------------------
@@ -111,7 +124,7 @@ class TestTradeActionRepository:
     async def test_insert_many_returns_all_records(self, db_session):
         repo = TradeActionRepository(db_session)
         # First we need a backtest stat in the DB (FK constraint)
-        stat = await BacktestStatRepository(db_session).insert(_backtest_payload())
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
         stat_id = stat.id
 
         records = [
@@ -121,13 +134,43 @@ class TestTradeActionRepository:
         saved = await repo.insert_many(records)
         assert len(saved) == 3
 
+    async def test_insert_many_skips_existing_actions(self, db_session):
+        repo = TradeActionRepository(db_session)
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+
+        await repo.insert_many([_trade_action_payload(stat.id, "2024-01-01T00:00:00")])
+        saved = await repo.insert_many(
+            [
+                _trade_action_payload(stat.id, "2024-01-01T00:00:00"),
+                _trade_action_payload(stat.id, "2024-01-02T00:00:00"),
+            ]
+        )
+
+        assert [ta.datetime for ta in saved] == [datetime(2024, 1, 2)]
+        assert len(await repo.get_all_for_backtest(stat.id)) == 2
+
+    async def test_insert_many_in_chunks(self, db_session):
+        repo = TradeActionRepository(db_session)
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+
+        await repo.insert_many([_trade_action_payload(stat.id, "2024-01-03T00:00:00")])
+        records = [
+            _trade_action_payload(stat.id, f"2024-01-{day:02d}T00:00:00") for day in range(1, 8)
+        ]
+        saved = await repo.insert_many(records, chunk_size=3)
+
+        # Rows of every chunk come back, minus the one that already existed
+        assert len(saved) == 6
+        assert datetime(2024, 1, 3) not in [ta.datetime for ta in saved]
+        assert len(await repo.get_all_for_backtest(stat.id)) == 7
+
     async def test_insert_many_empty_list_returns_empty(self, db_session):
         repo = TradeActionRepository(db_session)
         result = await repo.insert_many([])
         assert result == []
 
     async def test_get_latest_for_strategy_returns_newest(self, db_session):
-        stat = await BacktestStatRepository(db_session).insert(_backtest_payload())
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
         stat_id = stat.id
 
         ta_repo = TradeActionRepository(db_session)
@@ -145,3 +188,178 @@ class TestTradeActionRepository:
         repo = TradeActionRepository(db_session)
         result = await repo.get_latest_for_strategy(999)
         assert result is None
+
+
+def _heatmap_payload(backtest_id: int, **overrides) -> dict:
+    return {
+        "backtest_id": backtest_id,
+        "ticker": "AAPL",
+        "strategy": "ema_bollinger",
+        "period": "1mo",
+        "interval": "1h",
+        "strategy_version": "abc123",
+        "data_fingerprint": "f" * 32,
+        "objective": "Win Rate [%]",
+        "points": [{"params": {"tp": 1.5}, "value": 55.0, "trades": 4}],
+        "updated_at": datetime(2024, 1, 1),
+        **overrides,
+    }
+
+
+class TestOptimizationHeatmapRepository:
+    async def test_get_cached_points_groups_by_objective(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = OptimizationHeatmapRepository(db_session)
+        await repo.upsert(_heatmap_payload(stat.id))
+        await repo.upsert(_heatmap_payload(stat.id, objective="Return [%]"))
+
+        cached = await repo.get_cached_points(_heatmap_payload(stat.id))
+        assert set(cached) == {"Win Rate [%]", "Return [%]"}
+        assert cached["Win Rate [%]"][0]["params"] == {"tp": 1.5}
+
+    async def test_get_cached_points_ignores_other_fingerprint(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = OptimizationHeatmapRepository(db_session)
+        await repo.upsert(_heatmap_payload(stat.id))
+
+        cached = await repo.get_cached_points(_heatmap_payload(stat.id, data_fingerprint="0" * 32))
+        assert cached == {}
+
+    async def test_upsert_replaces_points_for_same_key(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = OptimizationHeatmapRepository(db_session)
+        first_id = await repo.upsert(_heatmap_payload(stat.id))
+
+        new_points = [{"params": {"tp": 2.0}, "value": None, "trades": 0}]
+        second_id = await repo.upsert(_heatmap_payload(stat.id, points=new_points))
+
+        assert first_id == second_id
+        cached = await repo.get_cached_points(_heatmap_payload(stat.id))
+        assert cached["Win Rate [%]"] == new_points
+
+    async def test_null_key_columns_match(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = OptimizationHeatmapRepository(db_session)
+        await repo.upsert(_heatmap_payload(stat.id, period=None, interval=None))
+
+        cached = await repo.get_cached_points(_heatmap_payload(stat.id, period=None, interval=None))
+        assert set(cached) == {"Win Rate [%]"}
+        assert await repo.get_cached_points(_heatmap_payload(stat.id)) == {}
+
+    async def test_get_latest_for_backtest(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = OptimizationHeatmapRepository(db_session)
+        await repo.upsert(_heatmap_payload(stat.id))
+        await repo.upsert(
+            _heatmap_payload(stat.id, objective="Return [%]", updated_at=datetime(2024, 2, 1))
+        )
+
+        latest = await repo.get_latest_for_backtest(stat.id)
+        assert latest is not None
+        assert latest.objective == "Return [%]"
+        assert await repo.get_latest_for_backtest(999) is None
+
+
+class TestBacktestReportRepository:
+    @staticmethod
+    def _report(backtest_id: int, content_hash: str, html: str) -> dict:
+        return {
+            "backtest_id": backtest_id,
+            "content_hash": content_hash,
+            "html_codec": "identity",
+            "html": html,
+            "html_bytes": None,
+            "updated_at": datetime(2024, 1, 1),
+        }
+
+    async def test_exists(self, db_session):
+        repo = BacktestStatRepository(db_session)
+        stat = await repo.upsert(_backtest_payload())
+        assert await repo.exists(stat.id) is True
+        assert await repo.exists(999) is False
+
+    async def test_get_missing_returns_none(self, db_session):
+        assert await BacktestReportRepository(db_session).get(999) is None
+
+    async def test_upsert_inserts_then_replaces(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = BacktestReportRepository(db_session)
+
+        await repo.upsert(self._report(stat.id, "a", "first"))
+        await repo.upsert(self._report(stat.id, "b", "second"))
+
+        stored = await repo.get(stat.id)
+        assert (stored.content_hash, stored.html) == ("b", "second")
+
+    async def test_upsert_same_hash_leaves_row_untouched(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = BacktestReportRepository(db_session)
+
+        await repo.upsert(self._report(stat.id, "a", "first"))
+        await repo.upsert({**self._report(stat.id, "a", "rewritten"), "updated_at": datetime(2024, 1, 2)})
+
+        stored = await repo.get(stat.id)
+        await db_session.refresh(stored)
+        assert (stored.html, stored.updated_at) == ("first", datetime(2024, 1, 1))
+
+    async def test_delete(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = BacktestReportRepository(db_session)
+
+        await repo.upsert(self._report(stat.id, "a", "first"))
+        await repo.delete(stat.id)
+
+        assert await repo.get(stat.id) is None
+
+
+class TestBacktestArtifactRepository:
+    async def test_upsert_inserts_then_replaces(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = BacktestArtifactRepository(db_session)
+
+        await repo.upsert({"backtest_id": stat.id, "payload": b"first", "updated_at": datetime(2024, 1, 1)})
+        await repo.upsert({"backtest_id": stat.id, "payload": b"second", "updated_at": datetime(2024, 1, 2)})
+
+        assert await repo.get_payload(stat.id) == b"second"
+
+    async def test_get_payload_missing_returns_none(self, db_session):
+        assert await BacktestArtifactRepository(db_session).get_payload(999) is None
+
+
+class TestBacktestCheckpointRepository:
+    @staticmethod
+    def _checkpoint(backtest_id: int, **overrides) -> dict:
+        return {
+            "backtest_id": backtest_id,
+            "restart_at": "2024-01-01 00:00:00",
+            "last_bar": "2024-02-01 00:00:00",
+            "strategy_version": "abc",
+            "params": {"slcoef": 2.0},
+            "actions_digest": "d1",
+            "runs_since_rebuild": 0,
+            **overrides,
+        }
+
+    async def test_get_for_config_joins_backtest_key(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        other = await BacktestStatRepository(db_session).upsert(_backtest_payload(ticker="MSFT"))
+        repo = BacktestCheckpointRepository(db_session)
+        await repo.upsert(self._checkpoint(stat.id))
+        await repo.upsert(self._checkpoint(other.id, actions_digest="d2"))
+
+        checkpoint = await repo.get_for_config("AAPL", "macd_1", "1y", "1d")
+        assert (checkpoint.backtest_id, checkpoint.params) == (stat.id, {"slcoef": 2.0})
+        assert await repo.get_for_config("AAPL", "macd_1", "2y", "1d") is None
+
+    async def test_upsert_replaces_and_update_advances(self, db_session):
+        stat = await BacktestStatRepository(db_session).upsert(_backtest_payload())
+        repo = BacktestCheckpointRepository(db_session)
+        await repo.upsert(self._checkpoint(stat.id, runs_since_rebuild=3))
+        await repo.upsert(self._checkpoint(stat.id, actions_digest="d2"))
+        await repo.update(stat.id, {"last_bar": "2024-02-02 00:00:00", "runs_since_rebuild": 1})
+
+        checkpoint = await repo.get_for_config("AAPL", "macd_1", "1y", "1d")
+        await db_session.refresh(checkpoint)
+        assert (checkpoint.actions_digest, checkpoint.last_bar, checkpoint.runs_since_rebuild) == (
+            "d2", "2024-02-02 00:00:00", 1,
+        )
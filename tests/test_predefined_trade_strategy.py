@@ -0,0 +1,73 @@
+"""
+Unit tests for the replay strategy's trade-schedule matching
+(app/signals/strategies/replay/predefined_trade_strategy.py).
+
+Uses backtesting.py's bundled GOOG sample data — no network or DB required.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pandas as pd
+from backtesting.test import GOOG
+
+from app.signals.strategies.replay.predefined_trade_strategy import backtest
+
+
+def _trade(dt, action, size=10):
+    return {
+        "datetime": dt,
+        "trade_action": action,
+        "entry_price": None,
+        "price": None,
+        "sl": None,
+        "tp": None,
+        "size": size if action != "close" else None,
+    }
+
+
+DF = GOOG.iloc[:60]
+
+
+class TestTradeScheduleMatching:
+    def test_trades_execute_on_first_bar_at_or_after_their_time(self):
+        index = DF.index
+        schedule = [
+            _trade(index[10].to_pydatetime(), "buy"),
+            # Saturday between two bars → runs on the following Monday's bar
+            _trade(datetime(2004, 9, 11, 12, 0), "close"),
+            _trade(index[30], "sell"),
+            # Out of order in the input; the schedule is sorted before matching
+            _trade(index[25], "close"),
+        ]
+
+        _, stats, actions, _ = backtest(DF, schedule)
+
+        executed = [(a["trade_action"], pd.Timestamp(a["datetime"])) for a in actions]
+        assert executed == [
+            ("buy", index[10]),
+            ("close", index[index.searchsorted(pd.Timestamp("2004-09-11 12:00"))]),
+            ("close", index[25]),
+            ("sell", index[30]),
+        ]
+        # The final sell is still open at the end, so only the long round trip is closed
+        assert stats["# Trades"] == 1
+
+    def test_trades_before_first_or_after_last_bar_are_skipped(self):
+        assert DF.index[0] > pd.Timestamp("2004-07-01") and DF.index[-1] < pd.Timestamp("2005-01-01")
+        schedule = [
+            _trade(datetime(2004, 7, 1), "buy"),
+            _trade(datetime(2005, 1, 1), "sell"),
+        ]
+
+        _, _, actions, _ = backtest(DF, schedule)
+
+        assert actions == []
+
+    def test_string_datetimes_are_accepted(self):
+        schedule = [_trade(DF.index[5].strftime("%Y-%m-%d %H:%M:%S.%f"), "buy")]
+
+        _, _, actions, _ = backtest(DF, schedule)
+
+        assert [pd.Timestamp(a["datetime"]) for a in actions] == [DF.index[5]]
@@ -0,0 +1,117 @@
+"""
+Unit tests for the append-only price history in app/ticker/price_bars.py.
+
+Uses mongomock-motor and synthetic yfinance frames — no network access.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ticker import price_bars, service
+
+
+def _history(start: str, periods: int, tz: str = "America/New_York") -> pd.DataFrame:
+    index = pd.date_range(start, periods=periods, freq="B", tz=tz, name="Date")
+    close = np.linspace(100, 100 + periods - 1, periods) + 0.123456
+    return pd.DataFrame(
+        {
+            "Open": close - 1,
+            "High": close + 1,
+            "Low": close - 2,
+            "Close": close,
+            "Volume": np.arange(periods) * 1000,
+            "Dividends": 0.0,
+            "Stock Splits": 0.0,
+        },
+        index=index,
+    )
+
+
+@pytest.fixture
+async def bars_db(mock_mongo_db, monkeypatch):
+    async def connect():
+        return mock_mongo_db
+
+    monkeypatch.setattr(service, "connect_mongodb", connect)
+    monkeypatch.setattr(service, "_price_bar_index_ready", False)
+    return mock_mongo_db
+
+
+class TestHistoryRecords:
+    def test_builds_one_rounded_document_per_day(self):
+        records = price_bars.history_records("AAPL", _history("2024-01-01", 3))
+
+        assert [r["_id"] for r in records] == ["AAPL:2024-01-01", "AAPL:2024-01-02", "AAPL:2024-01-03"]
+        assert records[0] == {
+            "_id": "AAPL:2024-01-01",
+            "ticker": "AAPL",
+            "time": "2024-01-01",
+            "open": 99.12346,
+            "high": 101.12346,
+            "low": 98.12346,
+            "close": 100.12346,
+            "volume": 0.0,
+        }
+
+    def test_empty_and_missing_closes(self):
+        assert price_bars.history_records("AAPL", _history("2024-01-01", 0)) == []
+        history = _history("2024-01-01", 2)
+        history.iloc[0, history.columns.get_loc("Close")] = np.nan
+        assert [r["time"] for r in price_bars.history_records("AAPL", history)] == ["2024-01-02"]
+
+
+class TestReadBars:
+    async def test_range_query_is_inclusive_and_sorted(self, mock_mongo_db):
+        collection = mock_mongo_db["price_bars"]
+        records = price_bars.history_records("AAPL", _history("2024-01-01", 10))
+        await collection.insert_many(list(reversed(records)))
+        await collection.insert_many(price_bars.history_records("MSFT", _history("2024-01-01", 10)))
+
+        bars = await price_bars.read_bars(collection, "AAPL", "2024-01-03", "2024-01-08")
+
+        assert [bar["time"] for bar in bars] == ["2024-01-03", "2024-01-04", "2024-01-05", "2024-01-08"]
+        assert set(bars[0]) == {"time", "open", "high", "low", "close", "volume"}
+        assert len(await price_bars.read_bars(collection, "AAPL")) == 10
+        assert len(await price_bars.read_bars(collection, "AAPL", start="2024-01-12")) == 1
+
+    async def test_latest_bar_time(self, mock_mongo_db):
+        collection = mock_mongo_db["price_bars"]
+        assert await price_bars.latest_bar_time(collection, "AAPL") is None
+        await collection.insert_many(price_bars.history_records("AAPL", _history("2024-01-01", 5)))
+        assert await price_bars.latest_bar_time(collection, "AAPL") == "2024-01-05"
+
+
+class TestArchivePriceHistory:
+    async def test_refresh_only_appends_new_bars(self, bars_db, monkeypatch):
+        calls = []
+
+        def fetch(ticker, start):
+            calls.append(start)
+            if start is None:
+                return _history("2024-01-01", 5)
+            return _history(start, 3)
+
+        monkeypatch.setattr(service, "_fetch_history", fetch)
+
+        first = await service.get_ticker_price_history("AAPL")
+        second = await service.get_ticker_price_history("AAPL")
+
+        assert calls == [None, "2024-01-05"]
+        assert first["data"] == {"inserted": 5, "updated": 0}
+        # 2024-01-05 is re-written unchanged, 01-08 and 01-09 are new
+        assert second["data"]["inserted"] == 2
+        assert await bars_db["price_bars"].count_documents({"ticker": "AAPL"}) == 7
+
+    async def test_fetch_errors_are_reported(self, bars_db, monkeypatch):
+        def fetch(ticker, start):
+            raise RuntimeError("rate limited")
+
+        monkeypatch.setattr(service, "_fetch_history", fetch)
+
+        result = await service.get_ticker_price_history("AAPL")
+
+        assert result["status"] == 400
+        assert "rate limited" in result["message"]
@@ -0,0 +1,91 @@
+"""
+Unit tests for the replay result cache in app/signals/service.py.
+
+Uses backtesting.py's bundled GOOG sample data in place of yfinance and the
+SQLite session from conftest — no network required.
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+from backtesting.test import GOOG
+
+from app.db.repository import BacktestStatRepository, TradeActionRepository
+from app.signals import service
+from app.signals.strategies.replay import predefined_trade_strategy
+
+
+@pytest.fixture
+async def replay_env(db_session, monkeypatch):
+    stat = await BacktestStatRepository(db_session).upsert(
+        {"ticker": "GOOG", "strategy": "macd_1", "period": "2y", "interval": "1d", "trade_count": 1}
+    )
+    await TradeActionRepository(db_session).insert_many(
+        [
+            {"id": 1, "backtest_id": stat.id, "datetime": datetime(2005, 3, 1),
+             "trade_action": "buy", "entry_price": 180.0, "price": 180.0, "size": 10},
+            {"id": 2, "backtest_id": stat.id, "datetime": datetime(2005, 6, 1),
+             "trade_action": "close", "entry_price": None, "price": 280.0, "size": None},
+        ]
+    )
+
+    @asynccontextmanager
+    async def session_local():
+        yield db_session
+
+    bars = {"df": GOOG.iloc[:400]}
+    runs = []
+    original = predefined_trade_strategy.backtest
+
+    def counting_backtest(df, trade_schedule, **kwargs):
+        runs.append(len(df))
+        return original(df, trade_schedule, **kwargs)
+
+    monkeypatch.setattr(service, "AsyncSessionLocal", session_local)
+    monkeypatch.setattr(service, "getYFinanceData", lambda **kwargs: bars["df"].copy())
+    monkeypatch.setattr(predefined_trade_strategy, "backtest", counting_backtest)
+    service._replay_cache.clear()
+    yield stat.id, bars, runs, db_session
+    service._replay_cache.clear()
+
+
+class TestReplayCache:
+    async def test_repeat_view_is_a_cache_hit(self, replay_env):
+        backtest_id, _, runs, _ = replay_env
+
+        first = await service.replay_backtest(backtest_id)
+        second = await service.replay_backtest(backtest_id)
+
+        assert len(runs) == 1
+        assert second["data"] == first["data"]
+
+    async def test_mutating_a_result_leaves_the_cache_intact(self, replay_env):
+        backtest_id, _, runs, _ = replay_env
+
+        first = await service.replay_backtest(backtest_id)
+        expected = dict(first["data"])
+        first["data"]["html"] = None
+        second = await service.replay_backtest(backtest_id)
+        second["data"].pop("ticker")
+        third = await service.replay_backtest(backtest_id)
+
+        assert len(runs) == 1
+        assert third["data"] == expected
+
+    async def test_new_bar_or_trade_recomputes(self, replay_env):
+        backtest_id, bars, runs, session = replay_env
+
+        await service.replay_backtest(backtest_id)
+        bars["df"] = GOOG.iloc[:401]
+        await service.replay_backtest(backtest_id)
+        assert len(runs) == 2
+
+        await TradeActionRepository(session).insert_many(
+            [{"id": 3, "backtest_id": backtest_id, "datetime": datetime(2005, 8, 1),
+              "trade_action": "sell", "entry_price": 290.0, "price": 290.0, "size": 5}]
+        )
+        await service.replay_backtest(backtest_id)
+        assert len(runs) == 3
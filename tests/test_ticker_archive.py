@@ -0,0 +1,141 @@
+"""
+Unit tests for batch archive jobs in app/ticker/archive.py.
+
+yf.download and yf.Ticker are replaced by synthetic data; MongoDB is
+mongomock-motor.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+from fastapi import HTTPException
+
+from app.signals.jobs import DONE, JobRegistry
+from app.ticker import archive
+from tests.test_fundamentals import FakeTicker
+from tests.test_price_bars import _history
+
+
+def _download(histories: dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """A multi-ticker yf.download frame (ticker, field) columns."""
+    return pd.concat(histories, axis=1)
+
+
+@pytest.fixture
+def archive_db(mock_mongo_db, monkeypatch):
+    async def connect():
+        return mock_mongo_db
+
+    monkeypatch.setattr(archive, "connect_mongodb", connect)
+    monkeypatch.setattr(archive.yf, "Ticker", lambda ticker: FakeTicker(failing=("news",) if ticker == "BAD" else ()))
+    return mock_mongo_db
+
+
+class TestDownloadHistories:
+    def test_splits_multi_ticker_frame(self, monkeypatch):
+        calls = []
+
+        def download(tickers, **kwargs):
+            calls.append((tickers, kwargs))
+            frame = _download({"AAPL": _history("2024-01-01", 3), "MSFT": _history("2024-01-01", 3)})
+            # yfinance leaves an all-NaN block for tickers it could not fetch
+            frame[("NOPE", "Close")] = float("nan")
+            return frame
+
+        monkeypatch.setattr(archive.yf, "download", download)
+
+        histories = archive.download_histories(["AAPL", "MSFT", "NOPE", "GONE"], "2024-01-01")
+
+        assert set(histories) == {"AAPL", "MSFT"}
+        assert list(histories["AAPL"]["Close"].round(2)) == [100.12, 101.12, 102.12]
+        assert calls[0][1]["start"] == "2024-01-01" and calls[0][1]["group_by"] == "ticker"
+
+    def test_full_window_without_start(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(
+            archive.yf, "download", lambda tickers, **kwargs: calls.append(kwargs) or _download({"AAPL": _history("2024-01-01", 1)})
+        )
+        archive.download_histories(["AAPL"], None)
+        assert calls[0]["period"] == "5y" and "start" not in calls[0]
+
+
+class TestWatchlist:
+    async def test_latest_snapshot_symbols(self, mock_mongo_db):
+        collection = mock_mongo_db["stock_lists"]
+        await collection.insert_one({"date": "01-01-2024", "data": [{"Symbol": "OLD"}]})
+        await collection.insert_one({"date": "01-02-2024", "data": [{"Symbol": "AAPL"}, {"Symbol": "MSFT"}, {"Name": "x"}]})
+
+        assert await archive.watchlist_tickers(mock_mongo_db) == ["AAPL", "MSFT"]
+
+
+class TestArchiveJob:
+    async def test_archives_watchlist_and_reports_failures(self, archive_db, monkeypatch):
+        await archive_db["stock_lists"].insert_one({"data": [{"Symbol": "AAPL"}, {"Symbol": "BAD"}, {"Symbol": "GONE"}]})
+        monkeypatch.setattr(
+            archive,
+            "download_histories",
+            lambda tickers, start: {t: _history("2024-01-01", 5) for t in tickers if t != "GONE"},
+        )
+        monkeypatch.setattr(archive, "CHUNK_SIZE", 2)
+        progress = []
+
+        result = await archive.run_archive_job(on_progress=lambda stage, value, **details: progress.append((stage, value)))
+
+        assert result["tickers"] == 3
+        assert result["history"] == {"inserted": 10, "updated": 0, "archived": 2}
+        assert result["info"]["refreshed"] == 3
+        assert result["failed"]["GONE"]["history"] == "No price data returned"
+        assert "news" in result["failed"]["BAD"]["info"]
+        assert [stage for stage, _ in progress] == ["history", "history", "info", "info", "done"]
+        assert progress[-1][1] == 1.0
+        assert await archive_db["price_bars"].count_documents({}) == 10
+
+    async def test_failed_info_write_is_reported_per_ticker(self, archive_db):
+        class FailingWrites:
+            def __init__(self, collection):
+                self.collection = collection
+
+            def find(self, *args, **kwargs):
+                return self.collection.find(*args, **kwargs)
+
+            async def bulk_write(self, operations, ordered=True):
+                raise RuntimeError("write failed")
+
+        db = {archive.COLLECTIONS["ticker_infos"]: FailingWrites(archive_db["ticker_infos"])}
+        progress = archive.ArchiveProgress(["AAPL", "MSFT"], steps=1)
+
+        await archive.archive_fundamentals(db, ["AAPL", "MSFT"], progress)
+
+        assert progress.result["info"]["refreshed"] == 0
+        assert progress.result["failed"] == {
+            "AAPL": {"info": "write failed"},
+            "MSFT": {"info": "write failed"},
+        }
+
+    async def test_runs_on_a_job_registry(self, archive_db, monkeypatch):
+        async def run(tickers=None, history=True, info=True, job_id=None, on_progress=None):
+            on_progress("history", 0.5, result={"tickers": len(tickers)})
+            return {}
+
+        registry = JobRegistry(run, workers=1, job_id_arg="job_id")
+        job = registry.submit({"tickers": ["AAPL", "MSFT"], "history": True, "info": False})
+
+        async for snapshot in registry.watch(job.id):
+            if snapshot and snapshot["status"] == DONE:
+                break
+
+        assert registry.get(job.id).snapshot()["result"] == {"tickers": 2}
+
+    async def test_archive_registry_has_no_backtest_wording(self, monkeypatch):
+        monkeypatch.setattr(archive, "_registry", None)
+        monkeypatch.setenv("ARCHIVE_JOB_QUEUE_SIZE", "1")
+        registry = archive.get_archive_registry()
+        # Workers start on submit; keep the job queued
+        monkeypatch.setattr(registry, "_worker_count", 0)
+
+        job = registry.submit({"tickers": ["AAPL"]})
+        assert "backtest_id" not in job.snapshot()
+        with pytest.raises(HTTPException) as exc:
+            registry.submit({"tickers": ["MSFT"]})
+        assert exc.value.detail == "Too many archive jobs queued; try again later"
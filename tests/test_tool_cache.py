@@ -0,0 +1,162 @@
+"""
+Unit tests for the chatbot tool-result cache in app/ai/tool_cache.py.
+
+Tools are stood in for by counting coroutines; the mongo backend runs on
+mongomock-motor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.ai import tool_cache
+from app.ai.tool_cache import (
+    MemoryBackend,
+    MongoBackend,
+    ToolResultCache,
+    cache_key,
+    normalize_args,
+)
+
+
+class CountingTool:
+    def __init__(self, result=None, delay: float = 0.0):
+        self.calls = 0
+        self.result = result if result is not None else {"status": 200, "data": ["headline"]}
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.result
+
+
+def test_normalize_args_ignores_whitespace_and_key_order():
+    assert normalize_args("  AAPL\n news ") == "AAPL news"
+    assert normalize_args({"b": " X ", "a": ["Y"]}) == {"a": ["Y"], "b": "X"}
+    assert normalize_args({"b": " X ", "a": ["Y"]}, casefold=True) == {"a": ["y"], "b": "x"}
+
+
+def test_only_ticker_tools_ignore_case():
+    ticker = "get_news_sentiment"
+    assert cache_key(ticker, {"__arg1": "AAPL"}) == cache_key(ticker, {"__arg1": " aapl "})
+    search = "DuckDuckGoSearchRun"
+    assert cache_key(search, {"query": "US CPI"}) != cache_key(search, {"query": "us cpi"})
+    assert cache_key(search, {"query": "US  CPI "}) == cache_key(search, {"query": "US CPI"})
+
+
+def test_cache_key_depends_on_tool_name_and_args():
+    assert cache_key("get_news_sentiment", "AAPL") != cache_key("fetch_yfinance_news", "AAPL")
+    assert cache_key("get_news_sentiment", "AAPL") != cache_key("get_news_sentiment", "MSFT")
+
+
+async def test_repeated_call_is_served_from_cache():
+    cache = ToolResultCache(MemoryBackend())
+    tool = CountingTool()
+
+    first = await cache.get_or_call("get_news_sentiment", "AAPL", tool)
+    second = await cache.get_or_call("get_news_sentiment", " aapl ", tool)
+
+    assert first == second == tool.result
+    assert tool.calls == 1
+    counts = cache.metrics()["tools"]["get_news_sentiment"]
+    assert counts["hits"] == 1
+    assert counts["misses"] == 1
+    assert counts["hit_rate"] == 0.5
+
+
+async def test_entries_expire_after_the_tool_ttl():
+    cache = ToolResultCache(MemoryBackend(), ttls={"fetch_yfinance_news": 0.05})
+    tool = CountingTool()
+
+    await cache.get_or_call("fetch_yfinance_news", "AAPL", tool)
+    time.sleep(0.1)
+    await cache.get_or_call("fetch_yfinance_news", "AAPL", tool)
+
+    assert tool.calls == 2
+
+
+async def test_zero_ttl_disables_caching_for_a_tool():
+    cache = ToolResultCache(MemoryBackend(), ttls={"DuckDuckGoSearchRun": 0})
+    tool = CountingTool()
+
+    await cache.get_or_call("DuckDuckGoSearchRun", "okane", tool)
+    await cache.get_or_call("DuckDuckGoSearchRun", "okane", tool)
+
+    assert tool.calls == 2
+
+
+async def test_memory_backend_is_size_bounded():
+    backend = MemoryBackend(maxsize=2)
+    cache = ToolResultCache(backend)
+
+    for ticker in ["AAPL", "MSFT", "NVDA"]:
+        await cache.get_or_call("get_news_sentiment", ticker, CountingTool())
+
+    assert backend.size() == 2
+    assert cache.metrics()["size"] == 2
+
+
+async def test_errors_are_not_cached():
+    cache = ToolResultCache(MemoryBackend())
+    failing = CountingTool(result={"status": 500, "message": "upstream down"})
+
+    await cache.get_or_call("get_news_sentiment", "AAPL", failing)
+    await cache.get_or_call("get_news_sentiment", "AAPL", failing)
+    assert failing.calls == 2
+
+    async def raises():
+        raise TimeoutError
+
+    with pytest.raises(TimeoutError):
+        await cache.get_or_call("fetch_yfinance_news", "AAPL", raises)
+    assert cache.metrics()["tools"]["get_news_sentiment"]["errors"] == 2
+    assert cache.metrics()["tools"]["fetch_yfinance_news"]["errors"] == 1
+
+
+async def test_concurrent_identical_calls_run_the_tool_once():
+    cache = ToolResultCache(MemoryBackend())
+    tool = CountingTool(delay=0.05)
+
+    results = await asyncio.gather(
+        *(cache.get_or_call("get_news_sentiment", "AAPL", tool) for _ in range(5))
+    )
+
+    assert tool.calls == 1
+    assert all(result == tool.result for result in results)
+
+
+async def test_mongo_backend_shares_results(mock_mongo_db):
+    collection = mock_mongo_db["tool_result_cache"]
+    tool = CountingTool()
+
+    await ToolResultCache(MongoBackend(collection)).get_or_call("get_news_sentiment", "AAPL", tool)
+    # A second cache (another worker) sees the stored result
+    other_worker = ToolResultCache(MongoBackend(collection))
+    result = await other_worker.get_or_call("get_news_sentiment", "aapl", tool)
+
+    assert result == tool.result
+    assert tool.calls == 1
+    stored = await collection.find_one({"_id": cache_key("get_news_sentiment", "AAPL")})
+    assert stored["value"] == tool.result
+    assert "expires_at" in stored
+
+
+def test_create_tool_cache_reads_environment(monkeypatch):
+    monkeypatch.setenv("TOOL_CACHE_SIZE", "7")
+    monkeypatch.setenv("TOOL_CACHE_DEFAULT_TTL", "60")
+    cache = tool_cache.create_tool_cache()
+    assert isinstance(cache.backend, MemoryBackend)
+    assert cache.default_ttl == 60
+    assert cache.ttl("get_news_sentiment") == tool_cache.TOOL_TTLS["get_news_sentiment"]
+
+    monkeypatch.setenv("TOOL_CACHE_BACKEND", "mongo")
+    assert isinstance(tool_cache.create_tool_cache().backend, MongoBackend)
+
+    monkeypatch.setenv("TOOL_CACHE_BACKEND", "redis")
+    with pytest.raises(ValueError):
+        tool_cache.create_tool_cache()
@@ -0,0 +1,114 @@
+"""
+Unit tests for columnar trade schedules: the Core bulk and streaming reads in
+TradeActionRepository, the array conversion in
+app/signals/strategies/replay/trade_schedule.py and the CSV export.
+"""
+
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from app.db.repository import TRADE_SCHEDULE_COLUMNS, BacktestStatRepository, TradeActionRepository
+from app.signals import backtests_service
+from app.signals.strategies.replay.trade_schedule import (
+    schedule_from_records,
+    schedule_from_rows,
+    schedule_hash,
+)
+
+
+async def _insert_actions(session, count: int) -> int:
+    stat = await BacktestStatRepository(session).upsert(
+        {"ticker": "GOOG", "strategy": "macd_1", "period": "1y", "interval": "1d", "trade_count": count}
+    )
+    await TradeActionRepository(session).insert_many(
+        [
+            {
+                "id": i + 1,
+                "backtest_id": stat.id,
+                # Inserted newest first to check the read order
+                "datetime": datetime(2024, 1, count - i),
+                "trade_action": "BUY" if i % 2 else "close",
+                "entry_price": None,
+                "price": 100.0 + i,
+                "sl": None,
+                "tp": 110.0,
+                "size": 0.5,
+            }
+            for i in range(count)
+        ]
+    )
+    return stat.id
+
+
+class TestScheduleReads:
+    async def test_bulk_read_returns_tuples_oldest_first(self, db_session):
+        backtest_id = await _insert_actions(db_session, 3)
+        rows = await TradeActionRepository(db_session).get_schedule_rows(backtest_id)
+
+        assert [row[0] for row in rows] == [datetime(2024, 1, d) for d in (1, 2, 3)]
+        assert tuple(rows[0]) == (datetime(2024, 1, 1), "close", None, 102.0, None, 110.0, 0.5)
+
+    async def test_stream_yields_batches(self, db_session):
+        backtest_id = await _insert_actions(db_session, 5)
+        repo = TradeActionRepository(db_session)
+
+        batches = [batch async for batch in repo.stream_schedule_rows(backtest_id, batch_size=2)]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert sum(batches, []) == await repo.get_schedule_rows(backtest_id)
+
+    async def test_rows_to_arrays(self, db_session):
+        backtest_id = await _insert_actions(db_session, 2)
+        schedule = schedule_from_rows(await TradeActionRepository(db_session).get_schedule_rows(backtest_id))
+
+        assert schedule["datetime"].dtype == np.dtype("datetime64[ns]")
+        assert list(schedule["trade_action"]) == ["buy", "close"]
+        assert np.isnan(schedule["sl"]).all() and (schedule["tp"] == 110.0).all()
+
+
+class TestScheduleHash:
+    def test_stable_and_sensitive(self):
+        records = [{"datetime": datetime(2024, 1, 1), "trade_action": "buy", "price": 1.0, "size": 1.0}]
+        assert schedule_hash(schedule_from_records(records)) == schedule_hash(
+            schedule_from_records([dict(records[0])])
+        )
+        assert schedule_hash(schedule_from_records(records)) != schedule_hash(
+            schedule_from_records([{**records[0], "size": 2.0}])
+        )
+
+    def test_empty_schedule(self):
+        schedule = schedule_from_rows([])
+        assert all(len(column) == 0 for column in schedule.values())
+        assert isinstance(schedule_hash(schedule), str)
+
+
+class TestTradeActionExport:
+    @pytest.fixture
+    def export_service(self, db_session, monkeypatch):
+        @asynccontextmanager
+        async def session_local():
+            yield db_session
+
+        monkeypatch.setattr(backtests_service, "AsyncSessionLocal", session_local)
+        monkeypatch.setattr(backtests_service, "EXPORT_BATCH_SIZE", 2)
+        return backtests_service
+
+    async def test_csv_streams_all_rows(self, db_session, export_service):
+        backtest_id = await _insert_actions(db_session, 3)
+        chunks = [chunk async for chunk in await export_service.export_trade_actions_csv(backtest_id)]
+
+        lines = "".join(chunks).splitlines()
+        assert lines[0] == ",".join(TRADE_SCHEDULE_COLUMNS)
+        assert lines[1] == "2024-01-01T00:00:00,close,,102.0,,110.0,0.5"
+        assert len(lines) == 4 and len(chunks) == 3
+
+    async def test_unknown_backtest_is_404(self, export_service):
+        with pytest.raises(HTTPException) as exc:
+            await export_service.export_trade_actions_csv(999)
+        assert exc.value.status_code == 404
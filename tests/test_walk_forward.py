@@ -0,0 +1,105 @@
+"""
+Unit tests for walk-forward backtesting.
+
+Uses a synthetic signals frame — no network or DB required.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.signals.strategies.walk_forward import (
+    aggregate_out_of_sample,
+    walk_forward_backtest,
+    walk_forward_folds,
+)
+
+
+def _signals_df(n: int = 800) -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    signal = np.zeros(n, dtype=int)
+    signal[::15] = 2
+    signal[7::15] = 1
+    return pd.DataFrame(
+        {
+            "Open": close,
+            "High": close + 0.5,
+            "Low": close - 0.5,
+            "Close": close,
+            "Volume": 1000,
+            "ATR": 0.8,
+            "RSI": 50.0,
+            "TotalSignal": signal,
+        },
+        index=pd.date_range("2024-01-01", periods=n, freq="1h"),
+    )
+
+
+def _fold(ret, is_ret=10.0, trades=(), dd=-5.0, sharpe=1.0):
+    return {
+        "return_percentage": ret,
+        "in_sample_return_percentage": is_ret,
+        "trade_returns": list(trades),
+        "max_drawdown_percentage": dd,
+        "sharpe_ratio": sharpe,
+    }
+
+
+class TestWalkForwardFolds:
+    def test_test_windows_are_contiguous_and_end_on_last_bar(self):
+        folds = walk_forward_folds(1000, n_folds=4, train_ratio=3.0)
+        assert len(folds) == 4
+        assert folds[-1][2] == 1000
+        for (_, _, prev_test_end), (_, next_train_end, _) in zip(folds, folds[1:]):
+            assert prev_test_end == next_train_end
+
+    def test_train_window_is_ratio_of_test_window(self):
+        for train_start, train_end, test_end in walk_forward_folds(700, n_folds=4, train_ratio=3.0):
+            assert train_end - train_start == 3 * (test_end - train_end)
+            assert train_start >= 0
+
+    def test_too_little_data_raises(self):
+        with pytest.raises(ValueError):
+            walk_forward_folds(3, n_folds=4, train_ratio=3.0)
+
+
+class TestAggregateOutOfSample:
+    def test_returns_are_compounded(self):
+        summary = aggregate_out_of_sample([_fold(10.0), _fold(-10.0)])
+        assert summary["return_percentage"] == pytest.approx(-1.0)
+        assert summary["profitable_folds"] == 1
+
+    def test_trade_stats_are_pooled(self):
+        summary = aggregate_out_of_sample([_fold(1.0, trades=[0.02, -0.01]), _fold(1.0, trades=[0.01])])
+        assert summary["trade_count"] == 3
+        assert summary["win_rate"] == pytest.approx(200 / 3)
+        assert summary["profit_factor"] == pytest.approx(3.0)
+
+    def test_efficiency_and_drawdown(self):
+        summary = aggregate_out_of_sample([_fold(5.0, is_ret=10.0, dd=-3.0), _fold(5.0, is_ret=10.0, dd=-8.0)])
+        assert summary["walk_forward_efficiency"] == pytest.approx(0.5)
+        assert summary["max_drawdown_percentage"] == -8.0
+
+
+class TestWalkForwardBacktest:
+    def test_runs_folds_out_of_sample(self):
+        df = _signals_df()
+        result = walk_forward_backtest(
+            df, "ema_bollinger", {"best": False, "size": 0.03}, n_folds=2, train_ratio=2.0, max_workers=2
+        )
+
+        folds = result["folds"]
+        assert [f["fold"] for f in folds] == [0, 1]
+        for fold in folds:
+            assert fold["train_end"] < fold["test_start"]
+            assert set(fold["best_params"]) == {"tpslRatio", "slcoef"}
+        assert folds[-1]["test_end"] == df.index[-1]
+        assert result["out_of_sample"]["fold_count"] == 2
+        assert result["out_of_sample"]["trade_count"] == sum(f["trade_count"] for f in folds)
+
+    def test_empty_frame_raises(self):
+        with pytest.raises(ValueError):
+            walk_forward_backtest(pd.DataFrame(), "ema_bollinger", {"size": 0.03})